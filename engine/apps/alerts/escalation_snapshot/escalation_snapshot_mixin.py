@@ -15,6 +15,7 @@ from apps.alerts.escalation_snapshot.snapshot_classes import (
     EscalationPolicySnapshot,
     EscalationSnapshot,
 )
+from apps.alerts.escalation_snapshot_cache import get_raw_escalation_snapshot
 from apps.alerts.tasks import escalate_alert_group
 
 if typing.TYPE_CHECKING:
@@ -42,21 +43,12 @@ class EscalationSnapshotMixin:
         """
         Builds new escalation chain in a json serializable format (dict).
         Use this method to prepare escalation chain data for saving to alert group before start new escalation.
+        The route's escalation chain is serialized once per change and cached, see `get_raw_escalation_snapshot`.
         """
-        data = {}
+        if not self.escalation_chain_exists:
+            return EscalationSnapshot.serializer({}).data
 
-        if self.escalation_chain_exists:
-            channel_filter: "ChannelFilter" = self.channel_filter
-            escalation_chain = channel_filter.escalation_chain
-            escalation_policies = escalation_chain.escalation_policies.all()
-
-            data = {
-                "channel_filter_snapshot": channel_filter,
-                "escalation_chain_snapshot": escalation_chain,
-                "escalation_policies_snapshots": escalation_policies,
-                "slack_channel_id": self.slack_channel_id,
-            }
-        return EscalationSnapshot.serializer(data).data
+        return get_raw_escalation_snapshot(self.channel_filter, self.slack_channel_id)
 
     @property
     def channel_filter_with_respect_to_escalation_snapshot(self):
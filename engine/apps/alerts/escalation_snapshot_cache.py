@@ -0,0 +1,131 @@
+import copy
+import time
+import typing
+import uuid
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.core.cache import cache
+
+from common.cache import ensure_cache_key_allocates_to_the_same_hash_slot
+from common.lru_cache import LRUCache, LRUCacheInfo
+
+if typing.TYPE_CHECKING:
+    from apps.alerts.models import ChannelFilter
+
+ESCALATION_SNAPSHOT_VERSION_CACHE_TIMEOUT = 60 * 60 * 24  # 24 hours
+# versions are bumped as soon as routes, escalation chains and policies are saved, i.e. possibly before the transaction
+# is committed, so another process may build a snapshot from the old data under the new version. Snapshots are rebuilt
+# after this many seconds regardless of the versions, which bounds how long such a snapshot can be used.
+ESCALATION_SNAPSHOT_MAX_AGE = 60
+
+_VERSION_KEY_HASH_TAG = "escalation_snapshot_version"
+
+
+def _get_channel_filter_version_cache_key(channel_filter_id: int) -> str:
+    return ensure_cache_key_allocates_to_the_same_hash_slot(
+        f"{_VERSION_KEY_HASH_TAG}_channel_filter_{channel_filter_id}", _VERSION_KEY_HASH_TAG
+    )
+
+
+def _get_escalation_chain_version_cache_key(escalation_chain_id: int) -> str:
+    return ensure_cache_key_allocates_to_the_same_hash_slot(
+        f"{_VERSION_KEY_HASH_TAG}_escalation_chain_{escalation_chain_id}", _VERSION_KEY_HASH_TAG
+    )
+
+
+def get_escalation_snapshot_version(channel_filter_id: int, escalation_chain_id: int) -> typing.Tuple[str, str]:
+    """
+    Return the current snapshot versions of a route and an escalation chain. Versions are random tokens (not counters),
+    so a version lost from the cache can never collide with a snapshot built before that.
+    """
+    cache_keys = [
+        _get_channel_filter_version_cache_key(channel_filter_id),
+        _get_escalation_chain_version_cache_key(escalation_chain_id),
+    ]
+    versions = cache.get_many(cache_keys)
+    for cache_key in cache_keys:
+        if cache_key not in versions:
+            cache.add(cache_key, uuid.uuid4().hex, timeout=ESCALATION_SNAPSHOT_VERSION_CACHE_TIMEOUT)
+            versions[cache_key] = cache.get(cache_key)
+    return versions[cache_keys[0]], versions[cache_keys[1]]
+
+
+def invalidate_channel_filter_escalation_snapshot(channel_filter_id: int) -> None:
+    """
+    Invalidate escalation snapshots built for a route in all processes. Must be called whenever the route is updated
+    or deleted.
+    """
+    cache.set(
+        _get_channel_filter_version_cache_key(channel_filter_id),
+        uuid.uuid4().hex,
+        timeout=ESCALATION_SNAPSHOT_VERSION_CACHE_TIMEOUT,
+    )
+
+
+def invalidate_escalation_chain_escalation_snapshot(escalation_chain_id: int) -> None:
+    """
+    Invalidate escalation snapshots built for an escalation chain in all processes. Must be called whenever the chain
+    or any of its escalation policies are created, updated, deleted or reordered.
+    """
+    cache.set(
+        _get_escalation_chain_version_cache_key(escalation_chain_id),
+        uuid.uuid4().hex,
+        timeout=ESCALATION_SNAPSHOT_VERSION_CACHE_TIMEOUT,
+    )
+
+
+@dataclass
+class CachedEscalationSnapshot:
+    version: typing.Tuple[str, str]
+    # serialized snapshot without the alert group specific slack_channel_id
+    data: dict
+    built_at: float = field(default_factory=time.monotonic)
+
+
+# snapshots are keyed by (channel filter id, escalation chain id), each entry holds the versions it was built for
+_escalation_snapshots: LRUCache[typing.Tuple[int, int], CachedEscalationSnapshot] = LRUCache(
+    maxsize=settings.ESCALATION_SNAPSHOT_CACHE_SIZE
+)
+
+
+def _build_raw_escalation_snapshot(channel_filter: "ChannelFilter") -> dict:
+    from apps.alerts.escalation_snapshot.snapshot_classes import EscalationSnapshot
+
+    escalation_chain = channel_filter.escalation_chain
+    data = {
+        "channel_filter_snapshot": channel_filter,
+        "escalation_chain_snapshot": escalation_chain,
+        "escalation_policies_snapshots": escalation_chain.escalation_policies.all(),
+        "slack_channel_id": None,
+    }
+    return EscalationSnapshot.serializer(data).data
+
+
+def get_raw_escalation_snapshot(channel_filter: "ChannelFilter", slack_channel_id: typing.Optional[str]) -> dict:
+    """
+    Return a new serialized escalation snapshot for the route, which must have an escalation chain.
+    The route's escalation chain and policies are serialized at most once per version, alert groups get a copy.
+    """
+    cache_key = (channel_filter.pk, channel_filter.escalation_chain_id)
+    version = get_escalation_snapshot_version(*cache_key)
+    snapshot = _escalation_snapshots.get(cache_key)
+    if (
+        snapshot is None
+        or snapshot.version != version
+        or time.monotonic() - snapshot.built_at > ESCALATION_SNAPSHOT_MAX_AGE
+    ):
+        snapshot = CachedEscalationSnapshot(version=version, data=_build_raw_escalation_snapshot(channel_filter))
+        _escalation_snapshots.set(cache_key, snapshot)
+
+    data = copy.deepcopy(snapshot.data)
+    data["slack_channel_id"] = str(slack_channel_id) if slack_channel_id is not None else None
+    return data
+
+
+def escalation_snapshot_cache_info() -> LRUCacheInfo:
+    return _escalation_snapshots.cache_info()
+
+
+def clear_escalation_snapshot_cache() -> None:
+    _escalation_snapshots.clear()
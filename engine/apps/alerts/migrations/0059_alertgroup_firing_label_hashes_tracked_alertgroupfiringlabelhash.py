@@ -0,0 +1,46 @@
+# Generated by Django 4.2.15 on 2026-10-18 10:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django_add_default_value import AddDefaultValue
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alerts', '0058_alter_alertgroup_reason_to_skip_escalation'),
+    ]
+
+    operations = [
+        # existing alert groups have no tracked firing label hashes, new ones are tracked from their first alert
+        migrations.AddField(
+            model_name='alertgroup',
+            name='firing_label_hashes_tracked',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AlterField(
+            model_name='alertgroup',
+            name='firing_label_hashes_tracked',
+            field=models.BooleanField(default=True),
+        ),
+        # migrations.AddField enforces the default value on the app level, which leads to the issues during release
+        # adding same default value on the database level
+        AddDefaultValue(
+            model_name='alertgroup',
+            name='firing_label_hashes_tracked',
+            value=True
+        ),
+        migrations.CreateModel(
+            name='AlertGroupFiringLabelHash',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('label_hash', models.CharField(max_length=100)),
+                ('is_firing', models.BooleanField(default=True)),
+                ('last_alert_id', models.BigIntegerField()),
+                ('alert_group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='firing_label_hashes', to='alerts.alertgroup')),
+            ],
+            options={
+                'unique_together': {('alert_group', 'label_hash')},
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.15 on 2026-10-18 14:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alerts', '0059_alertgroup_firing_label_hashes_tracked_alertgroupfiringlabelhash'),
+    ]
+
+    operations = [
+        # alerts of existing alert groups are not counted, new alert groups count their alerts from the first one
+        migrations.AddField(
+            model_name='alertgroup',
+            name='alerts_count',
+            field=models.PositiveIntegerField(default=None, null=True),
+        ),
+        migrations.AlterField(
+            model_name='alertgroup',
+            name='alerts_count',
+            field=models.PositiveIntegerField(default=0, null=True),
+        ),
+        migrations.AddField(
+            model_name='alertgroup',
+            name='last_alert',
+            field=models.ForeignKey(default=None, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='alerts.alert'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 4.2.15 on 2026-10-18 21:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+from apps.alerts.tasks import update_search_tokens_for_alert_receive_channel
+
+
+def index_alert_group_titles(apps, _):
+    AlertReceiveChannel = apps.get_model("alerts", "AlertReceiveChannel")
+    for pk in AlertReceiveChannel.objects.values_list("pk", flat=True):
+        update_search_tokens_for_alert_receive_channel.delay(pk)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_management', '0022_alter_team_unique_together'),
+        ('alerts', '0060_alertgroup_alerts_count_last_alert'),
+    ]
+
+    operations = [
+        # titles of existing alert groups are indexed by update_search_tokens_for_alert_receive_channel tasks
+        migrations.AddField(
+            model_name='alertgroup',
+            name='search_tokens_indexed',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AlterField(
+            model_name='alertgroup',
+            name='search_tokens_indexed',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.CreateModel(
+            name='AlertGroupSearchToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=50)),
+                ('alert_group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_tokens', to='alerts.alertgroup')),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='alert_group_search_tokens', to='user_management.organization')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='alertgroupsearchtoken',
+            constraint=models.UniqueConstraint(fields=('organization', 'token', 'alert_group'), name='unique_alert_group_search_token'),
+        ),
+        migrations.RunPython(index_alert_group_titles, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.15 on 2026-10-18 23:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alerts', '0061_alertgroup_search_tokens'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='alertgroupsearchtoken',
+            name='unique_alert_group_search_token',
+        ),
+        migrations.AddConstraint(
+            model_name='alertgroupsearchtoken',
+            constraint=models.UniqueConstraint(fields=('organization', 'token', 'alert_group'), name='unique_alert_group_search_token', opclasses=['int8_ops', 'varchar_pattern_ops', 'int8_ops']),
+        ),
+    ]
@@ -7,14 +7,19 @@ from uuid import uuid4
 from django.conf import settings
 from django.core.validators import MinLengthValidator
 from django.db import models, transaction
-from django.db.models import JSONField
+from django.db.models import F, JSONField, Value
+from django.db.models.functions import Coalesce, Greatest
 
 from apps.alerts import tasks
 from apps.alerts.constants import TASK_DELAY_SECONDS
 from apps.alerts.incident_appearance.templaters import TemplateLoader
 from apps.alerts.signals import alert_group_escalation_snapshot_built
 from apps.alerts.tasks.distribute_alert import send_alert_create_signal
-from apps.labels.alert_group_labels import assign_labels, gather_labels_from_alert_receive_channel_and_raw_request_data
+from apps.labels.alert_group_labels import (
+    assign_labels,
+    gather_labels_from_alert_receive_channel_and_raw_request_data,
+    gather_labels_from_alert_receive_channel_and_raw_request_data_list,
+)
 from apps.labels.types import AlertLabels
 from common.jinja_templater import apply_jinja_template_to_alert_payload_and_labels
 from common.jinja_templater.apply_jinja_template import (
@@ -47,6 +52,40 @@ def generate_public_primary_key_for_alert():
     return new_public_primary_key
 
 
+def _update_alert_group_alerts_info(
+    alert_group_id: int, alerts_count: int, last_alert_pk: int, alert_group: typing.Optional["AlertGroup"] = None
+) -> None:
+    """
+    Update alerts info denormalized on the alert group after inserting alerts into it. If passed, the alert group
+    instance is updated too.
+    """
+    from apps.alerts.models import AlertGroup
+
+    AlertGroup.objects.filter(pk=alert_group_id).update(
+        # stays None for alert groups whose alerts were never counted
+        alerts_count=F("alerts_count") + alerts_count,
+        # alerts inserted concurrently may be committed out of order, keep the latest one
+        last_alert_id=Greatest(Coalesce("last_alert_id", Value(0)), Value(last_alert_pk)),
+    )
+    if alert_group is not None:
+        if alert_group.alerts_count is not None:
+            alert_group.alerts_count += alerts_count
+        if last_alert_pk > (alert_group.last_alert_id or 0):
+            alert_group.last_alert_id = last_alert_pk
+
+
+class AlertBatchCreateError(Exception):
+    """
+    Raised by Alert.create_many when creating the alerts of a bucket fails. Alerts of the buckets processed before the
+    failing one are committed, `pending_raw_request_data_list` holds the payloads which were not created.
+    """
+
+    def __init__(self, created_alerts: typing.List["Alert"], pending_raw_request_data_list: typing.List[typing.Any]):
+        super().__init__(f"{len(pending_raw_request_data_list)} alerts were not created")
+        self.created_alerts = created_alerts
+        self.pending_raw_request_data_list = pending_raw_request_data_list
+
+
 class Alert(models.Model):
     group: typing.Optional["AlertGroup"]
     resolved_alert_groups: "RelatedManager['AlertGroup']"
@@ -79,6 +118,13 @@ class Alert(models.Model):
 
     RawRequestData: typing.TypeAlias = typing.Union[typing.Dict, typing.List]
 
+    def save(self, *args, **kwargs):
+        created = self._state.adding
+        super().save(*args, **kwargs)
+        if created and self.group_id is not None:
+            alert_group = self.group if Alert.group.is_cached(self) else None
+            _update_alert_group_alerts_info(self.group_id, 1, self.pk, alert_group)
+
     def get_integration_optimization_hash(self):
         """
         Should be overloaded in child classes.
@@ -99,9 +145,10 @@ class Alert(models.Model):
         is_demo: bool = False,
         channel_filter: typing.Optional["ChannelFilter"] = None,
         received_at: typing.Optional[str] = None,
+        inside_organization_number: typing.Optional[int] = None,
     ) -> "Alert":
         """
-        Creates an alert and a group if needed.
+        Creates an alert and a group if needed. `inside_organization_number` is used for the new group, if passed.
         """
         # This import is here to avoid circular imports
         from apps.alerts.models import AlertGroup, AlertGroupLogRecord, AlertReceiveChannel, ChannelFilter
@@ -120,6 +167,7 @@ class Alert(models.Model):
             channel_filter=channel_filter,
             group_data=group_data,
             received_at=received_at,
+            inside_organization_number=inside_organization_number,
         )
         logger.debug(f"alert group {group.pk} created={group_created}")
 
@@ -194,6 +242,187 @@ class Alert(models.Model):
 
         return alert
 
+    @classmethod
+    def create_many(
+        cls,
+        alert_receive_channel: "AlertReceiveChannel",
+        raw_request_data_list: typing.List[RawRequestData],
+        received_at: typing.Optional[str] = None,
+        on_bucket_created: typing.Optional[typing.Callable[[typing.List["Alert"]], None]] = None,
+    ) -> typing.List["Alert"]:
+        """
+        Creates alerts for multiple payloads of the same integration, e.g. all alerts of an AlertManager notification.
+        Alerts are never resolved by source here, same as Alert.create with enable_autoresolve=False.
+
+        Payloads are rendered and routed in memory, then grouped by (route, group distinction). Open alert groups for all
+        of them are fetched with a single query. Alerts of a bucket without an open alert group go through Alert.create
+        (which creates the alert group, its log records and starts escalation) until one of them lands in an open alert
+        group, all other alerts are bulk-inserted and produce a single alert create signal per alert group.
+
+        Each bucket is created in its own transaction, together with `on_bucket_created` called with its alerts. If a
+        bucket fails, AlertBatchCreateError is raised with the payloads of that bucket and the following ones, so they
+        can be retried without creating the alerts of the committed buckets again. The number of an alert group a
+        bucket may open is reserved before its transaction, so the organization's alert group counter isn't locked
+        until the bucket is committed.
+
+        Returned alerts have their pk set, also when bulk_create doesn't set it (MySQL).
+        """
+        from apps.alerts.models import AlertGroup, AlertGroupCounter, ChannelFilter
+        from apps.alerts.routing import get_route_table
+
+        route_table = get_route_table(alert_receive_channel.pk)
+        labels_list = gather_labels_from_alert_receive_channel_and_raw_request_data_list(
+            alert_receive_channel, raw_request_data_list
+        )
+
+        # bucket payloads by (route, group distinction), preserving the order in which they were received
+        buckets: typing.Dict[
+            typing.Tuple[typing.Optional[int], str],
+            typing.List[typing.Tuple[Alert.RawRequestData, "AlertGroup.GroupData"]],
+        ] = {}
+        for raw_request_data, parsed_labels in zip(raw_request_data_list, labels_list):
+            group_data = cls.render_group_data(alert_receive_channel, raw_request_data, parsed_labels)
+            channel_filter_id = route_table.select_route(raw_request_data, parsed_labels)
+            buckets.setdefault((channel_filter_id, group_data.group_distinction), []).append(
+                (raw_request_data, group_data)
+            )
+
+        channel_filters = ChannelFilter.objects.in_bulk([channel_filter_id for channel_filter_id, _ in buckets])
+        open_alert_groups = {
+            (alert_group.channel_filter_id, alert_group.distinction): alert_group
+            for alert_group in AlertGroup.objects.filter(
+                channel=alert_receive_channel,
+                channel_filter_id__in=channel_filters.keys(),
+                distinction__in=[distinction for _, distinction in buckets],
+                is_open_for_grouping__isnull=False,
+            )
+        }
+
+        created_alerts: typing.List[Alert] = []
+        bucket_items = list(buckets.items())
+        for idx, ((channel_filter_id, distinction), bucket) in enumerate(bucket_items):
+            try:
+                group = open_alert_groups.get((channel_filter_id, distinction))
+                inside_organization_number = None
+                if group is None:
+                    inside_organization_number = AlertGroupCounter.objects.get_value(
+                        organization=alert_receive_channel.organization
+                    )
+                with transaction.atomic():
+                    bucket_alerts = cls._create_bucket(
+                        alert_receive_channel,
+                        channel_filters.get(channel_filter_id),
+                        group,
+                        bucket,
+                        received_at,
+                        inside_organization_number,
+                    )
+                    if on_bucket_created is not None:
+                        on_bucket_created(bucket_alerts)
+            except Exception as e:
+                pending_raw_request_data_list = [
+                    raw_request_data
+                    for _, pending_bucket in bucket_items[idx:]
+                    for raw_request_data, _ in pending_bucket
+                ]
+                raise AlertBatchCreateError(created_alerts, pending_raw_request_data_list) from e
+            created_alerts += bucket_alerts
+
+        return created_alerts
+
+    @classmethod
+    def _create_bucket(
+        cls,
+        alert_receive_channel: "AlertReceiveChannel",
+        channel_filter: typing.Optional["ChannelFilter"],
+        group: typing.Optional["AlertGroup"],
+        bucket: typing.List[typing.Tuple[RawRequestData, "AlertGroup.GroupData"]],
+        received_at: typing.Optional[str],
+        inside_organization_number: typing.Optional[int] = None,
+    ) -> typing.List["Alert"]:
+        created_alerts: typing.List[Alert] = []
+        # Without an open alert group, alerts go through get_or_create_grouping until one of them opens (or lands in)
+        # an open alert group. A resolve alert may be attached to the latest resolved alert group, firing alerts
+        # following it must not. At most one alert group is created, using the number reserved for the bucket.
+        while bucket and group is None:
+            (raw_request_data, _), bucket = bucket[0], bucket[1:]
+            alert = cls.create(
+                title=None,
+                message=None,
+                image_url=None,
+                link_to_upstream_details=None,
+                alert_receive_channel=alert_receive_channel,
+                integration_unique_data=None,
+                raw_request_data=raw_request_data,
+                enable_autoresolve=False,
+                channel_filter=channel_filter,
+                received_at=received_at,
+                inside_organization_number=inside_organization_number,
+            )
+            created_alerts.append(alert)
+            if alert.group.is_open_for_grouping:
+                group = alert.group
+
+        if bucket:
+            created_alerts += cls._bulk_create_for_alert_group(group, bucket)
+            if not group.acknowledged and any(group_data.is_acknowledge_signal for _, group_data in bucket):
+                group.acknowledge_by_source()
+
+        return created_alerts
+
+    @classmethod
+    def _bulk_create_for_alert_group(
+        cls, group: "AlertGroup", payloads: typing.List[typing.Tuple[RawRequestData, "AlertGroup.GroupData"]]
+    ) -> typing.List["Alert"]:
+        """
+        Bulk-insert alerts into an existing alert group and send a single alert create signal for the last one.
+        """
+        from apps.alerts.models import AlertGroup
+
+        alerts = [
+            cls(
+                is_resolve_signal=group_data.is_resolve_signal,
+                group=group,
+                raw_request_data=raw_request_data,
+                public_primary_key=generate_public_primary_key("A"),
+            )
+            for raw_request_data, group_data in payloads
+        ]
+        # regenerate public primary keys colliding with existing alerts with a single query instead of one per alert
+        existing_public_primary_keys = set(
+            cls.objects.filter(public_primary_key__in=[alert.public_primary_key for alert in alerts]).values_list(
+                "public_primary_key", flat=True
+            )
+        )
+        for alert in alerts:
+            if alert.public_primary_key in existing_public_primary_keys:
+                alert.public_primary_key = generate_public_primary_key_for_alert()
+        cls.objects.bulk_create(alerts, batch_size=5000)
+
+        if alerts[0].pk is None:
+            # bulk_create doesn't set pks on MySQL, fetch them with a single query
+            pks = dict(
+                cls.objects.filter(public_primary_key__in=[alert.public_primary_key for alert in alerts]).values_list(
+                    "public_primary_key", "pk"
+                )
+            )
+            for alert in alerts:
+                alert.pk = pks[alert.public_primary_key]
+        last_alert_pk = alerts[-1].pk
+        _update_alert_group_alerts_info(group.pk, len(alerts), last_alert_pk, group)
+        transaction.on_commit(partial(send_alert_create_signal.apply_async, (last_alert_pk,)))
+        logger.debug(f"{len(alerts)} alerts bulk created for alert group {group.pk}")
+
+        if group.pause_escalation:
+            group.start_escalation_if_needed(countdown=TASK_DELAY_SECONDS)
+
+        # Store exact alert which resolved group.
+        if group.resolved_by == AlertGroup.SOURCE and group.resolved_by_alert is None:
+            group.resolved_by_alert = alerts[0]
+            group.save(update_fields=["resolved_by_alert"])
+
+        return alerts
+
     def wipe(self, wiped_by, wiped_at):
         wiped_by_user_verbal = "by " + wiped_by.username
 
@@ -34,6 +34,7 @@ from common.public_primary_keys import generate_public_primary_key, increase_pub
 from common.utils import clean_markup, str_or_backup
 
 from .alert_group_counter import AlertGroupCounter
+from .alert_group_search_token import create_alert_group_search_tokens, update_alert_groups_search_tokens
 
 if typing.TYPE_CHECKING:
     from django.db.models.manager import RelatedManager
@@ -102,18 +103,26 @@ class Permalinks(typing.TypedDict):
 
 
 class AlertGroupQuerySet(models.QuerySet):
-    def create(self, **kwargs):
+    def create(self, inside_organization_number=None, **kwargs):
         organization = kwargs["channel"].organization
 
-        inside_organization_number = AlertGroupCounter.objects.get_value(organization=organization) + 1
-        return super().create(**kwargs, inside_organization_number=inside_organization_number)
+        if inside_organization_number is None:
+            inside_organization_number = AlertGroupCounter.objects.get_value(organization=organization)
+        alert_group = super().create(**kwargs, inside_organization_number=inside_organization_number)
+        create_alert_group_search_tokens(organization.pk, alert_group)
+        return alert_group
 
-    def get_or_create_grouping(self, channel, channel_filter, group_data, received_at=None):
+    def get_or_create_grouping(
+        self, channel, channel_filter, group_data, received_at=None, inside_organization_number=None
+    ):
         """
         This method is similar to default Django QuerySet.get_or_create(), please see the original get_or_create method.
         The difference is that this method is trying to get an object using multiple queries with different filters.
-        Also, "create" is invoked without transaction.atomic to reduce number of ConcurrentUpdateError's which can be
-        raised in AlertGroupQuerySet.create() due to optimistic locking of AlertGroupCounter model.
+        The inside_organization_number of a new alert group is reserved before "create" is wrapped in a savepoint, so
+        AlertGroupCounter can hand out values from blocks reserved for the current process when there's no outer
+        transaction (see AlertGroupCounterQuerySet.get_value). Callers creating alert groups inside a transaction should
+        reserve `inside_organization_number` before opening it, otherwise the organization's counter row stays locked
+        until the transaction commits (see Alert.create_many).
         """
         search_params = {
             "channel": channel,
@@ -136,13 +145,18 @@ class AlertGroupQuerySet(models.QuerySet):
                 pass
 
         # Create a new group if we couldn't group it to any existing ones
+        if inside_organization_number is None:
+            inside_organization_number = AlertGroupCounter.objects.get_value(organization=channel.organization)
         try:
-            alert_group = self.create(
-                **search_params,
-                is_open_for_grouping=True,
-                web_title_cache=group_data.web_title_cache,
-                received_at=received_at,
-            )
+            # savepoint, so the alert group created concurrently can still be fetched inside an outer transaction
+            with transaction.atomic():
+                alert_group = self.create(
+                    **search_params,
+                    is_open_for_grouping=True,
+                    web_title_cache=group_data.web_title_cache,
+                    received_at=received_at,
+                    inside_organization_number=inside_organization_number,
+                )
             alert_group_created_signal.send(sender=self.__class__, alert_group=alert_group)
             return (alert_group, True)
         except IntegrityError:
@@ -293,6 +307,17 @@ class AlertGroup(AlertGroupSlackRenderingMixin, EscalationSnapshotMixin, models.
         related_name="resolved_alert_groups",
     )
 
+    # Denormalized alerts info, updated when alerts are inserted (see Alert.save and Alert._bulk_create_for_alert_group).
+    # alerts_count is None for alert groups created before it was introduced, their alerts have to be counted.
+    alerts_count = models.PositiveIntegerField(null=True, default=0)
+    last_alert = models.ForeignKey(
+        "alerts.Alert",
+        on_delete=models.SET_NULL,
+        null=True,
+        default=None,
+        related_name="+",
+    )
+
     resolved_at = models.DateTimeField(blank=True, null=True)
     acknowledged = models.BooleanField(default=False)
     acknowledged_on_source = models.BooleanField(default=False)
@@ -314,6 +339,10 @@ class AlertGroup(AlertGroupSlackRenderingMixin, EscalationSnapshotMixin, models.
 
     active_escalation_id = models.CharField(max_length=100, null=True, default=None)  # ID generated by celery
     active_resolve_calculation_id = models.CharField(max_length=100, null=True, default=None)  # ID generated by celery
+    # whether firing label hashes of the group are tracked in AlertGroupFiringLabelHash (False for groups created before)
+    firing_label_hashes_tracked = models.BooleanField(default=True)
+    # whether the title is indexed in AlertGroupSearchToken (False for groups created before, until they're indexed)
+    search_tokens_indexed = models.BooleanField(default=True)
 
     SILENCE_DELAY_OPTIONS = (
         (1800, "30 minutes"),
@@ -1249,6 +1278,7 @@ class AlertGroup(AlertGroupSlackRenderingMixin, EscalationSnapshotMixin, models.
                 alert.wipe(wiped_by=self.wiped_by, wiped_at=self.wiped_at)
 
             self.save(update_fields=update_fields)
+            update_alert_groups_search_tokens(self.channel.organization_id, [self])
 
         # Update alert group state and response time metrics cache
         self._update_metrics(organization_id=user.organization_id, previous_state=initial_state, state=self.state)
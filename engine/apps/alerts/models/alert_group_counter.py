@@ -1,30 +1,107 @@
-from django.db import models
+import logging
+import threading
+import time
+import typing
 
+from django.conf import settings
+from django.db import IntegrityError, connection, models, transaction
+from django.db.models import F
 
-class ConcurrentUpdateError(Exception):
-    pass
+from apps.metrics_exporter.counters import Counters
+
+if typing.TYPE_CHECKING:
+    from apps.user_management.models import Organization
+
+logger = logging.getLogger(__name__)
+
+# reservations slower than this are logged, as they indicate contention on the organization's counter row
+SLOW_RESERVATION_THRESHOLD_SECONDS = 1.0
+
+alert_group_counter_counters = Counters(
+    "alert_group_counter",
+    {
+        "reservations": "Number of inside_organization_number reservations from the counter row",
+        "reservation_wait_seconds": "Time spent reserving inside_organization_number values, incl. waiting for the lock",
+    },
+)
+
+
+# per-process reserved ranges of inside_organization_number values, organization_id -> (next value, last value)
+_reserved_blocks: typing.Dict[int, typing.Tuple[int, int]] = {}
+_reserved_blocks_lock = threading.Lock()
 
 
 class AlertGroupCounterQuerySet(models.QuerySet):
-    def get_value(self, organization):
-        counter, _ = self.get_or_create(organization=organization)
+    def get_value(self, organization: "Organization") -> int:
+        """
+        Return the next inside_organization_number for the organization.
 
-        num_updated_rows = self.filter(organization=organization, value=counter.value).update(value=counter.value + 1)
-        if num_updated_rows == 0:
-            raise ConcurrentUpdateError()
+        Values are taken from a range reserved for the current process, a new range of
+        ALERT_GROUP_COUNTER_BLOCK_SIZE values is reserved when the current one is used up. This means values are unique,
+        but with block size > 1 they are not strictly increasing across processes and unused values of a range are lost
+        when the process exits, leaving gaps.
+        """
+        block_size = settings.ALERT_GROUP_COUNTER_BLOCK_SIZE
 
-        return counter.value
+        # A range reserved inside an outer transaction would be rolled back together with it, while still being cached
+        # in this process. Only reserve single values in that case, so a rollback can't lead to duplicate values.
+        if block_size <= 1 or connection.in_atomic_block:
+            value, _ = self.reserve_block(organization.pk, 1)
+            return value
+
+        with _reserved_blocks_lock:
+            next_value, last_value = _reserved_blocks.get(organization.pk, (1, 0))
+            if next_value <= last_value:
+                _reserved_blocks[organization.pk] = (next_value + 1, last_value)
+                return next_value
+
+        first_value, last_value = self.reserve_block(organization.pk, block_size)
+        with _reserved_blocks_lock:
+            _reserved_blocks[organization.pk] = (first_value + 1, last_value)
+        return first_value
+
+    def reserve_block(self, organization_id: int, size: int) -> typing.Tuple[int, int]:
+        """
+        Atomically reserve `size` consecutive values for the organization, return the first and the last one.
+        The counter row is incremented in place, so concurrent reservations wait for each other instead of failing.
+        The number of reservations and time spent on them are counted, to monitor contention on the counter row.
+        """
+        started_at = time.perf_counter()
+        with transaction.atomic():
+            num_updated_rows = self.filter(organization_id=organization_id).update(value=F("value") + size)
+            if num_updated_rows == 0:
+                try:
+                    with transaction.atomic():
+                        self.create(organization_id=organization_id, value=size)
+                except IntegrityError:
+                    # counter was created concurrently
+                    self.filter(organization_id=organization_id).update(value=F("value") + size)
+            last_value = self.filter(organization_id=organization_id).values_list("value", flat=True).get()
+        duration = time.perf_counter() - started_at
+
+        alert_group_counter_counters.add(reservations=1, reservation_wait_seconds=duration)
+        if duration > SLOW_RESERVATION_THRESHOLD_SECONDS:
+            logger.warning(
+                f"Slow alert group counter reservation organization_id={organization_id} size={size} "
+                f"duration={duration:.3f}s"
+            )
+
+        return last_value - size + 1, last_value
 
 
 class AlertGroupCounter(models.Model):
     """
-    This model is used to assign unique, increasing inside_organization_number's for alert groups.
-    It uses optimistic locking to get values and raises ConcurrentUpdateError exception in case of concurrent updates.
-    This is used on alert group creation in order to not block Celery workers with select_for_update and give space
-    to other tasks to run in case of high load on alert group creation.
+    This model is used to assign unique inside_organization_number's for alert groups.
+    Values are reserved in blocks of ALERT_GROUP_COUNTER_BLOCK_SIZE with an atomic increment of the counter row, so
+    alert group creation never needs to be retried because of concurrent updates. `value` is the last reserved value.
     """
 
     objects = models.Manager.from_queryset(AlertGroupCounterQuerySet)()
 
     organization = models.OneToOneField("user_management.Organization", on_delete=models.CASCADE)
     value = models.PositiveBigIntegerField(default=0)
+
+    @staticmethod
+    def clear_reserved_blocks() -> None:
+        with _reserved_blocks_lock:
+            _reserved_blocks.clear()
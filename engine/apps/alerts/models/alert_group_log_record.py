@@ -23,6 +23,30 @@ logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
 
+class AlertGroupLogRecordQuerySet(models.QuerySet):
+    def bulk_create_with_log_report_update(
+        self, log_records: typing.List["AlertGroupLogRecord"]
+    ) -> typing.List["AlertGroupLogRecord"]:
+        """
+        Insert log records with a single query. bulk_create doesn't send post_save, so instead of updating the log
+        report once per log record (see `listen_for_alertgrouplogrecord`), it's updated once per alert group.
+        """
+        if not log_records:
+            return []
+        log_records = self.bulk_create(log_records)
+        alert_group_pks = {
+            log_record.alert_group_id
+            for log_record in log_records
+            if log_record.type not in AlertGroupLogRecord.TYPES_SKIPPING_UPDATE_SIGNAL
+        }
+        for alert_group_pk in alert_group_pks:
+            logger.debug(
+                f"send_update_log_report_signal for alert_group {alert_group_pk}, {len(log_records)} log records created"
+            )
+            tasks.schedule_update_log_report_signal(alert_group_pk, countdown=8)
+        return log_records
+
+
 class AlertGroupLogRecord(models.Model):
     alert_group: "AlertGroup"
     author: typing.Optional["User"]
@@ -32,6 +56,8 @@ class AlertGroupLogRecord(models.Model):
     invitation: typing.Optional["Invitation"]
     root_alert_group: typing.Optional["AlertGroup"]
 
+    objects = models.Manager.from_queryset(AlertGroupLogRecordQuerySet)()
+
     (
         TYPE_ACK,
         TYPE_UN_ACK,
@@ -621,4 +647,4 @@ def listen_for_alertgrouplogrecord(sender, instance, created, *args, **kwargs):
             f"send_update_log_report_signal for alert_group {alert_group_pk}, "
             f"alert group event: {instance.get_type_display()}"
         )
-        tasks.send_update_log_report_signal.apply_async(kwargs={"alert_group_pk": alert_group_pk}, countdown=8)
+        tasks.schedule_update_log_report_signal(alert_group_pk, countdown=8)
@@ -0,0 +1,95 @@
+import re
+import typing
+
+from django.db import models
+from django.db.models import Q
+
+if typing.TYPE_CHECKING:
+    from apps.alerts.models import AlertGroup
+
+SEARCH_TOKEN_RE = re.compile(r"\w+")
+SEARCH_TOKEN_MAX_LENGTH = 50
+# tokens after the first MAX_SEARCH_TOKENS_PER_ALERT_GROUP distinct ones are not indexed, titles are usually short
+MAX_SEARCH_TOKENS_PER_ALERT_GROUP = 100
+
+
+def get_search_tokens(text: typing.Optional[str]) -> typing.List[str]:
+    """
+    Split text into distinct lowercase word tokens, same for indexed titles and search terms.
+    """
+    if not text:
+        return []
+    tokens = dict.fromkeys(token[:SEARCH_TOKEN_MAX_LENGTH] for token in SEARCH_TOKEN_RE.findall(text.lower()))
+    return list(tokens)[:MAX_SEARCH_TOKENS_PER_ALERT_GROUP]
+
+
+class AlertGroupSearchToken(models.Model):
+    """
+    Inverted index of alert group titles (web_title_cache), so alert groups can be searched by title without scanning
+    the alert group table. Tokens are kept in sync with the title by `update_alert_groups_search_tokens`.
+    """
+
+    alert_group = models.ForeignKey("alerts.AlertGroup", on_delete=models.CASCADE, related_name="search_tokens")
+    organization = models.ForeignKey(
+        "user_management.Organization", on_delete=models.CASCADE, related_name="alert_group_search_tokens"
+    )
+    token = models.CharField(max_length=SEARCH_TOKEN_MAX_LENGTH)
+
+    class Meta:
+        constraints = [
+            # also serves token prefix lookups (token__startswith). PostgreSQL only uses btree indexes for LIKE with the
+            # C collation or a pattern operator class, opclasses are ignored by other databases.
+            models.UniqueConstraint(
+                fields=["organization", "token", "alert_group"],
+                name="unique_alert_group_search_token",
+                opclasses=["int8_ops", "varchar_pattern_ops", "int8_ops"],
+            )
+        ]
+
+
+def _build_search_tokens(organization_id: int, alert_group: "AlertGroup") -> typing.List[AlertGroupSearchToken]:
+    return [
+        AlertGroupSearchToken(alert_group_id=alert_group.pk, organization_id=organization_id, token=token)
+        for token in get_search_tokens(alert_group.web_title_cache)
+    ]
+
+
+def create_alert_group_search_tokens(organization_id: int, alert_group: "AlertGroup") -> None:
+    """
+    Index the title of a new alert group.
+    """
+    AlertGroupSearchToken.objects.bulk_create(_build_search_tokens(organization_id, alert_group))
+
+
+def update_alert_groups_search_tokens(organization_id: int, alert_groups: typing.Sequence["AlertGroup"]) -> None:
+    """
+    Re-index titles of the organization's alert groups, must be called whenever web_title_cache is updated.
+    """
+    from apps.alerts.models import AlertGroup
+
+    alert_group_pks = [alert_group.pk for alert_group in alert_groups]
+    AlertGroupSearchToken.objects.filter(alert_group_id__in=alert_group_pks).delete()
+    AlertGroupSearchToken.objects.bulk_create(
+        [token for alert_group in alert_groups for token in _build_search_tokens(organization_id, alert_group)],
+        batch_size=1000,
+    )
+    AlertGroup.objects.filter(pk__in=alert_group_pks, search_tokens_indexed=False).update(search_tokens_indexed=True)
+
+
+def get_title_search_filter(organization_id: int, term: str) -> Q:
+    """
+    Return a filter matching alert groups with every token of the search term being a prefix of a title token.
+    Titles of alert groups created before they were indexed (search_tokens_indexed=False) are scanned instead.
+    """
+    tokens = get_search_tokens(term)
+    if not tokens:
+        return Q(web_title_cache__icontains=term)
+
+    indexed_filter = Q(search_tokens_indexed=True)
+    for token in tokens:
+        indexed_filter &= Q(
+            pk__in=AlertGroupSearchToken.objects.filter(
+                organization_id=organization_id, token__startswith=token
+            ).values("alert_group_id")
+        )
+    return indexed_filter | Q(search_tokens_indexed=False, web_title_cache__icontains=term)
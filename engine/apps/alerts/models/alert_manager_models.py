@@ -1,7 +1,8 @@
 import hashlib
 import json
+import typing
 
-from django.db import transaction
+from django.db import models, transaction
 
 from apps.alerts.models import Alert, AlertGroup
 
@@ -15,33 +16,71 @@ from apps.alerts.models import Alert, AlertGroup
 # error: Couldn't resolve related manager for relation 'dependent_alert_groups'
 # (from apps.alerts.models.alert_group.AlertGroup.alerts.AlertGroup.root_alert_group).  [django-manager-missing]
 class AlertGroupForAlertManager(AlertGroup):  # type: ignore[django-manager-missing]
-    MAX_ALERTS_IN_GROUP_FOR_AUTO_RESOLVE = 500
+    @staticmethod
+    def track_firing_label_hashes(alerts: typing.Iterable[Alert]) -> None:
+        """
+        Update the label hashes of alert groups with newly created alerts. A firing alert marks its label hash as
+        firing, a resolved alert marks it as not firing.
+
+        Each label hash keeps the pk of the last alert applied to it and older alerts are ignored, so alerts of a group
+        tracked concurrently and out of order lead to the same state as replaying the group's alerts in pk order.
+        """
+        # (alert group id, label hash) -> (last alert pk, is firing)
+        latest_states: typing.Dict[typing.Tuple[int, str], typing.Tuple[int, bool]] = {}
+        for alert in alerts:
+            key = (alert.group_id, get_label_hash(alert.raw_request_data))
+            if key not in latest_states or latest_states[key][0] < alert.pk:
+                latest_states[key] = (alert.pk, not is_resolve_payload(alert.raw_request_data))
+        if not latest_states:
+            return
+
+        AlertGroupFiringLabelHash.objects.bulk_create(
+            [
+                AlertGroupFiringLabelHash(
+                    alert_group_id=alert_group_id, label_hash=label_hash, last_alert_id=alert_pk, is_firing=is_firing
+                )
+                for (alert_group_id, label_hash), (alert_pk, is_firing) in latest_states.items()
+            ],
+            ignore_conflicts=True,
+        )
+        # label hashes which already existed are updated, unless a later alert was applied to them concurrently
+        existing_label_hashes = AlertGroupFiringLabelHash.objects.filter(
+            alert_group_id__in={alert_group_id for alert_group_id, _ in latest_states},
+            label_hash__in={label_hash for _, label_hash in latest_states},
+        ).values_list("pk", "alert_group_id", "label_hash", "last_alert_id")
+        for pk, alert_group_id, label_hash, last_alert_id in existing_label_hashes:
+            alert_pk, is_firing = latest_states.get((alert_group_id, label_hash), (0, False))
+            if last_alert_id < alert_pk:
+                AlertGroupFiringLabelHash.objects.filter(pk=pk, last_alert_id__lt=alert_pk).update(
+                    last_alert_id=alert_pk, is_firing=is_firing
+                )
 
     def is_alert_a_resolve_signal(self, alert):
-        non_resolved_hashes = set()
-        hash = alert.get_integration_optimization_hash()
-        if alert.calculated_is_resolve_signal:
-            other_alerts = AlertForAlertManager.objects.filter(group=self).exclude(pk=alert.pk)[
-                : AlertGroupForAlertManager.MAX_ALERTS_IN_GROUP_FOR_AUTO_RESOLVE
-            ]
-            # Calculate leftover hashes
-            for alert in other_alerts:
-                if alert.calculated_is_resolve_signal:
-                    try:
-                        non_resolved_hashes.remove(alert.get_integration_optimization_hash())
-                    except KeyError:
-                        pass
-                else:
-                    non_resolved_hashes.add(alert.get_integration_optimization_hash())
-            # Remove last hash
-            try:
-                non_resolved_hashes.remove(hash)
-            except KeyError:
-                pass
-            return len(non_resolved_hashes) == 0
-        else:
+        if not alert.calculated_is_resolve_signal:
             return False
 
+        hash = get_label_hash(alert.raw_request_data)
+        if self.firing_label_hashes_tracked:
+            return not self.firing_label_hashes.filter(is_firing=True).exclude(label_hash=hash).exists()
+
+        # Alert groups created before firing label hashes were tracked, replay all the alerts of the group
+        non_resolved_hashes = set()
+        other_alerts_raw_request_data = (
+            Alert.objects.filter(group=self)
+            .exclude(pk=alert.pk)
+            .order_by("pk")
+            .values_list("raw_request_data", flat=True)
+        )
+        # Calculate leftover hashes
+        for raw_request_data in other_alerts_raw_request_data.iterator():
+            if is_resolve_payload(raw_request_data):
+                non_resolved_hashes.discard(get_label_hash(raw_request_data))
+            else:
+                non_resolved_hashes.add(get_label_hash(raw_request_data))
+        # Remove last hash
+        non_resolved_hashes.discard(hash)
+        return len(non_resolved_hashes) == 0
+
     class Meta:
         app_label = "alerts"
         proxy = True
@@ -56,10 +95,7 @@ class AlertForAlertManager(Alert):  # type: ignore[django-manager-missing]
                 else:
                     alert = self
 
-                _hash = dict(alert.raw_request_data.get("labels", {}))
-                _hash = json.dumps(_hash, sort_keys=True)
-                _hash = hashlib.md5(str(_hash).encode()).hexdigest()
-                alert.integration_optimization_hash = _hash
+                alert.integration_optimization_hash = get_label_hash(alert.raw_request_data)
 
                 if self.id is not None:
                     alert.save()
@@ -70,8 +106,35 @@ class AlertForAlertManager(Alert):  # type: ignore[django-manager-missing]
 
     @property
     def calculated_is_resolve_signal(self):
-        return self.raw_request_data.get("status", "") == "resolved"
+        return is_resolve_payload(self.raw_request_data)
 
     class Meta:
         app_label = "alerts"
         proxy = True
+
+
+class AlertGroupFiringLabelHash(models.Model):
+    """
+    Label hashes of the alerts of an AlertManager alert group and whether they are currently firing. Maintained on each
+    alert insert by AlertGroupForAlertManager.track_firing_label_hashes, so resolving by source doesn't need to replay
+    all the alerts of the group.
+    """
+
+    alert_group = models.ForeignKey("alerts.AlertGroup", on_delete=models.CASCADE, related_name="firing_label_hashes")
+    label_hash = models.CharField(max_length=100)
+    is_firing = models.BooleanField(default=True)
+    # pk of the last alert applied, older alerts tracked later are ignored
+    last_alert_id = models.BigIntegerField()
+
+    class Meta:
+        unique_together = ("alert_group", "label_hash")
+
+
+def get_label_hash(raw_request_data: Alert.RawRequestData) -> str:
+    _hash = dict(raw_request_data.get("labels", {}))
+    _hash = json.dumps(_hash, sort_keys=True)
+    return hashlib.md5(str(_hash).encode()).hexdigest()
+
+
+def is_resolve_payload(raw_request_data: Alert.RawRequestData) -> bool:
+    return raw_request_data.get("status", "") == "resolved"
@@ -9,7 +9,7 @@ from django.conf import settings
 from django.core.validators import MinLengthValidator
 from django.db import models, transaction
 from django.db.models import BigIntegerField, Case, F, Q, When
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from django.utils import timezone
 from django.utils.crypto import get_random_string
@@ -21,6 +21,7 @@ from apps.alerts.models.maintainable_object import MaintainableObject
 from apps.alerts.tasks import disable_maintenance, disconnect_integration_from_alerting_contact_points
 from apps.base.messaging import get_messaging_backend_from_id
 from apps.base.utils import live_settings
+from apps.integrations.alert_receive_channel_cache import update_alert_receive_channel_cache
 from apps.integrations.legacy_prefix import remove_legacy_prefix
 from apps.integrations.metadata import heartbeat
 from apps.integrations.tasks import create_alert, create_alertmanager_alerts
@@ -35,7 +36,7 @@ from apps.slack.utils import post_message_to_channel
 from common.api_helpers.utils import create_engine_url
 from common.exceptions import TeamCanNotBeChangedError, UnableToSendDemoAlert
 from common.insight_log import EntityEvent, write_resource_insight_log
-from common.jinja_templater import jinja_template_env
+from common.jinja_templater import get_compiled_template
 from common.public_primary_keys import generate_public_primary_key, increase_public_primary_key_length
 
 if typing.TYPE_CHECKING:
@@ -463,7 +464,7 @@ class AlertReceiveChannel(IntegrationOptionsMixin, MaintainableObject):
         # TODO: AMV2: Remove this check after legacy integrations are migrated.
         if self.integration == AlertReceiveChannel.INTEGRATION_LEGACY_GRAFANA_ALERTING:
             contact_points = self.contact_points.all()
-            rendered_description = jinja_template_env.from_string(self.config.description).render(
+            rendered_description = get_compiled_template(self.config.description).render(
                 is_finished_alerting_setup=self.is_finished_alerting_setup,
                 grafana_alerting_entities=[
                     {
@@ -791,3 +792,12 @@ def listen_for_alertreceivechannel_model_save(
         metrics_remove_deleted_integration_from_cache(instance)
     else:
         metrics_update_integration_cache(instance)
+
+    update_alert_receive_channel_cache(instance)
+
+
+@receiver(post_delete, sender=AlertReceiveChannel)
+def listen_for_alertreceivechannel_model_delete(
+    sender: AlertReceiveChannel, instance: AlertReceiveChannel, **kwargs
+) -> None:
+    update_alert_receive_channel_cache(instance, deleted=True)
@@ -6,7 +6,11 @@ import typing
 from django.conf import settings
 from django.core.validators import MinLengthValidator
 from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 
+from apps.alerts.escalation_snapshot_cache import invalidate_channel_filter_escalation_snapshot
+from apps.alerts.routing import invalidate_route_table, select_channel_filter
 from common.jinja_templater import apply_jinja_template_to_alert_payload_and_labels
 from common.jinja_templater.apply_jinja_template import (
     JinjaTemplateError,
@@ -117,11 +121,7 @@ class ChannelFilter(OrderedModel):
         raw_request_data: "Alert.RawRequestData",
         alert_labels: typing.Optional[typing.Dict[str, str]] = None,
     ) -> typing.Optional["ChannelFilter"]:
-        channel_filters = cls.objects.filter(alert_receive_channel=alert_receive_channel)
-        for channel_filter in channel_filters:
-            if channel_filter.is_satisfying(raw_request_data, alert_labels):
-                return channel_filter
-        return None
+        return select_channel_filter(alert_receive_channel, raw_request_data, alert_labels)
 
     def is_satisfying(
         self, raw_request_data: "Alert.RawRequestData", alert_labels: typing.Optional["AlertLabels"] = None
@@ -160,6 +160,19 @@ class ChannelFilter(OrderedModel):
             return True
         return False
 
+    # OrderedModel moves update orders in bulk without sending post_save, so route tables are invalidated explicitly
+    def to(self, order: int) -> None:
+        super().to(order)
+        invalidate_route_table(self.alert_receive_channel_id)
+
+    def to_index(self, index: int) -> None:
+        super().to_index(index)
+        invalidate_route_table(self.alert_receive_channel_id)
+
+    def swap(self, order: int) -> None:
+        super().swap(order)
+        invalidate_route_table(self.alert_receive_channel_id)
+
     @property
     def slack_channel_id_or_general_log_id(self):
         organization = self.alert_receive_channel.organization
@@ -233,3 +246,10 @@ class ChannelFilter(OrderedModel):
             "integration": self.alert_receive_channel.insight_logs_verbal,
             "integration_id": self.alert_receive_channel.public_primary_key,
         }
+
+
+@receiver(post_save, sender=ChannelFilter)
+@receiver(post_delete, sender=ChannelFilter)
+def listen_for_channelfilter_model_change(sender: ChannelFilter, instance: ChannelFilter, *args, **kwargs) -> None:
+    invalidate_route_table(instance.alert_receive_channel_id)
+    invalidate_channel_filter_escalation_snapshot(instance.pk)
@@ -3,7 +3,10 @@ import typing
 from django.conf import settings
 from django.core.validators import MinLengthValidator
 from django.db import models, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 
+from apps.alerts.escalation_snapshot_cache import invalidate_escalation_chain_escalation_snapshot
 from apps.alerts.models.escalation_policy import generate_public_primary_key_for_escalation_policy
 from common.public_primary_keys import generate_public_primary_key, increase_public_primary_key_length
 
@@ -106,3 +109,11 @@ class EscalationChain(models.Model):
         else:
             result["team"] = "General"
         return result
+
+
+@receiver(post_save, sender=EscalationChain)
+@receiver(post_delete, sender=EscalationChain)
+def listen_for_escalationchain_model_change(
+    sender: EscalationChain, instance: EscalationChain, *args, **kwargs
+) -> None:
+    invalidate_escalation_chain_escalation_snapshot(instance.pk)
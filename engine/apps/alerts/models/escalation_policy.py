@@ -3,7 +3,10 @@ import datetime
 from django.conf import settings
 from django.core.validators import MinLengthValidator
 from django.db import models
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
 
+from apps.alerts.escalation_snapshot_cache import invalidate_escalation_chain_escalation_snapshot
 from common.ordered_model.ordered_model import OrderedModel
 from common.public_primary_keys import generate_public_primary_key, increase_public_primary_key_length
 
@@ -336,6 +339,20 @@ class EscalationPolicy(OrderedModel):
     def __str__(self):
         return f"{self.pk}: {self.step_type_verbal}"
 
+    # OrderedModel moves update orders in bulk without sending post_save, so escalation snapshots are invalidated
+    # explicitly
+    def to(self, order: int) -> None:
+        super().to(order)
+        invalidate_escalation_chain_escalation_snapshot(self.escalation_chain_id)
+
+    def to_index(self, index: int) -> None:
+        super().to_index(index)
+        invalidate_escalation_chain_escalation_snapshot(self.escalation_chain_id)
+
+    def swap(self, order: int) -> None:
+        super().swap(order)
+        invalidate_escalation_chain_escalation_snapshot(self.escalation_chain_id)
+
     @property
     def step_type_verbal(self):
         return self.STEP_CHOICES[self.step][1] if self.step is not None else "Empty"
@@ -420,3 +437,30 @@ class EscalationPolicy(OrderedModel):
             "escalation_chain": self.escalation_chain.insight_logs_verbal,
             "escalation_chain_id": self.escalation_chain.public_primary_key,
         }
+
+
+@receiver(post_save, sender=EscalationPolicy)
+@receiver(post_delete, sender=EscalationPolicy)
+def listen_for_escalationpolicy_model_change(
+    sender: EscalationPolicy, instance: EscalationPolicy, *args, **kwargs
+) -> None:
+    invalidate_escalation_chain_escalation_snapshot(instance.escalation_chain_id)
+
+
+@receiver(m2m_changed, sender=EscalationPolicy.notify_to_users_queue.through)
+def listen_for_escalationpolicy_notify_to_users_queue_change(
+    sender, instance: EscalationPolicy, action: str, reverse: bool, *args, **kwargs
+) -> None:
+    if not action.startswith("post_"):
+        return
+    if reverse:
+        # users were added to or removed from policies queues from the user side
+        escalation_chain_ids = set(
+            EscalationPolicy.objects.filter(pk__in=kwargs.get("pk_set") or []).values_list(
+                "escalation_chain_id", flat=True
+            )
+        )
+    else:
+        escalation_chain_ids = {instance.escalation_chain_id}
+    for escalation_chain_id in escalation_chain_ids:
+        invalidate_escalation_chain_escalation_snapshot(escalation_chain_id)
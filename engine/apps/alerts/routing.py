@@ -0,0 +1,214 @@
+import json
+import logging
+import re
+import time
+import typing
+import uuid
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.cache import cache
+
+from common.jinja_templater import apply_jinja_template_to_alert_payload_and_labels
+from common.jinja_templater.apply_jinja_template import (
+    JinjaTemplateError,
+    JinjaTemplateWarning,
+    templated_value_is_truthy,
+)
+from common.lru_cache import LRUCache
+
+if typing.TYPE_CHECKING:
+    from apps.alerts.models import Alert, AlertReceiveChannel, ChannelFilter
+    from apps.labels.types import AlertLabels
+
+logger = logging.getLogger(__name__)
+
+ROUTE_TABLE_VERSION_CACHE_TIMEOUT = 60 * 60 * 24  # 24 hours
+# route versions are bumped as soon as routes are saved, i.e. possibly before the transaction is committed, so another
+# process may build a table from the old routes under the new version. Route tables are rebuilt after this many
+# seconds regardless of the version, which bounds how long such a table can be used.
+ROUTE_TABLE_MAX_AGE = 60
+
+
+def _get_route_table_version_cache_key(alert_receive_channel_id: int) -> str:
+    return f"route_table_version_{alert_receive_channel_id}"
+
+
+def get_route_table_version(alert_receive_channel_id: int) -> str:
+    """
+    Return the current route table version of an integration. Versions are random tokens (not counters), so a version
+    lost from the cache can never collide with a route table built before that.
+    """
+    cache_key = _get_route_table_version_cache_key(alert_receive_channel_id)
+    version = cache.get(cache_key)
+    if version is None:
+        cache.add(cache_key, uuid.uuid4().hex, timeout=ROUTE_TABLE_VERSION_CACHE_TIMEOUT)
+        version = cache.get(cache_key)
+    return version
+
+
+def invalidate_route_table(alert_receive_channel_id: int) -> None:
+    """
+    Invalidate the route tables of an integration in all processes. Must be called whenever routes of the
+    integration are created, updated, deleted or reordered.
+    """
+    cache.set(
+        _get_route_table_version_cache_key(alert_receive_channel_id),
+        uuid.uuid4().hex,
+        timeout=ROUTE_TABLE_VERSION_CACHE_TIMEOUT,
+    )
+
+
+@dataclass(frozen=True)
+class Route:
+    channel_filter_id: int
+    is_default: bool
+    filtering_term_type: int
+    filtering_term: typing.Optional[str]
+    # compiled REGEX route, None if the regex is invalid or the route is not a REGEX route
+    regex: typing.Optional[re.Pattern] = None
+    # label pairs of a LABELS route, None if the route is not a LABELS route or has no labels set
+    labels: typing.Optional[typing.Tuple[typing.Tuple[str, str], ...]] = None
+
+
+class RouteTable:
+    """
+    Precompiled routes of an integration, in the same order as `ChannelFilter.select_filter` checks them.
+
+    - REGEX routes hold compiled patterns and the payload is JSON-serialized at most once per alert
+    - JINJA2 routes reuse the process-wide compiled template cache
+    - LABELS routes are indexed by their first label pair, so routes that can't possibly match are skipped without
+      comparing all of their labels
+    """
+
+    def __init__(self, version: str, routes: typing.List[Route]) -> None:
+        from apps.alerts.models import ChannelFilter
+
+        self.version = version
+        self.routes = routes
+        self.built_at = time.monotonic()
+        self._label_index: typing.Dict[typing.Tuple[str, str], typing.Set[int]] = {}
+        for route in routes:
+            if route.filtering_term_type == ChannelFilter.FILTERING_TERM_TYPE_LABELS and route.labels:
+                self._label_index.setdefault(route.labels[0], set()).add(route.channel_filter_id)
+
+    @classmethod
+    def build(cls, alert_receive_channel_id: int, version: str) -> "RouteTable":
+        from apps.alerts.models import ChannelFilter
+
+        routes = []
+        channel_filters = ChannelFilter.objects.filter(alert_receive_channel_id=alert_receive_channel_id).values_list(
+            "id", "is_default", "filtering_term_type", "filtering_term", "filtering_labels"
+        )
+        for channel_filter_id, is_default, filtering_term_type, filtering_term, filtering_labels in channel_filters:
+            regex = labels = None
+            if filtering_term_type == ChannelFilter.FILTERING_TERM_TYPE_REGEX and filtering_term is not None:
+                try:
+                    regex = re.compile(filtering_term)
+                except re.error:
+                    logger.error(f"channel_filter={channel_filter_id} failed to parse regex={filtering_term}")
+            elif filtering_term_type == ChannelFilter.FILTERING_TERM_TYPE_LABELS and filtering_labels:
+                labels = tuple((item["key"]["name"], item["value"]["name"]) for item in filtering_labels)
+
+            routes.append(
+                Route(
+                    channel_filter_id=channel_filter_id,
+                    is_default=is_default,
+                    filtering_term_type=filtering_term_type,
+                    filtering_term=filtering_term,
+                    regex=regex,
+                    labels=labels,
+                )
+            )
+        return cls(version, routes)
+
+    def select_route(
+        self,
+        raw_request_data: "Alert.RawRequestData",
+        alert_labels: typing.Optional["AlertLabels"] = None,
+    ) -> typing.Optional[int]:
+        """
+        Return the id of the first route satisfying the alert, None if there's no such route.
+        """
+        from apps.alerts.models import ChannelFilter
+
+        serialized_payload: typing.Optional[str] = None
+        label_route_candidates: typing.Set[int] = set()
+        if alert_labels and self._label_index:
+            for label_pair in alert_labels.items():
+                label_route_candidates |= self._label_index.get(label_pair, set())
+
+        for route in self.routes:
+            if route.is_default:
+                return route.channel_filter_id
+
+            if route.filtering_term_type == ChannelFilter.FILTERING_TERM_TYPE_JINJA2:
+                try:
+                    is_satisfying = templated_value_is_truthy(
+                        apply_jinja_template_to_alert_payload_and_labels(
+                            route.filtering_term, raw_request_data, alert_labels
+                        )
+                    )
+                except (JinjaTemplateError, JinjaTemplateWarning):
+                    logger.error(
+                        f"channel_filter={route.channel_filter_id} failed to parse jinja2={route.filtering_term}"
+                    )
+                    is_satisfying = False
+            elif route.filtering_term_type == ChannelFilter.FILTERING_TERM_TYPE_REGEX:
+                if route.regex is None:
+                    continue
+                if serialized_payload is None:
+                    serialized_payload = json.dumps(raw_request_data)
+                is_satisfying = route.regex.search(serialized_payload) is not None
+            elif route.filtering_term_type == ChannelFilter.FILTERING_TERM_TYPE_LABELS:
+                is_satisfying = route.channel_filter_id in label_route_candidates and all(
+                    alert_labels.get(key) == value for key, value in route.labels
+                )
+            else:
+                is_satisfying = False
+
+            if is_satisfying:
+                return route.channel_filter_id
+
+        return None
+
+
+# route tables are keyed by integration id, each entry holds the version it was built for
+_route_tables: LRUCache[int, RouteTable] = LRUCache(maxsize=settings.ROUTE_TABLE_CACHE_SIZE)
+
+
+def get_route_table(alert_receive_channel_id: int) -> RouteTable:
+    version = get_route_table_version(alert_receive_channel_id)
+    route_table = _route_tables.get(alert_receive_channel_id)
+    if (
+        route_table is None
+        or route_table.version != version
+        or time.monotonic() - route_table.built_at > ROUTE_TABLE_MAX_AGE
+    ):
+        route_table = RouteTable.build(alert_receive_channel_id, version)
+        _route_tables.set(alert_receive_channel_id, route_table)
+    return route_table
+
+
+def select_channel_filter(
+    alert_receive_channel: "AlertReceiveChannel",
+    raw_request_data: "Alert.RawRequestData",
+    alert_labels: typing.Optional["AlertLabels"] = None,
+) -> typing.Optional["ChannelFilter"]:
+    from apps.alerts.models import ChannelFilter
+
+    route_table = get_route_table(alert_receive_channel.pk)
+    channel_filter_id = route_table.select_route(raw_request_data, alert_labels)
+    if channel_filter_id is None:
+        return None
+
+    # route tables only hold routing data, so the selected channel filter is always fetched fresh by its pk
+    try:
+        return ChannelFilter.objects.get(pk=channel_filter_id)
+    except ChannelFilter.DoesNotExist:
+        # the route table is stale (e.g. the route was deleted in the meantime), rebuild it from the database
+        logger.warning(f"channel_filter={channel_filter_id} not found, rebuilding route table")
+        route_table = RouteTable.build(alert_receive_channel.pk, route_table.version)
+        _route_tables.set(alert_receive_channel.pk, route_table)
+        channel_filter_id = route_table.select_route(raw_request_data, alert_labels)
+        return ChannelFilter.objects.filter(pk=channel_filter_id).first() if channel_filter_id else None
@@ -1,5 +1,7 @@
 from .acknowledge_reminder import acknowledge_reminder_task  # noqa: F401
 from .alert_group_web_title_cache import (  # noqa:F401
+    update_search_tokens,
+    update_search_tokens_for_alert_receive_channel,
     update_web_title_cache,
     update_web_title_cache_for_alert_receive_channel,
 )
@@ -18,7 +20,10 @@ from .notify_user import notify_user_task  # noqa: F401
 from .resolve_alert_group_by_source_if_needed import resolve_alert_group_by_source_if_needed  # noqa: F401
 from .resolve_by_last_step import resolve_by_last_step_task  # noqa: F401
 from .send_alert_group_signal import send_alert_group_signal  # noqa: F401
-from .send_update_log_report_signal import send_update_log_report_signal  # noqa: F401
+from .send_update_log_report_signal import (  # noqa: F401
+    schedule_update_log_report_signal,
+    send_update_log_report_signal,
+)
 from .send_update_resolution_note_signal import send_update_resolution_note_signal  # noqa: F401
 from .sync_grafana_alerting_contact_points import disconnect_integration_from_alerting_contact_points  # noqa: F401
 from .unsilence import unsilence_task  # noqa: F401
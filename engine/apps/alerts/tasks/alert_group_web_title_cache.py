@@ -50,6 +50,7 @@ def update_web_title_cache(alert_receive_channel_pk, alert_group_pks):
     )
 
     from apps.alerts.models import Alert, AlertGroup, AlertReceiveChannel
+    from apps.alerts.models.alert_group_search_token import update_alert_groups_search_tokens
 
     try:
         alert_receive_channel = AlertReceiveChannel.objects_with_deleted.get(pk=alert_receive_channel_pk)
@@ -57,7 +58,7 @@ def update_web_title_cache(alert_receive_channel_pk, alert_group_pks):
         task_logger.warning(f"AlertReceiveChannel {alert_receive_channel_pk} doesn't exist")
         return
 
-    alert_groups = AlertGroup.objects.filter(pk__in=alert_group_pks).only("pk")
+    alert_groups = list(AlertGroup.objects.filter(pk__in=alert_group_pks).only("pk"))
 
     # get first alerts in 2 SQL queries
     alerts_info = (
@@ -85,3 +86,53 @@ def update_web_title_cache(alert_receive_channel_pk, alert_group_pks):
         alert_group.web_title_cache = web_title_cache
 
     AlertGroup.objects.bulk_update(alert_groups, ["web_title_cache"])
+    update_alert_groups_search_tokens(alert_receive_channel.organization_id, alert_groups)
+
+
+@shared_dedicated_queue_retry_task
+def update_search_tokens_for_alert_receive_channel(alert_receive_channel_pk):
+    """
+    Index titles of alert groups created before alert group titles were indexed for search (search_tokens_indexed is
+    False), for alert receive channel with pk = alert_receive_channel_pk.
+    """
+    task_logger.debug(
+        f"Starting update_search_tokens_for_alert_receive_channel, alert_receive_channel_pk: {alert_receive_channel_pk}"
+    )
+
+    from apps.alerts.models import AlertGroup
+
+    countdown = 0
+    cursor = 0
+    queryset = AlertGroup.objects.filter(channel_id=alert_receive_channel_pk, search_tokens_indexed=False)
+    ids = batch_ids(queryset, cursor)
+
+    while ids:
+        update_search_tokens.apply_async((alert_receive_channel_pk, ids), countdown=countdown)
+
+        cursor = ids[-1]
+        ids = batch_ids(queryset, cursor)
+        countdown += 1
+
+
+@shared_dedicated_queue_retry_task
+def update_search_tokens(alert_receive_channel_pk, alert_group_pks):
+    """
+    Index titles of alert groups with pk in alert_group_pks, for alert receive channel with
+    pk = alert_receive_channel_pk.
+    """
+    task_logger.debug(
+        f"Starting update_search_tokens, alert_receive_channel_pk: {alert_receive_channel_pk}, "
+        f"first alert_group_pk: {alert_group_pks[0]}, last alert_group_pk: {alert_group_pks[-1]}"
+    )
+
+    from apps.alerts.models import AlertGroup, AlertReceiveChannel
+    from apps.alerts.models.alert_group_search_token import update_alert_groups_search_tokens
+
+    try:
+        alert_receive_channel = AlertReceiveChannel.objects_with_deleted.get(pk=alert_receive_channel_pk)
+    except AlertReceiveChannel.DoesNotExist:
+        task_logger.warning(f"AlertReceiveChannel {alert_receive_channel_pk} doesn't exist")
+        return
+
+    alert_groups = list(AlertGroup.objects.filter(pk__in=alert_group_pks).only("pk", "web_title_cache"))
+    update_alert_groups_search_tokens(alert_receive_channel.organization_id, alert_groups)
@@ -78,6 +78,7 @@ def notify_group_task(alert_group_pk, escalation_policy_snapshot_order=None):
             escalation_snapshot.save_to_alert_group()
 
         usergroup_notification_plan = ""
+        log_records = []
         for user in usergroup_users:
             if not user.is_notification_allowed:
                 continue
@@ -113,14 +114,16 @@ def notify_group_task(alert_group_pk, escalation_policy_snapshot_order=None):
                     "important": escalation_policy_step == EscalationPolicy.STEP_NOTIFY_GROUP_IMPORTANT,
                 },
             )
-            AlertGroupLogRecord(
-                type=AlertGroupLogRecord.TYPE_ESCALATION_TRIGGERED,
-                author=user,
-                alert_group=alert_group,
-                reason=reason,
-                escalation_policy=escalation_policy,
-                escalation_policy_step=escalation_policy_step,
-            ).save()
+            log_records.append(
+                AlertGroupLogRecord(
+                    type=AlertGroupLogRecord.TYPE_ESCALATION_TRIGGERED,
+                    author=user,
+                    alert_group=alert_group,
+                    reason=reason,
+                    escalation_policy=escalation_policy,
+                    escalation_policy_step=escalation_policy_step,
+                )
+            )
         log_record = AlertGroupLogRecord(
             type=AlertGroupLogRecord.TYPE_ESCALATION_TRIGGERED,
             alert_group=alert_group,
@@ -128,7 +131,8 @@ def notify_group_task(alert_group_pk, escalation_policy_snapshot_order=None):
             escalation_policy_step=escalation_policy_step,
             step_specific_info={"usergroup_handle": usergroup.handle},
         )
-        log_record.save()
+        log_records.append(log_record)
+        AlertGroupLogRecord.objects.bulk_create_with_log_report_update(log_records)
         if not alert_group.skip_escalation_in_slack and alert_group.notify_in_slack_enabled:
             text = f"Inviting @{usergroup.handle} User Group: {usergroup_notification_plan}"
             step_specific_info = {"usergroup_handle": usergroup.handle}
@@ -144,5 +148,5 @@ def notify_group_task(alert_group_pk, escalation_policy_snapshot_order=None):
                 countdown=5,
             )
     task_logger.debug(
-        f"Finish notify_group_task for alert_group {alert_group_pk}, log record {log_record.pk}",
+        f"Finish notify_group_task for alert_group {alert_group_pk}, escalation policy {escalation_policy_pk}",
     )
@@ -11,7 +11,7 @@ from kombu.utils.uuid import uuid as celery_uuid
 from telegram.error import RetryAfter
 
 from apps.alerts.constants import NEXT_ESCALATION_DELAY
-from apps.alerts.tasks.send_update_log_report_signal import send_update_log_report_signal
+from apps.alerts.tasks.send_update_log_report_signal import schedule_update_log_report_signal
 from apps.base.messaging import get_messaging_backend_from_id
 from apps.metrics_exporter.tasks import update_metrics_for_user
 from apps.phone_notifications.phone_backend import PhoneBackend
@@ -676,7 +676,7 @@ def send_bundled_notification(user_notification_bundle_id: int):
         user_notification_bundle.save(update_fields=["notification_task_id", "last_notified_at", "eta"])
 
     for alert_group_id in active_alert_group_ids:
-        transaction.on_commit(partial(send_update_log_report_signal.apply_async, (None, alert_group_id)))
+        transaction.on_commit(partial(schedule_update_log_report_signal, alert_group_id))
 
     # update metric
     transaction.on_commit(partial(update_metric_if_needed, user_notification_bundle.user, active_alert_group_ids))
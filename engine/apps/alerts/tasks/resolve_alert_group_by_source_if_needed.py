@@ -20,12 +20,7 @@ def resolve_alert_group_by_source_if_needed(alert_group_pk):
             alert_group.active_resolve_calculation_id
         )
     else:
-        is_more_than_max_alerts_in_group = alert_group.alerts_count_gt(
-            AlertGroupForAlertManager.MAX_ALERTS_IN_GROUP_FOR_AUTO_RESOLVE
-        )
-        if is_more_than_max_alerts_in_group:
-            alert_group.resolved_by = alert_group.NOT_YET_STOP_AUTORESOLVE
-            alert_group.save(update_fields=["resolved_by"])
+        # auto-resolve used to be disabled for alert groups with too many alerts, keep it disabled for such groups
         if alert_group.resolved_by == alert_group.NOT_YET_STOP_AUTORESOLVE:
             return "alert_group is too big to auto-resolve"
 
@@ -1,17 +1,83 @@
+import time
+import uuid
+
 from django.conf import settings
+from django.core.cache import cache
 
 from apps.alerts.signals import alert_group_update_log_report_signal
+from apps.metrics_exporter.counters import Counters
 from common.custom_celery_tasks import shared_dedicated_queue_retry_task
 
 from .task_logger import task_logger
 
+LOG_REPORT_UPDATE_TOKEN_CACHE_TIMEOUT = 60 * 10  # 10 minutes
+# log report updates are postponed while new log records keep coming in, but never for longer than this many seconds
+LOG_REPORT_UPDATE_MAX_DELAY = 60
+
+log_report_update_counters = Counters(
+    "log_report_updates",
+    {
+        "scheduled": "Number of log report updates scheduled",
+        "sent": "Number of log report update signals sent",
+        "suppressed": "Number of log report updates skipped, superseded by a later update of the same alert group",
+    },
+)
+
+
+def _get_log_report_update_cache_key(alert_group_pk: int) -> str:
+    return f"update_log_report_{alert_group_pk}"
+
+
+def schedule_update_log_report_signal(alert_group_pk: int, countdown: int = 0) -> None:
+    """
+    Schedule a log report update for the alert group. Updates scheduled for the same alert group are coalesced:
+    every call replaces the alert group's update token, and only the task holding the latest token (or the first task
+    to run after LOG_REPORT_UPDATE_MAX_DELAY) sends `alert_group_update_log_report_signal`, so a burst of log records
+    re-renders the log report in each messaging backend once instead of once per record.
+    """
+    cache_key = _get_log_report_update_cache_key(alert_group_pk)
+    pending_update = cache.get(cache_key)
+    first_scheduled_at = pending_update["first_scheduled_at"] if pending_update else time.time()
+    token = uuid.uuid4().hex
+    cache.set(
+        cache_key,
+        {"token": token, "first_scheduled_at": first_scheduled_at},
+        timeout=LOG_REPORT_UPDATE_TOKEN_CACHE_TIMEOUT,
+    )
+    log_report_update_counters.add(scheduled=1)
+    send_update_log_report_signal.apply_async(
+        kwargs={"alert_group_pk": alert_group_pk, "update_token": token}, countdown=countdown
+    )
+
 
 @shared_dedicated_queue_retry_task(
     autoretry_for=(Exception,), retry_backoff=True, max_retries=1 if settings.DEBUG else 10
 )
-def send_update_log_report_signal(log_record_pk=None, alert_group_pk=None):
+def send_update_log_report_signal(log_record_pk=None, alert_group_pk=None, update_token=None):
     from apps.alerts.models import AlertGroup, AlertReceiveChannel
 
+    # tasks without a token were scheduled directly (not via schedule_update_log_report_signal) and always update
+    if update_token is not None:
+        cache_key = _get_log_report_update_cache_key(alert_group_pk)
+        pending_update = cache.get(cache_key)
+        if pending_update is not None:
+            if pending_update["token"] == update_token:
+                cache.delete(cache_key)
+            elif time.time() - pending_update["first_scheduled_at"] < LOG_REPORT_UPDATE_MAX_DELAY:
+                log_report_update_counters.add(suppressed=1)
+                task_logger.debug(
+                    f'send_update_log_report_signal: alert_group={alert_group_pk} msg="skip '
+                    f'alert_group_update_log_report_signal, superseded by a later update"'
+                )
+                return
+            else:
+                # the latest update is still pending, but the log report wasn't updated for too long already
+                cache.set(
+                    cache_key,
+                    {"token": pending_update["token"], "first_scheduled_at": time.time()},
+                    timeout=LOG_REPORT_UPDATE_TOKEN_CACHE_TIMEOUT,
+                )
+
     alert_group = AlertGroup.objects.get(id=alert_group_pk)
     if alert_group.is_maintenance_incident:
         task_logger.debug(
@@ -25,6 +91,7 @@ def send_update_log_report_signal(log_record_pk=None, alert_group_pk=None):
         )
         return
 
+    log_report_update_counters.add(sent=1)
     alert_group_update_log_report_signal.send(
         sender=send_update_log_report_signal,
         alert_group=alert_group_pk,
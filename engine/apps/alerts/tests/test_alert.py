@@ -1,9 +1,12 @@
 from unittest.mock import PropertyMock, patch
 
 import pytest
+from django.db import connection, transaction
 from django.utils import timezone
 
-from apps.alerts.models import Alert, ChannelFilter, EscalationPolicy
+from apps.alerts.models import Alert, AlertGroup, ChannelFilter, EscalationPolicy
+from apps.alerts.models.alert_group import AlertGroupQuerySet
+from apps.alerts.models.alert_group_counter import AlertGroupCounterQuerySet
 from common.jinja_templater.apply_jinja_template import JinjaTemplateError, JinjaTemplateWarning
 
 
@@ -299,3 +302,191 @@ def test_apply_jinja_template_to_alert_payload_and_labels_jinja_exceptions(
     assert result == expected
 
     mock_apply_jinja_template_to_alert_payload_and_labels.assert_called_once_with(template, raw_request_data, labels)
+
+
+@pytest.mark.django_db
+@patch("apps.alerts.tasks.distribute_alert.send_alert_create_signal.apply_async", return_value=None)
+def test_alert_create_many(
+    mocked_send_alert_create_signal,
+    make_organization,
+    make_alert_receive_channel,
+    make_channel_filter,
+    django_capture_on_commit_callbacks,
+):
+    organization = make_organization()
+    alert_receive_channel = make_alert_receive_channel(
+        organization, grouping_id_template="{{ payload.group }}", resolve_condition_template="{{ payload.resolved }}"
+    )
+    default_channel_filter = make_channel_filter(alert_receive_channel, is_default=True)
+    channel_filter = make_channel_filter(alert_receive_channel, filtering_term="route_me", is_default=False)
+
+    raw_request_data_list = [
+        {"group": "a"},
+        {"group": "b"},
+        {"group": "a", "resolved": True},
+        {"group": "a", "title": "route_me"},
+        {"group": "b"},
+    ]
+    with django_capture_on_commit_callbacks(execute=True):
+        alerts = Alert.create_many(alert_receive_channel, raw_request_data_list)
+
+    assert len(alerts) == Alert.objects.count() == 5
+
+    # alerts are grouped by route and grouping id
+    alert_groups = {
+        (alert.group.channel_filter_id, alert.raw_request_data["group"])
+        for alert in Alert.objects.select_related("group")
+    }
+    assert alert_groups == {
+        (default_channel_filter.pk, "a"),
+        (default_channel_filter.pk, "b"),
+        (channel_filter.pk, "a"),
+    }
+    assert alert_receive_channel.alert_groups.count() == 3
+
+    # alerts are never resolved by source, same as Alert.create(enable_autoresolve=False)
+    assert alert_receive_channel.alert_groups.filter(resolved=True).count() == 0
+    assert Alert.objects.filter(is_resolve_signal=True).count() == 1
+
+    # one alert create signal per new alert group + one per alert group with bulk-inserted alerts
+    assert mocked_send_alert_create_signal.call_count == 5
+
+
+@pytest.mark.django_db
+def test_alert_create_many_existing_alert_group(
+    django_assert_max_num_queries, make_organization, make_alert_receive_channel
+):
+    organization = make_organization()
+    alert_receive_channel = make_alert_receive_channel(organization, grouping_id_template="{{ payload.group }}")
+    first_alert = Alert.create_many(alert_receive_channel, [{"group": "a"}])
+    alert_group = first_alert[0].group
+
+    # alerts for an existing alert group are bulk-inserted, the number of queries doesn't depend on the number of alerts
+    with django_assert_max_num_queries(10):
+        alerts = Alert.create_many(alert_receive_channel, [{"group": "a", "i": i} for i in range(50)])
+
+    assert len(alerts) == 50
+    assert alert_group.alerts.count() == 51
+    assert alert_receive_channel.alert_groups.count() == 1
+
+    alert_group.refresh_from_db()
+    assert alert_group.alerts_count == 51
+    assert alert_group.last_alert_id == alert_group.alerts.latest("pk").pk
+
+
+@pytest.mark.django_db
+def test_alert_create_many_resolve_alert_for_resolved_alert_group(make_organization, make_alert_receive_channel):
+    organization = make_organization()
+    alert_receive_channel = make_alert_receive_channel(
+        organization, grouping_id_template="{{ payload.group }}", resolve_condition_template="{{ payload.resolved }}"
+    )
+    resolved_alert_group = Alert.create_many(alert_receive_channel, [{"group": "a"}])[0].group
+    AlertGroup.objects.filter(pk=resolved_alert_group.pk).update(resolved=True, is_open_for_grouping=None)
+
+    alerts = Alert.create_many(
+        alert_receive_channel,
+        [{"group": "a", "resolved": True}, {"group": "a", "i": 1}, {"group": "a", "i": 2}],
+    )
+
+    # the resolve alert is attached to the resolved alert group, firing alerts following it open a new one
+    assert alerts[0].group_id == resolved_alert_group.pk
+    new_alert_group = alert_receive_channel.alert_groups.get(is_open_for_grouping=True)
+    assert {alert.group_id for alert in alerts[1:]} == {new_alert_group.pk}
+    assert new_alert_group.alerts.count() == 2
+
+
+@pytest.mark.django_db
+def test_alert_create_many_reserves_alert_group_numbers_outside_bucket_transaction(
+    make_organization, make_alert_receive_channel
+):
+    organization = make_organization()
+    alert_receive_channel = make_alert_receive_channel(organization, grouping_id_template="{{ payload.group }}")
+    get_value = AlertGroupCounterQuerySet.get_value
+    atomic_block_depths = []
+
+    def get_value_spy(self, **kwargs):
+        atomic_block_depths.append(len(connection.atomic_blocks))
+        return get_value(self, **kwargs)
+
+    # tests run in a transaction, numbers must be reserved at the same depth
+    depth = len(connection.atomic_blocks)
+    with patch.object(AlertGroupCounterQuerySet, "get_value", autospec=True, side_effect=get_value_spy):
+        alerts = Alert.create_many(alert_receive_channel, [{"group": "a"}, {"group": "b"}, {"group": "a"}])
+
+    assert atomic_block_depths == [depth, depth]
+    assert sorted(alert.group.inside_organization_number for alert in alerts) == [1, 1, 2]
+
+
+@pytest.mark.django_db
+def test_get_or_create_grouping_concurrently_created_alert_group(
+    make_organization, make_alert_receive_channel, make_channel_filter
+):
+    organization = make_organization()
+    alert_receive_channel = make_alert_receive_channel(organization)
+    make_channel_filter(alert_receive_channel, is_default=True)
+    alert = Alert.create(
+        title=None,
+        message=None,
+        image_url=None,
+        link_to_upstream_details=None,
+        alert_receive_channel=alert_receive_channel,
+        integration_unique_data=None,
+        raw_request_data={},
+    )
+    group_data = Alert.render_group_data(alert_receive_channel, {}, None)
+    get = AlertGroupQuerySet.get
+    not_found_once = [AlertGroup.DoesNotExist()]
+
+    def get_spy(self, *args, **kwargs):
+        if not_found_once:
+            # the alert group is created after the lookup
+            raise not_found_once.pop()
+        return get(self, *args, **kwargs)
+
+    # the alert group created concurrently is returned also inside an outer transaction (e.g. Alert.create_many)
+    with transaction.atomic(), patch.object(AlertGroupQuerySet, "get", autospec=True, side_effect=get_spy):
+        alert_group, created = AlertGroup.objects.get_or_create_grouping(
+            alert_receive_channel, alert.group.channel_filter, group_data
+        )
+
+    assert (alert_group, created) == (alert.group, False)
+
+
+@pytest.mark.django_db
+def test_alert_create_updates_alert_group_alerts_info(make_organization, make_alert_receive_channel, make_alert):
+    organization = make_organization()
+    alert_receive_channel = make_alert_receive_channel(organization)
+
+    alert = Alert.create(
+        title="the title",
+        message="the message",
+        alert_receive_channel=alert_receive_channel,
+        raw_request_data={},
+        integration_unique_data={},
+        image_url=None,
+        link_to_upstream_details=None,
+    )
+    alert_group = alert.group
+    # the alert group instance is kept in sync
+    assert alert_group.alerts_count == 1
+    assert alert_group.last_alert_id == alert.pk
+
+    other_alert = make_alert(alert_group=alert_group, raw_request_data={})
+    alert_group.refresh_from_db()
+    assert alert_group.alerts_count == 2
+    assert alert_group.last_alert_id == other_alert.pk
+
+
+@pytest.mark.django_db
+def test_alert_create_alert_group_alerts_not_counted(
+    make_organization, make_alert_receive_channel, make_alert_group, make_alert
+):
+    organization = make_organization()
+    alert_receive_channel = make_alert_receive_channel(organization)
+    # alert groups created before alerts were counted
+    alert_group = make_alert_group(alert_receive_channel, alerts_count=None)
+
+    alert = make_alert(alert_group=alert_group, raw_request_data={})
+    alert_group.refresh_from_db()
+    assert alert_group.alerts_count is None
+    assert alert_group.last_alert_id == alert.pk
@@ -0,0 +1,90 @@
+import pytest
+
+from apps.alerts.models import AlertGroup, AlertGroupCounter
+from apps.alerts.models.alert_group_counter import alert_group_counter_counters
+
+
+@pytest.fixture(autouse=True)
+def clear_reserved_blocks():
+    AlertGroupCounter.clear_reserved_blocks()
+    yield
+    AlertGroupCounter.clear_reserved_blocks()
+
+
+@pytest.mark.django_db
+def test_get_value_sequential(make_organization):
+    organization = make_organization()
+
+    values = [AlertGroupCounter.objects.get_value(organization=organization) for _ in range(3)]
+
+    assert values == [1, 2, 3]
+    assert AlertGroupCounter.objects.get(organization=organization).value == 3
+
+
+@pytest.mark.django_db
+def test_get_value_per_organization(make_organization):
+    organization_1 = make_organization()
+    organization_2 = make_organization()
+
+    assert AlertGroupCounter.objects.get_value(organization=organization_1) == 1
+    assert AlertGroupCounter.objects.get_value(organization=organization_2) == 1
+    assert AlertGroupCounter.objects.get_value(organization=organization_1) == 2
+
+
+@pytest.mark.django_db
+def test_reserve_block(make_organization):
+    organization = make_organization()
+
+    assert AlertGroupCounter.objects.reserve_block(organization.pk, 10) == (1, 10)
+    assert AlertGroupCounter.objects.reserve_block(organization.pk, 5) == (11, 15)
+
+
+@pytest.mark.django_db
+def test_reserve_block_counters(make_organization):
+    organization = make_organization()
+
+    AlertGroupCounter.objects.reserve_block(organization.pk, 10)
+    AlertGroupCounter.objects.reserve_block(organization.pk, 1)
+    alert_group_counter_counters.flush()
+
+    totals = alert_group_counter_counters.get_totals()
+    assert totals["reservations"] == 2
+    assert totals["reservation_wait_seconds"] >= 0
+
+
+@pytest.mark.django_db(transaction=True)
+def test_get_value_block_allocation(make_organization, settings, django_assert_num_queries):
+    settings.ALERT_GROUP_COUNTER_BLOCK_SIZE = 10
+    organization = make_organization()
+
+    assert AlertGroupCounter.objects.get_value(organization=organization) == 1
+    assert AlertGroupCounter.objects.get(organization=organization).value == 10
+
+    # the rest of the block is handed out without hitting the database
+    with django_assert_num_queries(0):
+        values = [AlertGroupCounter.objects.get_value(organization=organization) for _ in range(9)]
+    assert values == list(range(2, 11))
+
+    # a new block is reserved once the current one is used up
+    assert AlertGroupCounter.objects.get_value(organization=organization) == 11
+    assert AlertGroupCounter.objects.get(organization=organization).value == 20
+
+
+@pytest.mark.django_db
+def test_get_value_no_block_allocation_in_atomic_block(make_organization, settings):
+    settings.ALERT_GROUP_COUNTER_BLOCK_SIZE = 10
+    organization = make_organization()
+
+    # tests run in a transaction, so values are reserved one by one
+    assert AlertGroupCounter.objects.get_value(organization=organization) == 1
+    assert AlertGroupCounter.objects.get(organization=organization).value == 1
+
+
+@pytest.mark.django_db
+def test_alert_group_create_inside_organization_number(make_organization, make_alert_receive_channel):
+    organization = make_organization()
+    alert_receive_channel = make_alert_receive_channel(organization)
+
+    alert_groups = [AlertGroup.objects.create(channel=alert_receive_channel, channel_filter=None) for _ in range(3)]
+
+    assert [alert_group.inside_organization_number for alert_group in alert_groups] == [1, 2, 3]
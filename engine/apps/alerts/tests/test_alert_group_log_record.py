@@ -16,9 +16,11 @@ def test_skip_update_signal(
     alert_group = make_alert_group(alert_receive_channel)
 
     for skip_type in AlertGroupLogRecord.TYPES_SKIPPING_UPDATE_SIGNAL:
-        with patch("apps.alerts.tasks.send_update_log_report_signal") as mock_update_log_signal:
+        with patch(
+            "apps.alerts.tasks.send_update_log_report_signal.send_update_log_report_signal.apply_async"
+        ) as mock_apply_async:
             alert_group.log_records.create(type=skip_type)
-        assert not mock_update_log_signal.apply_async.called
+        assert not mock_apply_async.called
 
 
 @pytest.mark.django_db
@@ -34,6 +36,8 @@ def test_trigger_update_signal(
     for log_type, _ in AlertGroupLogRecord.TYPE_CHOICES:
         if log_type in AlertGroupLogRecord.TYPES_SKIPPING_UPDATE_SIGNAL:
             continue
-        with patch("apps.alerts.tasks.send_update_log_report_signal") as mock_update_log_signal:
+        with patch(
+            "apps.alerts.tasks.send_update_log_report_signal.send_update_log_report_signal.apply_async"
+        ) as mock_apply_async:
             alert_group.log_records.create(type=log_type)
-        mock_update_log_signal.apply_async.assert_called_once()
+        mock_apply_async.assert_called_once()
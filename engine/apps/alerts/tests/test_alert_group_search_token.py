@@ -0,0 +1,102 @@
+from unittest.mock import patch
+
+import pytest
+
+from apps.alerts.models import AlertGroup, AlertGroupSearchToken
+from apps.alerts.models.alert_group_search_token import MAX_SEARCH_TOKENS_PER_ALERT_GROUP, get_search_tokens
+from apps.alerts.tasks import (
+    update_search_tokens,
+    update_search_tokens_for_alert_receive_channel,
+    update_web_title_cache,
+    wipe,
+)
+
+
+def _get_tokens(alert_group):
+    return set(alert_group.search_tokens.values_list("token", flat=True))
+
+
+def test_get_search_tokens():
+    assert get_search_tokens(None) == []
+    assert get_search_tokens("[FIRING:2] Disk usage > 90% on db-01, disk") == [
+        "firing",
+        "2",
+        "disk",
+        "usage",
+        "90",
+        "on",
+        "db",
+        "01",
+    ]
+    assert get_search_tokens("a" * 100) == ["a" * 50]
+    assert len(get_search_tokens(" ".join(str(i) for i in range(200)))) == MAX_SEARCH_TOKENS_PER_ALERT_GROUP
+
+
+@pytest.mark.django_db
+def test_alert_group_create_indexes_title(make_organization, make_alert_receive_channel, make_alert_group):
+    organization = make_organization()
+    alert_receive_channel = make_alert_receive_channel(organization)
+
+    alert_group = make_alert_group(alert_receive_channel, web_title_cache="High CPU usage on host-1")
+
+    assert alert_group.search_tokens_indexed
+    assert _get_tokens(alert_group) == {"high", "cpu", "usage", "on", "host", "1"}
+    assert set(alert_group.search_tokens.values_list("organization_id", flat=True)) == {organization.pk}
+
+
+@pytest.mark.django_db
+def test_wipe_removes_title_tokens(
+    make_organization_and_user, make_alert_receive_channel, make_alert_group, make_alert
+):
+    organization, user = make_organization_and_user()
+    alert_receive_channel = make_alert_receive_channel(organization)
+    alert_group = make_alert_group(alert_receive_channel, web_title_cache="High CPU usage")
+    make_alert(alert_group, raw_request_data={})
+
+    wipe(alert_group.pk, user.pk)
+
+    assert _get_tokens(alert_group) == set()
+
+
+@pytest.mark.django_db
+def test_update_web_title_cache_reindexes_title(
+    make_organization, make_alert_receive_channel, make_alert_group, make_alert
+):
+    organization = make_organization()
+    alert_receive_channel = make_alert_receive_channel(organization, web_title_template="{{ payload.title }}")
+    alert_group = make_alert_group(alert_receive_channel, web_title_cache="Old title")
+    make_alert(alert_group, raw_request_data={"title": "New title"})
+
+    update_web_title_cache(alert_receive_channel.pk, [alert_group.pk])
+
+    alert_group.refresh_from_db()
+    assert alert_group.web_title_cache == "New title"
+    assert _get_tokens(alert_group) == {"new", "title"}
+
+
+@patch("apps.alerts.tasks.alert_group_web_title_cache.update_search_tokens.apply_async")
+@pytest.mark.django_db
+def test_update_search_tokens_for_alert_receive_channel(
+    mock_update_search_tokens, make_organization, make_alert_receive_channel, make_alert_group
+):
+    organization = make_organization()
+    alert_receive_channel = make_alert_receive_channel(organization)
+    indexed_alert_group = make_alert_group(alert_receive_channel, web_title_cache="indexed")
+    # alert groups created before titles were indexed
+    alert_groups = [make_alert_group(alert_receive_channel, web_title_cache=f"title {i}") for i in range(2)]
+    AlertGroupSearchToken.objects.filter(alert_group__in=alert_groups).delete()
+    AlertGroup.objects.filter(pk__in=[alert_group.pk for alert_group in alert_groups]).update(
+        search_tokens_indexed=False
+    )
+
+    update_search_tokens_for_alert_receive_channel(alert_receive_channel.pk)
+    mock_update_search_tokens.assert_called_once_with(
+        (alert_receive_channel.pk, [alert_group.pk for alert_group in alert_groups]), countdown=0
+    )
+
+    update_search_tokens(*mock_update_search_tokens.call_args.args[0])
+    for i, alert_group in enumerate(alert_groups):
+        alert_group.refresh_from_db()
+        assert alert_group.search_tokens_indexed
+        assert _get_tokens(alert_group) == {"title", str(i)}
+    assert _get_tokens(indexed_alert_group) == {"indexed"}
@@ -1,6 +1,10 @@
+from unittest.mock import patch
+
 import pytest
 
+from apps.alerts.models import AlertGroup
 from apps.alerts.models.alert_manager_models import AlertForAlertManager, AlertGroupForAlertManager
+from apps.alerts.tasks import resolve_alert_group_by_source_if_needed
 
 
 @pytest.mark.django_db
@@ -97,6 +101,7 @@ def test_alert_group_resolved(
         group=alert_group,
     )
     alert_b.save()
+    AlertGroupForAlertManager.track_firing_label_hashes([alert_a, alert_b])
 
     alert_a_resolve = AlertForAlertManager(
         raw_request_data={
@@ -115,6 +120,7 @@ def test_alert_group_resolved(
 
     assert alert_group.is_alert_a_resolve_signal(alert_a_resolve) is False
     alert_a_resolve.save()
+    AlertGroupForAlertManager.track_firing_label_hashes([alert_a_resolve])
 
     alert_b_resolve = AlertForAlertManager(
         raw_request_data={
@@ -131,5 +137,112 @@ def test_alert_group_resolved(
         group=alert_group,
     )
     alert_b_resolve.save()
+    AlertGroupForAlertManager.track_firing_label_hashes([alert_b_resolve])
 
     assert alert_group.is_alert_a_resolve_signal(alert_b_resolve) is True
+
+
+def _alert_payload(region, status="firing"):
+    return {
+        "status": status,
+        "labels": {"alertname": "TestAlert", "region": region},
+        "annotations": {},
+    }
+
+
+@pytest.mark.django_db
+def test_track_firing_label_hashes(make_organization, make_alert_receive_channel, make_alert_group, make_alert):
+    organization = make_organization()
+    alert_receive_channel = make_alert_receive_channel(organization)
+    alert_group = make_alert_group(alert_receive_channel)
+
+    alerts = [
+        make_alert(alert_group, raw_request_data=_alert_payload("eu-1")),
+        make_alert(alert_group, raw_request_data=_alert_payload("us-east")),
+        make_alert(alert_group, raw_request_data=_alert_payload("eu-1")),
+        make_alert(alert_group, raw_request_data=_alert_payload("eu-1", status="resolved")),
+    ]
+    AlertGroupForAlertManager.track_firing_label_hashes(alerts)
+    assert alert_group.firing_label_hashes.filter(is_firing=True).count() == 1
+
+    # resolved, then firing again in the same batch
+    alerts = [
+        make_alert(alert_group, raw_request_data=_alert_payload("us-east", status="resolved")),
+        make_alert(alert_group, raw_request_data=_alert_payload("us-east")),
+    ]
+    AlertGroupForAlertManager.track_firing_label_hashes(alerts)
+    assert alert_group.firing_label_hashes.filter(is_firing=True).count() == 1
+
+    alert = make_alert(alert_group, raw_request_data=_alert_payload("us-east", status="resolved"))
+    AlertGroupForAlertManager.track_firing_label_hashes([alert])
+    assert alert_group.firing_label_hashes.filter(is_firing=True).count() == 0
+
+    alert_group = AlertGroupForAlertManager.objects.get(pk=alert_group.pk)
+    assert alert_group.is_alert_a_resolve_signal(AlertForAlertManager.objects.get(pk=alert.pk)) is True
+
+
+@pytest.mark.django_db
+def test_track_firing_label_hashes_out_of_order(
+    make_organization, make_alert_receive_channel, make_alert_group, make_alert
+):
+    organization = make_organization()
+    alert_receive_channel = make_alert_receive_channel(organization)
+    alert_group = make_alert_group(alert_receive_channel)
+
+    firing_alert = make_alert(alert_group, raw_request_data=_alert_payload("eu-1"))
+    resolve_alert = make_alert(alert_group, raw_request_data=_alert_payload("eu-1", status="resolved"))
+    other_firing_alert = make_alert(alert_group, raw_request_data=_alert_payload("us-east"))
+    other_resolve_alert = make_alert(alert_group, raw_request_data=_alert_payload("us-east", status="resolved"))
+    other_firing_again_alert = make_alert(alert_group, raw_request_data=_alert_payload("us-east"))
+
+    # alerts tracked after later alerts of the same labels don't change their state
+    AlertGroupForAlertManager.track_firing_label_hashes([resolve_alert, other_firing_again_alert])
+    AlertGroupForAlertManager.track_firing_label_hashes([firing_alert, other_resolve_alert])
+    AlertGroupForAlertManager.track_firing_label_hashes([other_firing_alert])
+
+    assert dict(alert_group.firing_label_hashes.values_list("last_alert_id", "is_firing")) == {
+        resolve_alert.pk: False,
+        other_firing_again_alert.pk: True,
+    }
+
+
+@pytest.mark.django_db
+def test_is_alert_a_resolve_signal_untracked_alert_group(
+    make_organization, make_alert_receive_channel, make_alert_group, make_alert
+):
+    organization = make_organization()
+    alert_receive_channel = make_alert_receive_channel(organization)
+    alert_group = make_alert_group(alert_receive_channel)
+    AlertGroup.objects.filter(pk=alert_group.pk).update(firing_label_hashes_tracked=False)
+    alert_group = AlertGroupForAlertManager.objects.get(pk=alert_group.pk)
+
+    make_alert(alert_group, raw_request_data=_alert_payload("eu-1"))
+    make_alert(alert_group, raw_request_data=_alert_payload("us-east"))
+    make_alert(alert_group, raw_request_data=_alert_payload("eu-1", status="resolved"))
+    alert = make_alert(alert_group, raw_request_data=_alert_payload("us-east", status="resolved"))
+
+    # firing label hashes are not tracked, alerts are replayed
+    assert alert_group.firing_label_hashes.count() == 0
+    assert alert_group.is_alert_a_resolve_signal(AlertForAlertManager.objects.get(pk=alert.pk)) is True
+
+
+@pytest.mark.django_db
+def test_resolve_alert_group_by_source_if_needed_big_alert_group(
+    make_organization, make_alert_receive_channel, make_alert_group, make_alert, django_assert_max_num_queries
+):
+    organization = make_organization()
+    alert_receive_channel = make_alert_receive_channel(organization)
+    alert_group = make_alert_group(alert_receive_channel, active_resolve_calculation_id="task-id")
+
+    alerts = [make_alert(alert_group, raw_request_data=_alert_payload(f"region-{i}")) for i in range(600)]
+    alerts += [
+        make_alert(alert_group, raw_request_data=_alert_payload(f"region-{i}", status="resolved")) for i in range(600)
+    ]
+    AlertGroupForAlertManager.track_firing_label_hashes(alerts)
+
+    with patch.object(AlertGroupForAlertManager, "resolve_by_source") as mock_resolve_by_source:
+        # the decision doesn't depend on the number of alerts in the group
+        with django_assert_max_num_queries(5):
+            resolve_alert_group_by_source_if_needed.apply((alert_group.pk,), task_id="task-id")
+
+    mock_resolve_by_source.assert_called_once_with()
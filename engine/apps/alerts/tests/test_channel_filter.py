@@ -152,3 +152,72 @@ def test_channel_filter_using_filter_labels(
     assert ChannelFilter.select_filter(alert_receive_channel, {"title": "Test Title", "value": 5}, labels) == (
         custom_channel_filter if should_match else default_channel_filter
     )
+
+
+@pytest.mark.django_db
+def test_channel_filter_select_filter_invalid_regex(make_organization, make_alert_receive_channel, make_channel_filter):
+    organization = make_organization()
+    alert_receive_channel = make_alert_receive_channel(organization)
+    default_channel_filter = make_channel_filter(alert_receive_channel, is_default=True)
+    make_channel_filter(
+        alert_receive_channel,
+        filtering_term="[invalid",
+        filtering_term_type=ChannelFilter.FILTERING_TERM_TYPE_REGEX,
+        is_default=False,
+    )
+
+    assert ChannelFilter.select_filter(alert_receive_channel, {"title": "[invalid"}) == default_channel_filter
+
+
+@pytest.mark.django_db
+def test_channel_filter_select_filter_route_table_invalidation(
+    make_organization, make_alert_receive_channel, make_channel_filter
+):
+    organization = make_organization()
+    alert_receive_channel = make_alert_receive_channel(organization)
+    make_channel_filter(alert_receive_channel, is_default=True)
+    first_channel_filter = make_channel_filter(alert_receive_channel, filtering_term="foo", is_default=False)
+    second_channel_filter = make_channel_filter(alert_receive_channel, filtering_term="foo", is_default=False)
+
+    raw_request_data = {"title": "foo"}
+    assert ChannelFilter.select_filter(alert_receive_channel, raw_request_data) == first_channel_filter
+
+    # reordering routes invalidates the route table
+    second_channel_filter.to_index(0)
+    assert ChannelFilter.select_filter(alert_receive_channel, raw_request_data) == second_channel_filter
+
+    # updating a route invalidates the route table
+    second_channel_filter.filtering_term = "bar"
+    second_channel_filter.save()
+    assert ChannelFilter.select_filter(alert_receive_channel, raw_request_data) == first_channel_filter
+
+    # deleting a route invalidates the route table
+    first_channel_filter.delete()
+    assert ChannelFilter.select_filter(alert_receive_channel, {"title": "bar"}) == second_channel_filter
+
+
+@pytest.mark.django_db
+def test_channel_filter_select_filter_uses_cached_route_table(
+    django_assert_num_queries, make_organization, make_alert_receive_channel, make_channel_filter
+):
+    organization = make_organization()
+    alert_receive_channel = make_alert_receive_channel(organization)
+    make_channel_filter(alert_receive_channel, is_default=True)
+    for i in range(10):
+        make_channel_filter(alert_receive_channel, filtering_term=f"route_{i}", is_default=False)
+    channel_filter = make_channel_filter(
+        alert_receive_channel,
+        filtering_labels=[{"key": {"id": "1", "name": "foo"}, "value": {"id": "2", "name": "bar"}}],
+        filtering_term_type=ChannelFilter.FILTERING_TERM_TYPE_LABELS,
+        is_default=False,
+    )
+
+    # first call builds the route table
+    assert ChannelFilter.select_filter(alert_receive_channel, {"title": "Test Title"}, {"foo": "bar"}) == channel_filter
+
+    # subsequent calls only fetch the selected channel filter
+    with django_assert_num_queries(1):
+        assert (
+            ChannelFilter.select_filter(alert_receive_channel, {"title": "Test Title"}, {"foo": "bar"})
+            == channel_filter
+        )
@@ -1,6 +1,9 @@
+import re
 from unittest.mock import call, patch
 
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
 from apps.alerts.constants import NEXT_ESCALATION_DELAY
@@ -8,6 +11,7 @@ from apps.alerts.escalation_snapshot.serializers.escalation_policy_snapshot impo
 from apps.alerts.escalation_snapshot.snapshot_classes import EscalationPolicySnapshot
 from apps.alerts.escalation_snapshot.utils import eta_for_escalation_step_notify_if_time
 from apps.alerts.models import AlertGroupLogRecord, EscalationPolicy
+from apps.alerts.tasks.notify_group import notify_group_task
 from apps.api.permissions import LegacyAccessControlRole
 from apps.schedules.ical_utils import list_users_to_notify_from_ical
 from apps.schedules.models import CustomOnCallShift, OnCallScheduleCalendar
@@ -690,3 +694,92 @@ def test_notify_team_members(
         (user_2.pk, alert_group.pk), expected_kwargs, immutable=True
     )
     assert mock_execute.signature.call_count == 2
+
+
+@patch("apps.alerts.escalation_snapshot.snapshot_classes.EscalationPolicySnapshot._execute_tasks", return_value=None)
+@patch("apps.alerts.models.alert_group_log_record.tasks.send_update_log_report_signal.apply_async")
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "step,queries_depend_on_users",
+    (
+        (EscalationPolicy.STEP_NOTIFY_MULTIPLE_USERS, False),
+        (EscalationPolicy.STEP_NOTIFY_TEAM_MEMBERS, False),
+        (EscalationPolicy.STEP_NOTIFY_SCHEDULE, False),
+        # notification policies are fetched for each member of the user group to build the notification plan
+        (EscalationPolicy.STEP_NOTIFY_GROUP, True),
+    ),
+)
+def test_escalation_step_log_records_created_in_bulk(
+    mocked_send_update_log_report_signal,
+    mocked_execute_tasks,
+    escalation_step_test_setup,
+    make_user,
+    make_team,
+    make_schedule,
+    make_on_call_shift,
+    make_slack_team_identity,
+    make_slack_user_group,
+    make_escalation_policy,
+    step,
+    queries_depend_on_users,
+):
+    organization, _, _, channel_filter, alert_group, reason = escalation_step_test_setup
+    slack_team_identity = make_slack_team_identity()
+    organization.slack_team_identity = slack_team_identity
+    organization.save()
+    # match the table name quoted with either double quotes or backticks (MySQL)
+    log_record_insert_regex = re.compile(
+        rf"^INSERT INTO [`\"]?{AlertGroupLogRecord._meta.db_table}[`\"]?\s", re.IGNORECASE
+    )
+
+    def _execute_step(users_count):
+        users = [make_user(organization=organization) for _ in range(users_count)]
+        team = make_team(organization=organization)
+        team.users.add(*users)
+        schedule = make_schedule(organization, schedule_class=OnCallScheduleCalendar)
+        start_date = timezone.now().replace(microsecond=0)
+        on_call_shift = make_on_call_shift(
+            organization=organization,
+            shift_type=CustomOnCallShift.TYPE_SINGLE_EVENT,
+            start=start_date,
+            rotation_start=start_date,
+            duration=timezone.timedelta(seconds=7200),
+        )
+        on_call_shift.users.add(*users)
+        schedule.custom_on_call_shifts.add(on_call_shift)
+        escalation_policy = make_escalation_policy(
+            escalation_chain=channel_filter.escalation_chain,
+            escalation_policy_step=step,
+            notify_to_team_members=team,
+            notify_schedule=schedule,
+            notify_to_group=make_slack_user_group(slack_team_identity),
+        )
+        escalation_policy.notify_to_users_queue.set(users)
+        escalation_policy_snapshot = get_escalation_policy_snapshot_from_model(escalation_policy)
+        alert_group.raw_escalation_snapshot = alert_group.build_raw_escalation_snapshot()
+        alert_group.save(update_fields=["raw_escalation_snapshot"])
+
+        mocked_send_update_log_report_signal.reset_mock()
+        with CaptureQueriesContext(connection) as context:
+            escalation_policy_snapshot.execute(alert_group, reason)
+            if step == EscalationPolicy.STEP_NOTIFY_GROUP:
+                # user group members are notified by a separate task
+                with patch(
+                    "apps.slack.models.SlackUserGroup.get_users_from_members_for_organization", return_value=users
+                ):
+                    notify_group_task(alert_group.pk, escalation_policy_snapshot_order=escalation_policy.order)
+
+        # a log record for the step and one for each notified user
+        assert escalation_policy.log_records.count() == users_count + 1
+        log_record_inserts = [
+            query for query in context.captured_queries if log_record_insert_regex.match(query["sql"].lstrip())
+        ]
+        assert len(log_record_inserts) == 1
+        # log report is updated once per step
+        assert mocked_send_update_log_report_signal.call_count == 1
+        return len(context.captured_queries)
+
+    queries_for_one_user = _execute_step(1)
+    queries_for_ten_users = _execute_step(10)
+    if not queries_depend_on_users:
+        assert queries_for_one_user == queries_for_ten_users
@@ -765,3 +765,67 @@ def test_update_next_step_eta_none(
     updated_snapshot = alert_group.update_next_step_eta(increase_by_timedelta)
     assert updated_snapshot == alert_group.build_raw_escalation_snapshot()
     assert updated_snapshot.get("next_step_eta") is None
+
+
+@pytest.mark.django_db
+def test_build_raw_escalation_snapshot_cached(
+    make_organization_and_user,
+    make_alert_receive_channel,
+    make_channel_filter,
+    make_escalation_chain,
+    make_escalation_policy,
+    make_alert_group,
+):
+    organization, user = make_organization_and_user()
+    alert_receive_channel = make_alert_receive_channel(organization)
+    escalation_chain = make_escalation_chain(organization=organization)
+    channel_filter = make_channel_filter(alert_receive_channel, escalation_chain=escalation_chain)
+    escalation_policy = make_escalation_policy(
+        escalation_chain=escalation_chain, escalation_policy_step=EscalationPolicy.STEP_NOTIFY_USERS_QUEUE
+    )
+    escalation_policy.notify_to_users_queue.add(user)
+
+    def _build_raw_escalation_snapshot():
+        # use a new instance of the alert group each time, as it would be for new alert groups
+        alert_group = make_alert_group(alert_receive_channel, channel_filter=channel_filter)
+        with patch.object(
+            EscalationSnapshot.serializer, "to_representation", wraps=EscalationSnapshot.serializer().to_representation
+        ) as mock_to_representation:
+            raw_escalation_snapshot = alert_group.build_raw_escalation_snapshot()
+        return raw_escalation_snapshot, mock_to_representation.called
+
+    def _expected_snapshot():
+        return EscalationSnapshot.serializer(
+            {
+                "channel_filter_snapshot": channel_filter,
+                "escalation_chain_snapshot": escalation_chain,
+                "escalation_policies_snapshots": escalation_chain.escalation_policies.all(),
+                "slack_channel_id": None,
+            }
+        ).data
+
+    snapshot, serialized = _build_raw_escalation_snapshot()
+    assert serialized
+    assert snapshot == _expected_snapshot()
+
+    # the escalation chain is serialized once, alert groups get independent copies
+    snapshot["escalation_policies_snapshots"][0]["escalation_counter"] = 1
+    snapshot, serialized = _build_raw_escalation_snapshot()
+    assert not serialized
+    assert snapshot == _expected_snapshot()
+
+    # changes to the route, the escalation chain and its policies are reflected in new snapshots
+    for change in [
+        lambda: escalation_policy.notify_to_users_queue.remove(user),
+        lambda: make_escalation_policy(
+            escalation_chain=escalation_chain, escalation_policy_step=EscalationPolicy.STEP_NOTIFY_TEAM_MEMBERS
+        ),
+        lambda: escalation_policy.to(2),
+        lambda: setattr(escalation_chain, "name", "new name") or escalation_chain.save(),
+        lambda: setattr(channel_filter, "notify_in_slack", False) or channel_filter.save(),
+        lambda: escalation_policy.delete(),
+    ]:
+        change()
+        snapshot, serialized = _build_raw_escalation_snapshot()
+        assert serialized
+        assert snapshot == _expected_snapshot()
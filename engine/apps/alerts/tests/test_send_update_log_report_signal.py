@@ -0,0 +1,69 @@
+from unittest.mock import patch
+
+import pytest
+from django.core.cache import cache
+
+from apps.alerts.tasks.send_update_log_report_signal import (
+    LOG_REPORT_UPDATE_MAX_DELAY,
+    _get_log_report_update_cache_key,
+    log_report_update_counters,
+    schedule_update_log_report_signal,
+    send_update_log_report_signal,
+)
+
+
+@pytest.fixture
+def alert_group(make_organization, make_alert_receive_channel, make_alert_group):
+    organization = make_organization()
+    alert_receive_channel = make_alert_receive_channel(organization)
+    return make_alert_group(alert_receive_channel)
+
+
+@patch("apps.alerts.tasks.send_update_log_report_signal.alert_group_update_log_report_signal")
+@patch("apps.alerts.tasks.send_update_log_report_signal.send_update_log_report_signal.apply_async")
+@pytest.mark.django_db
+def test_schedule_update_log_report_signal_coalesced(mock_apply_async, mock_signal, alert_group):
+    for _ in range(5):
+        schedule_update_log_report_signal(alert_group.pk, countdown=8)
+    assert mock_apply_async.call_count == 5
+
+    for call in mock_apply_async.call_args_list:
+        send_update_log_report_signal(**call.kwargs["kwargs"])
+
+    # only the task scheduled last sends the signal
+    mock_signal.send.assert_called_once_with(sender=send_update_log_report_signal, alert_group=alert_group.pk)
+    log_report_update_counters.flush()
+    assert log_report_update_counters.get_totals() == {"scheduled": 5, "sent": 1, "suppressed": 4}
+    assert cache.get(_get_log_report_update_cache_key(alert_group.pk)) is None
+
+
+@patch("apps.alerts.tasks.send_update_log_report_signal.alert_group_update_log_report_signal")
+@patch("apps.alerts.tasks.send_update_log_report_signal.send_update_log_report_signal.apply_async")
+@pytest.mark.django_db
+def test_schedule_update_log_report_signal_max_delay(mock_apply_async, mock_signal, alert_group):
+    schedule_update_log_report_signal(alert_group.pk)
+    schedule_update_log_report_signal(alert_group.pk)
+    first_task_kwargs, last_task_kwargs = [call.kwargs["kwargs"] for call in mock_apply_async.call_args_list]
+
+    # the log report update has been postponed for too long, the outdated task sends the signal anyway
+    cache_key = _get_log_report_update_cache_key(alert_group.pk)
+    pending_update = cache.get(cache_key)
+    pending_update["first_scheduled_at"] -= LOG_REPORT_UPDATE_MAX_DELAY
+    cache.set(cache_key, pending_update)
+
+    send_update_log_report_signal(**first_task_kwargs)
+    assert mock_signal.send.call_count == 1
+    assert cache.get(cache_key)["token"] == last_task_kwargs["update_token"]
+
+    send_update_log_report_signal(**last_task_kwargs)
+    assert mock_signal.send.call_count == 2
+
+
+@patch("apps.alerts.tasks.send_update_log_report_signal.alert_group_update_log_report_signal")
+@pytest.mark.django_db
+def test_send_update_log_report_signal_without_token(mock_signal, alert_group):
+    with patch("apps.alerts.tasks.send_update_log_report_signal.send_update_log_report_signal.apply_async"):
+        schedule_update_log_report_signal(alert_group.pk)
+
+    send_update_log_report_signal(alert_group_pk=alert_group.pk)
+    mock_signal.send.assert_called_once_with(sender=send_update_log_report_signal, alert_group=alert_group.pk)
@@ -215,8 +215,8 @@ class OnCallShiftSerializer(EagerLoadingMixin, serializers.ModelSerializer):
         self._require_users(validated_data)
         instance = super().create(validated_data)
 
-        # refresh related schedule ical files
-        instance.refresh_schedule()
+        # refresh related schedule ical files, final schedule only for the time range of the new shift events
+        instance.refresh_schedule(changed_range=instance.events_range)
 
         return instance
 
@@ -254,11 +254,20 @@ class OnCallShiftUpdateSerializer(OnCallShiftSerializer):
         self._require_users(validated_data)
 
         if not force_update and create_or_update_last_shift:
+            # shift events are only updated from now on
+            changed_range = (timezone.now().replace(microsecond=0), None)
             result = instance.create_or_update_last_shift(validated_data)
         else:
+            previous_start, previous_end = instance.events_range
             result = super().update(instance, validated_data)
-
-        # refresh related schedule ical files
-        instance.refresh_schedule()
+            # previous and updated shift events have to be refreshed
+            start, end = result.events_range
+            changed_range = (
+                min(previous_start, start),
+                max(previous_end, end) if previous_end is not None and end is not None else None,
+            )
+
+        # refresh related schedule ical files, final schedule only for the time range of the changed shift events
+        instance.refresh_schedule(changed_range=changed_range)
 
         return result
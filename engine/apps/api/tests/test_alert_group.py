@@ -2,6 +2,8 @@ from unittest.mock import Mock, patch
 
 import pytest
 from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 from rest_framework import status
@@ -1031,6 +1033,61 @@ def test_get_title_search(
     assert response.json()["results"][0]["pk"] == alert_groups[1].public_primary_key
 
 
+@pytest.mark.django_db
+def test_get_title_search_tokens(
+    settings,
+    make_organization_and_user_with_plugin_token,
+    make_organization,
+    make_alert_receive_channel,
+    make_channel_filter,
+    make_alert_group,
+    make_user_auth_headers,
+):
+    settings.FEATURE_ALERT_GROUP_SEARCH_ENABLED = True
+    settings.FEATURE_ALERT_GROUP_SEARCH_CUTOFF_DAYS = None
+    organization, user, token = make_organization_and_user_with_plugin_token()
+    alert_receive_channel = make_alert_receive_channel(organization)
+    channel_filter = make_channel_filter(alert_receive_channel, is_default=True)
+
+    cpu_alert_group = make_alert_group(
+        alert_receive_channel, channel_filter=channel_filter, web_title_cache="[FIRING:1] High CPU usage on db-01"
+    )
+    disk_alert_group = make_alert_group(
+        alert_receive_channel, channel_filter=channel_filter, web_title_cache="Disk usage on db-02"
+    )
+    # alert group created before titles were indexed
+    legacy_alert_group = make_alert_group(
+        alert_receive_channel, channel_filter=channel_filter, web_title_cache="Legacy CPU usage"
+    )
+    legacy_alert_group.search_tokens.all().delete()
+    AlertGroup.objects.filter(pk=legacy_alert_group.pk).update(search_tokens_indexed=False)
+    # other organization's alert group
+    make_alert_group(make_alert_receive_channel(make_organization()), web_title_cache="High CPU usage")
+
+    client = APIClient()
+    url = reverse("api-internal:alertgroup-list")
+
+    def _search(search):
+        response = client.get(url, {"search": search}, format="json", **make_user_auth_headers(user, token))
+        assert response.status_code == status.HTTP_200_OK
+        return {result["pk"] for result in response.json()["results"]}
+
+    # prefix search
+    assert _search("us") == {
+        cpu_alert_group.public_primary_key,
+        disk_alert_group.public_primary_key,
+        legacy_alert_group.public_primary_key,
+    }
+    # every term (and every token of a term) must match
+    assert _search("cpu db") == {cpu_alert_group.public_primary_key}
+    assert _search("db-0") == {cpu_alert_group.public_primary_key, disk_alert_group.public_primary_key}
+    assert _search("Usage CPU") == {cpu_alert_group.public_primary_key, legacy_alert_group.public_primary_key}
+    assert _search("db-03") == set()
+    # search by ID and number
+    assert _search(disk_alert_group.public_primary_key) == {disk_alert_group.public_primary_key}
+    assert _search(str(cpu_alert_group.inside_organization_number)) == {cpu_alert_group.public_primary_key}
+
+
 @pytest.mark.django_db
 @pytest.mark.parametrize(
     "role,expected_status",
@@ -2344,3 +2401,94 @@ def test_alert_group_external_urls(
         "url": "https://some-url",
     }
     assert response.json()["external_urls"] == [expected]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "query_params",
+    [
+        "",
+        "?status=0&status=1",
+        "?integration={integration}",
+        "?involved_users_are={user}",
+        "?label=a:b",
+    ],
+)
+def test_alert_group_list_number_of_queries(
+    query_params,
+    make_organization_and_user_with_plugin_token,
+    make_alert_receive_channel,
+    make_channel_filter,
+    make_alert_group,
+    make_alert,
+    make_alert_group_label_association,
+    make_user_auth_headers,
+):
+    organization, user, token = make_organization_and_user_with_plugin_token()
+    alert_receive_channel = make_alert_receive_channel(organization)
+    channel_filter = make_channel_filter(alert_receive_channel, is_default=True)
+
+    alert_groups = []
+    for _ in range(3):
+        alert_group = make_alert_group(alert_receive_channel, channel_filter=channel_filter, acknowledged_by_user=user)
+        make_alert(alert_group=alert_group, raw_request_data=alert_raw_request_data)
+        make_alert_group_label_association(organization, alert_group, key_name="a", value_name="b")
+        alert_groups.append(alert_group)
+
+    client = APIClient()
+    url = reverse("api-internal:alertgroup-list") + query_params.format(
+        integration=alert_receive_channel.public_primary_key, user=user.public_primary_key
+    )
+
+    def _get_number_of_queries():
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url, format="json", **make_user_auth_headers(user, token))
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()["results"]) == 3
+        return len(context.captured_queries)
+
+    # alert groups are rendered (and cached) on the first request
+    _get_number_of_queries()
+    number_of_queries = _get_number_of_queries()
+
+    # alerts are neither counted nor fetched for every alert group, the number of queries doesn't depend on the
+    # number of alerts
+    for alert_group in alert_groups:
+        for _ in range(10):
+            make_alert(alert_group=alert_group, raw_request_data=alert_raw_request_data)
+    _get_number_of_queries()
+    assert _get_number_of_queries() == number_of_queries
+
+
+@pytest.mark.django_db
+def test_alert_group_list_alerts_not_counted(
+    make_organization_and_user_with_plugin_token,
+    make_alert_receive_channel,
+    make_alert_group,
+    make_alert,
+    make_user_auth_headers,
+):
+    organization, user, token = make_organization_and_user_with_plugin_token()
+    alert_receive_channel = make_alert_receive_channel(organization)
+
+    alert_group = make_alert_group(alert_receive_channel)
+    make_alert(alert_group=alert_group, raw_request_data=alert_raw_request_data)
+    # alert groups created before alerts were counted
+    legacy_alert_group = make_alert_group(alert_receive_channel)
+    make_alert(alert_group=legacy_alert_group, raw_request_data=alert_raw_request_data)
+    make_alert(alert_group=legacy_alert_group, raw_request_data={**alert_raw_request_data, "title": "Last alert"})
+    AlertGroup.objects.filter(pk=legacy_alert_group.pk).update(alerts_count=None, last_alert=None)
+    legacy_alert_group_without_alerts = make_alert_group(alert_receive_channel, alerts_count=None)
+
+    client = APIClient()
+    url = reverse("api-internal:alertgroup-list")
+    response = client.get(url, format="json", **make_user_auth_headers(user, token))
+
+    assert response.status_code == status.HTTP_200_OK
+    results = {result["pk"]: result for result in response.json()["results"]}
+    assert results[alert_group.public_primary_key]["alerts_count"] == 1
+    assert results[alert_group.public_primary_key]["render_for_web"]["title"] == alert_raw_request_data["title"]
+    assert results[legacy_alert_group.public_primary_key]["alerts_count"] == 2
+    assert results[legacy_alert_group.public_primary_key]["render_for_web"]["title"] == "Last alert"
+    assert results[legacy_alert_group_without_alerts.public_primary_key]["alerts_count"] == 0
+    assert results[legacy_alert_group_without_alerts.public_primary_key]["render_for_web"] == {}
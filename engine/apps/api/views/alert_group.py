@@ -16,6 +16,7 @@ from rest_framework.response import Response
 
 from apps.alerts.constants import ActionSource
 from apps.alerts.models import Alert, AlertGroup, AlertReceiveChannel, EscalationChain, ResolutionNote
+from apps.alerts.models.alert_group_search_token import get_title_search_filter
 from apps.alerts.paging import unpage_user
 from apps.alerts.tasks import delete_alert_group, send_update_resolution_note_signal
 from apps.api.errors import AlertGroupAPIError
@@ -244,7 +245,15 @@ class AlertGroupSearchFilter(SearchFilter):
                 started_at__gte=end - timedelta(days=settings.FEATURE_ALERT_GROUP_SEARCH_CUTOFF_DAYS)
             )
 
-        return super().filter_queryset(request, queryset, view)
+        # every search term must match alert group ID, number or title (using the alert group title search index)
+        organization_id = request.auth.organization.id
+        for search_term in search_terms:
+            queryset = queryset.filter(
+                Q(public_primary_key__iexact=search_term)
+                | Q(inside_organization_number__iexact=search_term)
+                | get_title_search_filter(organization_id, search_term)
+            )
+        return queryset
 
     def get_search_fields(self, view, request):
         return (
@@ -443,31 +452,40 @@ class AlertGroupView(
         queryset = self.get_serializer_class().setup_eager_loading(queryset)
         alert_groups = list(queryset)
 
-        # get info on alerts count and last alert ID for every alert group
-        alerts_info = (
-            Alert.objects.values("group_id")
-            .filter(group_id__in=alert_group_pks)
-            .annotate(alerts_count=Count("group_id"), last_alert_id=Max("id"))
-        )
-        alerts_info_map = {info["group_id"]: info for info in alerts_info}
+        # alerts count and last alert ID are denormalized on alert groups, except for alert groups created before that
+        # (alerts_count is None), get info on their alerts
+        alerts_info_map = {}
+        not_counted_alert_group_pks = [
+            alert_group.pk for alert_group in alert_groups if alert_group.alerts_count is None
+        ]
+        if not_counted_alert_group_pks:
+            alerts_info = (
+                Alert.objects.values("group_id")
+                .filter(group_id__in=not_counted_alert_group_pks)
+                .annotate(alerts_count=Count("group_id"), last_alert_id=Max("id"))
+            )
+            alerts_info_map = {info["group_id"]: info for info in alerts_info}
+        for alert_group in alert_groups:
+            if alert_group.alerts_count is None:
+                alerts_info = alerts_info_map.get(alert_group.pk, {"alerts_count": 0, "last_alert_id": None})
+                alert_group.alerts_count = alerts_info["alerts_count"]
+                alert_group.last_alert_id = alerts_info["last_alert_id"]
 
         # fetch last alerts for every alert group
-        last_alert_ids = [info["last_alert_id"] for info in alerts_info_map.values()]
-        last_alerts = Alert.objects.filter(pk__in=last_alert_ids)
-        for alert in last_alerts:
-            # link group back to alert
-            alert.group = [alert_group for alert_group in alert_groups if alert_group.pk == alert.group_id][0]
-            alerts_info_map[alert.group_id].update({"last_alert": alert})
-
-        # add additional "alerts_count" and "last_alert" fields to every alert group
+        last_alerts = {
+            alert.pk: alert
+            for alert in Alert.objects.filter(
+                pk__in=[alert_group.last_alert_id for alert_group in alert_groups if alert_group.last_alert_id]
+            )
+        }
+
+        # add "last_alert" to every alert group
         for alert_group in alert_groups:
-            try:
-                alert_group.last_alert = alerts_info_map[alert_group.pk]["last_alert"]
-                alert_group.alerts_count = alerts_info_map[alert_group.pk]["alerts_count"]
-            except KeyError:
-                # alert group has no alerts
-                alert_group.last_alert = None
-                alert_group.alerts_count = 0
+            last_alert = last_alerts.get(alert_group.last_alert_id)
+            if last_alert is not None:
+                # link group back to alert
+                last_alert.group = alert_group
+            alert_group.last_alert = last_alert
 
         return alert_groups
 
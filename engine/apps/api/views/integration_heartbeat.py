@@ -6,6 +6,7 @@ from rest_framework.response import Response
 from apps.api.permissions import RBACPermission
 from apps.api.serializers.integration_heartbeat import IntegrationHeartBeatSerializer
 from apps.auth_token.auth import PluginAuthentication
+from apps.heartbeat.heartbeat_cache import discard_heartbeat
 from apps.heartbeat.models import IntegrationHeartBeat
 from common.api_helpers.mixins import PublicPrimaryKeyMixin, TeamFilteringMixin
 from common.insight_log import EntityEvent, write_resource_insight_log
@@ -78,6 +79,7 @@ class IntegrationHeartBeatView(
         instance = self.get_object()
         instance.last_heartbeat_time = None
         instance.save()
+        discard_heartbeat(instance.alert_receive_channel_id)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
     @action(detail=False, methods=["get"])
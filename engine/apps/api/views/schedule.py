@@ -200,6 +200,7 @@ class ScheduleView(
             "prev_ical_file_primary",
             "prev_ical_file_overrides",
             "cached_ical_final_schedule",
+            "cached_final_schedule_events",
         )
         if not ignore_filtering_by_available_teams:
             queryset = queryset.filter(*self.available_teams_lookup_args).distinct()
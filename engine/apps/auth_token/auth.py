@@ -18,6 +18,7 @@ from apps.user_management.models.organization import Organization
 from apps.user_management.sync import get_or_create_user
 from settings.base import SELF_HOSTED_SETTINGS
 
+from .auth_cache import get_cached_auth, set_cached_auth
 from .constants import GOOGLE_OAUTH2_AUTH_TOKEN_NAME, SCHEDULE_EXPORT_TOKEN_NAME, SLACK_AUTH_TOKEN_NAME
 from .exceptions import InvalidToken
 from .grafana.grafana_auth_token import get_service_account_token_permissions
@@ -50,6 +51,10 @@ class ApiTokenAuthentication(BaseAuthentication):
 
     def authenticate(self, request):
         auth = get_authorization_header(request).decode("utf-8")
+        cached = get_cached_auth(self.__class__.__name__, [auth])
+        if cached is not None:
+            return cached
+
         user, auth_token = self.authenticate_credentials(auth)
 
         if not user.is_active or not user_is_authorized(user, [RBACPermission.Permissions.API_KEYS_WRITE]):
@@ -57,6 +62,7 @@ class ApiTokenAuthentication(BaseAuthentication):
                 "Only users with Admin permissions are allowed to perform this action."
             )
 
+        set_cached_auth(self.__class__.__name__, [auth], auth_token.organization_id, (user, auth_token))
         return user, auth_token
 
     def authenticate_credentials(self, token):
@@ -109,6 +115,11 @@ class BasePluginAuthentication(BaseAuthentication):
         if "stack_id" not in context or "org_id" not in context:
             raise exceptions.AuthenticationFailed("Invalid instance context.")
 
+        credentials = [token_string, context_string, request.headers.get("X-Grafana-Context")]
+        cached = get_cached_auth(self.__class__.__name__, credentials)
+        if cached is not None:
+            return cached
+
         try:
             auth_token = check_token(token_string, context=context)
             if not auth_token.organization:
@@ -117,6 +128,9 @@ class BasePluginAuthentication(BaseAuthentication):
             raise exceptions.AuthenticationFailed("Invalid token.")
 
         user = self._get_user(request, auth_token.organization)
+        # plugin requests may be made before the user is synced, don't cache until it is
+        if user is not None:
+            set_cached_auth(self.__class__.__name__, credentials, auth_token.organization.pk, (user, auth_token))
         return user, auth_token
 
     @staticmethod
@@ -350,6 +364,12 @@ class GrafanaServiceAccountAuthentication(BaseAuthentication):
         if not auth.startswith(GRAFANA_SA_PREFIX):
             return None
 
+        # service account permissions are checked by calling Grafana API, cache them along with the organization
+        credentials = [auth, request.headers.get(X_GRAFANA_INSTANCE_ID)]
+        cached = get_cached_auth(self.__class__.__name__, credentials)
+        if cached is not None:
+            return cached
+
         organization = self.get_organization(request)
         if not organization:
             raise exceptions.AuthenticationFailed("Invalid organization.")
@@ -358,7 +378,9 @@ class GrafanaServiceAccountAuthentication(BaseAuthentication):
         if organization.deleted_at:
             raise OrganizationDeletedException(organization)
 
-        return self.authenticate_credentials(organization, auth)
+        result = self.authenticate_credentials(organization, auth)
+        set_cached_auth(self.__class__.__name__, credentials, organization.pk, result)
+        return result
 
     def get_organization(self, request):
         if settings.LICENSE == settings.CLOUD_LICENSE_NAME:
@@ -0,0 +1,81 @@
+import hashlib
+import json
+import typing
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+from apps.metrics_exporter.counters import Counters
+
+AUTH_CACHE_KEY_PREFIX = "auth_token_cache"
+# cached authentication results are valid as long as their organization's version key is unchanged
+AUTH_CACHE_VERSION_TIMEOUT = 60 * 60 * 24
+
+T = typing.TypeVar("T")
+
+auth_cache_counters = Counters(
+    "auth_cache",
+    {
+        "hits": "Number of requests authenticated from the authentication cache",
+        "misses": "Number of authentication cache lookups without a valid cached result",
+        "invalidations": "Number of organization authentication cache invalidations",
+    },
+)
+
+
+def _get_auth_cache_key(scope: str, credentials: typing.Sequence[typing.Optional[str]]) -> str:
+    # credentials (tokens) are never stored in the cache, only their digest
+    digest = hashlib.sha256(json.dumps(credentials).encode()).hexdigest()
+    return f"{AUTH_CACHE_KEY_PREFIX}_{scope}_{digest}"
+
+
+def _get_organization_version_cache_key(organization_id: int) -> str:
+    return f"{AUTH_CACHE_KEY_PREFIX}_version_{organization_id}"
+
+
+def get_cached_auth(scope: str, credentials: typing.Sequence[typing.Optional[str]]) -> typing.Optional[T]:
+    """
+    Return the authentication result cached for the credentials by `set_cached_auth`, None on a cache miss.
+    """
+    if not settings.AUTH_TOKEN_CACHE_TIMEOUT:
+        return None
+
+    cached = cache.get(_get_auth_cache_key(scope, credentials))
+    if cached is not None:
+        version = cache.get(_get_organization_version_cache_key(cached["organization_id"]))
+        if version is not None and version == cached["version"]:
+            auth_cache_counters.add(hits=1)
+            return cached["result"]
+
+    auth_cache_counters.add(misses=1)
+    return None
+
+
+def set_cached_auth(
+    scope: str, credentials: typing.Sequence[typing.Optional[str]], organization_id: int, result: T
+) -> None:
+    """
+    Cache the authentication result (e.g. a tuple of user and auth token model instances) for AUTH_TOKEN_CACHE_TIMEOUT
+    seconds, or until `invalidate_organization_auth_cache` is called for the organization.
+    """
+    if not settings.AUTH_TOKEN_CACHE_TIMEOUT:
+        return
+
+    version_cache_key = _get_organization_version_cache_key(organization_id)
+    cache.add(version_cache_key, uuid.uuid4().hex, timeout=AUTH_CACHE_VERSION_TIMEOUT)
+    version = cache.get(version_cache_key)
+    cache.set(
+        _get_auth_cache_key(scope, credentials),
+        {"organization_id": organization_id, "version": version, "result": result},
+        timeout=settings.AUTH_TOKEN_CACHE_TIMEOUT,
+    )
+
+
+def invalidate_organization_auth_cache(organization_id: int) -> None:
+    """
+    Invalidate authentication results cached for the organization. Must be called when the organization's tokens are
+    revoked, or its users or settings affecting permissions change.
+    """
+    cache.delete(_get_organization_version_cache_key(organization_id))
+    auth_cache_counters.add(invalidations=1)
@@ -1,8 +1,11 @@
 from typing import Tuple
 
 from django.db import models
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
 
 from apps.auth_token import constants, crypto
+from apps.auth_token.auth_cache import invalidate_organization_auth_cache
 from apps.auth_token.models.base_auth_token import BaseAuthToken
 from apps.user_management.models import Organization, User
 
@@ -47,3 +50,8 @@ class ApiAuthToken(BaseAuthToken):
     @property
     def insight_logs_metadata(self):
         return {}
+
+
+@receiver(post_delete, sender=ApiAuthToken)
+def listen_for_apiauthtoken_model_delete(sender: ApiAuthToken, instance: ApiAuthToken, *args, **kwargs) -> None:
+    invalidate_organization_auth_cache(instance.organization_id)
@@ -6,6 +6,7 @@ from django.db import models
 from django.utils import timezone
 
 from apps.auth_token import constants
+from apps.auth_token.auth_cache import invalidate_organization_auth_cache
 from apps.auth_token.crypto import hash_token_string
 from apps.auth_token.exceptions import InvalidToken
 
@@ -15,7 +16,13 @@ class AuthTokenQueryset(models.QuerySet):
         return super().filter(*args, **kwargs, revoked_at=None)
 
     def delete(self):
+        organization_ids = set()
+        if any(f.name == "organization" for f in self.model._meta.get_fields()):
+            organization_ids = set(self.values_list("organization_id", flat=True))
         self.update(revoked_at=timezone.now())
+        # drop authentication results cached for the revoked tokens
+        for organization_id in organization_ids:
+            invalidate_organization_auth_cache(organization_id)
 
 
 class BaseAuthToken(models.Model):
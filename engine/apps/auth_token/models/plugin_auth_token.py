@@ -3,8 +3,11 @@ from hmac import compare_digest
 from typing import Tuple
 
 from django.db import models
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
 
 from apps.auth_token import constants
+from apps.auth_token.auth_cache import invalidate_organization_auth_cache
 from apps.auth_token.crypto import (
     generate_plugin_token_string,
     generate_plugin_token_string_and_salt,
@@ -59,3 +62,10 @@ class PluginAuthToken(BaseAuthToken):
                 return auth_token
 
         raise InvalidToken
+
+
+@receiver(post_delete, sender=PluginAuthToken)
+def listen_for_pluginauthtoken_model_delete(
+    sender: PluginAuthToken, instance: PluginAuthToken, *args, **kwargs
+) -> None:
+    invalidate_organization_auth_cache(instance.organization_id)
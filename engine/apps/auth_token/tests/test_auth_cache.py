@@ -0,0 +1,150 @@
+from unittest.mock import patch
+
+import pytest
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIRequestFactory
+
+from apps.api.permissions import LegacyAccessControlRole
+from apps.auth_token.auth import (
+    GRAFANA_SA_PREFIX,
+    ApiTokenAuthentication,
+    GrafanaServiceAccountAuthentication,
+    PluginAuthentication,
+)
+from apps.auth_token.auth_cache import auth_cache_counters
+from apps.grafana_plugin.sync_data import SyncUser
+from apps.user_management.sync import _sync_users_data
+from settings.base import OPEN_SOURCE_LICENSE_NAME, SELF_HOSTED_SETTINGS
+
+INSTANCE_CONTEXT = '{"stack_id": 42, "org_id": 24, "grafana_token": "abc"}'
+
+
+@pytest.mark.django_db
+def test_api_token_authentication_cached(make_organization_and_user, make_public_api_token, django_assert_num_queries):
+    organization, user = make_organization_and_user()
+    token, token_string = make_public_api_token(user, organization)
+    request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=token_string)
+
+    assert ApiTokenAuthentication().authenticate(request) == (user, token)
+
+    with django_assert_num_queries(0):
+        cached_user, cached_token = ApiTokenAuthentication().authenticate(request)
+    assert (cached_user, cached_token) == (user, token)
+    assert cached_user.organization == organization
+    auth_cache_counters.flush()
+    totals_before = auth_cache_counters.get_totals()
+    assert totals_before["hits"] == 1
+    assert totals_before["misses"] == 1
+
+    # revoked token is not authenticated anymore
+    token.delete()
+    with pytest.raises(AuthenticationFailed):
+        ApiTokenAuthentication().authenticate(request)
+    auth_cache_counters.flush()
+    totals = auth_cache_counters.get_totals()
+    assert totals["invalidations"] > totals_before["invalidations"]
+    assert totals["hits"] == totals_before["hits"]
+
+
+@pytest.mark.django_db
+def test_api_token_authentication_cache_invalidated_on_users_sync(make_organization_and_user, make_public_api_token):
+    organization, user = make_organization_and_user()
+    _, token_string = make_public_api_token(user, organization)
+    request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=token_string)
+    ApiTokenAuthentication().authenticate(request)
+
+    sync_user = SyncUser(
+        id=user.user_id,
+        name=user.name,
+        login=user.username,
+        email=user.email,
+        role="Viewer",
+        avatar_url=user.avatar_url,
+        permissions=[],
+        teams=None,
+    )
+    _sync_users_data(organization, [sync_user])
+    user.refresh_from_db()
+    assert user.role == LegacyAccessControlRole.VIEWER
+
+    with pytest.raises(AuthenticationFailed):
+        ApiTokenAuthentication().authenticate(request)
+
+
+@pytest.mark.django_db
+def test_plugin_authentication_cached(
+    make_organization, make_user, make_token_for_organization, django_assert_num_queries
+):
+    organization = make_organization(stack_id=42, org_id=24)
+    user = make_user(organization=organization, user_id=12)
+    token, token_string = make_token_for_organization(organization)
+    headers = {
+        "HTTP_AUTHORIZATION": token_string,
+        "HTTP_X-Instance-Context": INSTANCE_CONTEXT,
+        "HTTP_X-Grafana-Context": '{"UserId": 12}',
+    }
+    assert PluginAuthentication().authenticate(APIRequestFactory().get("/", **headers)) == (user, token)
+
+    with django_assert_num_queries(0):
+        assert PluginAuthentication().authenticate(APIRequestFactory().get("/", **headers)) == (user, token)
+
+    # another user with the same token is not authenticated from the cache
+    headers["HTTP_X-Grafana-Context"] = '{"UserId": 13}'
+    with pytest.raises(AuthenticationFailed):
+        PluginAuthentication().authenticate(APIRequestFactory().get("/", **headers))
+
+    # organization changes invalidate cached results
+    organization.save()
+    headers["HTTP_X-Grafana-Context"] = '{"UserId": 12}'
+    auth_cache_counters.flush()
+    totals_before = auth_cache_counters.get_totals()
+    with patch("apps.auth_token.auth.set_cached_auth") as mock_set_cached_auth:
+        assert PluginAuthentication().authenticate(APIRequestFactory().get("/", **headers)) == (user, token)
+    mock_set_cached_auth.assert_called_once()
+    auth_cache_counters.flush()
+    totals = auth_cache_counters.get_totals()
+    assert totals["misses"] - totals_before["misses"] == 1
+    assert totals["hits"] == totals_before["hits"]
+
+
+@pytest.mark.django_db
+def test_grafana_service_account_authentication_cached(make_organization, settings):
+    settings.LICENSE = OPEN_SOURCE_LICENSE_NAME
+    organization = make_organization(
+        stack_id=SELF_HOSTED_SETTINGS["STACK_ID"],
+        org_id=SELF_HOSTED_SETTINGS["ORG_ID"],
+        stack_slug=SELF_HOSTED_SETTINGS["STACK_SLUG"],
+        org_slug=SELF_HOSTED_SETTINGS["ORG_SLUG"],
+    )
+    request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"{GRAFANA_SA_PREFIX}xyz")
+
+    with patch(
+        "apps.auth_token.auth.get_service_account_token_permissions", return_value={"dashboards:read": []}
+    ) as mock_get_permissions:
+        for _ in range(2):
+            user, auth_token = GrafanaServiceAccountAuthentication().authenticate(request)
+            assert user.organization_id == organization.pk
+            assert user.permissions == [{"action": "dashboards:read"}]
+            assert auth_token.organization == organization
+
+    mock_get_permissions.assert_called_once_with(organization, f"{GRAFANA_SA_PREFIX}xyz")
+
+
+@pytest.mark.django_db
+def test_authentication_cache_disabled(
+    make_organization_and_user, make_public_api_token, django_assert_num_queries, settings
+):
+    settings.AUTH_TOKEN_CACHE_TIMEOUT = 0
+    organization, user = make_organization_and_user()
+    _, token_string = make_public_api_token(user, organization)
+    request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=token_string)
+
+    ApiTokenAuthentication().authenticate(request)
+    with patch("apps.auth_token.auth_cache.cache") as mock_cache:
+        ApiTokenAuthentication().authenticate(request)
+    mock_cache.get.assert_not_called()
+    mock_cache.set.assert_not_called()
+    # the cache isn't looked up, so there are no hits or misses either
+    auth_cache_counters.flush()
+    totals = auth_cache_counters.get_totals()
+    assert totals["hits"] == totals["misses"] == 0
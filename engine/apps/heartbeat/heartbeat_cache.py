@@ -0,0 +1,76 @@
+import datetime
+import typing
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from apps.heartbeat.models import IntegrationHeartBeat
+from common.cache import ensure_cache_key_allocates_to_the_same_hash_slot
+
+# heartbeats are cached for longer than the longest heartbeat timeout, they're flushed to the database way more often
+HEARTBEAT_CACHE_TIMEOUT = 60 * 60 * 24 * 2  # 2 days
+HEARTBEAT_CACHE_SHARDS = 16
+HEARTBEAT_FLUSH_BATCH_SIZE = 1000
+
+
+def _get_shard_hash_tag(alert_receive_channel_id: int) -> str:
+    return f"heartbeat_shard_{alert_receive_channel_id % HEARTBEAT_CACHE_SHARDS}"
+
+
+def _get_heartbeat_cache_key(alert_receive_channel_id: int) -> str:
+    # keys of a shard are kept in the same hash slot, so they can be read with get_many on Redis Cluster
+    hash_tag = _get_shard_hash_tag(alert_receive_channel_id)
+    return ensure_cache_key_allocates_to_the_same_hash_slot(f"{hash_tag}_{alert_receive_channel_id}", hash_tag)
+
+
+def record_heartbeat(alert_receive_channel_id: int) -> None:
+    """
+    Record a heartbeat signal for the integration. Only the latest signal time is kept in the cache, it's saved to
+    the database by `flush_heartbeats` (run by `check_heartbeats`).
+    """
+    cache.set(_get_heartbeat_cache_key(alert_receive_channel_id), timezone.now(), timeout=HEARTBEAT_CACHE_TIMEOUT)
+
+
+def discard_heartbeat(alert_receive_channel_id: int) -> None:
+    """
+    Discard the recorded (but not yet flushed) heartbeat signal of the integration, e.g. when the heartbeat is reset.
+    """
+    cache.delete(_get_heartbeat_cache_key(alert_receive_channel_id))
+
+
+def flush_heartbeats() -> int:
+    """
+    Save recorded heartbeat signal times to the database, return the number of updated heartbeats.
+    """
+    # shard hash tag -> [(heartbeat id, integration id, last heartbeat time in the database)]
+    heartbeats_by_shard: typing.Dict[
+        str, typing.List[typing.Tuple[int, int, typing.Optional[datetime.datetime]]]
+    ] = defaultdict(list)
+    for heartbeat_id, alert_receive_channel_id, last_heartbeat_time in IntegrationHeartBeat.objects.values_list(
+        "id", "alert_receive_channel_id", "last_heartbeat_time"
+    ).iterator():
+        heartbeats_by_shard[_get_shard_hash_tag(alert_receive_channel_id)].append(
+            (heartbeat_id, alert_receive_channel_id, last_heartbeat_time)
+        )
+
+    heartbeats_to_update = []
+    for heartbeats in heartbeats_by_shard.values():
+        for i in range(0, len(heartbeats), HEARTBEAT_FLUSH_BATCH_SIZE):
+            batch = {
+                _get_heartbeat_cache_key(alert_receive_channel_id): (heartbeat_id, last_heartbeat_time)
+                for heartbeat_id, alert_receive_channel_id, last_heartbeat_time in heartbeats[
+                    i : i + HEARTBEAT_FLUSH_BATCH_SIZE
+                ]
+            }
+            for cache_key, recorded_heartbeat_time in cache.get_many(list(batch)).items():
+                heartbeat_id, last_heartbeat_time = batch[cache_key]
+                if last_heartbeat_time is None or recorded_heartbeat_time > last_heartbeat_time:
+                    heartbeats_to_update.append(
+                        IntegrationHeartBeat(id=heartbeat_id, last_heartbeat_time=recorded_heartbeat_time)
+                    )
+
+    IntegrationHeartBeat.objects.bulk_update(
+        heartbeats_to_update, ["last_heartbeat_time"], batch_size=HEARTBEAT_FLUSH_BATCH_SIZE
+    )
+    return len(heartbeats_to_update)
@@ -8,6 +8,7 @@ from django.db.models import DateTimeField, DurationField, ExpressionWrapper, F
 from django.db.models.functions import Cast
 from django.utils import timezone
 
+from apps.heartbeat.heartbeat_cache import flush_heartbeats
 from apps.heartbeat.models import IntegrationHeartBeat
 from apps.integrations.tasks import create_alert
 from common.custom_celery_tasks import shared_dedicated_queue_retry_task
@@ -25,6 +26,10 @@ def check_heartbeats() -> str:
     # * has timeout_seconds set to non-zero (non-default) value,
     # * received at least one checkup (last_heartbeat_time set to non-null value)\
 
+    # Heartbeat signals are recorded in the cache, save them to the database before checking the heartbeats
+    flushed_count = flush_heartbeats()
+    logger.info(f"Flushed {flushed_count} heartbeats")
+
     def _get_timeout_expression() -> ExpressionWrapper:
         if settings.DATABASES["default"]["ENGINE"] == f"django.db.backends.{DatabaseTypes.POSTGRESQL}":
             # DurationField: When used on PostgreSQL, the data type used is an interval
@@ -113,6 +118,10 @@ def integration_heartbeat_checkup(heartbeat_id: int) -> None:
 
 @shared_dedicated_queue_retry_task()
 def process_heartbeat_task(alert_receive_channel_pk):
+    """
+    Deprecated. Heartbeat signals are recorded in the cache, see `record_heartbeat`.
+    TODO: Remove this task after this task cleared from queue
+    """
     IntegrationHeartBeat.objects.filter(
         alert_receive_channel__pk=alert_receive_channel_pk,
     ).update(last_heartbeat_time=timezone.now())
@@ -1,9 +1,12 @@
 from unittest.mock import patch
 
 import pytest
+from django.urls import reverse
 from django.utils import timezone
+from rest_framework.test import APIClient
 
 from apps.alerts.models import AlertReceiveChannel
+from apps.heartbeat.heartbeat_cache import discard_heartbeat, flush_heartbeats, record_heartbeat
 from apps.heartbeat.tasks import check_heartbeats
 from apps.integrations.tasks import create_alert
 
@@ -89,3 +92,71 @@ def test_check_heartbeats(
             result = check_heartbeats()
     assert result == "Found 0 expired and 0 restored heartbeats"
     assert mock_create_alert_apply_async.call_count == 0
+
+
+@pytest.mark.django_db
+def test_heartbeat_signal_recorded_in_cache(
+    make_organization,
+    make_alert_receive_channel,
+    make_integration_heartbeat,
+    django_capture_on_commit_callbacks,
+):
+    organization = make_organization()
+    alert_receive_channel = make_alert_receive_channel(
+        organization, integration=AlertReceiveChannel.INTEGRATION_FORMATTED_WEBHOOK
+    )
+    integration_heartbeat = make_integration_heartbeat(
+        alert_receive_channel,
+        60,
+        last_heartbeat_time=timezone.now() - timezone.timedelta(minutes=10),
+        previous_alerted_state_was_life=False,
+    )
+
+    client = APIClient()
+    url = reverse("integrations:formatted_webhook_heartbeat", kwargs={"alert_channel_key": alert_receive_channel.token})
+    for _ in range(3):
+        response = client.post(url)
+        assert response.status_code == 200
+
+    # signals are not saved to the database on every request
+    last_heartbeat_time = integration_heartbeat.last_heartbeat_time
+    integration_heartbeat.refresh_from_db()
+    assert integration_heartbeat.last_heartbeat_time == last_heartbeat_time
+
+    # the latest signal is saved and the heartbeat is restored on check
+    with patch.object(create_alert, "apply_async") as mock_create_alert_apply_async:
+        with django_capture_on_commit_callbacks(execute=True):
+            result = check_heartbeats()
+    assert result == "Found 0 expired and 1 restored heartbeats"
+    assert mock_create_alert_apply_async.call_count == 1
+    integration_heartbeat.refresh_from_db()
+    assert integration_heartbeat.last_heartbeat_time > last_heartbeat_time
+
+
+@pytest.mark.django_db
+def test_flush_heartbeats(make_organization, make_alert_receive_channel, make_integration_heartbeat):
+    organization = make_organization()
+    now = timezone.now()
+    heartbeats = [
+        make_integration_heartbeat(
+            make_alert_receive_channel(organization), 60, last_heartbeat_time=last_heartbeat_time
+        )
+        for last_heartbeat_time in (None, now - timezone.timedelta(minutes=1), now + timezone.timedelta(minutes=1), now)
+    ]
+    not_recorded_heartbeat, recorded_heartbeat, newer_heartbeat, discarded_heartbeat = heartbeats
+    for heartbeat in (recorded_heartbeat, newer_heartbeat, discarded_heartbeat):
+        record_heartbeat(heartbeat.alert_receive_channel_id)
+    discard_heartbeat(discarded_heartbeat.alert_receive_channel_id)
+
+    assert flush_heartbeats() == 1
+    for heartbeat in heartbeats:
+        last_heartbeat_time = heartbeat.last_heartbeat_time
+        heartbeat.refresh_from_db()
+        if heartbeat == recorded_heartbeat:
+            assert heartbeat.last_heartbeat_time > last_heartbeat_time
+        else:
+            # heartbeats with no recorded signals or with newer signal times in the database are not updated
+            assert heartbeat.last_heartbeat_time == last_heartbeat_time
+
+    # already flushed signals are not saved again
+    assert flush_heartbeats() == 0
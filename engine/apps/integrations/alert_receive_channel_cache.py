@@ -0,0 +1,145 @@
+import copy
+import time
+import typing
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.core.cache import cache
+
+from common.cache import ensure_cache_key_allocates_to_the_same_hash_slot
+from common.lru_cache import LRUCache
+
+if typing.TYPE_CHECKING:
+    from apps.alerts.models import AlertReceiveChannel
+
+CHANNEL_DOES_NOT_EXIST_PLACEHOLDER = "DOES_NOT_EXIST"
+
+CACHE_KEY_SHORT_TERM = "cached_alert_receive_channels_short_term"  # Key for caching channels to reduce DB load
+CACHE_SHORT_TERM_TIMEOUT = 5
+
+CACHE_KEY_DB_FALLBACK = "cached_alert_receive_channels_db_fallback"  # Set once all channels are cached as a DB fallback
+CACHE_DB_FALLBACK_OBSOLETE_KEY = CACHE_KEY_DB_FALLBACK + "_obsolete_key"  # Used as a timer for re-caching
+CACHE_DB_FALLBACK_REFRESH_INTERVAL = 180
+CACHE_DB_FALLBACK_BATCH_SIZE = 1000
+
+_DB_FALLBACK_HASH_TAG = "alert_receive_channels_db_fallback"
+
+SerializedAlertReceiveChannel = typing.Dict[str, typing.Any]
+
+
+def get_short_term_cache_key(token: str) -> str:
+    return CACHE_KEY_SHORT_TERM + "_" + token
+
+
+def get_db_fallback_cache_key(token: str) -> str:
+    # all fallback entries are kept in the same hash slot, so they can be written with set_many on Redis Cluster
+    return ensure_cache_key_allocates_to_the_same_hash_slot(f"{_DB_FALLBACK_HASH_TAG}_{token}", _DB_FALLBACK_HASH_TAG)
+
+
+def serialize_alert_receive_channel(alert_receive_channel: "AlertReceiveChannel") -> SerializedAlertReceiveChannel:
+    """
+    Return the integration's concrete field values. Unlike the Django JSON serializer output, the result can be turned
+    back into a model instance without parsing and converting each field.
+    """
+    return {f.attname: getattr(alert_receive_channel, f.attname) for f in alert_receive_channel._meta.concrete_fields}
+
+
+def deserialize_alert_receive_channel(
+    serialized: typing.Any,
+) -> typing.Optional["AlertReceiveChannel"]:
+    """
+    Return an integration built from `serialize_alert_receive_channel` output, None if it was cached by another
+    version of the model (or in another format) and can't be used anymore.
+    """
+    from apps.alerts.models import AlertReceiveChannel
+
+    if not isinstance(serialized, dict):
+        return None
+    try:
+        alert_receive_channel = AlertReceiveChannel(**serialized)
+    except TypeError:
+        return None
+    alert_receive_channel._state.adding = False
+    alert_receive_channel._state.db = "default"
+    return alert_receive_channel
+
+
+@dataclass
+class CachedAlertReceiveChannel:
+    # None if there's no integration with the token
+    alert_receive_channel: typing.Optional["AlertReceiveChannel"]
+    cached_at: float = field(default_factory=time.monotonic)
+
+
+# integrations are keyed by token, entries are used for CACHE_SHORT_TERM_TIMEOUT seconds like the short-term cache
+_alert_receive_channels: LRUCache[str, CachedAlertReceiveChannel] = LRUCache(
+    maxsize=settings.ALERT_RECEIVE_CHANNEL_CACHE_SIZE
+)
+
+
+def get_alert_receive_channel_from_local_cache(token: str) -> typing.Optional[CachedAlertReceiveChannel]:
+    """
+    Return the integration cached in this process, None on a cache miss. The cached instance is shared, so callers get
+    a (shallow) copy they are free to modify.
+    """
+    cached = _alert_receive_channels.get(token)
+    if cached is None or time.monotonic() - cached.cached_at > CACHE_SHORT_TERM_TIMEOUT:
+        return None
+    if cached.alert_receive_channel is None:
+        return cached
+    return CachedAlertReceiveChannel(copy.copy(cached.alert_receive_channel), cached.cached_at)
+
+
+def set_alert_receive_channel_to_local_cache(
+    token: str, alert_receive_channel: typing.Optional["AlertReceiveChannel"]
+) -> None:
+    _alert_receive_channels.set(token, CachedAlertReceiveChannel(alert_receive_channel))
+
+
+def update_db_fallback_cache() -> None:
+    """
+    Cache all integrations as a DB fallback, in batches of CACHE_DB_FALLBACK_BATCH_SIZE.
+    Integrations are also cached one by one as they are saved, see `update_alert_receive_channel_cache`.
+    """
+    from apps.alerts.models import AlertReceiveChannel
+
+    batch = {}
+    for alert_receive_channel in AlertReceiveChannel.objects.iterator(chunk_size=CACHE_DB_FALLBACK_BATCH_SIZE):
+        batch[get_db_fallback_cache_key(alert_receive_channel.token)] = serialize_alert_receive_channel(
+            alert_receive_channel
+        )
+        if len(batch) >= CACHE_DB_FALLBACK_BATCH_SIZE:
+            # Caching forever, re-caching is managed by "obsolete key"
+            cache.set_many(batch, timeout=None)
+            batch = {}
+    if batch:
+        cache.set_many(batch, timeout=None)
+    cache.set(CACHE_KEY_DB_FALLBACK, True, timeout=None)
+
+
+def update_alert_receive_channel_cache(alert_receive_channel: "AlertReceiveChannel", deleted: bool = False) -> None:
+    """
+    Invalidate the cached integration and update its DB fallback entry. Must be called whenever an integration is
+    saved or deleted.
+    Entries cached by other processes are not invalidated and expire after CACHE_SHORT_TERM_TIMEOUT seconds.
+    """
+    from apps.alerts.models import AlertReceiveChannel
+
+    token = alert_receive_channel.token
+    _alert_receive_channels.delete(token)
+    cache.delete(get_short_term_cache_key(token))
+    # same as AlertReceiveChannel.objects, deleted and maintenance integrations are not cached
+    if (
+        deleted
+        or alert_receive_channel.deleted_at
+        or alert_receive_channel.integration == AlertReceiveChannel.INTEGRATION_MAINTENANCE
+    ):
+        cache.delete(get_db_fallback_cache_key(token))
+    else:
+        cache.set(
+            get_db_fallback_cache_key(token), serialize_alert_receive_channel(alert_receive_channel), timeout=None
+        )
+
+
+def clear_alert_receive_channel_cache() -> None:
+    _alert_receive_channels.clear()
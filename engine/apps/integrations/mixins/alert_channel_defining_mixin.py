@@ -1,19 +1,27 @@
+import copy
 import logging
 from time import perf_counter
 from typing import Optional
 
-from django.core import serializers
 from django.core.cache import cache
 from django.core.exceptions import PermissionDenied
 from django.db import OperationalError
 
 from apps.alerts.models import AlertReceiveChannel
+from apps.integrations import alert_receive_channel_cache
+from apps.integrations.alert_receive_channel_cache import (
+    CHANNEL_DOES_NOT_EXIST_PLACEHOLDER,
+    deserialize_alert_receive_channel,
+    get_alert_receive_channel_from_local_cache,
+    get_db_fallback_cache_key,
+    get_short_term_cache_key,
+    serialize_alert_receive_channel,
+    set_alert_receive_channel_to_local_cache,
+)
 from apps.user_management.exceptions import OrganizationMovedException
 
 INTEGRATION_PERMISSION_DENIED_MESSAGE = "Integration key was not found. Permission denied."
 
-CHANNEL_DOES_NOT_EXIST_PLACEHOLDER = "DOES_NOT_EXIST"
-
 logger = logging.getLogger(__name__)
 
 
@@ -21,14 +29,17 @@ class AlertChannelDefiningMixin(object):
     """
     Mixin is defining "alert channel" used for this request, gathers Slack Team and Chanel to fulfill "request".
     To make it easy to access them in ViewSets.
+
+    Integrations are looked up in a per-process cache first, then in the short-term cache shared by all processes and
+    finally in the database. When the database is unavailable, the per-integration DB fallback cache is used.
     """
 
-    CACHE_KEY_DB_FALLBACK = "cached_alert_receive_channels_db_fallback"  # Key for caching channels as a DB fallback
-    CACHE_DB_FALLBACK_OBSOLETE_KEY = CACHE_KEY_DB_FALLBACK + "_obsolete_key"  # Used as a timer for re-caching
-    CACHE_DB_FALLBACK_REFRESH_INTERVAL = 180
+    CACHE_KEY_DB_FALLBACK = alert_receive_channel_cache.CACHE_KEY_DB_FALLBACK
+    CACHE_DB_FALLBACK_OBSOLETE_KEY = alert_receive_channel_cache.CACHE_DB_FALLBACK_OBSOLETE_KEY
+    CACHE_DB_FALLBACK_REFRESH_INTERVAL = alert_receive_channel_cache.CACHE_DB_FALLBACK_REFRESH_INTERVAL
 
-    CACHE_KEY_SHORT_TERM = "cached_alert_receive_channels_short_term"  # Key for caching channels to reduce DB load
-    CACHE_SHORT_TERM_TIMEOUT = 5
+    CACHE_KEY_SHORT_TERM = alert_receive_channel_cache.CACHE_KEY_SHORT_TERM
+    CACHE_SHORT_TERM_TIMEOUT = alert_receive_channel_cache.CACHE_SHORT_TERM_TIMEOUT
 
     def dispatch(self, *args, **kwargs):
         token = str(kwargs["alert_channel_key"])
@@ -50,25 +61,33 @@ class AlertChannelDefiningMixin(object):
     def get_alert_receive_channel_from_short_term_cache(
         self, token: str
     ) -> tuple[Optional[AlertReceiveChannel], Optional[str]]:
+        # Trying to define from per-process cache
+        cached = get_alert_receive_channel_from_local_cache(token)
+        if cached is not None:
+            if cached.alert_receive_channel is None:
+                return None, CHANNEL_DOES_NOT_EXIST_PLACEHOLDER
+            return cached.alert_receive_channel, None
+
         # Trying to define from short-term cache
-        cache_key_short_term = self.CACHE_KEY_SHORT_TERM + "_" + token
+        cache_key_short_term = get_short_term_cache_key(token)
         cached_alert_receive_channel_raw = cache.get(cache_key_short_term)
 
         if cached_alert_receive_channel_raw == CHANNEL_DOES_NOT_EXIST_PLACEHOLDER:
+            set_alert_receive_channel_to_local_cache(token, None)
             return None, CHANNEL_DOES_NOT_EXIST_PLACEHOLDER
 
         if cached_alert_receive_channel_raw:
-            try:
-                alert_receive_channel = next(serializers.deserialize("json", cached_alert_receive_channel_raw)).object
-                return alert_receive_channel, None
-            except serializers.base.DeserializationError:
-                # cached object model is outdated
-                pass
+            alert_receive_channel = deserialize_alert_receive_channel(cached_alert_receive_channel_raw)
+            # None if cached object model is outdated
+            if alert_receive_channel is not None:
+                set_alert_receive_channel_to_local_cache(token, alert_receive_channel)
+                return copy.copy(alert_receive_channel), None
 
         alert_receive_channel, db_ok = self.get_alert_receive_channel_from_db(token)
         if not alert_receive_channel:
             logger.info(f"Channel {token} does not exist")
             cache.set(cache_key_short_term, CHANNEL_DOES_NOT_EXIST_PLACEHOLDER, self.CACHE_SHORT_TERM_TIMEOUT)
+            set_alert_receive_channel_to_local_cache(token, None)
             return None, CHANNEL_DOES_NOT_EXIST_PLACEHOLDER
 
         if db_ok:
@@ -77,11 +96,13 @@ class AlertChannelDefiningMixin(object):
                     f"Channel {token} organization {alert_receive_channel.organization.public_primary_key} is deleted"
                 )
                 cache.set(cache_key_short_term, CHANNEL_DOES_NOT_EXIST_PLACEHOLDER, self.CACHE_SHORT_TERM_TIMEOUT)
+                set_alert_receive_channel_to_local_cache(token, None)
                 return None, CHANNEL_DOES_NOT_EXIST_PLACEHOLDER
 
-            # Update short term cache
-            serialized = serializers.serialize("json", [alert_receive_channel])
+            # Update short term caches. Related objects fetched above are not cached, same as in the short-term cache
+            serialized = serialize_alert_receive_channel(alert_receive_channel)
             cache.set(cache_key_short_term, serialized, self.CACHE_SHORT_TERM_TIMEOUT)
+            set_alert_receive_channel_to_local_cache(token, deserialize_alert_receive_channel(serialized))
 
             # Update cached channels
             if cache.get(self.CACHE_DB_FALLBACK_OBSOLETE_KEY) is None:
@@ -110,21 +131,15 @@ class AlertChannelDefiningMixin(object):
             return self.get_alert_receive_channel_from_fallback_cache(token), False
 
     def get_alert_receive_channel_from_fallback_cache(self, token: str) -> Optional[AlertReceiveChannel]:
-        fallback_channels = cache.get(self.CACHE_KEY_DB_FALLBACK)
-        if fallback_channels:
-            for obj in serializers.deserialize("json", fallback_channels):
-                if obj.object.token == token:
-                    return obj.object
-        else:
-            logger.info("Cache is empty!")
-            raise
-        logger.info(f"Integration {token} not found in fallback cache")
-        return None
+        serialized = cache.get(get_db_fallback_cache_key(token))
+        if serialized is None:
+            if cache.get(self.CACHE_KEY_DB_FALLBACK) is None:
+                logger.info("Cache is empty!")
+                raise
+            logger.info(f"Integration {token} not found in fallback cache")
+            return None
+        return deserialize_alert_receive_channel(serialized)
 
     def update_alert_receive_channel_fallback_cache(self):
-        from apps.alerts.models import AlertReceiveChannel
-
         logger.info("Caching alert receive channels from database.")
-        serialized = serializers.serialize("json", AlertReceiveChannel.objects.all())
-        # Caching forever, re-caching is managed by "obsolete key"
-        cache.set(self.CACHE_KEY_DB_FALLBACK, serialized, timeout=None)
+        alert_receive_channel_cache.update_db_fallback_cache()
@@ -1,13 +1,14 @@
 import logging
-import random
 import typing
+from functools import partial
 
 from celery import shared_task
 from celery.utils.log import get_task_logger
+from celery.utils.time import get_exponential_backoff_interval
 from django.conf import settings
 from django.core.cache import cache
+from django.db import transaction
 
-from apps.alerts.models.alert_group_counter import ConcurrentUpdateError
 from apps.alerts.tasks import resolve_alert_group_by_source_if_needed
 from apps.slack.client import SlackClient
 from apps.slack.errors import SlackAPIError
@@ -15,7 +16,7 @@ from common.custom_celery_tasks import shared_dedicated_queue_retry_task
 from common.custom_celery_tasks.create_alert_base_task import CreateAlertBaseTask
 
 if typing.TYPE_CHECKING:
-    from apps.alerts.models import Alert
+    from apps.alerts.models import Alert, AlertReceiveChannel
 
 logger = get_task_logger(__name__)
 logger.setLevel(logging.DEBUG)
@@ -28,7 +29,7 @@ logger.setLevel(logging.DEBUG)
     max_retries=1 if settings.DEBUG else None,
 )
 def create_alertmanager_alerts(alert_receive_channel_pk, alert, is_demo=False, received_at=None):
-    from apps.alerts.models import Alert, AlertReceiveChannel
+    from apps.alerts.models import Alert, AlertGroupForAlertManager, AlertReceiveChannel
 
     alert_receive_channel = AlertReceiveChannel.objects_with_deleted.get(pk=alert_receive_channel_pk)
     if (
@@ -38,7 +39,9 @@ def create_alertmanager_alerts(alert_receive_channel_pk, alert, is_demo=False, r
         logger.info("AlertReceiveChannel alert ignored if deleted/maintenance")
         return
 
-    try:
+    # label hashes are tracked in the same transaction as the alert, same as for buckets of create_alertmanager_alerts_batch,
+    # so an alert is never committed without being tracked (a retry would create it again)
+    with transaction.atomic():
         alert = Alert.create(
             title=None,
             message=None,
@@ -51,13 +54,7 @@ def create_alertmanager_alerts(alert_receive_channel_pk, alert, is_demo=False, r
             is_demo=is_demo,
             received_at=received_at,
         )
-    except ConcurrentUpdateError:
-        # This error is raised when there are concurrent updates on AlertGroupCounter due to optimistic lock on it.
-        # The idea is to not block the worker with a database lock and retry the task in case of concurrent updates.
-        countdown = random.randint(1, 10)
-        create_alertmanager_alerts.apply_async((alert_receive_channel_pk, alert), countdown=countdown)
-        logger.warning(f"Retrying the task gracefully in {countdown} seconds due to ConcurrentUpdateError")
-        return
+        AlertGroupForAlertManager.track_firing_label_hashes([alert])
 
     if alert_receive_channel.allow_source_based_resolving:
         alert_group = alert.group
@@ -71,6 +68,70 @@ def create_alertmanager_alerts(alert_receive_channel_pk, alert, is_demo=False, r
     )
 
 
+@shared_task(
+    base=CreateAlertBaseTask,
+    autoretry_for=(Exception,),
+    retry_backoff=True,
+    max_retries=1 if settings.DEBUG else None,
+)
+def create_alertmanager_alerts_batch(alert_receive_channel_pk, alerts, received_at=None):
+    """
+    Batch version of create_alertmanager_alerts, creates alerts from all alerts of an AlertManager notification at once.
+    """
+    from apps.alerts.models import Alert, AlertReceiveChannel
+    from apps.alerts.models.alert import AlertBatchCreateError
+
+    alert_receive_channel = AlertReceiveChannel.objects_with_deleted.get(pk=alert_receive_channel_pk)
+    if (
+        alert_receive_channel.deleted_at is not None
+        or alert_receive_channel.integration == AlertReceiveChannel.INTEGRATION_MAINTENANCE
+    ):
+        logger.info("AlertReceiveChannel alert ignored if deleted/maintenance")
+        return
+
+    try:
+        created_alerts = Alert.create_many(
+            alert_receive_channel,
+            alerts,
+            received_at=received_at,
+            on_bucket_created=partial(_on_alertmanager_alerts_created, alert_receive_channel),
+        )
+    except AlertBatchCreateError as e:
+        logger.warning(
+            f"Failed to create {len(e.pending_raw_request_data_list)} of {len(alerts)} alertmanager alerts "
+            f"channel_id={alert_receive_channel.pk}, retrying them"
+        )
+        # alerts created before the failure are committed, only retry the others so they are not created twice
+        request = create_alertmanager_alerts_batch.request
+        raise create_alertmanager_alerts_batch.retry(
+            args=(alert_receive_channel_pk, e.pending_raw_request_data_list),
+            kwargs={"received_at": received_at},
+            exc=e.__cause__,
+            countdown=get_exponential_backoff_interval(
+                factor=1, retries=request.retries, maximum=600, full_jitter=True
+            ),
+        )
+
+    logger.debug(
+        f"Created {len(created_alerts)} alertmanager alerts channel_id={alert_receive_channel.pk} "
+        f"alert_group_ids={sorted({alert.group_id for alert in created_alerts})}"
+    )
+
+
+def _on_alertmanager_alerts_created(alert_receive_channel: "AlertReceiveChannel", alerts: typing.List["Alert"]) -> None:
+    from apps.alerts.models import AlertGroupForAlertManager
+
+    AlertGroupForAlertManager.track_firing_label_hashes(alerts)
+
+    if alert_receive_channel.allow_source_based_resolving:
+        alert_groups = {alert.group_id: alert.group for alert in alerts}
+        for alert_group in alert_groups.values():
+            if alert_group.resolved_by != alert_group.NOT_YET_STOP_AUTORESOLVE:
+                task = resolve_alert_group_by_source_if_needed.apply_async((alert_group.pk,), countdown=5)
+                alert_group.active_resolve_calculation_id = task.id
+                alert_group.save(update_fields=["active_resolve_calculation_id"])
+
+
 @shared_task(
     base=CreateAlertBaseTask,
     autoretry_for=(Exception,),
@@ -98,43 +159,20 @@ def create_alert(
     if image_url is not None:
         image_url = str(image_url)[:299]
 
-    try:
-        alert = Alert.create(
-            title=title,
-            message=message,
-            image_url=image_url,
-            link_to_upstream_details=link_to_upstream_details,
-            alert_receive_channel=alert_receive_channel,
-            integration_unique_data=integration_unique_data,
-            raw_request_data=raw_request_data,
-            is_demo=is_demo,
-            received_at=received_at,
-        )
-        logger.debug(
-            f"Created alert alert_id={alert.pk} alert_group_id={alert.group.pk} channel_id={alert_receive_channel.pk}"
-        )
-    except ConcurrentUpdateError:
-        # This error is raised when there are concurrent updates on AlertGroupCounter due to optimistic lock on it.
-        # The idea is to not block the worker with a database lock and retry the task in case of concurrent updates.
-        countdown = random.randint(1, 10)
-        create_alert.apply_async(
-            (
-                title,
-                message,
-                image_url,
-                link_to_upstream_details,
-                alert_receive_channel_pk,
-                integration_unique_data,
-                raw_request_data,
-            ),
-            kwargs={
-                "received_at": received_at,
-            },
-            countdown=countdown,
-        )
-        logger.warning(
-            f"Retrying the task gracefully in {countdown} seconds due to ConcurrentUpdateError for alert_receive_channel={alert_receive_channel_pk}"
-        )
+    alert = Alert.create(
+        title=title,
+        message=message,
+        image_url=image_url,
+        link_to_upstream_details=link_to_upstream_details,
+        alert_receive_channel=alert_receive_channel,
+        integration_unique_data=integration_unique_data,
+        raw_request_data=raw_request_data,
+        is_demo=is_demo,
+        received_at=received_at,
+    )
+    logger.debug(
+        f"Created alert alert_id={alert.pk} alert_group_id={alert.group.pk} channel_id={alert_receive_channel.pk}"
+    )
 
 
 @shared_dedicated_queue_retry_task()
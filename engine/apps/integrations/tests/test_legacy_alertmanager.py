@@ -7,7 +7,7 @@ from rest_framework.test import APIClient
 from apps.alerts.models import AlertReceiveChannel
 
 
-@mock.patch("apps.integrations.tasks.create_alertmanager_alerts.apply_async", return_value=None)
+@mock.patch("apps.integrations.tasks.create_alertmanager_alerts_batch.apply_async", return_value=None)
 @mock.patch("apps.integrations.tasks.create_alert.apply_async", return_value=None)
 @pytest.mark.django_db
 def test_legacy_am_integrations(
@@ -103,4 +103,6 @@ def test_legacy_am_integrations(
 
     url = reverse("integrations:alertmanager", kwargs={"alert_channel_key": legacy_alertmanager.token})
     client.post(url, data=data, format="json")
-    assert mocked_create_am_alert.call_count == 3
+    # all alerts of the legacy AlertManager payload are created by a single batch task
+    assert mocked_create_am_alert.call_count == 1
+    assert len(mocked_create_am_alert.call_args.args[0][1]) == 3
@@ -1,7 +1,10 @@
+from unittest.mock import patch
+
 import pytest
+from celery.exceptions import Retry
 
-from apps.alerts.models import Alert, AlertReceiveChannel
-from apps.integrations.tasks import create_alertmanager_alerts
+from apps.alerts.models import Alert, AlertGroupForAlertManager, AlertReceiveChannel
+from apps.integrations.tasks import create_alertmanager_alerts, create_alertmanager_alerts_batch
 
 
 @pytest.mark.django_db
@@ -29,3 +32,112 @@ def test_create_alertmanager_alert_maintanance_task_no_alert_no_retry(
     create_alertmanager_alerts(integration.pk, {})
 
     assert Alert.objects.count() == 0
+
+
+@pytest.mark.django_db
+def test_create_alertmanager_alerts_tracks_label_hashes(
+    make_organization,
+    make_alert_receive_channel,
+):
+    organization = make_organization()
+    integration = make_alert_receive_channel(organization, integration=AlertReceiveChannel.INTEGRATION_ALERTMANAGER)
+    alert = {"status": "firing", "labels": {"alertname": "InstanceDown"}}
+
+    create_alertmanager_alerts(integration.pk, alert)
+
+    assert Alert.objects.count() == 1
+    assert integration.alert_groups.get().firing_label_hashes.filter(is_firing=True).count() == 1
+
+
+@pytest.mark.django_db
+def test_create_alertmanager_alerts_label_hashes_tracking_failed(
+    make_organization,
+    make_alert_receive_channel,
+):
+    organization = make_organization()
+    integration = make_alert_receive_channel(organization, integration=AlertReceiveChannel.INTEGRATION_ALERTMANAGER)
+    alert = {"status": "firing", "labels": {"alertname": "InstanceDown"}}
+
+    with patch.object(AlertGroupForAlertManager, "track_firing_label_hashes", side_effect=Exception("test")):
+        with pytest.raises(Exception, match="test"):
+            create_alertmanager_alerts(integration.pk, alert)
+
+    # the alert is rolled back together with the failed tracking, so the retry doesn't create it twice
+    assert Alert.objects.count() == 0
+    assert integration.alert_groups.count() == 0
+
+
+@pytest.mark.django_db
+def test_create_alertmanager_alerts_batch_deleted_task_no_alert_no_retry(
+    make_organization,
+    make_alert_receive_channel,
+):
+    organization = make_organization()
+    integration = make_alert_receive_channel(organization, integration=AlertReceiveChannel.INTEGRATION_WEBHOOK)
+    integration.delete()
+
+    create_alertmanager_alerts_batch(integration.pk, [{}, {}])
+
+    assert Alert.objects.count() == 0
+
+
+@pytest.mark.django_db
+def test_create_alertmanager_alerts_batch(
+    make_organization,
+    make_alert_receive_channel,
+):
+    organization = make_organization()
+    integration = make_alert_receive_channel(
+        organization,
+        integration=AlertReceiveChannel.INTEGRATION_ALERTMANAGER,
+        grouping_id_template="{{ payload.labels.alertname }}",
+    )
+    alerts = [
+        {"status": "firing", "labels": {"alertname": "InstanceDown"}, "annotations": {"value": str(i)}}
+        for i in range(3)
+    ]
+
+    with patch("apps.integrations.tasks.resolve_alert_group_by_source_if_needed.apply_async") as mock_resolve:
+        mock_resolve.return_value.id = "resolve-task-id"
+        create_alertmanager_alerts_batch(integration.pk, alerts)
+
+    assert Alert.objects.count() == 3
+    assert integration.alert_groups.count() == 1
+    # source-based resolving is checked once per alert group
+    mock_resolve.assert_called_once_with((integration.alert_groups.get().pk,), countdown=5)
+    # all alerts have the same labels
+    assert integration.alert_groups.get().firing_label_hashes.count() == 1
+
+
+@pytest.mark.django_db
+def test_create_alertmanager_alerts_batch_retries_alerts_not_created(
+    make_organization,
+    make_alert_receive_channel,
+):
+    organization = make_organization()
+    integration = make_alert_receive_channel(
+        organization,
+        integration=AlertReceiveChannel.INTEGRATION_ALERTMANAGER,
+        grouping_id_template="{{ payload.labels.alertname }}",
+    )
+    alerts = [
+        {"status": "firing", "labels": {"alertname": "InstanceDown"}},
+        {"status": "firing", "labels": {"alertname": "DiskFull"}},
+        {"status": "firing", "labels": {"alertname": "InstanceDown"}},
+    ]
+    create_alert = Alert.create
+
+    def _create_alert(*args, **kwargs):
+        if kwargs["raw_request_data"]["labels"]["alertname"] == "DiskFull":
+            raise Exception("test")
+        return create_alert(*args, **kwargs)
+
+    with patch("apps.alerts.models.Alert.create", side_effect=_create_alert):
+        with patch.object(create_alertmanager_alerts_batch, "retry", side_effect=Retry) as mock_retry:
+            with pytest.raises(Retry):
+                create_alertmanager_alerts_batch(integration.pk, alerts)
+
+    # alerts of the first alert group are committed and not retried
+    assert Alert.objects.count() == 2
+    assert integration.alert_groups.get().firing_label_hashes.count() == 1
+    assert mock_retry.call_args.kwargs["args"] == (integration.pk, [alerts[1]])
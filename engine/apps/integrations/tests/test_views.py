@@ -158,12 +158,57 @@ def test_integration_grafana_endpoint_wrong_endpoint(
     mock_create_alertmanager_alerts.assert_not_called()
 
 
-@patch("apps.integrations.views.create_alertmanager_alerts")
+@patch("apps.integrations.views.create_alertmanager_alerts_batch")
 @pytest.mark.django_db
 def test_integration_grafana_endpoint_has_alerts(
-    mock_create_alertmanager_alerts, settings, make_organization_and_user, make_alert_receive_channel
+    mock_create_alertmanager_alerts_batch, settings, make_organization_and_user, make_alert_receive_channel
+):
+    settings.DEBUG = False
+
+    integration_type = "grafana"
+    organization, user = make_organization_and_user()
+    alert_receive_channel = make_alert_receive_channel(
+        organization=organization,
+        author=user,
+        integration=integration_type,
+    )
+
+    client = APIClient()
+    url = reverse("integrations:grafana", kwargs={"alert_channel_key": alert_receive_channel.token})
+
+    data = {
+        "alerts": [
+            {
+                "foo": 123,
+            },
+            {
+                "foo": 456,
+            },
+        ]
+    }
+    now = timezone.now()
+    with patch("django.utils.timezone.now") as mock_now:
+        mock_now.return_value = now
+        response = client.post(url, data, format="json")
+    assert response.status_code == status.HTTP_200_OK
+
+    mock_create_alertmanager_alerts_batch.apply_async.assert_called_once_with(
+        (alert_receive_channel.pk, data["alerts"]), kwargs={"received_at": now.isoformat()}
+    )
+
+
+@patch("apps.integrations.views.create_alertmanager_alerts_batch")
+@patch("apps.integrations.views.create_alertmanager_alerts")
+@pytest.mark.django_db
+def test_integration_grafana_endpoint_has_alerts_batch_ingestion_disabled(
+    mock_create_alertmanager_alerts,
+    mock_create_alertmanager_alerts_batch,
+    settings,
+    make_organization_and_user,
+    make_alert_receive_channel,
 ):
     settings.DEBUG = False
+    settings.FEATURE_ALERTMANAGER_BATCH_INGESTION_ENABLED = False
 
     integration_type = "grafana"
     organization, user = make_organization_and_user()
@@ -198,6 +243,7 @@ def test_integration_grafana_endpoint_has_alerts(
             call((alert_receive_channel.pk, data["alerts"][1]), kwargs={"received_at": now.isoformat()}),
         ]
     )
+    mock_create_alertmanager_alerts_batch.apply_async.assert_not_called()
 
 
 @patch("apps.integrations.views.create_alert")
@@ -328,10 +374,10 @@ def test_integration_universal_endpoint_works_without_db(
     )
 
 
-@patch("apps.integrations.views.create_alertmanager_alerts")
+@patch("apps.integrations.views.create_alertmanager_alerts_batch")
 @pytest.mark.django_db
 def test_integration_grafana_endpoint_without_db_has_alerts(
-    mock_create_alertmanager_alerts, settings, make_organization_and_user, make_alert_receive_channel
+    mock_create_alertmanager_alerts_batch, settings, make_organization_and_user, make_alert_receive_channel
 ):
     settings.DEBUG = False
 
@@ -369,11 +415,8 @@ def test_integration_grafana_endpoint_without_db_has_alerts(
 
     assert response.status_code == status.HTTP_200_OK
 
-    mock_create_alertmanager_alerts.apply_async.assert_has_calls(
-        [
-            call((alert_receive_channel.pk, data["alerts"][0]), kwargs={"received_at": now.isoformat()}),
-            call((alert_receive_channel.pk, data["alerts"][1]), kwargs={"received_at": now.isoformat()}),
-        ]
+    mock_create_alertmanager_alerts_batch.apply_async.assert_called_once_with(
+        (alert_receive_channel.pk, data["alerts"]), kwargs={"received_at": now.isoformat()}
     )
 
 
@@ -432,10 +475,10 @@ def test_integration_universal_endpoint_works_without_cache(
     )
 
 
-@patch("apps.integrations.views.create_alertmanager_alerts")
+@patch("apps.integrations.views.create_alertmanager_alerts_batch")
 @pytest.mark.django_db
 def test_integration_grafana_endpoint_without_cache_has_alerts(
-    mock_create_alertmanager_alerts, settings, make_organization_and_user, make_alert_receive_channel
+    mock_create_alertmanager_alerts_batch, settings, make_organization_and_user, make_alert_receive_channel
 ):
     settings.DEBUG = False
     # setup failing redis cache and ignore exception settings
@@ -469,11 +512,8 @@ def test_integration_grafana_endpoint_without_cache_has_alerts(
 
     assert response.status_code == status.HTTP_200_OK
 
-    mock_create_alertmanager_alerts.apply_async.assert_has_calls(
-        [
-            call((alert_receive_channel.pk, data["alerts"][0]), kwargs={"received_at": now.isoformat()}),
-            call((alert_receive_channel.pk, data["alerts"][1]), kwargs={"received_at": now.isoformat()}),
-        ]
+    mock_create_alertmanager_alerts_batch.apply_async.assert_called_once_with(
+        (alert_receive_channel.pk, data["alerts"]), kwargs={"received_at": now.isoformat()}
     )
 
 
@@ -561,7 +601,8 @@ def test_non_existent_integration_does_not_repeat_access_db(
         mock_cache_get.assert_called_with(cache_key)
         assert response.status_code == status.HTTP_403_FORBIDDEN
 
-    assert mock_cache_get.call_count == attempts
+    # subsequent requests are served from the per-process cache
+    assert mock_cache_get.call_count == 1
     mock_cache_set.assert_called_once_with(
         cache_key, CHANNEL_DOES_NOT_EXIST_PLACEHOLDER, AlertChannelDefiningMixin.CACHE_SHORT_TERM_TIMEOUT
     )
@@ -605,14 +646,92 @@ def test_deleted_integration_does_not_repeat_access_db(
     )
 
     mock_cache_get.reset_mock()
+    mock_cache_set.reset_mock()
     for _ in range(attempts):
         data = {"foo": "bar"}
         response = client.post(url, data, format="json")
         mock_cache_get.assert_called_with(cache_key)
         assert response.status_code == status.HTTP_403_FORBIDDEN
 
-    assert mock_cache_get.call_count == attempts
+    # subsequent requests are served from the per-process cache
+    assert mock_cache_get.call_count == 1
     mock_cache_set.assert_called_once_with(
         cache_key, CHANNEL_DOES_NOT_EXIST_PLACEHOLDER, AlertChannelDefiningMixin.CACHE_SHORT_TERM_TIMEOUT
     )
     mock_db_get.assert_called_once_with(token=alert_receive_channel.token)
+
+
+@patch("apps.integrations.views.create_alert")
+@pytest.mark.django_db
+def test_integration_cached_in_process_until_updated(
+    mock_create_alert, make_organization_and_user, make_alert_receive_channel
+):
+    organization, user = make_organization_and_user()
+    alert_receive_channel = make_alert_receive_channel(organization=organization, author=user, integration="webhook")
+
+    client = APIClient()
+    url = reverse(
+        "integrations:universal",
+        kwargs={"integration_type": "webhook", "alert_channel_key": alert_receive_channel.token},
+    )
+
+    with patch(
+        "apps.alerts.models.AlertReceiveChannel.objects.get", wraps=AlertReceiveChannel.objects.get
+    ) as mock_db_get:
+        with patch("django.core.cache.cache.get", wraps=cache.get) as mock_cache_get:
+            for _ in range(3):
+                response = client.post(url, {"foo": "bar"}, format="json")
+                assert response.status_code == status.HTTP_200_OK
+        assert mock_db_get.call_count == 1
+        # only the first request reaches the short-term cache
+        assert (
+            mock_cache_get.call_args_list.count(
+                ((AlertChannelDefiningMixin.CACHE_KEY_SHORT_TERM + "_" + alert_receive_channel.token,),)
+            )
+            == 1
+        )
+
+        # updating the integration invalidates the cached one
+        alert_receive_channel.verbal_name = "updated"
+        alert_receive_channel.save()
+        response = client.post(url, {"foo": "bar"}, format="json")
+        assert response.status_code == status.HTTP_200_OK
+        assert mock_db_get.call_count == 2
+
+    # deleting the integration invalidates the cached one
+    alert_receive_channel.delete()
+    response = client.post(url, {"foo": "bar"}, format="json")
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@patch("apps.integrations.views.create_alert")
+@pytest.mark.django_db
+def test_integration_fallback_cache_updated_on_save(
+    mock_create_alert, make_organization_and_user, make_alert_receive_channel
+):
+    organization, user = make_organization_and_user()
+
+    # populate cache
+    AlertChannelDefiningMixin().update_alert_receive_channel_fallback_cache()
+    alert_receive_channel = make_alert_receive_channel(organization=organization, author=user, integration="webhook")
+    deleted_alert_receive_channel = make_alert_receive_channel(
+        organization=organization, author=user, integration="webhook"
+    )
+    # integrations saved and deleted afterwards are added to and removed from the cache without a full refresh
+    # (make_alert_receive_channel doesn't send post_save)
+    alert_receive_channel.save()
+    deleted_alert_receive_channel.save()
+    deleted_alert_receive_channel.delete()
+
+    client = APIClient()
+    with DatabaseBlocker().block():
+        for token, expected_status in (
+            (alert_receive_channel.token, status.HTTP_200_OK),
+            (deleted_alert_receive_channel.token, status.HTTP_403_FORBIDDEN),
+        ):
+            url = reverse("integrations:universal", kwargs={"integration_type": "webhook", "alert_channel_key": token})
+            response = client.post(url, {"foo": "bar"}, format="json")
+            assert response.status_code == expected_status
+
+    mock_create_alert.apply_async.assert_called_once()
+    assert mock_create_alert.apply_async.call_args.args[1]["alert_receive_channel_pk"] == alert_receive_channel.pk
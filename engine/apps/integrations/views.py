@@ -14,7 +14,7 @@ from rest_framework.views import APIView
 
 from apps.alerts.models import AlertReceiveChannel
 from apps.auth_token.auth import IntegrationBacksyncAuthentication
-from apps.heartbeat.tasks import process_heartbeat_task
+from apps.heartbeat.heartbeat_cache import record_heartbeat
 from apps.integrations.legacy_prefix import has_legacy_prefix
 from apps.integrations.mixins import (
     AlertChannelDefiningMixin,
@@ -23,7 +23,7 @@ from apps.integrations.mixins import (
     IntegrationRateLimitMixin,
     is_ratelimit_ignored,
 )
-from apps.integrations.tasks import create_alert, create_alertmanager_alerts
+from apps.integrations.tasks import create_alert, create_alertmanager_alerts, create_alertmanager_alerts_batch
 from apps.integrations.throttlers.integration_backsync_throttler import BacksyncRateThrottle
 from apps.user_management.exceptions import OrganizationDeletedException, OrganizationMovedException
 from common.api_helpers.utils import create_engine_url
@@ -95,7 +95,45 @@ class AmazonSNS(BrowsableInstructionMixin, AlertChannelDefiningMixin, Integratio
         )
 
 
+class AlertManagerAlertsMixin:
+    def process_alertmanager_alerts(self, alert_receive_channel, alerts):
+        """
+        Creates alerts from each alert in an AlertManager payload (also used by Grafana Alerting).
+        Every alert counts towards the integration rate limit. With batch ingestion enabled, all accepted alerts are
+        created by a single task instead of one task per alert.
+        Returns a rate limit response if the rate limit was hit, None otherwise.
+        """
+        now = timezone.now()
+        if settings.DEBUG:
+            for alert in alerts:
+                create_alertmanager_alerts(alert_receive_channel.pk, alert, received_at=now.isoformat())
+            return None
+
+        accepted_alerts = []
+        ratelimit_response = None
+        for alert in alerts:
+            self.execute_rate_limit_with_notification_logic()
+
+            if self.request.limited and not is_ratelimit_ignored(alert_receive_channel):
+                ratelimit_response = self.get_ratelimit_http_response()
+                break
+
+            if settings.FEATURE_ALERTMANAGER_BATCH_INGESTION_ENABLED:
+                accepted_alerts.append(alert)
+            else:
+                create_alertmanager_alerts.apply_async(
+                    (alert_receive_channel.pk, alert), kwargs={"received_at": now.isoformat()}
+                )
+
+        if accepted_alerts:
+            create_alertmanager_alerts_batch.apply_async(
+                (alert_receive_channel.pk, accepted_alerts), kwargs={"received_at": now.isoformat()}
+            )
+        return ratelimit_response
+
+
 class AlertManagerAPIView(
+    AlertManagerAlertsMixin,
     BrowsableInstructionMixin,
     AlertChannelDefiningMixin,
     IntegrationRateLimitMixin,
@@ -125,19 +163,7 @@ class AlertManagerAPIView(
         """
         process_v1 creates alerts from each alert in incoming AlertManager payload.
         """
-        now = timezone.now()
-        for alert in request.data.get("alerts", []):
-            if settings.DEBUG:
-                create_alertmanager_alerts(alert_receive_channel.pk, alert, received_at=now.isoformat())
-            else:
-                self.execute_rate_limit_with_notification_logic()
-
-                if self.request.limited and not is_ratelimit_ignored(alert_receive_channel):
-                    return self.get_ratelimit_http_response()
-
-                create_alertmanager_alerts.apply_async(
-                    (alert_receive_channel.pk, alert), kwargs={"received_at": now.isoformat()}
-                )
+        return self.process_alertmanager_alerts(alert_receive_channel, request.data.get("alerts", []))
 
     def process_v2(self, request, alert_receive_channel):
         """
@@ -185,6 +211,7 @@ class GrafanaAlertingAPIView(AlertManagerAPIView):
 
 
 class GrafanaAPIView(
+    AlertManagerAlertsMixin,
     BrowsableInstructionMixin,
     AlertChannelDefiningMixin,
     IntegrationRateLimitMixin,
@@ -202,20 +229,8 @@ class GrafanaAPIView(
 
         # Grafana Alerting 9 has the same payload structure as AlertManager
         if "alerts" in request.data:
-            now = timezone.now()
-            for alert in request.data.get("alerts", []):
-                if settings.DEBUG:
-                    create_alertmanager_alerts(alert_receive_channel.pk, alert, received_at=now.isoformat())
-                else:
-                    self.execute_rate_limit_with_notification_logic()
-
-                    if self.request.limited and not is_ratelimit_ignored(alert_receive_channel):
-                        return self.get_ratelimit_http_response()
-
-                    create_alertmanager_alerts.apply_async(
-                        (alert_receive_channel.pk, alert), kwargs={"received_at": now.isoformat()}
-                    )
-            return Response("Ok.")
+            ratelimit_response = self.process_alertmanager_alerts(alert_receive_channel, request.data.get("alerts", []))
+            return ratelimit_response or Response("Ok.")
 
         """
         Example of request.data from old Grafana:
@@ -353,9 +368,7 @@ class IntegrationHeartBeatAPIView(AlertChannelDefiningMixin, IntegrationHeartBea
         return Response(status=200)
 
     def _process_heartbeat_signal(self, request, alert_receive_channel):
-        process_heartbeat_task.apply_async(
-            (alert_receive_channel.pk,),
-        )
+        record_heartbeat(alert_receive_channel.pk)
 
 
 class IntegrationBacksyncAPIView(APIView):
@@ -24,22 +24,41 @@ MAX_LABELS_PER_ALERT_GROUP = 15
 def gather_labels_from_alert_receive_channel_and_raw_request_data(
     alert_receive_channel: "AlertReceiveChannel", raw_request_data: "Alert.RawRequestData"
 ) -> typing.Optional[types.AlertLabels]:
+    return gather_labels_from_alert_receive_channel_and_raw_request_data_list(
+        alert_receive_channel, [raw_request_data]
+    )[0]
+
+
+def gather_labels_from_alert_receive_channel_and_raw_request_data_list(
+    alert_receive_channel: "AlertReceiveChannel", raw_request_data_list: typing.List["Alert.RawRequestData"]
+) -> typing.List[typing.Optional[types.AlertLabels]]:
+    """
+    Same as gather_labels_from_alert_receive_channel_and_raw_request_data, but for multiple payloads of the same
+    integration. Inherited labels and custom label names are fetched once for all payloads.
+    """
     if not is_labels_feature_enabled(alert_receive_channel.organization):
-        return None
+        return [None for _ in raw_request_data_list]
 
     # inherit labels from the integration
-    labels = {
+    inherited_labels = {
         label.key.name: label.value.name
         for label in alert_receive_channel.labels.filter(inheritable=True).select_related("key", "value")
     }
+    custom_label_names = _get_custom_label_names(alert_receive_channel)
 
-    # apply custom labels
-    labels.update(_custom_labels(alert_receive_channel, raw_request_data))
+    labels_list = []
+    for raw_request_data in raw_request_data_list:
+        labels = inherited_labels.copy()
 
-    # apply template labels
-    labels.update(_template_labels(alert_receive_channel, raw_request_data))
+        # apply custom labels
+        labels.update(_custom_labels(alert_receive_channel, raw_request_data, custom_label_names))
 
-    return labels
+        # apply template labels
+        labels.update(_template_labels(alert_receive_channel, raw_request_data))
+
+        labels_list.append(labels)
+
+    return labels_list
 
 
 def assign_labels(
@@ -76,13 +95,16 @@ def assign_labels(
     AlertGroupAssociatedLabel.objects.bulk_create(alert_group_labels)
 
 
-def _custom_labels(
-    alert_receive_channel: "AlertReceiveChannel", raw_request_data: "Alert.RawRequestData"
-) -> types.AlertLabels:
-    from apps.labels.models import MAX_VALUE_NAME_LENGTH, LabelKeyCache, LabelValueCache
+def _get_custom_label_names(
+    alert_receive_channel: "AlertReceiveChannel",
+) -> typing.Tuple[typing.Dict[str, str], typing.Dict[str, str]]:
+    """
+    Fetch up-to-date label key and value names used by the custom labels of the integration.
+    """
+    from apps.labels.models import LabelKeyCache, LabelValueCache
 
     if alert_receive_channel.alert_group_labels_custom is None:
-        return {}
+        return {}, {}
 
     # fetch up-to-date label key names
     label_key_names = {
@@ -100,6 +122,21 @@ def _custom_labels(
         ).only("id", "name")
     }
 
+    return label_key_names, label_value_names
+
+
+def _custom_labels(
+    alert_receive_channel: "AlertReceiveChannel",
+    raw_request_data: "Alert.RawRequestData",
+    custom_label_names: typing.Tuple[typing.Dict[str, str], typing.Dict[str, str]],
+) -> types.AlertLabels:
+    from apps.labels.models import MAX_VALUE_NAME_LENGTH
+
+    if alert_receive_channel.alert_group_labels_custom is None:
+        return {}
+
+    label_key_names, label_value_names = custom_label_names
+
     rendered_labels = {}
     for label in alert_receive_channel.alert_group_labels_custom:
         key_id, value_id, template = label
@@ -21,6 +21,13 @@ class AlertGroupsTotalMetricsDict(typing.TypedDict):
     services: typing.Dict[str, AlertGroupStateDict]
 
 
+class ResponseTimeHistogramDict(typing.TypedDict):
+    # cumulative number of response times per bucket upper bound (as str), see ALERT_GROUPS_RESPONSE_TIME_BUCKETS
+    buckets: typing.Dict[str, int]
+    sum: float
+    count: int
+
+
 class AlertGroupsResponseTimeMetricsDict(typing.TypedDict):
     integration_name: str
     team_name: str
@@ -28,7 +35,7 @@ class AlertGroupsResponseTimeMetricsDict(typing.TypedDict):
     org_id: int
     slug: str
     id: int
-    services: typing.Dict[str, list]
+    services: typing.Dict[str, ResponseTimeHistogramDict]
 
 
 class UserWasNotifiedOfAlertGroupsMetricsDict(typing.TypedDict):
@@ -54,6 +61,10 @@ USER_WAS_NOTIFIED_OF_ALERT_GROUPS = METRICS_PREFIX + "user_was_notified_of_alert
 
 ALERT_GROUPS_TOTAL = "oncall_alert_groups_total"
 ALERT_GROUPS_RESPONSE_TIME = "oncall_alert_groups_response_time_seconds"
+ALERT_GROUPS_RESPONSE_TIME_BUCKETS = (60, 300, 600, 3600, "+Inf")
+
+METRICS_EXPORTER_SCRAPE_DURATION = "oncall_metrics_exporter_scrape_duration_seconds"
+METRICS_EXPORTER_SERIES = "oncall_metrics_exporter_series"
 
 METRICS_RESPONSE_TIME_CALCULATION_PERIOD = datetime.timedelta(days=7)
 
@@ -0,0 +1,111 @@
+"""
+Counters of application internals (cache hit rates, connection reuse, lock contention etc.), which can be incremented
+from any web or celery process and are exported by the metrics exporter along with the application metrics.
+
+Increments are accumulated in the process memory and added to the totals in the cache at most once per
+COUNTERS_FLUSH_INTERVAL seconds, so counting doesn't add a cache round trip to the hot paths it measures.
+Increments not flushed yet are lost when the process exits, and totals are reset when the cache is cleared, both look
+like a counter reset to Prometheus.
+"""
+
+import logging
+import threading
+import time
+import typing
+
+from django.core.cache import cache
+
+from common.cache import ensure_cache_key_allocates_to_the_same_hash_slot
+
+logger = logging.getLogger(__name__)
+
+COUNTERS_FLUSH_INTERVAL = 10  # seconds
+COUNTERS_CACHE_KEY_PREFIX = "metrics_exporter_counters"
+COUNTERS_METRIC_PREFIX = "oncall_"
+
+# fields with this suffix count durations, they are stored in the cache as integer milliseconds
+SECONDS_SUFFIX = "_seconds"
+
+_counters: typing.List["Counters"] = []
+
+
+class Counters:
+    """
+    A named set of counters, e.g. `Counters("auth_cache", {"hits": "...", "misses": "..."})` is exported as
+    `oncall_auth_cache_hits_total` and `oncall_auth_cache_misses_total` metrics.
+    Fields ending with "_seconds" accept float increments.
+    """
+
+    def __init__(self, name: str, documentation: typing.Dict[str, str]) -> None:
+        self.name = name
+        self.documentation = documentation
+        self._lock = threading.Lock()
+        self._pending = self._empty()
+        self._flushed_at = time.monotonic()
+        _counters.append(self)
+
+    def _empty(self) -> typing.Dict[str, float]:
+        return dict.fromkeys(self.documentation, 0)
+
+    def _get_cache_key(self, field: str) -> str:
+        return ensure_cache_key_allocates_to_the_same_hash_slot(
+            f"{COUNTERS_CACHE_KEY_PREFIX}_{self.name}_{field}", COUNTERS_CACHE_KEY_PREFIX
+        )
+
+    def add(self, **increments: float) -> None:
+        with self._lock:
+            for field, value in increments.items():
+                self._pending[field] += value
+            if time.monotonic() - self._flushed_at < COUNTERS_FLUSH_INTERVAL:
+                return
+            pending = self._take_pending()
+        self._flush(pending)
+
+    def _take_pending(self) -> typing.Dict[str, float]:
+        pending, self._pending = self._pending, self._empty()
+        self._flushed_at = time.monotonic()
+        return pending
+
+    def _flush(self, pending: typing.Dict[str, float]) -> None:
+        for field, value in pending.items():
+            if field.endswith(SECONDS_SUFFIX):
+                value = round(value * 1000)
+            if not value:
+                continue
+            cache_key = self._get_cache_key(field)
+            try:
+                cache.add(cache_key, 0, timeout=None)
+                cache.incr(cache_key, value)
+            except Exception:
+                # counting must never break the code being measured
+                logger.exception(f"Failed to flush counter {self.name}_{field}")
+
+    def flush(self) -> None:
+        """Add pending increments of this process to the totals right away"""
+        with self._lock:
+            pending = self._take_pending()
+        self._flush(pending)
+
+    def reset(self) -> None:
+        """Drop pending increments of this process"""
+        with self._lock:
+            self._take_pending()
+
+    def get_totals(self) -> typing.Dict[str, float]:
+        """Return totals of all processes, durations in seconds"""
+        cache_keys = {field: self._get_cache_key(field) for field in self.documentation}
+        cached = cache.get_many(cache_keys.values())
+        totals = {}
+        for field, cache_key in cache_keys.items():
+            value = cached.get(cache_key, 0)
+            totals[field] = value / 1000 if field.endswith(SECONDS_SUFFIX) else value
+        return totals
+
+
+def get_counters() -> typing.List[Counters]:
+    return list(_counters)
+
+
+def reset_counters() -> None:
+    for counters in _counters:
+        counters.reset()
@@ -8,6 +8,7 @@ from django.utils import timezone
 from apps.alerts.constants import AlertGroupState
 from apps.metrics_exporter.constants import (
     ALERT_GROUPS_RESPONSE_TIME,
+    ALERT_GROUPS_RESPONSE_TIME_BUCKETS,
     ALERT_GROUPS_TOTAL,
     METRICS_CACHE_LIFETIME,
     METRICS_CACHE_TIMER,
@@ -22,6 +23,7 @@ from apps.metrics_exporter.constants import (
     AlertGroupStateDict,
     AlertGroupsTotalMetricsDict,
     RecalculateMetricsTimer,
+    ResponseTimeHistogramDict,
     UserWasNotifiedOfAlertGroupsMetricsDict,
 )
 from common.cache import ensure_cache_key_allocates_to_the_same_hash_slot
@@ -49,10 +51,18 @@ def get_organization_ids():
     organizations_ids = cache.get(METRICS_ORGANIZATIONS_IDS, [])
     if not organizations_ids:
         organizations_ids = get_organization_ids_from_db()
-        cache.set(organizations_ids, METRICS_ORGANIZATIONS_IDS, METRICS_ORGANIZATIONS_IDS_CACHE_TIMEOUT)
+        cache.set(METRICS_ORGANIZATIONS_IDS, organizations_ids, METRICS_ORGANIZATIONS_IDS_CACHE_TIMEOUT)
     return organizations_ids
 
 
+def get_organization_ids_for_shard(organizations_ids: typing.Iterable[int], shard: int, shards: int) -> set[int]:
+    """
+    Split organizations between `shards` metrics exporter scrape targets and return ids of organizations belonging
+    to `shard` (0-based).
+    """
+    return {organization_id for organization_id in organizations_ids if organization_id % shards == shard}
+
+
 def is_allowed_to_start_metrics_calculation(organization_id, force=False) -> bool:
     """Check if metrics_cache_timer doesn't exist or if recalculation was started by force."""
     recalculate_timeout = get_metrics_recalculation_timeout()
@@ -137,6 +147,40 @@ def get_default_states_dict() -> AlertGroupStateDict:
     }
 
 
+def get_default_response_time_histogram() -> ResponseTimeHistogramDict:
+    return {
+        "buckets": {str(bucket): 0 for bucket in ALERT_GROUPS_RESPONSE_TIME_BUCKETS},
+        "sum": 0,
+        "count": 0,
+    }
+
+
+def add_response_times_to_histogram(
+    histogram: ResponseTimeHistogramDict, response_times: typing.Iterable[float]
+) -> ResponseTimeHistogramDict:
+    """Put response time values (in seconds) in the histogram buckets and update its sum and count"""
+    buckets = histogram["buckets"]
+    for value in response_times:
+        for bucket in ALERT_GROUPS_RESPONSE_TIME_BUCKETS:
+            if value <= float(bucket):
+                buckets[str(bucket)] += 1
+        histogram["sum"] += value
+        histogram["count"] += 1
+    return histogram
+
+
+def get_response_time_histogram(
+    response_times: ResponseTimeHistogramDict | typing.List[float],
+) -> ResponseTimeHistogramDict:
+    """
+    Return the response time histogram for a service from metrics cache.
+    Metrics cache calculated before response times were bucketed has the list of response times instead.
+    """
+    if isinstance(response_times, list):
+        return add_response_times_to_histogram(get_default_response_time_histogram(), response_times)
+    return response_times
+
+
 def metrics_update_integration_cache(integration: "AlertReceiveChannel") -> None:
     """Update integration data in metrics cache"""
     metrics_cache_timeout = get_metrics_cache_timeout(integration.organization_id)
@@ -216,7 +260,7 @@ def metrics_add_integrations_to_cache(integrations: list["AlertReceiveChannel"],
                 "org_id": grafana_org_id,
                 "slug": instance_slug,
                 "id": instance_id,
-                "services": {NO_SERVICE_VALUE: []},
+                "services": {NO_SERVICE_VALUE: get_default_response_time_histogram()},
             },
         )
     cache.set(metric_alert_groups_response_time_key, metric_alert_groups_response_time, timeout=metrics_cache_timeout)
@@ -302,6 +346,8 @@ def metrics_update_alert_groups_state_cache(states_diff: dict, organization_id:
 def metrics_update_alert_groups_response_time_cache(integrations_response_time: dict, organization_id: int):
     """
     Update alert groups response time metric cache for each integration in `integrations_response_time` dict.
+    Response times are added to the integration service histogram, so the cached value size doesn't depend on the
+    number of alert groups.
     integrations_response_time dict example:
     {
         <integration_id>: {
@@ -321,9 +367,10 @@ def metrics_update_alert_groups_response_time_cache(integrations_response_time:
         integration_response_time_metrics = metric_alert_groups_response_time.get(int(integration_id))
         if not integration_response_time_metrics:
             continue
+        services = integration_response_time_metrics["services"]
         for service_name, response_time_values in service_data.items():
-            integration_response_time_metrics["services"].setdefault(service_name, [])
-            integration_response_time_metrics["services"][service_name].extend(response_time_values)
+            histogram = get_response_time_histogram(services.get(service_name, get_default_response_time_histogram()))
+            services[service_name] = add_response_times_to_histogram(histogram, response_time_values)
     cache.set(metric_alert_groups_response_time_key, metric_alert_groups_response_time, timeout=metrics_cache_timeout)
 
 
@@ -1,16 +1,20 @@
 import logging
 import re
+import time
 import typing
 
 from django.conf import settings
 from django.core.cache import cache
-from prometheus_client import CollectorRegistry
+from prometheus_client import generate_latest
 from prometheus_client.metrics_core import CounterMetricFamily, GaugeMetricFamily, HistogramMetricFamily, Metric
 
 from apps.alerts.constants import AlertGroupState
 from apps.metrics_exporter.constants import (
     ALERT_GROUPS_RESPONSE_TIME,
+    ALERT_GROUPS_RESPONSE_TIME_BUCKETS,
     ALERT_GROUPS_TOTAL,
+    METRICS_EXPORTER_SCRAPE_DURATION,
+    METRICS_EXPORTER_SERIES,
     SERVICE_LABEL,
     USER_WAS_NOTIFIED_OF_ALERT_GROUPS,
     AlertGroupsResponseTimeMetricsDict,
@@ -18,13 +22,14 @@ from apps.metrics_exporter.constants import (
     RecalculateOrgMetricsDict,
     UserWasNotifiedOfAlertGroupsMetricsDict,
 )
+from apps.metrics_exporter.counters import COUNTERS_METRIC_PREFIX, get_counters
 from apps.metrics_exporter.helpers import (
     get_metric_alert_groups_response_time_key,
     get_metric_alert_groups_total_key,
     get_metric_calculation_started_key,
     get_metric_user_was_notified_of_alert_groups_key,
     get_metrics_cache_timer_key,
-    get_organization_ids,
+    get_response_time_histogram,
 )
 from apps.metrics_exporter.tasks import start_calculate_and_cache_metrics, start_recalculation_for_new_metric
 from settings.base import (
@@ -33,8 +38,6 @@ from settings.base import (
     METRIC_USER_WAS_NOTIFIED_OF_ALERT_GROUPS_NAME,
 )
 
-application_metrics_registry = CollectorRegistry()
-
 logger = logging.getLogger(__name__)
 
 # _RE_BASE_PATTERN allows for optional curly-brackets around the metric name as in some cases this may occur
@@ -51,7 +54,7 @@ class ApplicationMetricsCollector:
     GetMetricFunc = typing.Callable[[set], typing.Tuple[Metric, set]]
 
     def __init__(self):
-        self._buckets = (60, 300, 600, 3600, "+Inf")
+        self._buckets = ALERT_GROUPS_RESPONSE_TIME_BUCKETS
         self._stack_labels = [
             "org_id",
             "slug",
@@ -68,32 +71,44 @@ class ApplicationMetricsCollector:
         self._integration_labels_with_state = self._integration_labels + ["state"]
         self._user_labels = ["username"] + self._stack_labels
 
-    def collect(self):
+    def _get_metric_funcs(self) -> typing.List[GetMetricFunc]:
         """
-        Collects metrics listed in METRICS_TO_COLLECT settings var
+        Return metric getters for metrics listed in METRICS_TO_COLLECT settings var
         """
         metrics_map: typing.Dict[str, ApplicationMetricsCollector.GetMetricFunc] = {
             METRIC_ALERT_GROUPS_TOTAL_NAME: self._get_alert_groups_total_metric,
             METRIC_ALERT_GROUPS_RESPONSE_TIME_NAME: self._get_response_time_metric,
             METRIC_USER_WAS_NOTIFIED_OF_ALERT_GROUPS_NAME: self._get_user_was_notified_of_alert_groups_metric,
         }
-        org_ids = set(get_organization_ids())
-        metrics: typing.List[Metric] = []
-        missing_org_ids: typing.Set[int] = set()
-
+        metric_funcs = []
         for metric_name in settings.METRICS_TO_COLLECT:
             if metric_name not in metrics_map:
                 logger.error(f"Invalid metric name {metric_name} in `METRICS_TO_COLLECT` var")
                 continue
-            metric, missing_org_ids_temp = metrics_map[metric_name](org_ids)
-            metrics.append(metric)
-            missing_org_ids |= missing_org_ids_temp
+            metric_funcs.append(metrics_map[metric_name])
+        return metric_funcs
+
+    def collect_in_batches(self, org_ids: set[int], batch_size: int) -> typing.Iterator[typing.Tuple[Metric, bool]]:
+        """
+        Collects metrics listed in METRICS_TO_COLLECT settings var. Metrics cache is fetched for `batch_size`
+        organizations at a time and a metric family is yielded for each batch, so memory usage doesn't depend on the
+        number of organizations. Families of the same metric are yielded one after another, along with a flag telling
+        if it is the first family of the metric.
+        """
+        sorted_org_ids = sorted(org_ids)
+        # yield a family for each metric even if there are no organizations
+        org_ids_batches = [
+            set(sorted_org_ids[i : i + batch_size]) for i in range(0, len(sorted_org_ids), batch_size)
+        ] or [set()]
+        missing_org_ids: typing.Set[int] = set()
 
-        # check for orgs missing any of the metrics or needing a refresh, start recalculation task for missing org ids
-        self.recalculate_cache_for_missing_org_ids(org_ids, missing_org_ids)
+        for get_metric in self._get_metric_funcs():
+            for batch_number, org_ids_batch in enumerate(org_ids_batches):
+                metric, missing_org_ids_temp = get_metric(org_ids_batch)
+                missing_org_ids |= missing_org_ids_temp
+                yield metric, batch_number == 0
 
-        for metric in metrics:
-            yield metric
+        self.recalculate_cache_for_missing_org_ids(org_ids, missing_org_ids, batch_size=batch_size)
 
     def _get_alert_groups_total_metric(self, org_ids: set[int]) -> typing.Tuple[Metric, set[int]]:
         alert_groups_total = GaugeMetricFamily(
@@ -159,31 +174,20 @@ class ApplicationMetricsCollector:
                     break
                 labels_values: typing.List[str] = self._get_labels_from_integration_data(integration_data)
                 for service_name, response_time in integration_data["services"].items():
-                    if not response_time:
+                    histogram = get_response_time_histogram(response_time)
+                    if not histogram["count"]:
                         continue
-                    buckets_values, sum_value = self._get_buckets_with_sum(response_time)
-                    buckets: list = sorted(list(buckets_values.items()), key=lambda x: float(x[0]))
+                    buckets = [(str(bucket), histogram["buckets"][str(bucket)]) for bucket in self._buckets]
                     alert_groups_response_time_seconds.add_metric(
                         labels_values + [service_name],
                         buckets=buckets,
-                        sum_value=sum_value,
+                        sum_value=histogram["sum"],
                     )
             org_id_from_key = RE_ALERT_GROUPS_RESPONSE_TIME.match(org_key).groups()[0]
             processed_org_ids.add(int(org_id_from_key))
         missing_org_ids = org_ids - processed_org_ids
         return alert_groups_response_time_seconds, missing_org_ids
 
-    def _get_buckets_with_sum(self, values: typing.List[int]) -> typing.Tuple[typing.Dict[str, float], int]:
-        """Put values in correct buckets and count values sum"""
-        buckets_values = {str(key): 0 for key in self._buckets}
-        sum_value = 0
-        for value in values:
-            for bucket in self._buckets:
-                if value <= float(bucket):
-                    buckets_values[str(bucket)] += 1.0
-            sum_value += value
-        return buckets_values, sum_value
-
     def _get_labels_from_integration_data(
         self, integration_data: AlertGroupsTotalMetricsDict | AlertGroupsResponseTimeMetricsDict
     ) -> typing.List[str]:
@@ -210,7 +214,7 @@ class ApplicationMetricsCollector:
     def _update_new_metric(self, metric_name: str, org_ids: set[int], missing_org_ids: set[int]) -> set[int]:
         """
         This method is used for new metrics to calculate metrics gradually and avoid force recalculation for all orgs
-        Add to collect() method the following code with metric name when needed:
+        Add to collect_in_batches() method the following code with metric name when needed:
         # update new metric gradually
         missing_org_ids_X = self._update_new_metric(<NEW_METRIC_NAME>, org_ids, missing_org_ids_X)
         """
@@ -222,9 +226,14 @@ class ApplicationMetricsCollector:
                 start_recalculation_for_new_metric.apply_async((metric_name,))
         return missing_org_ids
 
-    def recalculate_cache_for_missing_org_ids(self, org_ids: set[int], missing_org_ids: set[int]) -> None:
+    def recalculate_cache_for_missing_org_ids(
+        self, org_ids: set[int], missing_org_ids: set[int], batch_size: typing.Optional[int] = None
+    ) -> None:
         cache_timer_for_org_keys = [get_metrics_cache_timer_key(org_id) for org_id in org_ids]
-        cache_timers_for_org = cache.get_many(cache_timer_for_org_keys)
+        batch_size = batch_size or len(cache_timer_for_org_keys) or 1
+        cache_timers_for_org = {}
+        for i in range(0, len(cache_timer_for_org_keys), batch_size):
+            cache_timers_for_org.update(cache.get_many(cache_timer_for_org_keys[i : i + batch_size]))
         recalculate_orgs: typing.List[RecalculateOrgMetricsDict] = []
         for org_id in org_ids:
             force_task = org_id in missing_org_ids
@@ -234,4 +243,63 @@ class ApplicationMetricsCollector:
             start_calculate_and_cache_metrics.apply_async((recalculate_orgs,))
 
 
-application_metrics_registry.register(ApplicationMetricsCollector())
+application_metrics_collector = ApplicationMetricsCollector()
+
+
+def get_counter_metric_families() -> typing.List[CounterMetricFamily]:
+    """Totals of the application internals counters (see apps.metrics_exporter.counters)"""
+    metrics = []
+    for counters in get_counters():
+        for field, value in counters.get_totals().items():
+            metric = CounterMetricFamily(
+                f"{COUNTERS_METRIC_PREFIX}{counters.name}_{field}", counters.documentation[field], value=value
+            )
+            metrics.append(metric)
+    return metrics
+
+
+class _MetricFamilies:
+    """Minimal collector-like wrapper, so `generate_latest` can render metric families one at a time"""
+
+    def __init__(self, *metrics: Metric) -> None:
+        self._metrics = metrics
+
+    def collect(self) -> typing.Iterable[Metric]:
+        return self._metrics
+
+
+def generate_latest_in_batches(
+    org_ids: set[int], batch_size: int, shard: int = 0, shards: int = 1
+) -> typing.Iterator[bytes]:
+    """
+    Render application metrics for the organizations in the Prometheus text format incrementally, so the response
+    can be streamed while metrics cache is fetched for next batches of organizations.
+    Scrape duration and the number of rendered series are added as metrics labeled with the shard.
+    Application internals counters aren't specific to organizations, they are only rendered by the first shard.
+    """
+    started_at = time.perf_counter()
+    series_count = 0
+    for metric, is_first_family in application_metrics_collector.collect_in_batches(org_ids, batch_size):
+        series_count += len(metric.samples)
+        output = generate_latest(_MetricFamilies(metric))
+        if not is_first_family:
+            # skip "# HELP" and "# TYPE" lines, they must be rendered once per metric
+            output = output.split(b"\n", 2)[2]
+        yield output
+
+    if shard == 0:
+        counter_metrics = get_counter_metric_families()
+        series_count += sum(len(metric.samples) for metric in counter_metrics)
+        yield generate_latest(_MetricFamilies(*counter_metrics))
+
+    shard_labels = ["shard", "shards"]
+    shard_label_values = [str(shard), str(shards)]
+    scrape_duration = GaugeMetricFamily(
+        METRICS_EXPORTER_SCRAPE_DURATION, "Duration of application metrics scrape (seconds)", labels=shard_labels
+    )
+    scrape_duration.add_metric(shard_label_values, time.perf_counter() - started_at)
+    series = GaugeMetricFamily(
+        METRICS_EXPORTER_SERIES, "Number of application metrics series in the scrape", labels=shard_labels
+    )
+    series.add_metric(shard_label_values, series_count)
+    yield generate_latest(_MetricFamilies(scrape_duration, series))
@@ -2,7 +2,7 @@ import typing
 
 from django.conf import settings
 from django.core.cache import cache
-from django.db.models import Count, Q
+from django.db.models import Case, CharField, Count, FilteredRelation, Q, Value, When
 
 from apps.alerts.constants import AlertGroupState
 from apps.metrics_exporter.constants import (
@@ -16,6 +16,8 @@ from apps.metrics_exporter.constants import (
     UserWasNotifiedOfAlertGroupsMetricsDict,
 )
 from apps.metrics_exporter.helpers import (
+    add_response_times_to_histogram,
+    get_default_response_time_histogram,
     get_default_states_dict,
     get_metric_alert_groups_response_time_key,
     get_metric_alert_groups_total_key,
@@ -39,7 +41,7 @@ from common.database import get_random_readonly_database_key_if_present_otherwis
 )
 def save_organizations_ids_in_cache():
     organizations_ids = get_organization_ids_from_db()
-    cache.set(organizations_ids, METRICS_ORGANIZATIONS_IDS, METRICS_ORGANIZATIONS_IDS_CACHE_TIMEOUT)
+    cache.set(METRICS_ORGANIZATIONS_IDS, organizations_ids, METRICS_ORGANIZATIONS_IDS_CACHE_TIMEOUT)
 
 
 @shared_dedicated_queue_retry_task(
@@ -91,8 +93,9 @@ def calculate_and_cache_metrics(organization_id, force=False):
     if not organization:
         return
 
+    db = get_random_readonly_database_key_if_present_otherwise_default()
     integrations = (
-        AlertReceiveChannel.objects.using(get_random_readonly_database_key_if_present_otherwise_default())
+        AlertReceiveChannel.objects.using(db)
         .filter(~Q(integration=AlertReceiveChannel.INTEGRATION_MAINTENANCE) & Q(organization_id=organization_id))
         .select_related("team")
     )
@@ -106,15 +109,8 @@ def calculate_and_cache_metrics(organization_id, force=False):
     metric_alert_group_total: typing.Dict[int, AlertGroupsTotalMetricsDict] = {}
     metric_alert_group_response_time: typing.Dict[int, AlertGroupsResponseTimeMetricsDict] = {}
 
-    states = {
-        AlertGroupState.FIRING.value: AlertGroup.get_new_state_filter(),
-        AlertGroupState.SILENCED.value: AlertGroup.get_silenced_state_filter(),
-        AlertGroupState.ACKNOWLEDGED.value: AlertGroup.get_acknowledged_state_filter(),
-        AlertGroupState.RESOLVED.value: AlertGroup.get_resolved_state_filter(),
-    }
-
     for integration in integrations:
-        metric_alert_group_total_data = {
+        metric_alert_group_total[integration.id] = {
             "integration_name": integration.emojized_verbal_name,
             "team_name": integration.team_name,
             "team_id": integration.team_id_or_no_team,
@@ -125,69 +121,62 @@ def calculate_and_cache_metrics(organization_id, force=False):
                 NO_SERVICE_VALUE: get_default_states_dict(),
             },
         }
-        # calculate states
-        for state, alert_group_filter in states.items():
-            # count alert groups with `service_name` label group by label value
-            alert_group_count_by_service = (
-                integration.alert_groups.filter(
-                    alert_group_filter,
-                    labels__organization=organization,
-                    labels__key_name=SERVICE_LABEL,
-                )
-                .values("labels__value_name")
-                .annotate(count=Count("id"))
-            )
-
-            for value in alert_group_count_by_service:
-                metric_alert_group_total_data["services"].setdefault(
-                    value["labels__value_name"],
-                    get_default_states_dict(),
-                )[state] += value["count"]
-            # count alert groups without `service_name` label
-            alert_groups_count_without_service = integration.alert_groups.filter(
-                alert_group_filter,
-                ~Q(labels__key_name=SERVICE_LABEL),
-            ).count()
-            metric_alert_group_total_data["services"][NO_SERVICE_VALUE][state] += alert_groups_count_without_service
-        metric_alert_group_total[integration.id] = metric_alert_group_total_data
-
-        # calculate response time metric
-        metric_response_time_data = {
+        metric_alert_group_response_time[integration.id] = {
             "integration_name": integration.emojized_verbal_name,
             "team_name": integration.team_name,
             "team_id": integration.team_id_or_no_team,
             "org_id": instance_org_id,
             "slug": instance_slug,
             "id": instance_id,
-            "services": {NO_SERVICE_VALUE: []},
+            "services": {NO_SERVICE_VALUE: get_default_response_time_histogram()},
         }
 
-        # filter response time by services
-        response_time_by_service = integration.alert_groups.filter(
-            started_at__gte=response_time_period,
-            response_time__isnull=False,
-            labels__organization=organization,
-            labels__key_name=SERVICE_LABEL,
-        ).values_list("id", "labels__value_name", "response_time")
-        for _, service_name, response_time in response_time_by_service:
-            metric_response_time_data["services"].setdefault(service_name, [])
-            metric_response_time_data["services"][service_name].append(response_time.total_seconds())
-
-        no_service_response_time = (
-            integration.alert_groups.filter(
-                started_at__gte=response_time_period,
-                response_time__isnull=False,
+    # alert groups are joined with their `service_name` labels (if any), so an alert group with several `service_name`
+    # labels is counted once per label value, and an alert group without it is counted with service_name=None
+    alert_groups = (
+        AlertGroup.objects.using(db)
+        .filter(channel_id__in=list(metric_alert_group_total))
+        .annotate(
+            service_label=FilteredRelation(
+                "labels", condition=Q(labels__organization=organization, labels__key_name=SERVICE_LABEL)
             )
-            .exclude(id__in=[i[0] for i in response_time_by_service])
-            .values_list("response_time", flat=True)
         )
+    )
 
-        no_service_response_time_seconds = [
-            int(response_time.total_seconds()) for response_time in no_service_response_time
-        ]
-        metric_response_time_data["services"][NO_SERVICE_VALUE] = no_service_response_time_seconds
-
-        metric_alert_group_response_time[integration.id] = metric_response_time_data
+    # count alert groups by integration, state and service in a single query
+    state = Case(
+        When(AlertGroup.get_new_state_filter(), then=Value(AlertGroupState.FIRING.value)),
+        When(AlertGroup.get_silenced_state_filter(), then=Value(AlertGroupState.SILENCED.value)),
+        When(AlertGroup.get_acknowledged_state_filter(), then=Value(AlertGroupState.ACKNOWLEDGED.value)),
+        When(AlertGroup.get_resolved_state_filter(), then=Value(AlertGroupState.RESOLVED.value)),
+        output_field=CharField(),
+    )
+    alert_group_counts = (
+        alert_groups.annotate(state=state)
+        .values("channel_id", "state", "service_label__value_name")
+        .annotate(count=Count("id"))
+        .order_by()
+    )
+    for row in alert_group_counts:
+        service_name = row["service_label__value_name"] or NO_SERVICE_VALUE
+        metric_alert_group_total[row["channel_id"]]["services"].setdefault(service_name, get_default_states_dict())[
+            row["state"]
+        ] += row["count"]
+
+    # calculate response time metric
+    response_times = alert_groups.filter(
+        started_at__gte=response_time_period,
+        response_time__isnull=False,
+    ).values_list("channel_id", "service_label__value_name", "response_time")
+    for integration_id, service_name, response_time in response_times:
+        response_time_services = metric_alert_group_response_time[integration_id]["services"]
+        if service_name is None:
+            histogram = response_time_services[NO_SERVICE_VALUE]
+            response_time_seconds = int(response_time.total_seconds())
+        else:
+            histogram = response_time_services.setdefault(service_name, get_default_response_time_histogram())
+            response_time_seconds = response_time.total_seconds()
+        add_response_times_to_histogram(histogram, [response_time_seconds])
 
     metric_alert_groups_total_key = get_metric_alert_groups_total_key(organization_id)
     metric_alert_groups_response_time_key = get_metric_alert_groups_response_time_key(organization_id)
@@ -8,6 +8,7 @@ from apps.metrics_exporter.constants import (
     USER_WAS_NOTIFIED_OF_ALERT_GROUPS,
 )
 from apps.metrics_exporter.helpers import (
+    get_default_response_time_histogram,
     get_metric_alert_groups_response_time_key,
     get_metric_alert_groups_total_key,
     get_metric_user_was_notified_of_alert_groups_key,
@@ -79,7 +80,15 @@ def mock_cache_get_metrics_for_collector(monkeypatch):
                     "org_id": 1,
                     "slug": "Test stack",
                     "id": 1,
-                    "services": {NO_SERVICE_VALUE: [2, 10, 200, 650], METRICS_TEST_SERVICE_NAME: [4, 12, 20]},
+                    "services": {
+                        NO_SERVICE_VALUE: {
+                            "buckets": {"60": 2, "300": 3, "600": 3, "3600": 4, "+Inf": 4},
+                            "sum": 862,
+                            "count": 4,
+                        },
+                        # metrics cache calculated before response times were bucketed
+                        METRICS_TEST_SERVICE_NAME: [4, 12, 20],
+                    },
                 },
                 2: {
                     "integration_name": "Empty integration",
@@ -90,7 +99,7 @@ def mock_cache_get_metrics_for_collector(monkeypatch):
                     "id": 2,
                     "services": {
                         # if there are no response times available, this integration will be ignored
-                        NO_SERVICE_VALUE: [],
+                        NO_SERVICE_VALUE: get_default_response_time_histogram(),
                     },
                 },
             },
@@ -198,7 +207,7 @@ def make_metrics_cache_params(monkeypatch):
                         "slug": METRICS_TEST_INSTANCE_SLUG,
                         "id": METRICS_TEST_INSTANCE_ID,
                         "services": {
-                            NO_SERVICE_VALUE: [],
+                            NO_SERVICE_VALUE: get_default_response_time_histogram(),
                         },
                     }
                 },
@@ -1,10 +1,14 @@
 from unittest.mock import patch
 
 import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 from apps.base.models import UserNotificationPolicyLogRecord
 from apps.metrics_exporter.constants import NO_SERVICE_VALUE, SERVICE_LABEL
 from apps.metrics_exporter.helpers import (
+    get_default_response_time_histogram,
     get_metric_alert_groups_response_time_key,
     get_metric_alert_groups_total_key,
     get_metric_user_was_notified_of_alert_groups_key,
@@ -111,7 +115,10 @@ def test_calculate_and_cache_metrics_task(
             "org_id": organization.org_id,
             "slug": organization.stack_slug,
             "id": organization.stack_id,
-            "services": {NO_SERVICE_VALUE: [], "test": []},
+            "services": {
+                NO_SERVICE_VALUE: get_default_response_time_histogram(),
+                "test": get_default_response_time_histogram(),
+            },
         },
         alert_receive_channel_2.id: {
             "integration_name": alert_receive_channel_2.verbal_name,
@@ -120,7 +127,10 @@ def test_calculate_and_cache_metrics_task(
             "org_id": organization.org_id,
             "slug": organization.stack_slug,
             "id": organization.stack_id,
-            "services": {NO_SERVICE_VALUE: [], "test": []},
+            "services": {
+                NO_SERVICE_VALUE: get_default_response_time_histogram(),
+                "test": get_default_response_time_histogram(),
+            },
         },
     }
 
@@ -137,7 +147,7 @@ def test_calculate_and_cache_metrics_task(
         metric_alert_groups_response_time_values = args[1].args
         assert metric_alert_groups_response_time_values[0] == metric_alert_groups_response_time_key
         for integration_id, values in metric_alert_groups_response_time_values[1].items():
-            assert len(values["services"][NO_SERVICE_VALUE]) == METRICS_RESPONSE_TIME_LEN
+            assert values["services"][NO_SERVICE_VALUE]["count"] == METRICS_RESPONSE_TIME_LEN
             # set response time to expected result because it is calculated on fly
             expected_result_metric_alert_groups_response_time[integration_id]["services"][NO_SERVICE_VALUE] = values[
                 "services"
@@ -213,3 +223,49 @@ def test_calculate_and_cache_user_was_notified_metric_task(
         metric_user_was_notified_of_alert_groups_values = args[0].args
         assert metric_user_was_notified_of_alert_groups_values[0] == metric_user_was_notified_key
         assert metric_user_was_notified_of_alert_groups_values[1] == expected_result_metric_user_was_notified
+
+
+@patch("apps.alerts.models.alert_group.update_metrics_for_alert_group.apply_async")
+@pytest.mark.django_db
+def test_calculate_and_cache_metrics_task_query_count(
+    mocked_update_state_cache,
+    make_organization,
+    make_alert_receive_channel,
+    make_alert_group,
+    make_alert_group_label_association,
+):
+    def _make_integrations(organization, count):
+        for _ in range(count):
+            alert_receive_channel = make_alert_receive_channel(organization)
+            make_alert_group(alert_receive_channel)
+            make_alert_group(alert_receive_channel).resolve()
+            alert_group_with_service = make_alert_group(alert_receive_channel)
+            make_alert_group_label_association(
+                organization, alert_group_with_service, key_name=SERVICE_LABEL, value_name="test"
+            )
+            alert_group_with_service.acknowledge()
+
+    def _count_queries(organization):
+        with CaptureQueriesContext(connection) as context:
+            calculate_and_cache_metrics(organization.id)
+        return len(context.captured_queries)
+
+    organization_1 = make_organization()
+    _make_integrations(organization_1, 1)
+    organization_2 = make_organization()
+    _make_integrations(organization_2, 10)
+
+    # the number of queries doesn't depend on the number of integrations
+    assert _count_queries(organization_1) == _count_queries(organization_2)
+
+    metric_alert_groups_total = cache.get(get_metric_alert_groups_total_key(organization_2.id))
+    assert len(metric_alert_groups_total) == 10
+    for integration_metrics in metric_alert_groups_total.values():
+        assert integration_metrics["services"] == {
+            NO_SERVICE_VALUE: {"firing": 1, "silenced": 0, "acknowledged": 0, "resolved": 1},
+            "test": {"firing": 0, "silenced": 0, "acknowledged": 1, "resolved": 0},
+        }
+    metric_alert_groups_response_time = cache.get(get_metric_alert_groups_response_time_key(organization_2.id))
+    for integration_metrics in metric_alert_groups_response_time.values():
+        assert integration_metrics["services"][NO_SERVICE_VALUE]["count"] == 1
+        assert integration_metrics["services"]["test"]["count"] == 1
@@ -0,0 +1,70 @@
+from unittest.mock import patch
+
+import pytest
+from django.core.cache import cache
+
+from apps.metrics_exporter import counters as counters_module
+from apps.metrics_exporter.counters import Counters, get_counters
+from apps.metrics_exporter.metrics_collectors import generate_latest_in_batches
+
+
+@pytest.fixture
+def test_counters():
+    counters = Counters("test", {"hits": "Number of hits", "wait_seconds": "Time spent waiting"})
+    yield counters
+    counters_module._counters.remove(counters)
+
+
+@pytest.mark.django_db
+def test_counters_flushed_after_interval(test_counters):
+    with patch("apps.metrics_exporter.counters.time.monotonic", return_value=test_counters._flushed_at):
+        test_counters.add(hits=1, wait_seconds=0.25)
+        test_counters.add(hits=1)
+    # increments are kept in memory until the flush interval has passed
+    assert test_counters.get_totals() == {"hits": 0, "wait_seconds": 0}
+
+    flush_at = test_counters._flushed_at + counters_module.COUNTERS_FLUSH_INTERVAL
+    with patch("apps.metrics_exporter.counters.time.monotonic", return_value=flush_at):
+        test_counters.add(hits=1)
+    assert test_counters.get_totals() == {"hits": 3, "wait_seconds": 0.25}
+
+
+@pytest.mark.django_db
+def test_counters_flush_and_reset(test_counters):
+    test_counters.add(hits=2)
+    test_counters.flush()
+    test_counters.add(hits=5)
+    test_counters.reset()
+    test_counters.flush()
+
+    assert test_counters.get_totals()["hits"] == 2
+
+
+@pytest.mark.django_db
+def test_counters_flush_cache_error(test_counters):
+    test_counters.add(hits=1)
+    with patch.object(cache, "incr", side_effect=ConnectionError):
+        test_counters.flush()
+
+    assert test_counters.get_totals()["hits"] == 0
+
+
+@pytest.mark.django_db
+def test_counters_registered(test_counters):
+    assert test_counters in get_counters()
+
+
+@patch("apps.metrics_exporter.metrics_collectors.start_calculate_and_cache_metrics.apply_async")
+@pytest.mark.django_db
+def test_generate_latest_in_batches_counters(_mocked_start_calculate_and_cache_metrics, test_counters):
+    test_counters.add(hits=4, wait_seconds=1.5)
+    test_counters.flush()
+
+    result = b"".join(generate_latest_in_batches(set(), batch_size=1)).decode("utf-8")
+    assert "# HELP oncall_test_hits_total Number of hits" in result
+    assert "oncall_test_hits_total 4.0" in result
+    assert "oncall_test_wait_seconds_total 1.5" in result
+
+    # counters aren't specific to organizations, other shards don't render them
+    result = b"".join(generate_latest_in_batches(set(), batch_size=1, shard=1, shards=2)).decode("utf-8")
+    assert "oncall_test_hits_total" not in result
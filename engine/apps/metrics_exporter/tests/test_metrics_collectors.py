@@ -3,7 +3,6 @@ from unittest.mock import patch
 import pytest
 from django.core.cache import cache
 from django.test import override_settings
-from prometheus_client import CollectorRegistry, generate_latest
 
 from apps.alerts.constants import AlertGroupState
 from apps.metrics_exporter.constants import (
@@ -13,7 +12,7 @@ from apps.metrics_exporter.constants import (
     USER_WAS_NOTIFIED_OF_ALERT_GROUPS,
 )
 from apps.metrics_exporter.helpers import get_metric_alert_groups_response_time_key, get_metric_alert_groups_total_key
-from apps.metrics_exporter.metrics_collectors import ApplicationMetricsCollector
+from apps.metrics_exporter.metrics_collectors import ApplicationMetricsCollector, generate_latest_in_batches
 from apps.metrics_exporter.tests.conftest import METRICS_TEST_SERVICE_NAME
 from settings.base import (
     METRIC_ALERT_GROUPS_RESPONSE_TIME_NAME,
@@ -43,11 +42,9 @@ from settings.base import (
         ],
     ],
 )
-@patch("apps.metrics_exporter.metrics_collectors.get_organization_ids", return_value=[1])
 @patch("apps.metrics_exporter.metrics_collectors.start_calculate_and_cache_metrics.apply_async")
 @pytest.mark.django_db
 def test_application_metrics_collectors(
-    mocked_org_ids,
     mocked_start_calculate_and_cache_metrics,
     mock_cache_get_metrics_for_collector,
     use_redis_cluster,
@@ -71,10 +68,8 @@ def test_application_metrics_collectors(
     with override_settings(USE_REDIS_CLUSTER=use_redis_cluster):
         settings.METRICS_TO_COLLECT = metric_base_names_and_metric_names[0]
         collector = ApplicationMetricsCollector()
-        test_metrics_registry = CollectorRegistry()
-        test_metrics_registry.register(collector)
 
-        metrics = [i for i in test_metrics_registry.collect()]
+        metrics = [metric for metric, _ in collector.collect_in_batches({1}, batch_size=1)]
         assert len(metrics) == len(metric_base_names_and_metric_names[1])
 
         for metric in metrics:
@@ -107,27 +102,22 @@ def test_application_metrics_collectors(
                 assert len(metric.samples) == 1
             else:
                 raise AssertionError
-        result = generate_latest(test_metrics_registry).decode("utf-8")
+        result = b"".join(generate_latest_in_batches({1}, batch_size=1)).decode("utf-8")
         assert result is not None
-        assert mocked_org_ids.called
         # Since there is no recalculation timer for test org in cache, start_calculate_and_cache_metrics must be called
         assert mocked_start_calculate_and_cache_metrics.called
-        test_metrics_registry.unregister(collector)
 
 
-@patch("apps.metrics_exporter.metrics_collectors.get_organization_ids", return_value=[1])
 @patch("apps.metrics_exporter.metrics_collectors.start_calculate_and_cache_metrics.apply_async")
 @pytest.mark.django_db
 def test_application_metrics_collector_with_old_metrics_without_services(
-    mocked_org_ids, mocked_start_calculate_and_cache_metrics, mock_cache_get_old_metrics_for_collector
+    mocked_start_calculate_and_cache_metrics, mock_cache_get_old_metrics_for_collector
 ):
     """Test that ApplicationMetricsCollector generates expected metrics from cache"""
 
     org_id = 1
     collector = ApplicationMetricsCollector()
-    test_metrics_registry = CollectorRegistry()
-    test_metrics_registry.register(collector)
-    metrics = [i for i in test_metrics_registry.collect()]
+    metrics = [metric for metric, _ in collector.collect_in_batches({org_id}, batch_size=1)]
     assert len(metrics) == 3
     for metric in metrics:
         if metric.name == ALERT_GROUPS_TOTAL:
@@ -146,9 +136,7 @@ def test_application_metrics_collector_with_old_metrics_without_services(
             assert len(metric.samples) == 1
         else:
             raise AssertionError
-    result = generate_latest(test_metrics_registry).decode("utf-8")
+    result = b"".join(generate_latest_in_batches({org_id}, batch_size=1)).decode("utf-8")
     assert result is not None
-    assert mocked_org_ids.called
     # Since there is no recalculation timer for test org in cache, start_calculate_and_cache_metrics must be called
     assert mocked_start_calculate_and_cache_metrics.called
-    test_metrics_registry.unregister(collector)
@@ -10,9 +10,11 @@ from apps.alerts.tasks.notify_user import update_metric_if_needed
 from apps.base.models import UserNotificationPolicy, UserNotificationPolicyLogRecord
 from apps.metrics_exporter.constants import NO_SERVICE_VALUE, SERVICE_LABEL
 from apps.metrics_exporter.helpers import (
+    get_default_response_time_histogram,
     get_metric_alert_groups_response_time_key,
     get_metric_alert_groups_total_key,
     get_metric_user_was_notified_of_alert_groups_key,
+    get_response_time_histogram,
     metrics_add_integrations_to_cache,
     metrics_bulk_update_team_label_cache,
 )
@@ -213,7 +215,7 @@ def test_update_metric_alert_groups_response_time_cache_on_action(
             "org_id": organization.org_id,
             "slug": organization.stack_slug,
             "id": organization.stack_id,
-            "services": {NO_SERVICE_VALUE: []},
+            "services": {NO_SERVICE_VALUE: get_default_response_time_histogram()},
         }
     }
 
@@ -229,7 +231,7 @@ def test_update_metric_alert_groups_response_time_cache_on_action(
                     service_name
                 ] = response_time_values
                 # response time values len always will be 1 here since cache is mocked and refreshed on every call
-                assert len(response_time_values) == 1
+                assert response_time_values["count"] == 1
                 assert called_arg.args[1] == expected_result_metric_alert_groups_response_time
                 return idx + 1
         raise AssertionError
@@ -277,7 +279,9 @@ def test_update_metric_alert_groups_response_time_cache_on_action(
         arg_idx = get_called_arg_index_and_compare_results()
 
         # create alert group with service label and check metric cache is updated properly
-        expected_result_metric_alert_groups_response_time[alert_receive_channel.id]["services"][NO_SERVICE_VALUE] = []
+        expected_result_metric_alert_groups_response_time[alert_receive_channel.id]["services"][
+            NO_SERVICE_VALUE
+        ] = get_default_response_time_histogram()
 
         alert_group_with_service = make_alert_group(alert_receive_channel)
         make_alert(alert_group=alert_group_with_service, raw_request_data={})
@@ -364,7 +368,7 @@ def test_update_metrics_cache_on_update_integration(
                 "org_id": organization.org_id,
                 "slug": organization.stack_slug,
                 "id": organization.stack_id,
-                "services": {NO_SERVICE_VALUE: []},
+                "services": {NO_SERVICE_VALUE: get_default_response_time_histogram()},
             }
         }
 
@@ -481,7 +485,7 @@ def test_update_metrics_cache_on_update_team(
             "org_id": organization.org_id,
             "slug": organization.stack_slug,
             "id": organization.stack_id,
-            "services": {NO_SERVICE_VALUE: []},
+            "services": {NO_SERVICE_VALUE: get_default_response_time_histogram()},
         }
     }
 
@@ -714,7 +718,7 @@ def test_metrics_add_integrations_to_cache(make_organization, make_alert_receive
 
     def _expected_alert_groups_response_time(alert_receive_channel, response_time=None):
         if response_time is None:
-            response_time = []
+            response_time = get_default_response_time_histogram()
 
         return {
             "integration_name": alert_receive_channel.emojized_verbal_name,
@@ -735,7 +739,11 @@ def test_metrics_add_integrations_to_cache(make_organization, make_alert_receive
     )
     cache.set(
         get_metric_alert_groups_response_time_key(organization.id),
-        {alert_receive_channel2.id: _expected_alert_groups_response_time(alert_receive_channel2, response_time=[12])},
+        {
+            alert_receive_channel2.id: _expected_alert_groups_response_time(
+                alert_receive_channel2, response_time=get_response_time_histogram([12])
+            )
+        },
     )
 
     # add integrations to cache
@@ -750,5 +758,42 @@ def test_metrics_add_integrations_to_cache(make_organization, make_alert_receive
     # check alert groups response time
     assert cache.get(get_metric_alert_groups_response_time_key(organization.id)) == {
         alert_receive_channel1.id: _expected_alert_groups_response_time(alert_receive_channel1),
-        alert_receive_channel2.id: _expected_alert_groups_response_time(alert_receive_channel2, response_time=[12]),
+        alert_receive_channel2.id: _expected_alert_groups_response_time(
+            alert_receive_channel2, response_time=get_response_time_histogram([12])
+        ),
+    }
+
+
+@pytest.mark.django_db
+def test_metrics_update_alert_groups_response_time_cache_histogram(make_organization, make_alert_receive_channel):
+    organization = make_organization()
+    alert_receive_channel = make_alert_receive_channel(organization)
+    metric_alert_groups_response_time_key = get_metric_alert_groups_response_time_key(organization.id)
+
+    metrics_add_integrations_to_cache([alert_receive_channel], organization)
+    # response times of METRICS_TEST_SERVICE_NAME are cached as a list, before response times were bucketed
+    metric_alert_groups_response_time = cache.get(metric_alert_groups_response_time_key)
+    metric_alert_groups_response_time[alert_receive_channel.id]["services"][METRICS_TEST_SERVICE_NAME] = [30, 400]
+    cache.set(metric_alert_groups_response_time_key, metric_alert_groups_response_time)
+
+    for response_time in [10, 60, 601, 5000]:
+        MetricsCacheManager.metrics_update_response_time_cache_for_alert_group(
+            alert_receive_channel.id, organization.id, response_time, NO_SERVICE_VALUE
+        )
+    MetricsCacheManager.metrics_update_response_time_cache_for_alert_group(
+        alert_receive_channel.id, organization.id, 100, METRICS_TEST_SERVICE_NAME
+    )
+
+    services = cache.get(metric_alert_groups_response_time_key)[alert_receive_channel.id]["services"]
+    assert services == {
+        NO_SERVICE_VALUE: {
+            "buckets": {"60": 2, "300": 2, "600": 2, "3600": 3, "+Inf": 4},
+            "sum": 5671,
+            "count": 4,
+        },
+        METRICS_TEST_SERVICE_NAME: {
+            "buckets": {"60": 1, "300": 2, "600": 3, "3600": 3, "+Inf": 3},
+            "sum": 530,
+            "count": 3,
+        },
     }
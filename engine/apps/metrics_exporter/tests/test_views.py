@@ -1,8 +1,25 @@
+from unittest.mock import patch
+
 import pytest
+from django.core.cache import cache
 from django.test import override_settings
 from django.urls import reverse
 from rest_framework.test import APIClient
 
+from apps.alerts.constants import AlertGroupState
+from apps.metrics_exporter.constants import (
+    ALERT_GROUPS_TOTAL,
+    METRICS_EXPORTER_SCRAPE_DURATION,
+    METRICS_EXPORTER_SERIES,
+    NO_SERVICE_VALUE,
+)
+from apps.metrics_exporter.helpers import (
+    get_default_states_dict,
+    get_metric_alert_groups_total_key,
+    get_metrics_cache_timer_key,
+)
+from settings.base import METRIC_ALERT_GROUPS_TOTAL_NAME
+
 
 @pytest.mark.django_db
 @pytest.mark.parametrize(
@@ -26,3 +43,68 @@ def test_metrics_exporter_auth(settings, reload_urls, token, auth, expected):
     response = client.get(url)
 
     assert response.status_code == expected
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "query_params",
+    ["shard=a&shards=2", "shard=2&shards=2", "shard=-1&shards=2", "shard=0&shards=0"],
+)
+@override_settings(FEATURE_PROMETHEUS_EXPORTER_ENABLED=True)
+def test_metrics_exporter_invalid_shard(settings, reload_urls, query_params):
+    reload_urls()
+    settings.PROMETHEUS_EXPORTER_SECRET = None
+
+    client = APIClient()
+    url = reverse("metrics-exporter")
+    response = client.get(f"{url}?{query_params}")
+
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+@patch("apps.metrics_exporter.metrics_collectors.start_calculate_and_cache_metrics.apply_async")
+@patch("apps.metrics_exporter.views.get_organization_ids", return_value=[1, 2, 3, 4, 5])
+@override_settings(FEATURE_PROMETHEUS_EXPORTER_ENABLED=True)
+def test_metrics_exporter_shard(mocked_org_ids, mocked_start_calculate_and_cache_metrics, settings, reload_urls):
+    reload_urls()
+    settings.PROMETHEUS_EXPORTER_SECRET = None
+    settings.METRICS_TO_COLLECT = [METRIC_ALERT_GROUPS_TOTAL_NAME]
+    settings.METRICS_EXPORTER_CACHE_BATCH_SIZE = 1
+
+    for org_id in [1, 2, 3, 4, 5]:
+        cache.set(
+            get_metric_alert_groups_total_key(org_id),
+            {
+                org_id: {
+                    "integration_name": f"Integration {org_id}",
+                    "team_name": "No team",
+                    "team_id": "no_team",
+                    "org_id": org_id,
+                    "slug": "test",
+                    "id": org_id,
+                    "services": {NO_SERVICE_VALUE: get_default_states_dict()},
+                },
+            },
+        )
+        cache.set(get_metrics_cache_timer_key(org_id), {"recalculate_timeout": 3600, "forced_started": False})
+
+    client = APIClient()
+    url = reverse("metrics-exporter")
+    response = client.get(f"{url}?shard=1&shards=2")
+
+    assert response.status_code == 200
+    assert response.streaming
+    result = b"".join(response.streaming_content).decode("utf-8")
+
+    # organizations 1, 3 and 5 belong to shard 1 of 2, metric header is rendered once for all batches
+    assert result.count(f"# TYPE {ALERT_GROUPS_TOTAL} gauge") == 1
+    for org_id in [1, 3, 5]:
+        assert f'integration="Integration {org_id}"' in result
+    for org_id in [2, 4]:
+        assert f'integration="Integration {org_id}"' not in result
+    assert f'{METRICS_EXPORTER_SCRAPE_DURATION}{{shard="1",shards="2"}}' in result
+    # 1 series for each alert group state of 3 integrations
+    assert f'{METRICS_EXPORTER_SERIES}{{shard="1",shards="2"}} {3 * len(AlertGroupState)}.0' in result
+    # all organizations of the shard have metrics cache, nothing to recalculate
+    assert not mocked_start_calculate_and_cache_metrics.called
@@ -1,16 +1,22 @@
 import re
 
 from django.conf import settings
-from django.http import HttpResponse
-from prometheus_client import generate_latest
+from django.http import HttpResponse, StreamingHttpResponse
 from rest_framework.views import APIView
 
-from .metrics_collectors import application_metrics_registry
+from .helpers import get_organization_ids, get_organization_ids_for_shard
+from .metrics_collectors import generate_latest_in_batches
 
 RE_AUTH_TOKEN = re.compile(r"^[Bb]earer\s{1}(.+)$")
 
 
 class MetricsExporterView(APIView):
+    """
+    Application metrics in the Prometheus text format.
+    Organizations can be split between several scrape targets with `?shard=<i>&shards=<n>` query params, each target
+    returning metrics for organizations with `id % n == i`. All organizations are exported by default.
+    """
+
     def get(self, request):
         if settings.PROMETHEUS_EXPORTER_SECRET:
             authorization = request.headers.get("Authorization", "")
@@ -19,5 +25,16 @@ class MetricsExporterView(APIView):
             if not token or token != settings.PROMETHEUS_EXPORTER_SECRET:
                 return HttpResponse(status=401)
 
-        result = generate_latest(application_metrics_registry).decode("utf-8")
-        return HttpResponse(result, content_type="text/plain; version=0.0.4; charset=utf-8")
+        try:
+            shard = int(request.query_params.get("shard", 0))
+            shards = int(request.query_params.get("shards", 1))
+        except ValueError:
+            return HttpResponse("shard and shards must be integers", status=400)
+        if shards < 1 or not 0 <= shard < shards:
+            return HttpResponse("shard must be in [0, shards) range", status=400)
+
+        org_ids = get_organization_ids_for_shard(get_organization_ids(), shard, shards)
+        return StreamingHttpResponse(
+            generate_latest_in_batches(org_ids, settings.METRICS_EXPORTER_CACHE_BATCH_SIZE, shard, shards),
+            content_type="text/plain; version=0.0.4; charset=utf-8",
+        )
@@ -46,6 +46,8 @@ class AlertGroupSerializer(EagerLoadingMixin, serializers.ModelSerializer):
         return obj.web_title_cache
 
     def get_alerts_count(self, obj):
+        if obj.alerts_count is not None:
+            return obj.alerts_count
         return obj.alerts.count()
 
     def get_state(self, obj):
@@ -52,6 +52,7 @@ class OnCallScheduleChannelView(RateLimitHeadersMixin, UpdateSerializerMixin, Mo
             "prev_ical_file_primary",
             "prev_ical_file_overrides",
             "cached_ical_final_schedule",
+            "cached_final_schedule_events",
         )
 
         if name is not None:
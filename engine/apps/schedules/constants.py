@@ -30,4 +30,12 @@ EXPORT_WINDOW_DAYS_BEFORE = 15
 SCHEDULE_ONCALL_CACHE_KEY_PREFIX = "schedule_oncall_users_"
 SCHEDULE_ONCALL_CACHE_TTL = 15 * 60  # 15 minutes in seconds
 
+SCHEDULE_ONCALL_TIMELINE_CACHE_KEY_PREFIX = "schedule_oncall_timeline_"
+SCHEDULE_ONCALL_TIMELINE_VERSION_CACHE_KEY_PREFIX = "schedule_oncall_timeline_version_"
+SCHEDULE_ONCALL_TIMELINE_WINDOW = 7 * 24 * 60 * 60  # 7 days in seconds
+# timelines are checked every 10 minutes by refresh_ical_file and rebuilt when the schedule iCal files changed or when
+# they are older than SCHEDULE_ONCALL_TIMELINE_REBUILD_AGE, ignore timelines which missed a few refreshes
+SCHEDULE_ONCALL_TIMELINE_MAX_AGE = 60 * 60  # 1 hour in seconds
+SCHEDULE_ONCALL_TIMELINE_REBUILD_AGE = 30 * 60  # 30 minutes in seconds
+
 PREFETCHED_SHIFT_SWAPS = "prefetched_shift_swaps"
@@ -0,0 +1,467 @@
+"""
+Incremental export of schedule final events to iCal (see OnCallSchedule.refresh_ical_final_schedule).
+
+Exported events are stored along with the final schedule iCal file, keyed by event UID, so the previous export is
+never re-parsed. The iCal file is rendered from them on every refresh, their VEVENTs are not stored a second time.
+
+Exported events also keep a fingerprint of everything the final events are computed from (iCal files, swap requests
+and organization users). Final events are only computed again for parts of the export window, previously exported
+events outside of them are kept as they are:
+- the part of the window not covered by the previous refresh (eg. the day added to the window by the nightly refresh),
+  when the fingerprint didn't change
+- the time ranges affected by shift changes recorded with `record_final_schedule_change`, when only the iCal files
+  changed since the previous refresh and all of their changes were recorded
+Any other change refreshes the whole window.
+"""
+import datetime
+import hashlib
+import typing
+
+import icalendar
+import pytz
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from apps.schedules.constants import (
+    ICAL_COMPONENT_VEVENT,
+    ICAL_DATETIME_END,
+    ICAL_DATETIME_STAMP,
+    ICAL_DATETIME_START,
+    ICAL_LAST_MODIFIED,
+    ICAL_PRIORITY,
+    ICAL_STATUS,
+    ICAL_STATUS_CANCELLED,
+    ICAL_SUMMARY,
+    ICAL_UID,
+)
+from apps.schedules.ical_utils import create_base_icalendar
+
+if typing.TYPE_CHECKING:
+    from apps.schedules.models import OnCallSchedule
+    from apps.schedules.models.on_call_schedule import ScheduleEvents
+    from apps.user_management.models import Organization
+
+# bump when the stored format or the exported events change, to trigger a full refresh
+FINAL_SCHEDULE_EXPORT_VERSION = 2
+# parts of the window computed again on incremental refreshes start (and end) this much earlier (later), so events
+# overlapping with their boundaries are taken into account when resolving the final events
+INCREMENTAL_REFRESH_OVERLAP = datetime.timedelta(hours=1)
+ICAL_CALENDAR_END = "END:VCALENDAR\r\n"
+
+FINAL_SCHEDULE_CHANGE_CACHE_KEY_PREFIX = "final_schedule_change_"
+# changes not picked up by a refresh within this time are dropped, leading to a full refresh
+FINAL_SCHEDULE_CHANGE_CACHE_TIMEOUT = 60 * 60 * 24
+USERS_FINGERPRINT_CACHE_KEY_PREFIX = "final_schedule_users_fingerprint_"
+USERS_FINGERPRINT_CACHE_TIMEOUT = 60 * 60
+
+
+class ExportedEvent(typing.TypedDict):
+    uid: str
+    summary: typing.Optional[str]
+    priority: typing.Optional[int]
+    # ISO formatted datetimes, None if missing
+    start: typing.Optional[str]
+    end: typing.Optional[str]
+    last_modified: typing.Optional[str]
+    cancelled: bool
+
+
+class Fingerprint(typing.TypedDict):
+    ical: str
+    swap_requests: str
+    users: str
+
+
+class ExportedEvents(typing.TypedDict):
+    version: int
+    fingerprint: Fingerprint
+    window_end: str
+    # digest of the exported iCal file, to detect changes made to it directly
+    ical_hash: str
+    events: typing.List[ExportedEvent]
+
+
+class FinalScheduleChange(typing.TypedDict):
+    # iCal files fingerprints before the first and after the last recorded change
+    ical_from: str
+    ical_to: str
+    # ISO formatted datetimes, end is None if the change affects the schedule until the end of the export window
+    start: str
+    end: typing.Optional[str]
+
+
+def _get_hash(value: str) -> str:
+    return hashlib.md5(value.encode("utf-8"), usedforsecurity=False).hexdigest()
+
+
+def _to_datetime(value: typing.Optional[datetime.date | datetime.datetime]) -> typing.Optional[datetime.datetime]:
+    if value is not None and type(value) is datetime.date:
+        # shift or overrides coming from ical calendars can be all day events, change to datetime
+        return datetime.datetime.combine(value, datetime.datetime.min.time(), tzinfo=pytz.UTC)
+    return value
+
+
+def _isoformat(value: typing.Optional[datetime.datetime]) -> typing.Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+def _fromisoformat(value: typing.Optional[str]) -> typing.Optional[datetime.datetime]:
+    return datetime.datetime.fromisoformat(value) if value is not None else None
+
+
+def _get_users_fingerprint_cache_key(organization_id: int) -> str:
+    return f"{USERS_FINGERPRINT_CACHE_KEY_PREFIX}{organization_id}"
+
+
+def _get_final_schedule_change_cache_key(schedule_id: int) -> str:
+    return f"{FINAL_SCHEDULE_CHANGE_CACHE_KEY_PREFIX}{schedule_id}"
+
+
+def _get_users_fingerprint(organization: "Organization") -> str:
+    """
+    Return a digest of the organization's users. It is the same for all schedules of the organization, so it is
+    computed once and cached until `invalidate_users_fingerprint` is called.
+    """
+    cache_key = _get_users_fingerprint_cache_key(organization.pk)
+    users_fingerprint = cache.get(cache_key)
+    if users_fingerprint is None:
+        users = organization.users.order_by("pk").values_list(
+            "pk", "is_active", "username", "email", "role", "permissions"
+        )
+        users_fingerprint = _get_hash(repr(list(users)))
+        cache.set(cache_key, users_fingerprint, timeout=USERS_FINGERPRINT_CACHE_TIMEOUT)
+    return users_fingerprint
+
+
+def invalidate_users_fingerprint(organization_id: int) -> None:
+    """
+    Must be called when the organization's users change. The cached fingerprint is dropped after the transaction is
+    committed, so it can't be computed again from the data before the change in the meantime.
+    """
+    transaction.on_commit(lambda: cache.delete(_get_users_fingerprint_cache_key(organization_id)))
+
+
+def get_ical_fingerprint(schedule: "OnCallSchedule") -> str:
+    return _get_hash(repr((schedule.cached_ical_file_primary, schedule.cached_ical_file_overrides)))
+
+
+def get_final_schedule_fingerprint(schedule: "OnCallSchedule") -> Fingerprint:
+    """Return digests of the schedule data final events are computed from."""
+    organization = schedule.organization
+    swap_requests = schedule.shift_swap_requests.order_by("pk").values_list("pk", "updated_at")
+    return {
+        "ical": get_ical_fingerprint(schedule),
+        "swap_requests": _get_hash(repr(list(swap_requests))),
+        "users": _get_hash(repr((organization.is_rbac_permissions_enabled, _get_users_fingerprint(organization)))),
+    }
+
+
+def record_final_schedule_change(
+    schedule: "OnCallSchedule",
+    start: datetime.datetime,
+    end: typing.Optional[datetime.datetime],
+    previous_ical_fingerprint: str,
+) -> None:
+    """
+    Record the time range affected by a shift change, right after the schedule iCal files were refreshed with it, so
+    the next final schedule refresh only computes final events for that range. `previous_ical_fingerprint` is the
+    iCal files fingerprint before the refresh, it links the change to the previously recorded ones and to the previous
+    final schedule refresh. `end` is None if the change affects the schedule indefinitely.
+    """
+    cache_key = _get_final_schedule_change_cache_key(schedule.pk)
+    change: typing.Optional[FinalScheduleChange] = cache.get(cache_key)
+    if change is None:
+        change = {
+            "ical_from": previous_ical_fingerprint,
+            "ical_to": "",
+            "start": start.isoformat(),
+            "end": _isoformat(end),
+        }
+    elif change["ical_to"] == previous_ical_fingerprint:
+        change_end = _fromisoformat(change["end"])
+        change["start"] = min(_fromisoformat(change["start"]), start).isoformat()
+        change["end"] = _isoformat(max(change_end, end) if change_end is not None and end is not None else None)
+    else:
+        # iCal files were changed in between without recording the change, the next refresh must be a full one
+        cache.delete(cache_key)
+        return
+    change["ical_to"] = get_ical_fingerprint(schedule)
+    cache.set(cache_key, change, timeout=FINAL_SCHEDULE_CHANGE_CACHE_TIMEOUT)
+
+
+def _pop_final_schedule_change(schedule_id: int) -> typing.Optional[FinalScheduleChange]:
+    cache_key = _get_final_schedule_change_cache_key(schedule_id)
+    change = cache.get(cache_key)
+    if change is not None:
+        cache.delete(cache_key)
+    return change
+
+
+def _exported_event_from_component(component: icalendar.Event) -> ExportedEvent:
+    dtstart = component.get(ICAL_DATETIME_START)
+    dtend = component.get(ICAL_DATETIME_END)
+    last_modified = component.get(ICAL_LAST_MODIFIED)
+    return {
+        "uid": str(component[ICAL_UID]),
+        "summary": str(component[ICAL_SUMMARY]) if ICAL_SUMMARY in component else None,
+        "priority": int(component[ICAL_PRIORITY]) if ICAL_PRIORITY in component else None,
+        "start": _isoformat(_to_datetime(dtstart.dt)) if dtstart else None,
+        "end": _isoformat(_to_datetime(dtend.dt)) if dtend else None,
+        "last_modified": _isoformat(_to_datetime(last_modified.dt)) if last_modified else None,
+        "cancelled": bool(component.get(ICAL_STATUS)),
+    }
+
+
+def _exported_events_from_ical(ical_data: str) -> typing.List[ExportedEvent]:
+    """Read exported events from a final schedule iCal file not exported incrementally."""
+    calendar = icalendar.Calendar.from_ical(ical_data)
+    return [
+        _exported_event_from_component(component)
+        for component in calendar.walk()
+        if component.name == ICAL_COMPONENT_VEVENT
+    ]
+
+
+def _exported_event_to_ical(exported_event: ExportedEvent, now: datetime.datetime) -> str:
+    def to_utc(value: typing.Optional[str]) -> typing.Optional[datetime.datetime]:
+        value = _fromisoformat(value)
+        return value.astimezone(pytz.UTC) if value is not None else None
+
+    start = to_utc(exported_event["start"])
+    end = to_utc(exported_event["end"])
+    last_modified = to_utc(exported_event["last_modified"])
+    event = icalendar.Event()
+    if exported_event["summary"] is not None:
+        event.add(ICAL_SUMMARY, exported_event["summary"])
+    if start is not None:
+        event.add(ICAL_DATETIME_START, start)
+    if end is not None:
+        event.add(ICAL_DATETIME_END, end)
+    event.add(ICAL_DATETIME_STAMP, last_modified or now)
+    if last_modified is not None:
+        event.add(ICAL_LAST_MODIFIED, last_modified)
+    # set priority based on primary/overrides
+    # 0: undefined priority, 1: high priority
+    if exported_event["priority"] is not None:
+        event.add(ICAL_PRIORITY, exported_event["priority"])
+    event[ICAL_UID] = exported_event["uid"]
+    if exported_event["cancelled"]:
+        event[ICAL_STATUS] = ICAL_STATUS_CANCELLED
+    return event.to_ical().decode()
+
+
+def _get_exported_event(
+    e: dict, user: dict, now: datetime.datetime, previous_by_key: typing.Dict[tuple, ExportedEvent]
+) -> ExportedEvent:
+    event_uid = "{}-{}-{}".format(e["shift"]["pk"], e["start"].strftime("%Y%m%d%H%S"), user["pk"])
+    key = (event_uid, user["display_name"], e["calendar_type"], e["start"].isoformat(), e["end"].isoformat())
+    if key in previous_by_key:
+        # unchanged event, keep it as it was exported
+        return previous_by_key[key]
+    return {
+        "uid": event_uid,
+        "summary": user["display_name"],
+        "priority": e["calendar_type"],
+        "start": e["start"].isoformat(),
+        "end": e["end"].isoformat(),
+        "last_modified": now.isoformat(),
+        "cancelled": False,
+    }
+
+
+def _get_cancelled_event(
+    exported_event: ExportedEvent, now: datetime.datetime, datetime_start: datetime.datetime
+) -> typing.Optional[ExportedEvent]:
+    """Return the event no longer in the final schedule as it must be exported, None if it must be dropped."""
+    end = _fromisoformat(exported_event["end"])
+    if end and end < datetime_start:
+        # event ended before window start
+        return None
+    is_cancelled = exported_event["cancelled"]
+    last_modified = _fromisoformat(exported_event["last_modified"])
+    if is_cancelled and last_modified and last_modified < datetime_start:
+        # drop already ended events older than the window we consider
+        return None
+    elif is_cancelled and last_modified:
+        # include events cancelled during the time window, unchanged
+        return exported_event
+
+    # set the event as cancelled, and set last_modified if it was missing (e.g. from previous export ical implementation)
+    return {
+        **exported_event,
+        "end": exported_event["start"] if not is_cancelled else exported_event["end"],
+        "last_modified": now.isoformat(),
+        "cancelled": True,
+    }
+
+
+def _get_refresh_ranges(
+    previous_data: typing.Optional[ExportedEvents],
+    fingerprint: Fingerprint,
+    change: typing.Optional[FinalScheduleChange],
+    datetime_start: datetime.datetime,
+    datetime_end: datetime.datetime,
+) -> typing.List[typing.Tuple[datetime.datetime, datetime.datetime]]:
+    """Return the time ranges final events must be computed for, the whole window if they can't be narrowed down."""
+    full_refresh = [(datetime_start, datetime_end)]
+    if previous_data is None:
+        return full_refresh
+    previous_window_end = _fromisoformat(previous_data["window_end"])
+    if previous_window_end > datetime_end:
+        return full_refresh
+
+    previous_fingerprint = previous_data["fingerprint"]
+    # the part of the window not covered by the previous refresh
+    refresh_ranges = [(previous_window_end, datetime_end)]
+    if previous_fingerprint == fingerprint:
+        return refresh_ranges
+    if (
+        change is not None
+        and {**previous_fingerprint, "ical": None} == {**fingerprint, "ical": None}
+        and change["ical_from"] == previous_fingerprint["ical"]
+        and change["ical_to"] == fingerprint["ical"]
+    ):
+        # iCal files only changed by recorded shift changes since the previous refresh
+        return refresh_ranges + [(_fromisoformat(change["start"]), _fromisoformat(change["end"]) or datetime_end)]
+    return full_refresh
+
+
+def _expand_refresh_ranges(
+    refresh_ranges: typing.List[typing.Tuple[datetime.datetime, datetime.datetime]],
+    previous_events: typing.List[typing.Tuple[datetime.datetime, datetime.datetime]],
+    datetime_start: datetime.datetime,
+    datetime_end: datetime.datetime,
+) -> typing.List[typing.Tuple[datetime.datetime, datetime.datetime]]:
+    """
+    Clip the ranges to the window, expand them to include previously exported events ongoing at their boundaries
+    (those were resolved along with the events in the ranges) and merge the overlapping ones.
+    """
+    expanded = []
+    for range_start, range_end in refresh_ranges:
+        range_start, range_end = max(range_start, datetime_start), min(range_end, datetime_end)
+        if range_start >= range_end:
+            continue
+        for start, end in previous_events:
+            if start < range_start < end:
+                range_start = start
+            if start < range_end < end:
+                range_end = min(end, datetime_end)
+        expanded.append((range_start, range_end))
+
+    merged: typing.List[typing.Tuple[datetime.datetime, datetime.datetime]] = []
+    for range_start, range_end in sorted(expanded):
+        if merged and range_start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], range_end))
+        else:
+            merged.append((range_start, range_end))
+    return merged
+
+
+def export_final_schedule(
+    schedule: "OnCallSchedule",
+    get_final_events: typing.Callable[[datetime.datetime, datetime.datetime], "ScheduleEvents"],
+    datetime_start: datetime.datetime,
+    datetime_end: datetime.datetime,
+) -> typing.Tuple[str, ExportedEvents]:
+    """
+    Export the schedule final events within the window to iCal, updating the previous export: events no longer in the
+    final schedule are cancelled, unchanged events are kept as they were.
+    Return the iCal file and the exported events to be stored for the next refresh.
+    """
+    now = timezone.now()
+    fingerprint = get_final_schedule_fingerprint(schedule)
+    change = _pop_final_schedule_change(schedule.pk)
+
+    previous_data: typing.Optional[ExportedEvents] = schedule.cached_final_schedule_events
+    previous_events: typing.List[ExportedEvent] = []
+    if (
+        previous_data is not None
+        and previous_data.get("version") == FINAL_SCHEDULE_EXPORT_VERSION
+        and schedule.cached_ical_final_schedule is not None
+        and previous_data["ical_hash"] == _get_hash(schedule.cached_ical_final_schedule)
+    ):
+        previous_events = previous_data["events"]
+    else:
+        # first incremental export, or exported iCal file updated elsewhere
+        previous_data = None
+        if schedule.cached_ical_final_schedule:
+            previous_events = _exported_events_from_ical(schedule.cached_ical_final_schedule)
+
+    active_previous_events = [
+        (_fromisoformat(e["start"]), _fromisoformat(e["end"]), e)
+        for e in previous_events
+        if not e["cancelled"] and e["start"] is not None and e["end"] is not None
+    ]
+    refresh_ranges = _expand_refresh_ranges(
+        _get_refresh_ranges(previous_data, fingerprint, change, datetime_start, datetime_end),
+        [(start, end) for start, end, _ in active_previous_events],
+        datetime_start,
+        datetime_end,
+    )
+
+    # compute final events for the refresh ranges, extended by some overlap so events crossing their boundaries are
+    # resolved the same way as they would be when computing the whole window
+    final_events = []
+    refreshed_ranges = []
+    for range_start, range_end in refresh_ranges:
+        if refreshed_ranges and refreshed_ranges[-1][1] >= datetime_end:
+            break
+        while True:
+            is_first, is_last = range_start <= datetime_start, range_end >= datetime_end
+            range_events = [
+                e
+                for e in get_final_events(
+                    datetime_start if is_first else range_start - INCREMENTAL_REFRESH_OVERLAP,
+                    datetime_end if is_last else range_end + INCREMENTAL_REFRESH_OVERLAP,
+                )
+                if (is_first or e["start"] >= range_start) and (is_last or e["start"] < range_end)
+            ]
+            if is_last or all(e["end"] <= range_end for e in range_events):
+                break
+            # the change affects events after the range, compute them until the end of the window
+            range_end = datetime_end
+        refreshed_ranges.append((range_start, range_end))
+        final_events += range_events
+
+    def is_refreshed(start: datetime.datetime) -> bool:
+        return any(
+            (range_start <= datetime_start or start >= range_start) and (range_end >= datetime_end or start < range_end)
+            for range_start, range_end in refreshed_ranges
+        )
+
+    # events already exported which are kept as they are
+    kept_events = [
+        e
+        for start, end, e in active_previous_events
+        if start < datetime_end and end > datetime_start and not is_refreshed(start)
+    ]
+    previous_by_key = {
+        (e["uid"], e["summary"], e["priority"], e["start"], e["end"]): e for _, _, e in active_previous_events
+    }
+    exported_events = kept_events + [
+        _get_exported_event(e, user, now, previous_by_key) for e in final_events for user in e["users"]
+    ]
+    exported_events.sort(key=lambda e: _fromisoformat(e["start"]))
+
+    # check previously exported events for potentially cancelled events
+    updated_ids = set(e["uid"] for e in exported_events)
+    for previous_event in previous_events:
+        if previous_event["uid"] in updated_ids:
+            continue
+        cancelled_event = _get_cancelled_event(previous_event, now, datetime_start)
+        if cancelled_event is not None:
+            # include just cancelled events as well as those that were cancelled during the time window
+            exported_events.append(cancelled_event)
+
+    calendar_ical = create_base_icalendar(schedule.name).to_ical().decode()
+    events_ical = "".join(_exported_event_to_ical(e, now) for e in exported_events)
+    ical_data = f"{calendar_ical[: -len(ICAL_CALENDAR_END)]}{events_ical}{ICAL_CALENDAR_END}"
+    data: ExportedEvents = {
+        "version": FINAL_SCHEDULE_EXPORT_VERSION,
+        "fingerprint": fingerprint,
+        "window_end": datetime_end.isoformat(),
+        "ical_hash": _get_hash(ical_data),
+        "events": exported_events,
+    }
+    return ical_data, data
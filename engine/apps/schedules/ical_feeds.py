@@ -0,0 +1,158 @@
+"""
+Conditional downloads of the iCal feeds imported by iCal and calendar schedules.
+
+Feeds are polled every few minutes (see start_refresh_ical_files) and rarely change between polls. Validators
+(ETag/Last-Modified) returned by feeds are stored in the cache along with a digest of the downloaded content, so the
+next poll sends a conditional request and a 304 response keeps the current file. Validators are only used while the
+schedule file still is the one they were returned for. Downloaded content matching the current file isn't parsed
+again.
+
+Downloads share a keep-alive connection pool per process. Feeds refreshed together (see refresh_ical_feeds_batch) are
+downloaded concurrently by a bounded thread pool beforehand, see prefetched_ical_feeds. Requests, 304 responses, downloads matching the current
+file, failed downloads, downloaded bytes and time spent are exported as counters (see apps.metrics_exporter.counters).
+"""
+import contextlib
+import contextvars
+import hashlib
+import logging
+import time
+import typing
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from icalendar import Calendar
+from requests.adapters import HTTPAdapter
+
+from apps.metrics_exporter.counters import Counters
+
+ICAL_FEED_VALIDATORS_CACHE_KEY_PREFIX = "ical_feed_validators_"
+ICAL_FEED_TIMEOUT = 10
+
+logger = logging.getLogger(__name__)
+
+ical_feed_counters = Counters(
+    "ical_feeds",
+    {
+        "requests": "Number of iCal feed requests sent",
+        "not_modified": "Number of iCal feed requests answered with 304 Not Modified",
+        "unchanged": "Number of iCal feed downloads matching the current file",
+        "errors": "Number of failed iCal feed downloads",
+        "downloaded_bytes": "Number of bytes downloaded from iCal feeds",
+        "refresh_seconds": "Time spent refreshing iCal feeds",
+    },
+)
+
+_session = requests.Session()
+# without user-agent header google calendar sometimes returns text/html instead of text/calendar
+_session.headers["User-Agent"] = "Grafana OnCall"
+_http_adapter = HTTPAdapter(
+    pool_connections=settings.ICAL_FEED_POOL_CONNECTIONS,
+    pool_maxsize=settings.ICAL_FEED_POOL_MAXSIZE,
+)
+_session.mount("http://", _http_adapter)
+_session.mount("https://", _http_adapter)
+
+
+# results of the feeds downloaded by prefetched_ical_feeds, by feed key (see _get_feed_key)
+_prefetched_ical_feeds: contextvars.ContextVar[
+    typing.Optional[typing.Dict[typing.Tuple[str, typing.Optional[str]], str | BaseException]]
+] = contextvars.ContextVar("prefetched_ical_feeds", default=None)
+
+
+def _get_hash(value: str) -> str:
+    return hashlib.md5(value.encode("utf-8"), usedforsecurity=False).hexdigest()
+
+
+def _get_validators_cache_key(ical_url: str) -> str:
+    return f"{ICAL_FEED_VALIDATORS_CACHE_KEY_PREFIX}{_get_hash(ical_url)}"
+
+
+def _get_feed_key(ical_url: str, current_ical_file: typing.Optional[str]) -> typing.Tuple[str, typing.Optional[str]]:
+    return ical_url, _get_hash(current_ical_file) if current_ical_file else None
+
+
+def fetch_ical_feed(ical_url: str, current_ical_file: typing.Optional[str] = None) -> str:
+    """
+    Download the iCal feed and return its content. Content unchanged from `current_ical_file` isn't validated again.
+    Raise requests.exceptions.RequestException if the download fails or the response isn't a 200 (or a 304 to a
+    conditional request), ValueError if the content isn't valid iCal.
+    """
+    prefetched = _prefetched_ical_feeds.get()
+    feed_key = _get_feed_key(ical_url, current_ical_file)
+    if prefetched is not None and feed_key in prefetched:
+        result = prefetched[feed_key]
+        if isinstance(result, BaseException):
+            raise result
+        return result
+
+    headers: typing.Dict[str, str] = {}
+    validators_cache_key = _get_validators_cache_key(ical_url)
+    current_hash = _get_hash(current_ical_file) if current_ical_file else None
+    validators = cache.get(validators_cache_key) if current_hash else None
+    if validators and validators["content_hash"] == current_hash:
+        if validators["etag"]:
+            headers["If-None-Match"] = validators["etag"]
+        if validators["last_modified"]:
+            headers["If-Modified-Since"] = validators["last_modified"]
+
+    started_at = time.monotonic()
+    try:
+        r = _session.get(ical_url, headers=headers, timeout=ICAL_FEED_TIMEOUT)
+        ical_feed_counters.add(requests=1, downloaded_bytes=len(r.content))
+        if r.status_code == 304 and headers:
+            ical_feed_counters.add(not_modified=1)
+            # mypy: headers are only sent along with the current file
+            return typing.cast(str, current_ical_file)
+        if r.status_code != 200:
+            # redirects are followed, anything else (including 304 to an unconditional request) has no feed content
+            raise requests.exceptions.HTTPError(f"Unexpected iCal feed response status {r.status_code}", response=r)
+
+        logger.info(f"fetch_ical_feed: content-type={r.headers.get('Content-Type')}")
+        ical_file = r.text
+        content_hash = _get_hash(ical_file)
+        if content_hash == current_hash:
+            ical_feed_counters.add(unchanged=1)
+        else:
+            Calendar.from_ical(ical_file)
+
+        etag, last_modified = r.headers.get("ETag"), r.headers.get("Last-Modified")
+        if etag or last_modified:
+            cache.set(
+                validators_cache_key,
+                {"etag": etag, "last_modified": last_modified, "content_hash": content_hash},
+                timeout=settings.ICAL_FEED_VALIDATORS_CACHE_TIMEOUT,
+            )
+        return ical_file
+    except (requests.exceptions.RequestException, ValueError):
+        ical_feed_counters.add(errors=1)
+        raise
+    finally:
+        ical_feed_counters.add(refresh_seconds=time.monotonic() - started_at)
+
+
+@contextlib.contextmanager
+def prefetched_ical_feeds(feeds: typing.Iterable[typing.Tuple[str, typing.Optional[str]]]) -> typing.Iterator[None]:
+    """
+    Download the given (ical_url, current_ical_file) feeds concurrently, at most ICAL_FEED_DOWNLOAD_MAX_WORKERS at a
+    time. Within the block, fetch_ical_feed returns (or raises) the prefetched results instead of downloading again.
+    """
+    feeds_by_key = {
+        _get_feed_key(ical_url, current_ical_file): (ical_url, current_ical_file)
+        for ical_url, current_ical_file in feeds
+    }
+    results: typing.Dict[typing.Tuple[str, typing.Optional[str]], str | BaseException] = {}
+    if feeds_by_key:
+        max_workers = min(settings.ICAL_FEED_DOWNLOAD_MAX_WORKERS, len(feeds_by_key))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {key: executor.submit(fetch_ical_feed, *feed) for key, feed in feeds_by_key.items()}
+        for key, future in futures.items():
+            exception = future.exception()
+            results[key] = exception if exception is not None else future.result()
+
+    token = _prefetched_ical_feeds.set(results)
+    try:
+        yield
+    finally:
+        _prefetched_ical_feeds.reset(token)
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import datetime
+import itertools
 import logging
 import re
 import typing
@@ -37,6 +38,8 @@ from apps.schedules.constants import (
     SCHEDULE_ONCALL_CACHE_TTL,
 )
 from apps.schedules.ical_events import ical_events
+from apps.schedules.ical_feeds import fetch_ical_feed
+from apps.schedules.oncall_timeline import get_oncall_usernames_for_multiple_schedules
 from common.cache import ensure_cache_key_allocates_to_the_same_hash_slot
 from common.timezones import is_valid_timezone
 from common.utils import timed_lru_cache
@@ -48,6 +51,7 @@ This module likely needs to refactored to be part of the OnCallSchedule module.
 if TYPE_CHECKING:
     from apps.schedules.models import OnCallSchedule
     from apps.schedules.models.on_call_schedule import OnCallScheduleQuerySet
+    from apps.schedules.rotation_events import RotationEvents
     from apps.user_management.models import Organization, User
 
 logger = logging.getLogger(__name__)
@@ -106,6 +110,44 @@ def memoized_users_in_ical(usernames_from_ical: typing.Tuple[str], organization:
     return users_in_ical(usernames_from_ical, organization)
 
 
+class UsersInIcal:
+    """
+    Users found for all the usernames of a set of iCal events, resolved with a single query.
+    Events users are then looked up in memory, matching usernames and e-mails case-insensitively. Usernames are
+    matched case-insensitively by `users_in_ical` on MySQL, so users it returns for differently cased usernames are
+    found too.
+    """
+
+    def __init__(self, users: typing.Sequence["User"]):
+        # keep the order users are returned by the query in, same as users_in_ical
+        self._user_index = {user.pk: idx for idx, user in enumerate(users)}
+        self._users_by_username: typing.Dict[str, typing.List["User"]] = {}
+        self._users_by_email: typing.Dict[str, typing.List["User"]] = {}
+        for user in users:
+            self._users_by_username.setdefault(user.username.casefold(), []).append(user)
+            self._users_by_email.setdefault(user.email.casefold(), []).append(user)
+
+    @classmethod
+    def resolve(cls, usernames: typing.Iterable[str], organization: "Organization") -> "UsersInIcal":
+        usernames = set(usernames)
+        return cls(users_in_ical(list(usernames), organization) if usernames else [])
+
+    def get_users(self, usernames: typing.Sequence[str]) -> typing.List["User"]:
+        users: typing.Dict[int, "User"] = {}
+        for username in usernames:
+            key = username.casefold()
+            for user in itertools.chain(self._users_by_username.get(key, ()), self._users_by_email.get(key, ())):
+                users[user.pk] = user
+        return sorted(users.values(), key=lambda u: self._user_index[u.pk])
+
+    def get_missing_usernames(self, usernames: typing.Sequence[str]) -> typing.List[str]:
+        return [
+            u
+            for u in usernames
+            if u != "" and u.casefold() not in self._users_by_username and u.casefold() not in self._users_by_email
+        ]
+
+
 # used for display schedule events on web
 def list_of_oncall_shifts_from_ical(
     schedule: "OnCallSchedule",
@@ -132,15 +174,18 @@ def list_of_oncall_shifts_from_ical(
     ]
     """
     from apps.schedules.models import OnCallSchedule
+    from apps.schedules.rotation_events import get_shifts_dict_from_rotation_events
 
     # get list of iCalendars from current iCal files. If there is more than one calendar, primary calendar will always
-    # be the first
-    calendars: typing.Tuple[typing.Optional[Calendar], ...]
+    # be the first. Web schedules calendars are replaced by their shifts rotation events, expanded without iCal
+    calendars: typing.Tuple[typing.Optional[Calendar], ...] | typing.Tuple[typing.Optional["RotationEvents"], ...]
+    rotation_events = None
 
     if from_cached_final:
         calendars = (Calendar.from_ical(schedule.cached_ical_final_schedule),)
     else:
-        calendars = schedule.get_icalendars()
+        rotation_events = schedule.get_rotation_events()
+        calendars = rotation_events if rotation_events is not None else schedule.get_icalendars()
 
     result_datetime = []
     result_date = []
@@ -159,9 +204,14 @@ def list_of_oncall_shifts_from_ical(
             if filter_by is not None and filter_by != calendar_type:
                 continue
 
-            tmp_result_datetime, tmp_result_date = get_shifts_dict(
-                calendar, calendar_type, schedule, datetime_start, datetime_end, with_empty_shifts
-            )
+            if rotation_events is not None:
+                tmp_result_datetime, tmp_result_date = get_shifts_dict_from_rotation_events(
+                    calendar, calendar_type, schedule, datetime_start, datetime_end, with_empty_shifts
+                )
+            else:
+                tmp_result_datetime, tmp_result_date = get_shifts_dict(
+                    calendar, calendar_type, schedule, datetime_start, datetime_end, with_empty_shifts
+                )
             result_datetime.extend(tmp_result_datetime)
             result_date.extend(tmp_result_date)
 
@@ -205,9 +255,11 @@ def get_shifts_dict(
     with_empty_shifts: bool = False,
 ):
     events = ical_events.get_events_from_ical_between(calendar, datetime_start, datetime_end)
+    events_usernames = [get_usernames_from_ical_event(event)[0] for event in events]
+    users_in_calendar = UsersInIcal.resolve(itertools.chain.from_iterable(events_usernames), schedule.organization)
     result_datetime = []
     result_date = []
-    for event in events:
+    for event, usernames in zip(events, events_usernames):
         status = event.get(ICAL_STATUS)
         if status == ICAL_STATUS_CANCELLED:
             # ignore cancelled events
@@ -218,8 +270,8 @@ def get_shifts_dict(
             recurrence_id = recurrence_id.dt.isoformat()
         priority = parse_priority_from_string(event.get(ICAL_SUMMARY, "[L0]"))
         pk, source = parse_event_uid(event.get(ICAL_UID), sequence=sequence, recurrence_id=recurrence_id)
-        users = get_users_from_ical_event(event, schedule.organization)
-        missing_users = get_missing_users_from_ical_event(event, schedule.organization)
+        users = users_in_calendar.get_users(usernames)
+        missing_users = users_in_calendar.get_missing_usernames(usernames)
         event_calendar_type = calendar_type
         if calendar_type == CALENDAR_TYPE_FINAL:
             event_calendar_type = (
@@ -299,11 +351,16 @@ def list_of_empty_shifts_in_schedule(
                 calendar, start_datetime_with_offset, end_datetime_with_offset
             )
 
+            events_usernames = [get_usernames_from_ical_event(event)[0] for event in events]
+            users_in_calendar = UsersInIcal.resolve(
+                itertools.chain.from_iterable(events_usernames), schedule.organization
+            )
+
             # Keep hashes of checked events to include only first recurrent event into result
             checked_events = set()
             empty_shifts_per_calendar = []
-            for event in events:
-                users = get_users_from_ical_event(event, schedule.organization)
+            for event, usernames in zip(events, events_usernames):
+                users = users_in_calendar.get_users(usernames)
                 if len(users) == 0:
                     summary = event.get(ICAL_SUMMARY, "")
                     description = event.get(ICAL_DESCRIPTION, "")
@@ -347,11 +404,7 @@ def list_users_to_notify_from_ical(
     Retrieve on-call users for the current time
     """
     events_datetime = events_datetime if events_datetime else datetime.datetime.now(datetime.timezone.utc)
-    return list_users_to_notify_from_ical_for_period(
-        schedule,
-        events_datetime,
-        events_datetime,
-    )
+    return get_oncall_users_for_multiple_schedules([schedule], events_datetime).get(schedule, [])
 
 
 def list_users_to_notify_from_ical_for_period(
@@ -377,11 +430,16 @@ def get_oncall_users_for_multiple_schedules(
     if not schedules:
         return {}
 
-    # Get on-call users
+    # Get on-call users, from the precomputed on-call timelines when possible
+    oncall_usernames = get_oncall_usernames_for_multiple_schedules(schedules, events_datetime)
     oncall_users: SchedulesOnCallUsers = {}
     for schedule in schedules:
-        # pass user list to list_users_to_notify_from_ical
-        schedule_oncall_users = list_users_to_notify_from_ical(schedule, events_datetime=events_datetime)
+        if schedule in oncall_usernames:
+            schedule_oncall_users = memoized_users_in_ical(tuple(oncall_usernames[schedule]), schedule.organization)
+        else:
+            schedule_oncall_users = list_users_to_notify_from_ical_for_period(
+                schedule, events_datetime, events_datetime
+            )
         oncall_users.update({schedule: schedule_oncall_users})
 
     return oncall_users
@@ -624,6 +682,8 @@ def is_icals_equal_line_by_line(first, second):
 
 
 def is_icals_equal(first, second):
+    if first == second:
+        return True
     first_cal = Calendar.from_ical(first)
     if first_cal.get("PRODID", None) in ("-//My calendar product//amixr//", "-//web schedule//oncall//"):
         # Compare schedules generated by oncall line by line, since they not support SEQUENCE field yet.
@@ -691,13 +751,17 @@ def get_icalendar_tz_or_utc(icalendar):
     return pytz.timezone(converted_timezone)
 
 
-def fetch_ical_file_or_get_error(ical_url: str) -> typing.Tuple[str | None, str | None]:
+def fetch_ical_file_or_get_error(
+    ical_url: str, current_ical_file: str | None = None
+) -> typing.Tuple[str | None, str | None]:
+    """
+    Download and validate the iCal feed. Pass the currently cached file to send a conditional request and skip
+    validating content identical to it (see apps.schedules.ical_feeds).
+    """
     cached_ical_file: str | None = None
     ical_file_error: str | None = None
     try:
-        new_ical_file = fetch_ical_file(ical_url)
-        Calendar.from_ical(new_ical_file)
-        cached_ical_file = new_ical_file
+        cached_ical_file = fetch_ical_feed(ical_url, current_ical_file)
     except requests.exceptions.RequestException:
         ical_file_error = "iCal download failed"
     except ValueError:
@@ -706,14 +770,6 @@ def fetch_ical_file_or_get_error(ical_url: str) -> typing.Tuple[str | None, str
     return cached_ical_file, ical_file_error
 
 
-def fetch_ical_file(ical_url: str) -> str:
-    # without user-agent header google calendar sometimes returns text/html instead of text/calendar
-    headers = {"User-Agent": "Grafana OnCall"}
-    r = requests.get(ical_url, headers=headers, timeout=10)
-    logger.info(f"fetch_ical_file: content-type={r.headers.get('Content-Type')}")
-    return r.text
-
-
 def create_base_icalendar(name: str) -> Calendar:
     cal = Calendar()
     cal.add("calscale", "GREGORIAN")
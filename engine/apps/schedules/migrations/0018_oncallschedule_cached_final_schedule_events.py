@@ -0,0 +1,18 @@
+# Generated by Django 4.2.15 on 2026-10-18 21:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedules', '0017_alter_oncallschedule_polymorphic_ctype'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='oncallschedule',
+            name='cached_final_schedule_events',
+            field=models.JSONField(default=None, null=True),
+        ),
+    ]
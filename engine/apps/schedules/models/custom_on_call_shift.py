@@ -18,6 +18,7 @@ from django.utils import timezone
 from django.utils.functional import cached_property
 from icalendar.cal import Event
 
+from apps.schedules.final_schedule_export import get_ical_fingerprint, record_final_schedule_change
 from apps.schedules.tasks import (
     check_gaps_and_empty_shifts_in_schedule,
     drop_cached_ical_task,
@@ -32,6 +33,7 @@ if typing.TYPE_CHECKING:
     from django.db.models.manager import RelatedManager
 
     from apps.schedules.models import OnCallSchedule
+    from apps.schedules.rotation_events import RotationEvents
 
 
 logger = logging.getLogger(__name__)
@@ -302,8 +304,16 @@ class CustomOnCallShift(models.Model):
 
         return is_finished
 
-    def _daily_by_day_to_ical(self, time_zone, start, users_queue):
-        """Create ical weekly shifts to distribute user groups combining daily + by_day.
+    @property
+    def events_range(self) -> typing.Tuple[datetime.datetime, typing.Optional[datetime.datetime]]:
+        """Time range the shift events can be in, the end is None if the shift recurs indefinitely"""
+        start = min(self.start, self.rotation_start)
+        if self.frequency is None:
+            return start, self.start + self.duration
+        return start, self.until + self.duration if self.until else None
+
+    def _daily_by_day_to_ical_events_params(self, time_zone, start, users_queue):
+        """Get ical weekly shifts params to distribute user groups combining daily + by_day.
 
         e.g.
             by_day: [WED, FRI]
@@ -316,7 +326,7 @@ class CustomOnCallShift(models.Model):
             user_group_2, weekly WED interval 3
             user_group_3, weekly FRI interval 3
         """
-        result = ""
+        result = []
         # keep tracking of (users, day) combinations, and starting dates for each
         combinations = []
         starting_dates = []
@@ -363,15 +373,42 @@ class CustomOnCallShift(models.Model):
                 custom_rrule["freq"] = ["WEEKLY"]
                 custom_rrule["interval"] = [week_interval]
                 custom_rrule["byday"] = [day]
-                custom_event_ical = self.generate_ical(
-                    start, user_counter, user, counter, time_zone, custom_rrule=custom_rrule
+                result.append(
+                    {
+                        "start": start,
+                        "user_counter": user_counter,
+                        "user": user,
+                        "counter": counter,
+                        "time_zone": time_zone,
+                        "custom_rrule": custom_rrule,
+                    }
                 )
-                result += custom_event_ical
             counter += 1
         return result
 
     def convert_to_ical(self, time_zone="UTC", allow_empty_users=False):
-        result = ""
+        return "".join(
+            self.generate_ical(**event_params)
+            for event_params in self._get_ical_events_params(time_zone, allow_empty_users=allow_empty_users)
+        )
+
+    def get_rotation_events(self, time_zone="UTC", allow_empty_users=False) -> "RotationEvents":
+        """
+        Return the shift events, same as the ones written to the schedule iCal file by `convert_to_ical`, to be
+        expanded without generating and parsing iCal (see apps.schedules.rotation_events).
+        """
+        from apps.schedules.rotation_events import build_rotation_event
+
+        rotation_events = []
+        for event_params in self._get_ical_events_params(time_zone, allow_empty_users=allow_empty_users):
+            rotation_event = build_rotation_event(self, **event_params)
+            if rotation_event is not None:
+                rotation_events.append(rotation_event)
+        return rotation_events
+
+    def _get_ical_events_params(self, time_zone="UTC", allow_empty_users=False) -> typing.List[dict]:
+        """Return `generate_ical` arguments for each iCal event of the shift."""
+        result = []
         # use shift time_zone if it exists, otherwise use schedule or default time_zone
         time_zone = self.time_zone if self.time_zone is not None else time_zone
         # rolling_users shift converts to several ical events
@@ -407,7 +444,7 @@ class CustomOnCallShift(models.Model):
                     start = start + datetime.timedelta(days=delta)
 
             if self.frequency == CustomOnCallShift.FREQUENCY_DAILY and self.by_day:
-                result = self._daily_by_day_to_ical(time_zone, start, users_queue)
+                result = self._daily_by_day_to_ical_events_params(time_zone, start, users_queue)
                 all_rotation_checked = True
 
             while not all_rotation_checked:
@@ -420,8 +457,18 @@ class CustomOnCallShift(models.Model):
                     ) or start >= self.rotation_start:
                         # event has already started, generate iCal for each user
                         for user_counter, user in enumerate(users, start=1):
-                            event_ical = self.generate_ical(start, user_counter, user, counter, time_zone)
-                            result += event_ical
+                            result.append(
+                                {
+                                    "start": start,
+                                    "user_counter": user_counter,
+                                    "user": user,
+                                    "counter": counter,
+                                    "time_zone": time_zone,
+                                }
+                            )
+                        if users:
+                            # the next rotation date is calculated from the last generated event
+                            event_ical = self.generate_ical(**result[-1])
                         rotations_created += 1
                     else:  # generate default iCal to calculate the date for the next rotation
                         event_ical = self.generate_ical(start)
@@ -433,7 +480,7 @@ class CustomOnCallShift(models.Model):
                     start = self.get_rotation_date(event_ical, get_next_date=True)
         else:
             for user_counter, user in enumerate(self.users.all(), start=1):
-                result += self.generate_ical(self.start, user_counter, user, time_zone=time_zone)
+                result.append({"start": self.start, "user_counter": user_counter, "user": user, "time_zone": time_zone})
         return result
 
     def generate_ical(self, start, user_counter=0, user=None, counter=1, time_zone="UTC", custom_rrule=None):
@@ -686,12 +733,21 @@ class CustomOnCallShift(models.Model):
         result %= len(self.rolling_users)
         return result
 
-    def refresh_schedule(self):
+    def refresh_schedule(
+        self, changed_range: typing.Optional[typing.Tuple[datetime.datetime, typing.Optional[datetime.datetime]]] = None
+    ):
+        """
+        Refresh the schedule iCal files and trigger the final schedule refresh. If `changed_range` is given (see
+        `events_range`), the final schedule is only computed again for that time range.
+        """
         if not self.schedule:
             # only trigger sync-refresh for web-created shifts
             return
         schedule = self.schedule.get_real_instance()
+        previous_ical_fingerprint = get_ical_fingerprint(schedule)
         schedule.refresh_ical_file()
+        if changed_range is not None:
+            record_final_schedule_change(schedule, *changed_range, previous_ical_fingerprint)
         refresh_ical_final_schedule.apply_async((schedule.pk,))
         check_gaps_and_empty_shifts_in_schedule.apply_async((schedule.pk,))
 
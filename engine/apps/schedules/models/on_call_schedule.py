@@ -1,5 +1,7 @@
+import bisect
 import copy
 import datetime
+import heapq
 import itertools
 import re
 import typing
@@ -12,37 +14,28 @@ from django.conf import settings
 from django.core.validators import MinLengthValidator
 from django.db import models
 from django.db.models import Q
+from django.db.models.signals import post_save
 from django.db.utils import DatabaseError
+from django.dispatch import receiver
 from django.utils import timezone
 from django.utils.functional import cached_property
 from polymorphic.managers import PolymorphicManager
 from polymorphic.models import PolymorphicModel
 from polymorphic.query import PolymorphicQuerySet
 
-from apps.schedules.constants import (
-    EXPORT_WINDOW_DAYS_AFTER,
-    EXPORT_WINDOW_DAYS_BEFORE,
-    ICAL_COMPONENT_VEVENT,
-    ICAL_DATETIME_END,
-    ICAL_DATETIME_STAMP,
-    ICAL_DATETIME_START,
-    ICAL_LAST_MODIFIED,
-    ICAL_PRIORITY,
-    ICAL_STATUS,
-    ICAL_STATUS_CANCELLED,
-    ICAL_SUMMARY,
-    ICAL_UID,
-    PREFETCHED_SHIFT_SWAPS,
-)
+from apps.schedules.constants import EXPORT_WINDOW_DAYS_AFTER, EXPORT_WINDOW_DAYS_BEFORE, PREFETCHED_SHIFT_SWAPS
+from apps.schedules.final_schedule_export import export_final_schedule
 from apps.schedules.ical_utils import (
     EmptyShifts,
-    create_base_icalendar,
     fetch_ical_file_or_get_error,
     get_oncall_users_for_multiple_schedules,
     list_of_empty_shifts_in_schedule,
     list_of_oncall_shifts_from_ical,
 )
 from apps.schedules.models import CustomOnCallShift
+from apps.schedules.oncall_timeline import invalidate_oncall_timeline
+from apps.schedules.parsed_calendar_cache import get_parsed_calendar
+from apps.schedules.rotation_events import get_cached_rotation_events
 from apps.user_management.models import User
 from common.database import NON_POLYMORPHIC_CASCADE, NON_POLYMORPHIC_SET_NULL
 from common.public_primary_keys import generate_public_primary_key, increase_public_primary_key_length
@@ -53,6 +46,7 @@ if typing.TYPE_CHECKING:
     from apps.alerts.models import EscalationPolicy
     from apps.auth_token.models import ScheduleExportAuthToken
     from apps.schedules.models import ShiftSwapRequest
+    from apps.schedules.rotation_events import RotationEvents
     from apps.slack.models import SlackUserGroup
     from apps.user_management.models import Organization, Team
 
@@ -132,7 +126,6 @@ class ScheduleFinalShift(typing.TypedDict):
 
 
 ScheduleEvents = typing.List[ScheduleEvent]
-ScheduleEventIntervals = typing.List[typing.List[datetime.datetime]]
 ScheduleFinalShifts = typing.List[ScheduleFinalShift]
 DurationMap = typing.Dict[str, datetime.timedelta]
 
@@ -196,6 +189,8 @@ class OnCallSchedule(PolymorphicModel):
     prev_ical_file_overrides = models.TextField(null=True, default=None)
 
     cached_ical_final_schedule = models.TextField(null=True, default=None)
+    # final schedule events exported to cached_ical_final_schedule, see apps.schedules.final_schedule_export
+    cached_final_schedule_events = models.JSONField(null=True, default=None)
 
     organization = models.ForeignKey(
         "user_management.Organization", on_delete=NON_POLYMORPHIC_CASCADE, related_name="oncall_schedules"
@@ -249,6 +244,11 @@ class OnCallSchedule(PolymorphicModel):
     has_empty_shifts = models.BooleanField(default=False)
     empty_shifts_report_sent_at = models.DateField(null=True, default=None)
 
+    # calendar type -> (shifts queryset, not saved shifts) being previewed, see preview_shift
+    _preview_shifts: typing.Optional[
+        typing.Dict[int, typing.Tuple[models.QuerySet, typing.List[CustomOnCallShift]]]
+    ] = None
+
     @property
     def web_page_link(self) -> str:
         return f"{self.organization.web_link}schedules"
@@ -261,18 +261,32 @@ class OnCallSchedule(PolymorphicModel):
         """Returns list of calendars. Primary calendar should always be the first"""
         # if self._ical_file_(primary|overrides) is None -> no cache, will trigger a refresh
         # if self._ical_file_(primary|overrides) == "" -> cached value for an empty schedule
+        # parsed calendars are cached per process and shared, they must not be modified
         if self._ical_file_primary:
-            calendar_primary: icalendar.Calendar = icalendar.Calendar.from_ical(self._ical_file_primary)
+            calendar_primary: icalendar.Calendar = get_parsed_calendar(
+                self.pk, OnCallSchedule.PRIMARY, self._ical_file_primary
+            )
         else:
             calendar_primary = None
 
         if self._ical_file_overrides:
-            calendar_overrides: icalendar.Calendar = icalendar.Calendar.from_ical(self._ical_file_overrides)
+            calendar_overrides: icalendar.Calendar = get_parsed_calendar(
+                self.pk, OnCallSchedule.OVERRIDES, self._ical_file_overrides
+            )
         else:
             calendar_overrides = None
 
         return calendar_primary, calendar_overrides
 
+    def get_rotation_events(
+        self,
+    ) -> typing.Optional[typing.Tuple[typing.Optional["RotationEvents"], typing.Optional["RotationEvents"]]]:
+        """
+        Returns rotation events of the schedule shifts, expanded instead of the calendars returned by get_icalendars.
+        Primary rotation events should always be the first. None if schedule events are read from iCal calendars.
+        """
+        return None
+
     def get_prev_and_current_ical_files(self):
         """Returns list of tuples with prev and current iCal files for each calendar"""
         return [
@@ -486,61 +500,16 @@ class OnCallSchedule(PolymorphicModel):
         datetime_start = now.replace(hour=0, minute=0, second=0, microsecond=0) - datetime.timedelta(days=delta)
         datetime_end = datetime_start + datetime.timedelta(days=days - 1, hours=23, minutes=59, seconds=59)
 
-        # setup calendar with final schedule shift events
-        calendar = create_base_icalendar(self.name)
-        events = self.final_events(datetime_start, datetime_end, ignore_untaken_swaps=True)
-        updated_ids = set()
-        for e in events:
-            for u in e["users"]:
-                event = icalendar.Event()
-                event.add(ICAL_SUMMARY, u["display_name"])
-                event.add(ICAL_DATETIME_START, e["start"])
-                event.add(ICAL_DATETIME_END, e["end"])
-                event.add(ICAL_DATETIME_STAMP, now)
-                event.add(ICAL_LAST_MODIFIED, now)
-                # set priority based on primary/overrides
-                # 0: undefined priority, 1: high priority
-                event.add(ICAL_PRIORITY, e["calendar_type"])
-                event_uid = "{}-{}-{}".format(e["shift"]["pk"], e["start"].strftime("%Y%m%d%H%S"), u["pk"])
-                event[ICAL_UID] = event_uid
-                calendar.add_component(event)
-                updated_ids.add(event_uid)
-
-        # check previously cached final schedule for potentially cancelled events
-        if self.cached_ical_final_schedule:
-            previous = icalendar.Calendar.from_ical(self.cached_ical_final_schedule)
-            for component in previous.walk():
-                if component.name == ICAL_COMPONENT_VEVENT and component[ICAL_UID] not in updated_ids:
-                    # check if event was ended or cancelled, update ical
-                    dtend = component.get(ICAL_DATETIME_END)
-                    dtend_datetime = dtend.dt if dtend else None
-                    if dtend_datetime and type(dtend_datetime) is datetime.date:
-                        # shift or overrides coming from ical calendars can be all day events, change to datetime
-                        dtend_datetime = datetime.datetime.combine(
-                            dtend.dt, datetime.datetime.min.time(), tzinfo=pytz.UTC
-                        )
-                    if dtend_datetime and dtend_datetime < datetime_start:
-                        # event ended before window start
-                        continue
-                    is_cancelled = component.get(ICAL_STATUS)
-                    last_modified = component.get(ICAL_LAST_MODIFIED)
-                    if is_cancelled and last_modified and last_modified.dt < datetime_start:
-                        # drop already ended events older than the window we consider
-                        continue
-                    elif is_cancelled and not last_modified:
-                        # set last_modified if it was missing (e.g. from previous export ical implementation)
-                        component[ICAL_LAST_MODIFIED] = icalendar.vDatetime(now).to_ical()
-                    elif not is_cancelled:
-                        # set the event as cancelled
-                        component[ICAL_DATETIME_END] = component[ICAL_DATETIME_START]
-                        component[ICAL_STATUS] = ICAL_STATUS_CANCELLED
-                        component[ICAL_LAST_MODIFIED] = icalendar.vDatetime(now).to_ical()
-                    # include just cancelled events as well as those that were cancelled during the time window
-                    calendar.add_component(component)
-
-        ical_data = calendar.to_ical().decode()
+        # export final schedule shift events, updating the previous export
+        ical_data, exported_events = export_final_schedule(
+            self,
+            lambda start, end: self.final_events(start, end, ignore_untaken_swaps=True),
+            datetime_start,
+            datetime_end,
+        )
         self.cached_ical_final_schedule = ical_data
-        self.save(update_fields=["cached_ical_final_schedule"])
+        self.cached_final_schedule_events = exported_events
+        self.save(update_fields=["cached_ical_final_schedule", "cached_final_schedule_events"])
 
     def shifts_for_user(
         self,
@@ -825,46 +794,46 @@ class OnCallSchedule(PolymorphicModel):
                 start,
             )
 
-        def insort_event(eventlist: ScheduleEvents, e: ScheduleEvent) -> None:
-            """Insert event keeping ordering criteria into already sorted event list."""
-            idx = 0
-            for i in eventlist:
-                if event_cmp_key(e) > event_cmp_key(i):
-                    idx += 1
-                else:
-                    break
-            eventlist.insert(idx, e)
-
-        def _merge_intervals(evs: ScheduleEvents) -> ScheduleEventIntervals:
-            """Keep track of scheduled intervals."""
-            if not evs:
-                return []
-            intervals = [[e["start"], e["end"]] for e in evs]
-            result = [intervals[0]]
-            for interval in intervals[1:]:
-                previous_interval = result[-1]
-                if previous_interval[0] <= interval[0] <= previous_interval[1]:
-                    previous_interval[1] = max(previous_interval[1], interval[1])
-                else:
-                    result.append(interval)
-            return result
-
         # sort schedule events by (type desc, priority desc, start timestamp asc)
         events.sort(key=event_cmp_key)
 
+        # pending events heap, a sorted list is already a heap. Updated events are pushed back ahead of pending events
+        # with the same sorting key (newest first), using a decreasing sequence number as tie-breaker
+        pending: typing.List[typing.Tuple[typing.Tuple[int, int, datetime.datetime], int, ScheduleEvent]] = [
+            (event_cmp_key(e), seq, e) for seq, e in enumerate(events)
+        ]
+        pushed_seq = itertools.count(-1, -1)
+
+        def push_pending(e: ScheduleEvent) -> None:
+            heapq.heappush(pending, (event_cmp_key(e), next(pushed_seq), e))
+
+        # scheduled intervals, merged (touching intervals are merged too) and sorted, kept as two parallel lists
+        # so they can be bisected. Resolved events are added to them on priority/calendar type change
+        interval_starts: typing.List[datetime.datetime] = []
+        interval_ends: typing.List[datetime.datetime] = []
+
+        def add_interval(start: datetime.datetime, end: datetime.datetime) -> None:
+            # merge with the intervals overlapping or touching the new one
+            i = bisect.bisect_left(interval_ends, start)
+            j = bisect.bisect_right(interval_starts, end)
+            if i < j:
+                start = min(start, interval_starts[i])
+                end = max(end, interval_ends[j - 1])
+            interval_starts[i:j] = [start]
+            interval_ends[i:j] = [end]
+
         # iterate over events, reserving schedule slots based on their priority
         # if the expected slot was already scheduled for a higher priority event,
         # split the event, or fix start/end timestamps accordingly
 
-        intervals = []
         resolved: ScheduleEvents = []
-        pending: ScheduleEvents = events
+        scheduled_count = 0  # number of resolved events already added to the scheduled intervals
         current_interval_idx = 0  # current scheduled interval being checked
         current_type: typing.Optional[int] = OnCallSchedule.TYPE_ICAL_OVERRIDES  # current calendar type
         current_priority: typing.Optional[int] = None  # current priority level being resolved
 
         while pending:
-            ev = pending.pop(0)
+            _, _, ev = heapq.heappop(pending)
 
             if ev["is_empty"]:
                 # exclude events without active users
@@ -880,65 +849,63 @@ class OnCallSchedule(PolymorphicModel):
                 # update scheduled intervals on priority change
                 # and start from the beginning for the new priority level
                 # also for calendar event type (overrides first, then apply regular shifts)
-                resolved.sort(key=event_start_cmp_key)
-                intervals = _merge_intervals(resolved)
+                for scheduled in resolved[scheduled_count:]:
+                    add_interval(scheduled["start"], scheduled["end"])
+                scheduled_count = len(resolved)
                 current_interval_idx = 0
                 current_priority = priority
                 current_type = ev["calendar_type"]
 
-            if current_interval_idx >= len(intervals):
-                # event outside scheduled intervals, add to resolved
-                # only if still starts before datetime_end
-                if ev["start"] < datetime_end:
-                    resolved.append(ev)
-
-            elif ev["start"] < intervals[current_interval_idx][0] and ev["end"] <= intervals[current_interval_idx][0]:
-                # event starts and ends outside an already scheduled interval, add to resolved
-                resolved.append(ev)
-
-            elif ev["start"] < intervals[current_interval_idx][0] and ev["end"] > intervals[current_interval_idx][0]:
-                # event starts outside interval but overlaps with an already scheduled interval
-                # 1. add a split event copy to schedule the time before the already scheduled interval
-                to_add = ev.copy()
-                to_add["end"] = intervals[current_interval_idx][0]
-                if to_add["end"] >= datetime_start:
-                    # only include if updated event ends inside the requested time range
-                    resolved.append(to_add)
-                # 2. check if there is still time to be scheduled after the current scheduled interval ends
-                if ev["end"] > intervals[current_interval_idx][1]:
-                    # event ends after current interval, update event start timestamp to match the interval end
-                    # and process the updated event as any other event
-                    ev["start"] = intervals[current_interval_idx][1]
+            while True:
+                if current_interval_idx >= len(interval_starts):
+                    # event outside scheduled intervals, add to resolved
+                    # only if still starts before datetime_end
                     if ev["start"] < datetime_end:
-                        # only include event if it is still inside the requested time range
-                        # reorder pending events after updating current event start date
-                        # (ie. insert the event where it should be to keep the order criteria)
-                        # TODO: switch to bisect insert on python 3.10 (or consider heapq)
-                        insort_event(pending, ev)
-                # done, go to next event
-
-            elif ev["start"] >= intervals[current_interval_idx][0] and ev["end"] <= intervals[current_interval_idx][1]:
-                # event inside an already scheduled interval, ignore (go to next)
-                continue
+                        resolved.append(ev)
+                    break
+
+                interval_start = interval_starts[current_interval_idx]
+                interval_end = interval_ends[current_interval_idx]
+                if ev["start"] < interval_start and ev["end"] <= interval_start:
+                    # event starts and ends outside an already scheduled interval, add to resolved
+                    resolved.append(ev)
 
-            elif (
-                ev["start"] >= intervals[current_interval_idx][0]
-                and ev["start"] < intervals[current_interval_idx][1]
-                and ev["end"] > intervals[current_interval_idx][1]
-            ):
-                # event starts inside a scheduled interval but ends out of it
-                # update the event start timestamp to match the interval end
-                ev["start"] = intervals[current_interval_idx][1]
-                # unresolved, re-add to pending
-                # TODO: switch to bisect insert on python 3.10 (or consider heapq)
-                insort_event(pending, ev)
-
-            elif ev["start"] >= intervals[current_interval_idx][1]:
-                # event starts after the current interval, move to next interval and go through it
-                current_interval_idx += 1
-                # unresolved, re-add to pending
-                # TODO: switch to bisect insert on python 3.10 (or consider heapq)
-                insort_event(pending, ev)
+                elif ev["start"] < interval_start and ev["end"] > interval_start:
+                    # event starts outside interval but overlaps with an already scheduled interval
+                    # 1. add a split event copy to schedule the time before the already scheduled interval
+                    to_add = ev.copy()
+                    to_add["end"] = interval_start
+                    if to_add["end"] >= datetime_start:
+                        # only include if updated event ends inside the requested time range
+                        resolved.append(to_add)
+                    # 2. check if there is still time to be scheduled after the current scheduled interval ends
+                    if ev["end"] > interval_end:
+                        # event ends after current interval, update event start timestamp to match the interval end
+                        # and process the updated event as any other event
+                        ev["start"] = interval_end
+                        if ev["start"] < datetime_end:
+                            # only include event if it is still inside the requested time range
+                            # reorder pending events after updating current event start date
+                            push_pending(ev)
+                    # done, go to next event
+
+                elif ev["start"] >= interval_start and ev["end"] <= interval_end:
+                    # event inside an already scheduled interval, ignore (go to next)
+                    pass
+
+                elif ev["start"] >= interval_start and ev["start"] < interval_end and ev["end"] > interval_end:
+                    # event starts inside a scheduled interval but ends out of it
+                    # update the event start timestamp to match the interval end
+                    ev["start"] = interval_end
+                    # unresolved, re-add to pending
+                    push_pending(ev)
+
+                elif ev["start"] >= interval_end:
+                    # event starts after the current interval, skip to the first interval that could overlap with it
+                    # (the one ending at or after the event start) and go through it
+                    current_interval_idx = bisect.bisect_left(interval_ends, ev["start"], lo=current_interval_idx + 1)
+                    continue
+                break
 
         resolved.sort(key=lambda e: (event_start_cmp_key(e), e["shift"]["pk"] or ""))
         return resolved
@@ -984,14 +951,23 @@ class OnCallSchedule(PolymorphicModel):
             ical += f"{end_line}\r\n"
         return ical
 
+    def _generate_rotation_events_from_shifts(self, qs, extra_shifts=None, allow_empty_users=False) -> "RotationEvents":
+        """Generate rotation events from custom on-call shifts, same as the iCal events of the generated iCal file."""
+        rotation_events = []
+        for event in itertools.chain(qs.all(), extra_shifts or []):
+            rotation_events.extend(event.get_rotation_events(allow_empty_users=allow_empty_users))
+        return rotation_events
+
     def preview_shift(self, custom_shift, datetime_start, datetime_end, updated_shift_pk=None):
         """Return unsaved rotation and final schedule preview events."""
         if custom_shift.type == CustomOnCallShift.TYPE_OVERRIDE:
             qs = self.custom_shifts.filter(type=CustomOnCallShift.TYPE_OVERRIDE)
+            calendar_type = OnCallSchedule.OVERRIDES
             ical_attr = "cached_ical_file_overrides"
             ical_property = "_ical_file_overrides"
         elif custom_shift.type == CustomOnCallShift.TYPE_ROLLING_USERS_EVENT:
             qs = self.custom_shifts.exclude(type=CustomOnCallShift.TYPE_OVERRIDE)
+            calendar_type = OnCallSchedule.PRIMARY
             ical_attr = "cached_ical_file_primary"
             ical_property = "_ical_file_primary"
         else:
@@ -1015,6 +991,7 @@ class OnCallSchedule(PolymorphicModel):
         original_value = getattr(self, ical_attr)
         _invalidate_cache(self, ical_property)
         setattr(self, ical_attr, ical_file)
+        self._preview_shifts = {calendar_type: (qs, extra_shifts)}
 
         # filter events using a temporal overriden calendar including the not-yet-saved shift
         events = self.filter_events(datetime_start, datetime_end, with_empty=True, with_gap=True)
@@ -1026,6 +1003,7 @@ class OnCallSchedule(PolymorphicModel):
 
         _invalidate_cache(self, ical_property)
         setattr(self, ical_attr, original_value)
+        self._preview_shifts = None
 
         return shift_events, final_events
 
@@ -1116,7 +1094,7 @@ class OnCallScheduleICal(OnCallSchedule):
         self.prev_ical_file_primary = self.cached_ical_file_primary
         if self.ical_url_primary is not None:
             self.cached_ical_file_primary, self.ical_file_error_primary = fetch_ical_file_or_get_error(
-                self.ical_url_primary,
+                self.ical_url_primary, current_ical_file=self.prev_ical_file_primary
             )
         self.save(update_fields=["cached_ical_file_primary", "prev_ical_file_primary", "ical_file_error_primary"])
 
@@ -1124,7 +1102,7 @@ class OnCallScheduleICal(OnCallSchedule):
         self.prev_ical_file_overrides = self.cached_ical_file_overrides
         if self.ical_url_overrides is not None:
             self.cached_ical_file_overrides, self.ical_file_error_overrides = fetch_ical_file_or_get_error(
-                self.ical_url_overrides,
+                self.ical_url_overrides, current_ical_file=self.prev_ical_file_overrides
             )
         self.save(update_fields=["cached_ical_file_overrides", "prev_ical_file_overrides", "ical_file_error_overrides"])
 
@@ -1206,7 +1184,7 @@ class OnCallScheduleCalendar(OnCallSchedule):
             self.cached_ical_file_overrides = self._generate_ical_file_from_shifts(qs)
         elif self.ical_url_overrides is not None:
             self.cached_ical_file_overrides, self.ical_file_error_overrides = fetch_ical_file_or_get_error(
-                self.ical_url_overrides,
+                self.ical_url_overrides, current_ical_file=self.prev_ical_file_overrides
             )
 
         self.save(update_fields=["cached_ical_file_overrides", "prev_ical_file_overrides", "ical_file_error_overrides"])
@@ -1297,6 +1275,35 @@ class OnCallScheduleWeb(OnCallSchedule):
         self.cached_ical_file_overrides = self._generate_ical_file_overrides()
         self.save(update_fields=["cached_ical_file_overrides", "prev_ical_file_overrides"])
 
+    def get_rotation_events(
+        self,
+    ) -> typing.Optional[typing.Tuple[typing.Optional["RotationEvents"], typing.Optional["RotationEvents"]]]:
+        if not settings.FEATURE_WEB_SCHEDULE_NATIVE_SHIFT_EXPANSION_ENABLED:
+            return None
+        rotation_events_primary = self._get_rotation_events(
+            OnCallSchedule.PRIMARY,
+            self._ical_file_primary,
+            self.custom_shifts.exclude(type=CustomOnCallShift.TYPE_OVERRIDE),
+        )
+        rotation_events_overrides = self._get_rotation_events(
+            OnCallSchedule.OVERRIDES,
+            self._ical_file_overrides,
+            self.custom_shifts.filter(type=CustomOnCallShift.TYPE_OVERRIDE),
+        )
+        return rotation_events_primary, rotation_events_overrides
+
+    def _get_rotation_events(self, calendar_type, ical_file, qs) -> typing.Optional["RotationEvents"]:
+        # same as get_icalendars, the iCal file is generated from the same shifts and is empty if there are none.
+        # Rotation events are cached per process and shared, they must not be modified
+        if not ical_file:
+            return None
+        if self._preview_shifts is not None and calendar_type in self._preview_shifts:
+            qs, extra_shifts = self._preview_shifts[calendar_type]
+            return self._generate_rotation_events_from_shifts(qs, extra_shifts=extra_shifts, allow_empty_users=True)
+        return get_cached_rotation_events(
+            self.pk, calendar_type, ical_file, lambda: self._generate_rotation_events_from_shifts(qs)
+        )
+
     # Insight logs
     @property
     def insight_logs_type_verbal(self):
@@ -1307,3 +1314,43 @@ class OnCallScheduleWeb(OnCallSchedule):
         res = super().insight_logs_serialized
         res["time_zone"] = self.time_zone
         return res
+
+
+@receiver(post_save, sender=OnCallSchedule)
+@receiver(post_save, sender=OnCallScheduleICal)
+@receiver(post_save, sender=OnCallScheduleCalendar)
+@receiver(post_save, sender=OnCallScheduleWeb)
+def listen_for_oncallschedule_model_save(
+    sender: typing.Type[OnCallSchedule], instance: OnCallSchedule, update_fields=None, **kwargs
+) -> None:
+    if update_fields is not None and not _affects_oncall_timeline(instance, update_fields):
+        return
+    # iCal files, time zone, etc. might have changed, the on-call timeline is rebuilt by the schedule refresh tasks
+    invalidate_oncall_timeline(instance.pk)
+
+
+# fields saved by the schedule refresh and check tasks, which don't change the schedule final events
+ONCALL_TIMELINE_UNAFFECTED_FIELDS = {
+    "prev_ical_file_primary",
+    "prev_ical_file_overrides",
+    "ical_file_error_primary",
+    "ical_file_error_overrides",
+    "cached_ical_final_schedule",
+    "cached_final_schedule_events",
+    "has_gaps",
+    "has_empty_shifts",
+}
+
+
+def _affects_oncall_timeline(instance: OnCallSchedule, update_fields: typing.Iterable[str]) -> bool:
+    for field in update_fields:
+        if field == "cached_ical_file_primary":
+            # refreshed iCal files are only a change if they differ from the previous ones
+            if instance.cached_ical_file_primary != instance.prev_ical_file_primary:
+                return True
+        elif field == "cached_ical_file_overrides":
+            if instance.cached_ical_file_overrides != instance.prev_ical_file_overrides:
+                return True
+        elif field not in ONCALL_TIMELINE_UNAFFECTED_FIELDS:
+            return True
+    return False
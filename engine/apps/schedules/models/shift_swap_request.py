@@ -5,11 +5,12 @@ from django.conf import settings
 from django.core.validators import MinLengthValidator
 from django.db import models
 from django.db.models import QuerySet
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from django.utils import timezone
 
 from apps.schedules import exceptions
+from apps.schedules.oncall_timeline import invalidate_oncall_timeline
 from apps.schedules.tasks import refresh_ical_final_schedule
 from common.insight_log import EntityEvent, write_resource_insight_log
 from common.public_primary_keys import generate_public_primary_key, increase_public_primary_key_length
@@ -269,6 +270,12 @@ def listen_for_shiftswaprequest_model_save(
 ) -> None:
     from apps.schedules.tasks.shift_swaps import create_shift_swap_request_message
 
+    invalidate_oncall_timeline(instance.schedule_id)
     if created:
         write_resource_insight_log(instance=instance, author=instance.beneficiary, event=EntityEvent.CREATED)
         create_shift_swap_request_message.apply_async((instance.pk,))
+
+
+@receiver(post_delete, sender=ShiftSwapRequest)
+def listen_for_shiftswaprequest_model_delete(sender: ShiftSwapRequest, instance: ShiftSwapRequest, **kwargs) -> None:
+    invalidate_oncall_timeline(instance.schedule_id)
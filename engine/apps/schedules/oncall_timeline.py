@@ -0,0 +1,184 @@
+"""
+Precomputed "who is on call" timelines of schedules.
+
+Resolving the users on call at a given time requires resolving the schedule final events (parsing iCal, expanding
+recurrences, merging, applying swap requests and resolving priorities). Timelines store the resolved final events of
+the next SCHEDULE_ONCALL_TIMELINE_WINDOW seconds as plain (start, end, usernames) intervals in the cache, so the users
+on call at a time inside the window are found with an interval lookup. Intervals are aligned with the final events and
+open, same as final_events(dt, dt): users of an event ending or starting exactly at the time are not on call.
+
+Timelines are rebuilt by the schedule refresh tasks: by refresh_ical_final_schedule, which is queued whenever shifts,
+overrides or swap requests change, and by refresh_ical_file only when the schedule iCal files changed or the timeline
+is older than SCHEDULE_ONCALL_TIMELINE_REBUILD_AGE. Timelines are versioned: any change to a schedule bumps its version,
+making its current timeline unusable until it is rebuilt, and timelines older than SCHEDULE_ONCALL_TIMELINE_MAX_AGE are
+not used. Schedules whose lookup can't be answered by a timeline are left out of the lookup result, and callers fall
+back to resolving their final events.
+"""
+import bisect
+import datetime
+import time
+import typing
+import uuid
+from dataclasses import dataclass
+
+from django.core.cache import cache
+
+from apps.schedules.constants import (
+    SCHEDULE_ONCALL_TIMELINE_CACHE_KEY_PREFIX,
+    SCHEDULE_ONCALL_TIMELINE_MAX_AGE,
+    SCHEDULE_ONCALL_TIMELINE_REBUILD_AGE,
+    SCHEDULE_ONCALL_TIMELINE_VERSION_CACHE_KEY_PREFIX,
+    SCHEDULE_ONCALL_TIMELINE_WINDOW,
+)
+from common.cache import ensure_cache_key_allocates_to_the_same_hash_slot
+
+if typing.TYPE_CHECKING:
+    from apps.schedules.models import OnCallSchedule
+
+ONCALL_TIMELINE_CACHE_TIMEOUT = SCHEDULE_ONCALL_TIMELINE_WINDOW
+
+
+# timeline and version keys are allocated to the same hash slot, so they can be fetched with a single get_many
+def _get_timeline_cache_key(schedule_id: int) -> str:
+    return ensure_cache_key_allocates_to_the_same_hash_slot(
+        f"{SCHEDULE_ONCALL_TIMELINE_CACHE_KEY_PREFIX}{schedule_id}", SCHEDULE_ONCALL_TIMELINE_CACHE_KEY_PREFIX
+    )
+
+
+def _get_timeline_version_cache_key(schedule_id: int) -> str:
+    return ensure_cache_key_allocates_to_the_same_hash_slot(
+        f"{SCHEDULE_ONCALL_TIMELINE_VERSION_CACHE_KEY_PREFIX}{schedule_id}", SCHEDULE_ONCALL_TIMELINE_CACHE_KEY_PREFIX
+    )
+
+
+def invalidate_oncall_timeline(schedule_id: int) -> None:
+    """
+    Make the current timeline of the schedule unusable. Must be called whenever anything affecting the schedule
+    final events changes.
+    """
+    cache.set(_get_timeline_version_cache_key(schedule_id), uuid.uuid4().hex, timeout=ONCALL_TIMELINE_CACHE_TIMEOUT)
+
+
+def _get_timeline_version(schedule_id: int) -> str:
+    cache_key = _get_timeline_version_cache_key(schedule_id)
+    version = cache.get(cache_key)
+    if version is None:
+        cache.add(cache_key, uuid.uuid4().hex, timeout=ONCALL_TIMELINE_CACHE_TIMEOUT)
+        version = cache.get(cache_key)
+    return version
+
+
+@dataclass
+class OnCallTimeline:
+    version: str
+    built_at: float
+    start: float
+    end: float
+    # (start, end, usernames) of the final events with users, sorted by start
+    intervals: typing.List[typing.Tuple[float, float, typing.List[str]]]
+    max_interval_duration: float
+
+    @classmethod
+    def build(cls, schedule: "OnCallSchedule", version: str) -> "OnCallTimeline":
+        now = datetime.datetime.now(datetime.timezone.utc)
+        datetime_end = now + datetime.timedelta(seconds=SCHEDULE_ONCALL_TIMELINE_WINDOW)
+        intervals = sorted(
+            (event["start"].timestamp(), event["end"].timestamp(), [user["email"] for user in event["users"]])
+            for event in schedule.final_events(now, datetime_end)
+            if event["users"]
+        )
+        return cls(
+            version=version,
+            built_at=time.time(),
+            start=now.timestamp(),
+            end=datetime_end.timestamp(),
+            intervals=intervals,
+            max_interval_duration=max((end - start for start, end, _ in intervals), default=0),
+        )
+
+    @classmethod
+    def from_dict(cls, data: typing.Dict) -> "OnCallTimeline":
+        return cls(**data)
+
+    def to_dict(self) -> typing.Dict:
+        # timelines are cached as plain data rather than pickled objects
+        return self.__dict__
+
+    def is_usable(self, version: str, timestamp: float) -> bool:
+        return (
+            self.version == version
+            and time.time() - self.built_at <= SCHEDULE_ONCALL_TIMELINE_MAX_AGE
+            and self.start <= timestamp <= self.end
+        )
+
+    def usernames_at(self, timestamp: float) -> typing.List[str]:
+        """
+        Return the usernames on call at the given time, same as the users of `final_events(dt, dt)`. Intervals are
+        open, as final_events(dt, dt) doesn't include events starting or ending at dt: at the exact time one shift ends
+        and the next one starts neither of them is on call.
+        """
+        usernames: typing.List[str] = []
+        # only intervals starting before the time and not longer than the longest interval can contain it
+        idx = bisect.bisect_left(self.intervals, (timestamp,))
+        while idx > 0:
+            idx -= 1
+            start, end, interval_usernames = self.intervals[idx]
+            if start <= timestamp - self.max_interval_duration:
+                break
+            if timestamp < end:
+                usernames.extend(interval_usernames)
+        return usernames
+
+
+def is_oncall_timeline_up_to_date(schedule_id: int) -> bool:
+    """
+    Return whether the schedule has a usable timeline which doesn't need to be rebuilt yet, if its iCal files didn't
+    change.
+    """
+    cached_data = cache.get_many([_get_timeline_cache_key(schedule_id), _get_timeline_version_cache_key(schedule_id)])
+    timeline_data = cached_data.get(_get_timeline_cache_key(schedule_id))
+    version = cached_data.get(_get_timeline_version_cache_key(schedule_id))
+    if timeline_data is None or version is None:
+        return False
+    timeline = OnCallTimeline.from_dict(timeline_data)
+    return timeline.version == version and time.time() - timeline.built_at <= SCHEDULE_ONCALL_TIMELINE_REBUILD_AGE
+
+
+def refresh_oncall_timeline(schedule: "OnCallSchedule") -> OnCallTimeline:
+    # iCal files missing from the schedule cache are generated and saved while resolving the final events, which
+    # invalidates the timeline. Make sure they are there before reading the version.
+    try:
+        schedule.get_icalendars()
+    except ValueError:
+        # invalid iCal file, there are no final events (see OnCallSchedule.filter_events)
+        pass
+    # the version is read before resolving the final events, so changes made in the meantime invalidate the timeline
+    timeline = OnCallTimeline.build(schedule, _get_timeline_version(schedule.pk))
+    cache.set(_get_timeline_cache_key(schedule.pk), timeline.to_dict(), timeout=ONCALL_TIMELINE_CACHE_TIMEOUT)
+    return timeline
+
+
+def get_oncall_usernames_for_multiple_schedules(
+    schedules: typing.Iterable["OnCallSchedule"], events_datetime: datetime.datetime
+) -> typing.Dict["OnCallSchedule", typing.List[str]]:
+    """
+    Return the usernames on call at the given time for the schedules whose timeline can answer it. Schedules without a
+    usable timeline are not included in the result.
+    """
+    schedules = list(schedules)
+    cache_keys = []
+    for schedule in schedules:
+        cache_keys += [_get_timeline_cache_key(schedule.pk), _get_timeline_version_cache_key(schedule.pk)]
+    cached_data = cache.get_many(cache_keys)
+
+    timestamp = events_datetime.timestamp()
+    result = {}
+    for schedule in schedules:
+        timeline_data = cached_data.get(_get_timeline_cache_key(schedule.pk))
+        version = cached_data.get(_get_timeline_version_cache_key(schedule.pk))
+        if timeline_data is None or version is None:
+            continue
+        timeline = OnCallTimeline.from_dict(timeline_data)
+        if timeline.is_usable(version, timestamp):
+            result[schedule] = timeline.usernames_at(timestamp)
+    return result
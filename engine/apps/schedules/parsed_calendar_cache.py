@@ -0,0 +1,37 @@
+import hashlib
+import typing
+
+from django.conf import settings
+from icalendar import Calendar
+
+from common.lru_cache import LRUCache, LRUCacheInfo
+
+# parsed calendars are keyed by schedule pk, calendar type and a digest of the iCal source, so calendars are re-parsed
+# as soon as the source changes. Previous versions are never looked up again and are the first to be evicted.
+# Entries are weighted by the size of the iCal source, as a proxy of the memory taken by the parsed calendar.
+_parsed_calendars: LRUCache[typing.Tuple[int, int, str], typing.Tuple[int, Calendar]] = LRUCache(
+    maxsize=settings.ICAL_PARSED_CALENDAR_CACHE_SIZE,
+    maxweight=settings.ICAL_PARSED_CALENDAR_CACHE_MAX_SOURCE_SIZE,
+    weigher=lambda key, value: value[0],
+)
+
+
+def get_parsed_calendar(schedule_pk: int, calendar_type: int, ical_file: str | bytes) -> Calendar:
+    """
+    Return `ical_file` parsed, reusing the calendar parsed earlier for the schedule if the iCal source didn't change.
+    Cached calendars are shared, callers must not modify them.
+    """
+    ical_data = ical_file.encode("utf-8") if isinstance(ical_file, str) else ical_file
+    content_hash = hashlib.md5(ical_data, usedforsecurity=False).hexdigest()
+    _, calendar = _parsed_calendars.get_or_set(
+        (schedule_pk, calendar_type, content_hash), lambda: (len(ical_file), Calendar.from_ical(ical_file))
+    )
+    return calendar
+
+
+def parsed_calendar_cache_info() -> LRUCacheInfo:
+    return _parsed_calendars.cache_info()
+
+
+def clear_parsed_calendar_cache() -> None:
+    _parsed_calendars.clear()
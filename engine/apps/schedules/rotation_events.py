@@ -0,0 +1,221 @@
+import datetime
+import hashlib
+import logging
+import typing
+from dataclasses import dataclass
+
+from dateutil import rrule
+from django.conf import settings
+from recurring_ical_events import time_span_contains_event
+
+from apps.schedules.ical_utils import (
+    UsersInIcal,
+    parse_event_uid,
+    parse_priority_from_string,
+    parse_username_from_string,
+)
+from common.lru_cache import LRUCache
+
+if typing.TYPE_CHECKING:
+    from apps.schedules.models import CustomOnCallShift, OnCallSchedule
+    from apps.user_management.models import User
+
+logger = logging.getLogger(__name__)
+
+RRULE_FREQUENCIES = {
+    "MONTHLY": rrule.MONTHLY,
+    "WEEKLY": rrule.WEEKLY,
+    "DAILY": rrule.DAILY,
+    "HOURLY": rrule.HOURLY,
+}
+RRULE_WEEKDAYS = {repr(weekday): weekday for weekday in rrule.weekdays}
+# occurrences are looked up with an extra margin, rrule generates them with the DTSTART UTC offset and they are moved
+# by up to an hour when localized back to the shift time zone
+LOOKUP_MARGIN = datetime.timedelta(days=1)
+
+
+@dataclass(frozen=True)
+class RotationEvent:
+    """
+    A custom shift event, as it's written to the schedule iCal file by `CustomOnCallShift.generate_ical` and read back
+    from it by `get_shifts_dict`: datetimes are in the shift time zone and truncated to seconds.
+    """
+
+    shift_pk: str
+    source: typing.Optional[str]
+    is_web: bool
+    username: typing.Optional[str]
+    priority: int
+    start: datetime.datetime
+    end: datetime.datetime
+    rotation_start: datetime.datetime
+    until: typing.Optional[datetime.datetime]
+    rule: rrule.rruleset
+
+    def get_occurrences(
+        self, datetime_start: datetime.datetime, datetime_end: datetime.datetime
+    ) -> typing.Iterator[typing.Tuple[datetime.datetime, datetime.datetime]]:
+        """
+        Yield (start, end) of the event occurrences within the time span, in the same way as they are returned by
+        AmixrRecurringIcalEventsAdapter for the event parsed from iCal.
+        """
+        duration = self.end - self.start
+        lookup_start = datetime_start - duration - LOOKUP_MARGIN
+        lookup_end = datetime_end + LOOKUP_MARGIN
+        for start in self.rule.between(lookup_start, lookup_end, inc=True):
+            # keep the wall clock time on DST changes, see recurring_ical_events.RepeatedComponent.within_days
+            start = start.tzinfo.localize(start.replace(tzinfo=None))
+            if self.until is not None and start > self.until:
+                continue
+            end = start + duration
+            if self.is_web:
+                # see AmixrRecurringIcalEventsAdapter.get_start_and_end_with_respect_to_event_type
+                if self.until is not None:
+                    end = min(end, self.until)
+                start = max(start, self.rotation_start)
+            if start > end or not time_span_contains_event(datetime_start, datetime_end, start, end):
+                continue
+            yield start, end
+
+
+RotationEvents = typing.List[RotationEvent]
+
+
+def _get_rrule_kwargs(rules: dict) -> dict:
+    # same as dateutil.rrule.rrulestr, for the values set by CustomOnCallShift.event_ical_rules
+    kwargs: typing.Dict[str, typing.Any] = {"freq": RRULE_FREQUENCIES[rules["freq"][0]]}
+    if "interval" in rules:
+        kwargs["interval"] = rules["interval"][0]
+    if "byday" in rules:
+        byweekday = []
+        for day in rules["byday"]:
+            n = day[:-2]
+            byweekday.append(RRULE_WEEKDAYS[day[-2:]](int(n)) if n else RRULE_WEEKDAYS[day[-2:]])
+        kwargs["byweekday"] = byweekday
+    if "bymonth" in rules:
+        kwargs["bymonth"] = rules["bymonth"]
+    if "bymonthday" in rules:
+        kwargs["bymonthday"] = rules["bymonthday"]
+    if "wkst" in rules:
+        kwargs["wkst"] = RRULE_WEEKDAYS[rules["wkst"]]
+    return kwargs
+
+
+def build_rotation_event(
+    shift: "CustomOnCallShift",
+    start: datetime.datetime,
+    user_counter: int = 0,
+    user: typing.Optional["User"] = None,
+    counter: int = 1,
+    time_zone: str = "UTC",
+    custom_rrule: typing.Optional[dict] = None,
+) -> typing.Optional[RotationEvent]:
+    """
+    Build the rotation event for `CustomOnCallShift.generate_ical` arguments, None if the event can't be generated.
+    """
+    summary = shift.get_summary_with_user_for_ical(user) if user else None
+    # iCal datetimes don't have microseconds
+    dtstart = shift.convert_dt_to_schedule_timezone(start, time_zone).replace(microsecond=0)
+    dtend = start + shift.duration
+    if shift.until:
+        dtend = min(dtend, shift.until)
+    dtend = shift.convert_dt_to_schedule_timezone(dtend, time_zone).replace(microsecond=0)
+
+    rules = custom_rrule or shift.event_ical_rules
+    until = rules["until"].replace(microsecond=0) if rules and "until" in rules else None
+    # same as recurring_ical_events.RepeatedComponent, DTSTART is always an occurrence
+    rule = rrule.rruleset()
+    if rules:
+        try:
+            rule.rrule(
+                rrule.rrule(
+                    dtstart=dtstart,
+                    # occurrences after UNTIL are filtered out once localized, see RotationEvent.get_occurrences
+                    until=until + datetime.timedelta(hours=1) if until else None,
+                    **_get_rrule_kwargs(rules),
+                )
+            )
+        except ValueError as e:
+            logger.warning(f"Cannot build rotation event for shift with pk {shift.pk}: {str(e)}")
+            return None
+    rule.rdate(dtstart)
+
+    shift_pk, source = parse_event_uid(
+        f"oncall-{shift.uuid}-PK{shift.public_primary_key}-U{user_counter}-E{counter}-S{shift.source}"
+    )
+    return RotationEvent(
+        shift_pk=shift_pk,
+        source=source,
+        is_web=shift.source == shift.SOURCE_WEB,
+        username=parse_username_from_string(summary) if summary else None,
+        priority=parse_priority_from_string(summary or "[L0]"),
+        start=dtstart,
+        end=dtend,
+        rotation_start=shift.rotation_start.replace(microsecond=0),
+        until=until,
+        rule=rule,
+    )
+
+
+def get_shifts_dict_from_rotation_events(
+    rotation_events: RotationEvents,
+    calendar_type: int,
+    schedule: "OnCallSchedule",
+    datetime_start: datetime.datetime,
+    datetime_end: datetime.datetime,
+    with_empty_shifts: bool = False,
+):
+    """
+    Same as `get_shifts_dict` for the schedule calendar built from the rotation events, without generating and
+    parsing iCal. Rotation events are never all-day events.
+    """
+    users_in_calendar = UsersInIcal.resolve(
+        (e.username for e in rotation_events if e.username is not None), schedule.organization
+    )
+    result_datetime = []
+    for rotation_event in rotation_events:
+        usernames = (rotation_event.username,) if rotation_event.username is not None else ()
+        users = users_in_calendar.get_users(usernames)
+        missing_users = users_in_calendar.get_missing_usernames(usernames)
+        if len(users) == 0 and not with_empty_shifts:
+            continue
+        for start, end in rotation_event.get_occurrences(datetime_start, datetime_end):
+            if start < end:
+                result_datetime.append(
+                    {
+                        "start": start.astimezone(datetime.timezone.utc),
+                        "end": end.astimezone(datetime.timezone.utc),
+                        "users": users,
+                        "missing_users": missing_users,
+                        "priority": rotation_event.priority,
+                        "source": rotation_event.source,
+                        "calendar_type": calendar_type,
+                        "shift_pk": rotation_event.shift_pk,
+                    }
+                )
+    return result_datetime, []
+
+
+# rotation events are keyed by schedule pk, calendar type and a digest of the schedule iCal file generated from the
+# same shifts, so they are rebuilt as soon as the shifts change, same as parsed calendars (see parsed_calendar_cache).
+_rotation_events: LRUCache[typing.Tuple[int, int, str], RotationEvents] = LRUCache(
+    maxsize=settings.SCHEDULE_ROTATION_EVENTS_CACHE_SIZE
+)
+
+
+def get_cached_rotation_events(
+    schedule_pk: int,
+    calendar_type: int,
+    ical_file: str,
+    factory: typing.Callable[[], RotationEvents],
+) -> RotationEvents:
+    """
+    Return the schedule rotation events built by `factory`, reusing the ones built earlier if the schedule iCal file
+    didn't change. Cached rotation events are shared, callers must not modify them.
+    """
+    content_hash = hashlib.md5(ical_file.encode("utf-8"), usedforsecurity=False).hexdigest()
+    return _rotation_events.get_or_set((schedule_pk, calendar_type, content_hash), factory)
+
+
+def clear_rotation_events_cache() -> None:
+    _rotation_events.clear()
@@ -15,6 +15,7 @@ from .notify_about_gaps_in_schedule import (  # noqa: F401
     start_notify_about_gaps_in_schedule,
 )
 from .refresh_ical_files import (  # noqa: F401
+    refresh_ical_feeds_batch,
     refresh_ical_file,
     refresh_ical_final_schedule,
     start_refresh_ical_files,
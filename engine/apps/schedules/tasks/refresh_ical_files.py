@@ -1,7 +1,14 @@
+import random
+import time
+import typing
+
 from celery.utils.log import get_task_logger
+from django.conf import settings
 
 from apps.alerts.tasks import notify_ical_schedule_shift  # type: ignore[no-redef]
+from apps.schedules.ical_feeds import prefetched_ical_feeds
 from apps.schedules.ical_utils import is_icals_equal, update_cached_oncall_users_for_schedule
+from apps.schedules.oncall_timeline import is_oncall_timeline_up_to_date, refresh_oncall_timeline
 from apps.schedules.tasks import (
     check_gaps_and_empty_shifts_in_schedule,
     notify_about_empty_shifts_in_schedule_task,
@@ -20,11 +27,52 @@ def start_refresh_ical_files():
     task_logger.info("Start refresh ical files")
 
     schedules = OnCallSchedule.objects.filter(organization__deleted_at__isnull=True)
+    imported_schedule_pks = []
     for schedule in schedules:
-        refresh_ical_file.apply_async((schedule.pk,))
+        if _get_imported_ical_feeds(schedule):
+            imported_schedule_pks.append(schedule.pk)
+        else:
+            refresh_ical_file.apply_async((schedule.pk,))
+
+    # imported iCal feeds are downloaded concurrently in batches, and the batches are spread over the jitter period
+    # instead of polling all of them at once
+    batch_size = settings.ICAL_FEED_REFRESH_BATCH_SIZE
+    for i in range(0, len(imported_schedule_pks), batch_size):
+        countdown = random.randint(0, settings.ICAL_FEED_REFRESH_JITTER)
+        refresh_ical_feeds_batch.apply_async((imported_schedule_pks[i : i + batch_size],), countdown=countdown)
 
     # Update Slack user groups with a delay to make sure all the schedules are refreshed
-    start_update_slack_user_group_for_schedules.apply_async(countdown=30)
+    start_update_slack_user_group_for_schedules.apply_async(countdown=30 + settings.ICAL_FEED_REFRESH_JITTER)
+
+
+def _get_imported_ical_feeds(schedule) -> typing.List[typing.Tuple[str, typing.Optional[str]]]:
+    """Return (ical_url, current_ical_file) of the iCal feeds imported by the schedule"""
+    feeds = []
+    if getattr(schedule, "ical_url_primary", None):
+        feeds.append((schedule.ical_url_primary, schedule.cached_ical_file_primary))
+    if getattr(schedule, "ical_url_overrides", None) and not getattr(schedule, "enable_web_overrides", False):
+        feeds.append((schedule.ical_url_overrides, schedule.cached_ical_file_overrides))
+    return feeds
+
+
+@shared_dedicated_queue_retry_task()
+def refresh_ical_feeds_batch(schedule_pks):
+    from apps.schedules.models import OnCallSchedule
+
+    task_logger.info(f"Refresh ical feeds for schedules {schedule_pks}")
+
+    schedules = OnCallSchedule.objects.filter(pk__in=schedule_pks)
+    feeds = [feed for schedule in schedules for feed in _get_imported_ical_feeds(schedule)]
+    started_at = time.monotonic()
+    with prefetched_ical_feeds(feeds):
+        task_logger.info(f"Downloaded {len(feeds)} ical feeds in {time.monotonic() - started_at:.3f}s")
+        for schedule_pk in schedule_pks:
+            try:
+                refresh_ical_file(schedule_pk)
+            except Exception:
+                # don't let a schedule failing to refresh hold back the rest of the batch, retry it on its own
+                task_logger.exception(f"Failed to refresh ical files for schedule {schedule_pk}")
+                refresh_ical_file.apply_async((schedule_pk,))
 
 
 @shared_dedicated_queue_retry_task()
@@ -50,7 +98,9 @@ def refresh_ical_file(schedule_pk):
         task_logger.info(f"Tried to refresh non-existing schedule {schedule_pk}")
         return
 
+    started_at = time.monotonic()
     schedule.refresh_ical_file()
+    task_logger.info(f"Refreshed ical files for schedule {schedule_pk} in {time.monotonic() - started_at:.3f}s")
     if schedule.channel is not None:
         notify_ical_schedule_shift.apply_async((schedule.pk,))
 
@@ -85,7 +135,13 @@ def refresh_ical_file(schedule_pk):
             task_logger.info(f"run_task_overrides {schedule_pk} {run_task_primary} icals not equal")
     run_task = run_task_primary or run_task_overrides
 
-    # update cached schedule on-call users
+    # rebuild the on-call timeline if needed and update cached schedule on-call users
+    ical_changed = (
+        schedule.cached_ical_file_primary != schedule.prev_ical_file_primary
+        or schedule.cached_ical_file_overrides != schedule.prev_ical_file_overrides
+    )
+    if ical_changed or not is_oncall_timeline_up_to_date(schedule.pk):
+        refresh_oncall_timeline(schedule)
     update_cached_oncall_users_for_schedule(schedule)
 
     check_gaps_and_empty_shifts_in_schedule.apply_async((schedule_pk,))
@@ -109,3 +165,5 @@ def refresh_ical_final_schedule(schedule_pk):
         return
 
     schedule.refresh_ical_final_schedule()
+    # refresh_ical_final_schedule is queued whenever shifts, overrides or swap requests change
+    refresh_oncall_timeline(schedule)
@@ -5,7 +5,11 @@ from django.core.cache import cache
 from django.utils import timezone
 
 from apps.schedules.models import CustomOnCallShift, OnCallScheduleICal, OnCallScheduleWeb
-from apps.schedules.tasks.refresh_ical_files import refresh_ical_file, start_refresh_ical_files
+from apps.schedules.tasks.refresh_ical_files import (
+    refresh_ical_feeds_batch,
+    refresh_ical_file,
+    start_refresh_ical_files,
+)
 
 
 @pytest.mark.django_db
@@ -82,6 +86,63 @@ def test_refresh_ical_files_filter_orgs(
         assert schedule_from_deleted_org.id not in called_args[0].args[0]
 
 
+@pytest.mark.django_db
+@patch("apps.slack.tasks.start_update_slack_user_group_for_schedules.apply_async")
+def test_refresh_ical_files_batches_imported_feeds(
+    mocked_start_update_slack_user_group_for_schedules,
+    make_organization,
+    make_schedule,
+    settings,
+):
+    settings.ICAL_FEED_REFRESH_BATCH_SIZE = 2
+    organization = make_organization()
+    web_schedule = make_schedule(organization, schedule_class=OnCallScheduleWeb)
+    imported_schedules = [
+        make_schedule(organization, schedule_class=OnCallScheduleICal, ical_url_primary=f"https://example.com/{i}.ics")
+        for i in range(3)
+    ]
+
+    with patch("apps.schedules.tasks.refresh_ical_file.apply_async") as mocked_refresh_ical_file:
+        with patch("apps.schedules.tasks.refresh_ical_feeds_batch.apply_async") as mocked_refresh_ical_feeds_batch:
+            start_refresh_ical_files()
+
+    assert [c.args[0] for c in mocked_refresh_ical_file.call_args_list] == [(web_schedule.pk,)]
+    batches = [c.args[0][0] for c in mocked_refresh_ical_feeds_batch.call_args_list]
+    assert [len(batch) for batch in batches] == [2, 1]
+    assert sorted(pk for batch in batches for pk in batch) == sorted(s.pk for s in imported_schedules)
+
+
+@pytest.mark.django_db
+def test_refresh_ical_feeds_batch(make_organization, make_schedule):
+    organization = make_organization()
+    schedules = [
+        make_schedule(organization, schedule_class=OnCallScheduleICal, ical_url_primary="https://example.com/1.ics"),
+        make_schedule(
+            organization,
+            schedule_class=OnCallScheduleICal,
+            ical_url_primary="https://example.com/2.ics",
+            ical_url_overrides="https://example.com/3.ics",
+        ),
+    ]
+    schedule_pks = [s.pk for s in schedules]
+
+    with patch("apps.schedules.tasks.refresh_ical_files.prefetched_ical_feeds") as mock_prefetched_ical_feeds:
+        with patch(
+            "apps.schedules.tasks.refresh_ical_files.refresh_ical_file", side_effect=[Exception("test"), None]
+        ) as mock_refresh_ical_file:
+            refresh_ical_feeds_batch(schedule_pks)
+
+    # feeds are downloaded before schedules are refreshed
+    assert sorted(mock_prefetched_ical_feeds.call_args.args[0]) == [
+        ("https://example.com/1.ics", None),
+        ("https://example.com/2.ics", None),
+        ("https://example.com/3.ics", None),
+    ]
+    assert [c.args for c in mock_refresh_ical_file.call_args_list] == [(pk,) for pk in schedule_pks]
+    # a failed refresh doesn't stop the batch and is retried separately
+    mock_refresh_ical_file.apply_async.assert_called_once_with((schedule_pks[0],))
+
+
 @pytest.mark.django_db
 def test_refresh_ical_updates_oncall_cache(
     make_organization,
@@ -125,3 +186,25 @@ def test_refresh_ical_updates_oncall_cache(
 
     cached_data = cache.get(_generate_cache_key(schedule))
     assert cached_data == [u.public_primary_key for u in users]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("cached_ical_primary,rebuilt", [("ical data", False), ("updated ical data", True)])
+def test_refresh_ical_file_rebuilds_oncall_timeline_if_ical_changed(
+    cached_ical_primary, rebuilt, make_organization, make_schedule
+):
+    organization = make_organization()
+    schedule = make_schedule(
+        organization,
+        schedule_class=OnCallScheduleICal,
+        cached_ical_file_primary=cached_ical_primary,
+        prev_ical_file_primary="ical data",
+    )
+
+    with patch("apps.schedules.models.OnCallSchedule.refresh_ical_file", return_value=None):
+        with patch("apps.schedules.tasks.refresh_ical_files.is_icals_equal", side_effect=lambda a, b: a == b):
+            with patch("apps.schedules.tasks.refresh_ical_files.is_oncall_timeline_up_to_date", return_value=True):
+                with patch("apps.schedules.tasks.refresh_ical_files.refresh_oncall_timeline") as mock_refresh_timeline:
+                    refresh_ical_file(schedule.pk)
+
+    assert mock_refresh_timeline.called == rebuilt
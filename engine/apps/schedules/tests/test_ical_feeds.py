@@ -0,0 +1,102 @@
+from unittest.mock import Mock, patch
+
+import pytest
+import requests
+
+from apps.schedules.ical_feeds import fetch_ical_feed, ical_feed_counters, prefetched_ical_feeds
+from apps.schedules.ical_utils import fetch_ical_file_or_get_error
+
+ICAL_FILE = "BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//test//EN\r\nEND:VCALENDAR\r\n"
+UPDATED_ICAL_FILE = "BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//test updated//EN\r\nEND:VCALENDAR\r\n"
+
+
+def _response(status_code=200, text="", headers=None):
+    return Mock(status_code=status_code, text=text, content=text.encode(), headers=headers or {})
+
+
+def test_fetch_ical_feed_not_modified():
+    url = "https://example.com/not-modified.ics"
+    headers = {"ETag": '"v1"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"}
+    with patch("apps.schedules.ical_feeds._session.get") as mock_get:
+        mock_get.return_value = _response(text=ICAL_FILE, headers=headers)
+        assert fetch_ical_feed(url) == ICAL_FILE
+        assert "If-None-Match" not in mock_get.call_args.kwargs["headers"]
+
+        mock_get.return_value = _response(status_code=304)
+        assert fetch_ical_feed(url, ICAL_FILE) == ICAL_FILE
+        assert mock_get.call_args.kwargs["headers"] == {
+            "If-None-Match": '"v1"',
+            "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT",
+        }
+
+        # validators are not sent if the current file isn't the one they were returned for
+        mock_get.return_value = _response(text=UPDATED_ICAL_FILE)
+        assert fetch_ical_feed(url, UPDATED_ICAL_FILE) == UPDATED_ICAL_FILE
+        assert mock_get.call_args.kwargs["headers"] == {}
+
+    ical_feed_counters.flush()
+    totals = ical_feed_counters.get_totals()
+    assert totals.pop("refresh_seconds") >= 0
+    assert totals == {
+        "requests": 3,
+        "not_modified": 1,
+        "unchanged": 1,
+        "errors": 0,
+        "downloaded_bytes": len(ICAL_FILE) + len(UPDATED_ICAL_FILE),
+    }
+
+
+def test_fetch_ical_feed_unchanged_content_not_parsed():
+    url = "https://example.com/unchanged.ics"
+    with patch("apps.schedules.ical_feeds._session.get", return_value=_response(text=ICAL_FILE)):
+        with patch("apps.schedules.ical_feeds.Calendar.from_ical") as mock_from_ical:
+            assert fetch_ical_feed(url, ICAL_FILE) == ICAL_FILE
+            mock_from_ical.assert_not_called()
+
+            assert fetch_ical_feed(url, UPDATED_ICAL_FILE) == ICAL_FILE
+            mock_from_ical.assert_called_once_with(ICAL_FILE)
+
+
+@pytest.mark.parametrize(
+    "response,error",
+    [
+        (requests.exceptions.ConnectionError(), "iCal download failed"),
+        (_response(text="not an ical file"), "wrong iCal"),
+        (_response(status_code=404, text="not found"), "iCal download failed"),
+        # not modified without validators sent
+        (_response(status_code=304), "iCal download failed"),
+    ],
+)
+def test_fetch_ical_file_or_get_error(response, error):
+    url = "https://example.com/error.ics"
+    with patch("apps.schedules.ical_feeds._session.get", side_effect=[response]):
+        assert fetch_ical_file_or_get_error(url, ICAL_FILE) == (None, error)
+    ical_feed_counters.flush()
+    assert ical_feed_counters.get_totals()["errors"] == 1
+
+
+def test_prefetched_ical_feeds(settings):
+    settings.ICAL_FEED_DOWNLOAD_MAX_WORKERS = 2
+    url, error_url = "https://example.com/prefetched.ics", "https://example.com/error.ics"
+    feeds = [(url, None), (url, ICAL_FILE), (error_url, None)]
+
+    def get(ical_url, **kwargs):
+        if ical_url == error_url:
+            raise requests.exceptions.ConnectionError()
+        return _response(text=ICAL_FILE)
+
+    with patch("apps.schedules.ical_feeds._session.get", side_effect=get) as mock_get:
+        with prefetched_ical_feeds(feeds):
+            assert mock_get.call_count == 3
+            assert fetch_ical_feed(url) == ICAL_FILE
+            assert fetch_ical_feed(url, ICAL_FILE) == ICAL_FILE
+            with pytest.raises(requests.exceptions.ConnectionError):
+                fetch_ical_feed(error_url)
+            assert mock_get.call_count == 3
+
+            # feeds prefetched for another current file are downloaded again
+            assert fetch_ical_feed(url, UPDATED_ICAL_FILE) == ICAL_FILE
+            assert mock_get.call_count == 4
+
+        assert fetch_ical_feed(url) == ICAL_FILE
+        assert mock_get.call_count == 5
@@ -7,10 +7,13 @@ import icalendar
 import pytest
 import pytz
 from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
 from apps.api.permissions import LegacyAccessControlRole, RBACPermission
 from apps.schedules.ical_utils import (
+    UsersInIcal,
     get_cached_oncall_users_for_multiple_schedules,
     get_icalendar_tz_or_utc,
     get_oncall_users_for_multiple_schedules,
@@ -144,6 +147,79 @@ def test_users_in_ical_rbac(make_organization_and_user, make_user_for_organizati
     assert users_in_ical(usernames, organization) == ([viewer] if included else [])
 
 
+@pytest.mark.django_db
+def test_users_in_ical_resolve(make_organization_and_user, make_user_for_organization):
+    organization, user = make_organization_and_user()
+    other_user = make_user_for_organization(organization, username="foo", email="TestingUser@test.com")
+    viewer = make_user_for_organization(organization, role=LegacyAccessControlRole.VIEWER)
+
+    users = UsersInIcal.resolve(
+        [other_user.username, user.username, "testinguser@test.com", viewer.username, "unknown", ""], organization
+    )
+
+    assert users.get_users([other_user.username, user.username]) == [user, other_user]
+    assert users.get_users(["testinguser@test.com", "foo"]) == [other_user]
+    assert users.get_users([viewer.username, "unknown", ""]) == []
+    assert users.get_missing_usernames([user.username, "TESTINGUSER@test.com", viewer.username, "unknown", ""]) == [
+        viewer.username,
+        "unknown",
+    ]
+
+
+@pytest.mark.django_db
+def test_users_in_ical_usernames_case_insensitive(make_organization, make_user_for_organization):
+    organization = make_organization()
+    user = make_user_for_organization(organization, username="John", email="john@test.com")
+
+    # MySQL matches usernames case-insensitively, users returned for differently cased usernames are found in memory
+    users = UsersInIcal([user])
+
+    assert users.get_users(["john"]) == [user]
+    assert users.get_users(["JOHN@test.com"]) == [user]
+    assert users.get_missing_usernames(["john", "John", "unknown"]) == ["unknown"]
+
+
+@pytest.mark.django_db
+def test_list_of_oncall_shifts_from_ical_resolves_users_once(
+    make_organization, make_user_for_organization, make_schedule
+):
+    organization = make_organization()
+    users = [make_user_for_organization(organization) for _ in range(5)]
+    start = datetime.datetime(2024, 1, 1, 9, tzinfo=datetime.timezone.utc)
+    events = "".join(
+        textwrap.dedent(
+            """
+            BEGIN:VEVENT
+            SUMMARY:{}
+            DTSTART;VALUE=DATE-TIME:{}
+            DTEND;VALUE=DATE-TIME:{}
+            DTSTAMP;VALUE=DATE-TIME:20230807T001508Z
+            RRULE:FREQ=DAILY
+            UID:uid-{}
+            END:VEVENT
+            """
+        ).format(
+            user.username,
+            (start + datetime.timedelta(hours=i)).strftime("%Y%m%dT%H%M%SZ"),
+            (start + datetime.timedelta(hours=i + 1)).strftime("%Y%m%dT%H%M%SZ"),
+            i,
+        )
+        for i, user in enumerate(users)
+    )
+    ical_data = f"BEGIN:VCALENDAR\nVERSION:2.0\nCALSCALE:GREGORIAN\nMETHOD:PUBLISH{events}END:VCALENDAR\n"
+    schedule = make_schedule(organization, schedule_class=OnCallScheduleICal, cached_ical_file_primary=ical_data)
+    # load the organization before counting queries
+    schedule.organization
+
+    with CaptureQueriesContext(connection) as queries:
+        shifts = list_of_oncall_shifts_from_ical(schedule, start, start + datetime.timedelta(days=10, hours=-1))
+
+    assert len(shifts) == 50
+    assert [s["users"] for s in shifts[:5]] == [[user] for user in users]
+    user_queries = [q for q in queries.captured_queries if "user_management_user" in q["sql"]]
+    assert len(user_queries) == 1
+
+
 @pytest.mark.django_db
 def test_list_users_to_notify_from_ical_viewers_exclusion(
     make_organization_and_user, make_user_for_organization, make_schedule, make_on_call_shift
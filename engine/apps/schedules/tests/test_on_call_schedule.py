@@ -18,6 +18,7 @@ from apps.schedules.constants import (
     ICAL_STATUS_CANCELLED,
     ICAL_SUMMARY,
 )
+from apps.schedules.final_schedule_export import get_final_schedule_fingerprint
 from apps.schedules.models import (
     CustomOnCallShift,
     OnCallSchedule,
@@ -837,6 +838,41 @@ def test_final_schedule_splitting_same_time_events(
     assert returned_events == expected_events
 
 
+@pytest.mark.django_db
+def test_resolve_schedule_many_priority_layers(make_organization, make_schedule):
+    organization = make_organization()
+    schedule = make_schedule(organization, schedule_class=OnCallScheduleWeb)
+    start_date = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+    hours = 24 * 28
+    layers = 12
+
+    def _event(start_h, duration, priority, calendar_type=OnCallSchedule.TYPE_ICAL_PRIMARY):
+        return {
+            "start": start_date + timezone.timedelta(hours=start_h),
+            "end": start_date + timezone.timedelta(hours=start_h + duration),
+            "priority_level": priority,
+            "calendar_type": calendar_type,
+            "is_empty": False,
+            "is_gap": False,
+            "shift": {"pk": f"{calendar_type}-{priority}"},
+        }
+
+    # hourly rotations, layer with priority p covers every (p + 1)th hour
+    events = [_event(h, 1, p) for p in range(layers) for h in range(0, hours, p + 1)]
+    # 2-hours overrides every day at 12:00
+    events += [_event(h, 2, 0, OnCallSchedule.TYPE_ICAL_OVERRIDES) for h in range(12, hours, 24)]
+
+    returned_events = schedule._resolve_schedule(events, start_date, start_date + timezone.timedelta(hours=hours))
+
+    expected_events = []
+    for h in range(hours):
+        if h % 24 == 12:
+            expected_events.append(_event(h, 2, 0, OnCallSchedule.TYPE_ICAL_OVERRIDES))
+        elif h % 24 != 13:
+            expected_events.append(_event(h, 1, max(p for p in range(layers) if h % (p + 1) == 0)))
+    assert returned_events == expected_events
+
+
 @pytest.mark.django_db
 def test_preview_shift(make_organization, make_user_for_organization, make_schedule, make_on_call_shift):
     organization = make_organization()
@@ -1781,6 +1817,196 @@ def test_refresh_ical_final_schedule_ok(
                 assert event in expected_events
 
 
+@pytest.mark.django_db
+def test_refresh_ical_final_schedule_incremental(
+    make_organization,
+    make_user_for_organization,
+    make_schedule,
+    make_on_call_shift,
+):
+    organization = make_organization()
+    u1 = make_user_for_organization(organization)
+    u2 = make_user_for_organization(organization)
+
+    today = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    schedule = make_schedule(organization, schedule_class=OnCallScheduleWeb)
+    on_call_shift = make_on_call_shift(
+        organization=organization,
+        shift_type=CustomOnCallShift.TYPE_ROLLING_USERS_EVENT,
+        start=today + timezone.timedelta(hours=20),
+        rotation_start=today + timezone.timedelta(hours=20),
+        duration=timezone.timedelta(hours=8),
+        frequency=CustomOnCallShift.FREQUENCY_DAILY,
+        schedule=schedule,
+    )
+    on_call_shift.add_rolling_users([[u1]])
+    schedule.refresh_ical_file()
+
+    def _refresh(days_after):
+        with patch("apps.schedules.models.on_call_schedule.EXPORT_WINDOW_DAYS_AFTER", days_after):
+            with patch("apps.schedules.models.on_call_schedule.EXPORT_WINDOW_DAYS_BEFORE", 0):
+                with patch.object(
+                    OnCallScheduleWeb, "final_events", autospec=True, side_effect=OnCallScheduleWeb.final_events
+                ) as mock_final_events:
+                    schedule.refresh_ical_final_schedule()
+        calendar = icalendar.Calendar.from_ical(schedule.cached_ical_final_schedule)
+        events = [
+            (
+                component[ICAL_SUMMARY],
+                component[ICAL_DATETIME_START].dt,
+                component[ICAL_DATETIME_END].dt,
+                component.get(ICAL_STATUS),
+                component[ICAL_LAST_MODIFIED].dt,
+            )
+            for component in calendar.walk()
+            if component.name == ICAL_COMPONENT_VEVENT
+        ]
+        (_, datetime_start, _), _ = mock_final_events.call_args
+        return events, datetime_start
+
+    def _expected_event(day, user):
+        start = today + timezone.timedelta(days=day, hours=20)
+        return (user.username, start, start + timezone.timedelta(hours=8), None)
+
+    events, datetime_start = _refresh(2)
+    assert datetime_start == today
+    assert [e[:4] for e in events] == [_expected_event(0, u1), _expected_event(1, u1)]
+
+    # nothing changed, the shift ongoing at the end of the previous window and the new day are refreshed
+    previous_events = events
+    events, datetime_start = _refresh(3)
+    assert datetime_start == today + timezone.timedelta(days=1, hours=19)
+    assert [e[:4] for e in events] == [_expected_event(day, u1) for day in range(3)]
+    # unchanged events are kept as they were exported
+    assert events[0] == previous_events[0]
+
+    # shifts changed, all events are refreshed
+    on_call_shift.add_rolling_users([[u2]])
+    schedule.refresh_ical_file()
+    events, datetime_start = _refresh(3)
+    assert datetime_start == today
+    assert [e[:4] for e in events[:3]] == [_expected_event(day, u2) for day in range(3)]
+    cancelled = [e[:4] for e in events[3:]]
+    assert cancelled == [(u1.username, e[1], e[1], ICAL_STATUS_CANCELLED) for e in cancelled]
+    assert len(cancelled) == 3
+
+
+@pytest.mark.django_db
+def test_refresh_ical_final_schedule_recorded_shift_change(
+    make_organization,
+    make_user_for_organization,
+    make_schedule,
+    make_on_call_shift,
+):
+    organization = make_organization()
+    u1 = make_user_for_organization(organization)
+    u2 = make_user_for_organization(organization)
+
+    today = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    schedule = make_schedule(organization, schedule_class=OnCallScheduleWeb)
+    on_call_shift = make_on_call_shift(
+        organization=organization,
+        shift_type=CustomOnCallShift.TYPE_ROLLING_USERS_EVENT,
+        start=today + timezone.timedelta(hours=20),
+        rotation_start=today + timezone.timedelta(hours=20),
+        duration=timezone.timedelta(hours=8),
+        frequency=CustomOnCallShift.FREQUENCY_DAILY,
+        schedule=schedule,
+    )
+    on_call_shift.add_rolling_users([[u1]])
+    schedule.refresh_ical_file()
+
+    def _refresh():
+        # iCal files are refreshed on another schedule instance by the shift
+        schedule.refresh_from_db()
+        with patch("apps.schedules.models.on_call_schedule.EXPORT_WINDOW_DAYS_AFTER", 3):
+            with patch("apps.schedules.models.on_call_schedule.EXPORT_WINDOW_DAYS_BEFORE", 0):
+                with patch.object(
+                    OnCallScheduleWeb, "final_events", autospec=True, side_effect=OnCallScheduleWeb.final_events
+                ) as mock_final_events:
+                    schedule.refresh_ical_final_schedule()
+        calendar = icalendar.Calendar.from_ical(schedule.cached_ical_final_schedule)
+        events = [
+            (
+                component[ICAL_SUMMARY],
+                component[ICAL_DATETIME_START].dt,
+                component[ICAL_DATETIME_END].dt,
+                component.get(ICAL_STATUS),
+                component[ICAL_LAST_MODIFIED].dt,
+            )
+            for component in calendar.walk()
+            if component.name == ICAL_COMPONENT_VEVENT
+        ]
+        return events, [call_args[0][1:] for call_args in mock_final_events.call_args_list]
+
+    def _expected_event(user, start, hours):
+        return (user.username, start, start + timezone.timedelta(hours=hours), None)
+
+    previous_events, _ = _refresh()
+    assert [e[:4] for e in previous_events] == [
+        _expected_event(u1, today + timezone.timedelta(days=day, hours=20), 8) for day in range(3)
+    ]
+
+    # override created, only its time range is refreshed
+    override_start = today + timezone.timedelta(days=1, hours=10)
+    override = make_on_call_shift(
+        organization=organization,
+        shift_type=CustomOnCallShift.TYPE_OVERRIDE,
+        start=override_start,
+        rotation_start=override_start,
+        duration=timezone.timedelta(hours=2),
+        schedule=schedule,
+    )
+    override.add_rolling_users([[u2]])
+    with patch("apps.schedules.models.custom_on_call_shift.refresh_ical_final_schedule"):
+        override.refresh_schedule(changed_range=override.events_range)
+
+    events, final_events_calls = _refresh()
+    assert final_events_calls == [
+        (override_start - timezone.timedelta(hours=1), override_start + timezone.timedelta(hours=3))
+    ]
+    assert [e[:4] for e in events] == [
+        _expected_event(u1, today + timezone.timedelta(hours=20), 8),
+        _expected_event(u2, override_start, 2),
+        _expected_event(u1, today + timezone.timedelta(days=1, hours=20), 8),
+        _expected_event(u1, today + timezone.timedelta(days=2, hours=20), 8),
+    ]
+    # events outside of the changed range are kept as they were exported
+    assert [events[0]] + events[2:] == previous_events
+
+    # shifts changed without recording the change, all events are refreshed
+    override.add_rolling_users([[u1]])
+    schedule.refresh_ical_file()
+    _, final_events_calls = _refresh()
+    assert final_events_calls == [(today, today + timezone.timedelta(days=2, hours=23, minutes=59, seconds=59))]
+
+
+@pytest.mark.django_db
+def test_final_schedule_users_fingerprint(
+    make_organization,
+    make_user_for_organization,
+    make_schedule,
+    django_capture_on_commit_callbacks,
+    django_assert_num_queries,
+):
+    organization = make_organization()
+    user = make_user_for_organization(organization)
+    schedule = make_schedule(organization, schedule_class=OnCallScheduleWeb)
+    other_schedule = make_schedule(organization, schedule_class=OnCallScheduleWeb)
+
+    fingerprint = get_final_schedule_fingerprint(schedule)
+    # users fingerprint is computed once per organization
+    with django_assert_num_queries(1):
+        assert get_final_schedule_fingerprint(other_schedule)["users"] == fingerprint["users"]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        user.username = "updated"
+        user.save(update_fields=["username"])
+    updated_fingerprint = get_final_schedule_fingerprint(schedule)
+    assert updated_fingerprint["users"] != fingerprint["users"]
+    assert updated_fingerprint["ical"] == fingerprint["ical"]
+
+
 @pytest.mark.django_db
 def test_refresh_ical_final_schedule_cancel_deleted_events(
     make_organization,
@@ -2799,3 +3025,29 @@ def test_shifts_for_user_without_final_ical(
     assert len(passed_shifts) == 0
     assert len(current_shifts) == 0
     assert len(upcoming_shifts) == 0
+
+
+@pytest.mark.django_db
+def test_get_icalendars_parsed_calendar_cache(make_organization, make_schedule, get_ical):
+    organization = make_organization()
+    ical_file = get_ical("calendar_with_all_day_event.ics").to_ical().decode()
+    updated_ical_file = get_ical("calendar_with_edited_recurring_events.ics").to_ical().decode()
+    schedule = make_schedule(
+        organization,
+        schedule_class=OnCallScheduleICal,
+        cached_ical_file_primary=ical_file,
+        cached_ical_file_overrides="",
+    )
+
+    with patch("icalendar.Calendar.from_ical", wraps=icalendar.Calendar.from_ical) as mock_from_ical:
+        calendar_primary, calendar_overrides = schedule.get_icalendars()
+        assert calendar_overrides is None
+        # the calendar is parsed only once while the iCal source doesn't change
+        assert OnCallScheduleICal.objects.get(pk=schedule.pk).get_icalendars()[0] is calendar_primary
+        assert mock_from_ical.call_count == 1
+
+        schedule.cached_ical_file_primary = updated_ical_file
+        schedule.save(update_fields=["cached_ical_file_primary"])
+        updated_calendar_primary, _ = OnCallScheduleICal.objects.get(pk=schedule.pk).get_icalendars()
+        assert mock_from_ical.call_count == 2
+        assert updated_calendar_primary is not calendar_primary
@@ -0,0 +1,188 @@
+import datetime
+from unittest.mock import patch
+
+import pytest
+from django.utils import timezone
+
+from apps.schedules.ical_utils import (
+    get_oncall_users_for_multiple_schedules,
+    list_users_to_notify_from_ical,
+    list_users_to_notify_from_ical_for_period,
+)
+from apps.schedules.models import CustomOnCallShift, OnCallScheduleWeb
+from apps.schedules.oncall_timeline import (
+    OnCallTimeline,
+    get_oncall_usernames_for_multiple_schedules,
+    is_oncall_timeline_up_to_date,
+    refresh_oncall_timeline,
+)
+
+
+@pytest.fixture
+def make_web_schedule_with_shifts(make_organization, make_user_for_organization, make_schedule, make_on_call_shift):
+    def _make_web_schedule_with_shifts():
+        organization = make_organization()
+        users = [make_user_for_organization(organization) for _ in range(4)]
+        schedule = make_schedule(organization, schedule_class=OnCallScheduleWeb)
+        start = timezone.now().replace(minute=0, second=0, microsecond=0) - timezone.timedelta(hours=5)
+
+        # L0: 12h shifts rotating 2 users, L1: 2h daily shift, override: 1h
+        for shift_start, duration, priority_level, rolling_users in (
+            (start, timezone.timedelta(hours=12), 0, [[users[0]], [users[1]]]),
+            (start + timezone.timedelta(hours=3), timezone.timedelta(hours=2), 1, [[users[2]]]),
+        ):
+            on_call_shift = make_on_call_shift(
+                organization=organization,
+                shift_type=CustomOnCallShift.TYPE_ROLLING_USERS_EVENT,
+                start=shift_start,
+                rotation_start=shift_start,
+                duration=duration,
+                priority_level=priority_level,
+                frequency=CustomOnCallShift.FREQUENCY_DAILY,
+                interval=1,
+                schedule=schedule,
+            )
+            on_call_shift.add_rolling_users(rolling_users)
+
+        override = make_on_call_shift(
+            organization=organization,
+            shift_type=CustomOnCallShift.TYPE_OVERRIDE,
+            start=start + timezone.timedelta(hours=7),
+            rotation_start=start + timezone.timedelta(hours=7),
+            duration=timezone.timedelta(hours=1),
+            schedule=schedule,
+        )
+        override.add_rolling_users([[users[3]]])
+        return schedule
+
+    return _make_web_schedule_with_shifts
+
+
+def test_oncall_timeline_usernames_at():
+    timeline = OnCallTimeline(
+        version="v",
+        built_at=0,
+        start=0,
+        end=100,
+        intervals=[(0, 50, ["a"]), (10, 20, ["b"]), (20, 30, ["c", "d"]), (60, 70, ["e"])],
+        max_interval_duration=50,
+    )
+
+    assert timeline.usernames_at(1) == ["a"]
+    assert sorted(timeline.usernames_at(15)) == ["a", "b"]
+    # intervals are open, same as final_events(dt, dt)
+    assert timeline.usernames_at(0) == []
+    assert timeline.usernames_at(20) == ["a"]
+    assert sorted(timeline.usernames_at(21)) == ["a", "c", "d"]
+    assert timeline.usernames_at(50) == []
+    assert timeline.usernames_at(55) == []
+    assert timeline.usernames_at(65) == ["e"]
+
+
+@pytest.mark.django_db
+def test_oncall_timeline_matches_final_events(make_web_schedule_with_shifts):
+    schedule = make_web_schedule_with_shifts()
+    refresh_oncall_timeline(schedule)
+
+    now = timezone.now()
+    datetimes = [now + timezone.timedelta(minutes=20 * i, seconds=7) for i in range(3 * 24 * 3)]
+    # at and around shift boundaries
+    for event in schedule.final_events(now, now + timezone.timedelta(days=3)):
+        for dt in (event["start"], event["end"]):
+            datetimes += [dt - timezone.timedelta(seconds=1), dt, dt + timezone.timedelta(seconds=1)]
+
+    for dt in datetimes:
+        if dt < now:
+            continue
+        expected_usernames = sorted(user["email"] for event in schedule.final_events(dt, dt) for user in event["users"])
+        assert sorted(get_oncall_usernames_for_multiple_schedules([schedule], dt)[schedule]) == expected_usernames, dt
+
+
+@pytest.mark.django_db
+def test_list_users_to_notify_from_ical_uses_oncall_timeline(make_web_schedule_with_shifts):
+    schedule = make_web_schedule_with_shifts()
+    expected_users = list_users_to_notify_from_ical(schedule)
+    assert len(expected_users) == 1
+
+    refresh_oncall_timeline(schedule)
+    with patch.object(OnCallScheduleWeb, "final_events") as mock_final_events:
+        assert list_users_to_notify_from_ical(schedule) == expected_users
+    mock_final_events.assert_not_called()
+
+    # times outside of the timeline window are resolved from the final events
+    with patch.object(OnCallScheduleWeb, "final_events", return_value=[]) as mock_final_events:
+        assert list_users_to_notify_from_ical(schedule, timezone.now() - timezone.timedelta(days=1)) == []
+    mock_final_events.assert_called_once()
+
+
+@pytest.mark.django_db
+def test_oncall_timeline_invalidated_on_schedule_save(make_web_schedule_with_shifts):
+    schedule = make_web_schedule_with_shifts()
+    refresh_oncall_timeline(schedule)
+    now = timezone.now()
+    assert schedule in get_oncall_usernames_for_multiple_schedules([schedule], now)
+
+    schedule.save()
+    assert get_oncall_usernames_for_multiple_schedules([schedule], now) == {}
+
+    refresh_oncall_timeline(schedule)
+    assert schedule in get_oncall_usernames_for_multiple_schedules([schedule], timezone.now())
+
+
+@pytest.mark.django_db
+def test_oncall_timeline_invalidated_on_shift_swap_request_change(
+    make_web_schedule_with_shifts, make_user_for_organization, make_shift_swap_request
+):
+    schedule = make_web_schedule_with_shifts()
+    beneficiary = make_user_for_organization(schedule.organization)
+    refresh_oncall_timeline(schedule)
+    now = timezone.now()
+
+    swap_request = make_shift_swap_request(
+        schedule,
+        beneficiary,
+        swap_start=now + datetime.timedelta(days=1),
+        swap_end=now + datetime.timedelta(days=2),
+    )
+    assert get_oncall_usernames_for_multiple_schedules([schedule], now) == {}
+
+    refresh_oncall_timeline(schedule)
+    swap_request.hard_delete()
+    assert get_oncall_usernames_for_multiple_schedules([schedule], now) == {}
+
+
+@pytest.mark.django_db
+def test_oncall_timeline_shift_end_boundary(make_web_schedule_with_shifts):
+    schedule = make_web_schedule_with_shifts()
+    refresh_oncall_timeline(schedule)
+
+    now = timezone.now()
+    shift_end = next(e["end"] for e in schedule.final_events(now, now + timezone.timedelta(days=1)) if e["users"])
+    fallback_users = list_users_to_notify_from_ical_for_period(schedule, shift_end, shift_end)
+    assert schedule in get_oncall_usernames_for_multiple_schedules([schedule], shift_end)
+    assert get_oncall_users_for_multiple_schedules([schedule], shift_end)[schedule] == fallback_users
+
+
+@pytest.mark.django_db
+def test_oncall_timeline_not_invalidated_by_unchanged_ical_refresh(make_web_schedule_with_shifts):
+    schedule = make_web_schedule_with_shifts()
+    schedule.refresh_ical_file()
+    refresh_oncall_timeline(schedule)
+    assert is_oncall_timeline_up_to_date(schedule.pk)
+
+    # iCal files regenerated from the same shifts
+    schedule.refresh_ical_file()
+    assert is_oncall_timeline_up_to_date(schedule.pk)
+
+    schedule.save(update_fields=["name"])
+    assert not is_oncall_timeline_up_to_date(schedule.pk)
+
+
+@pytest.mark.django_db
+def test_oncall_timeline_max_age(make_web_schedule_with_shifts):
+    schedule = make_web_schedule_with_shifts()
+    refresh_oncall_timeline(schedule)
+    now = timezone.now()
+
+    with patch("apps.schedules.oncall_timeline.SCHEDULE_ONCALL_TIMELINE_MAX_AGE", -1):
+        assert get_oncall_usernames_for_multiple_schedules([schedule], now) == {}
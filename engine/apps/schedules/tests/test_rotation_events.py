@@ -0,0 +1,179 @@
+import datetime
+import random
+from unittest.mock import patch
+
+import pytest
+
+from apps.api.permissions import LegacyAccessControlRole
+from apps.schedules.ical_utils import list_of_oncall_shifts_from_ical
+from apps.schedules.models import CustomOnCallShift, OnCallSchedule, OnCallScheduleWeb
+from apps.schedules.rotation_events import clear_rotation_events_cache
+
+TIME_ZONES = [None, "UTC", "Etc/UTC", "Europe/Amsterdam", "America/New_York", "Asia/Kolkata"]
+WEEKDAYS = list(CustomOnCallShift.ICAL_WEEKDAY_MAP.values())
+# windows include DST changes in Europe (2024-03-31, 2024-10-27) and in the US (2024-03-10, 2024-11-03)
+WINDOWS = [
+    (datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc), datetime.datetime(2024, 3, 1)),
+    (datetime.datetime(2024, 3, 8, 12, tzinfo=datetime.timezone.utc), datetime.datetime(2024, 4, 3)),
+    (datetime.datetime(2024, 10, 26, tzinfo=datetime.timezone.utc), datetime.datetime(2024, 11, 5)),
+    (datetime.datetime(2024, 2, 14, 10, 30, tzinfo=datetime.timezone.utc), datetime.datetime(2024, 2, 14, 10, 30)),
+]
+
+
+def _get_shifts(schedule, datetime_start, datetime_end, with_empty_shifts):
+    shifts = list_of_oncall_shifts_from_ical(
+        schedule, datetime_start, datetime_end, with_empty_shifts=with_empty_shifts
+    )
+    return [
+        (
+            shift["start"],
+            shift["end"],
+            [user.pk for user in shift["users"]],
+            shift["missing_users"],
+            shift["priority"],
+            shift["source"],
+            shift["calendar_type"],
+            shift["shift_pk"],
+        )
+        for shift in shifts or []
+    ]
+
+
+def _get_random_shift_data(rnd, schedule, users):
+    start = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc) + datetime.timedelta(
+        days=rnd.randint(0, 60), hours=rnd.randint(4, 21), minutes=rnd.choice([0, 30]), microseconds=rnd.randint(0, 9)
+    )
+    data = {
+        "type": rnd.choice([CustomOnCallShift.TYPE_ROLLING_USERS_EVENT, CustomOnCallShift.TYPE_OVERRIDE]),
+        "schedule": schedule,
+        "start": start,
+        "rotation_start": start + datetime.timedelta(days=rnd.choice([0, 0, 1, 5, 20]), hours=rnd.choice([0, 3])),
+        "duration": datetime.timedelta(hours=rnd.choice([1, 2, 8, 12, 24, 36])),
+        "source": rnd.choice([CustomOnCallShift.SOURCE_WEB, CustomOnCallShift.SOURCE_API]),
+        "time_zone": rnd.choice(TIME_ZONES),
+        "rolling_users": [
+            {user.pk: user.public_primary_key for user in rnd.sample(users, rnd.randint(1, 2))}
+            for _ in range(rnd.randint(1, 3))
+        ],
+    }
+    if data["type"] == CustomOnCallShift.TYPE_ROLLING_USERS_EVENT:
+        frequency = rnd.choice(
+            [
+                None,
+                CustomOnCallShift.FREQUENCY_HOURLY,
+                CustomOnCallShift.FREQUENCY_DAILY,
+                CustomOnCallShift.FREQUENCY_WEEKLY,
+                CustomOnCallShift.FREQUENCY_MONTHLY,
+            ]
+        )
+        data["priority_level"] = rnd.randint(0, 3)
+        data["frequency"] = frequency
+        data["interval"] = rnd.randint(1, 3)
+        data["week_start"] = rnd.randint(0, 6)
+        data["start_rotation_from_user_index"] = rnd.choice([None, 0, 1])
+        if frequency == CustomOnCallShift.FREQUENCY_HOURLY:
+            data["duration"] = datetime.timedelta(minutes=rnd.choice([30, 60]))
+        if frequency in (CustomOnCallShift.FREQUENCY_DAILY, CustomOnCallShift.FREQUENCY_WEEKLY) and rnd.random() < 0.5:
+            data["by_day"] = rnd.sample(WEEKDAYS, rnd.randint(1, 4))
+        if frequency == CustomOnCallShift.FREQUENCY_MONTHLY and rnd.random() < 0.5:
+            data["by_monthday"] = sorted(rnd.sample(range(1, 29), 2))
+        if frequency is not None and rnd.random() < 0.4:
+            data["until"] = start + datetime.timedelta(days=rnd.randint(1, 300), hours=rnd.randint(0, 23))
+    return data
+
+
+def _make_random_shifts(rnd, organization, schedule, users, make_on_call_shift, count):
+    for _ in range(count):
+        data = _get_random_shift_data(rnd, schedule, users)
+        make_on_call_shift(organization=organization, shift_type=data.pop("type"), **data)
+
+
+@pytest.mark.parametrize("seed", range(8))
+@pytest.mark.django_db
+def test_rotation_events_same_as_ical_events(
+    settings, make_organization, make_user_for_organization, make_schedule, make_on_call_shift, seed
+):
+    rnd = random.Random(seed)
+    organization = make_organization()
+    users = [make_user_for_organization(organization) for _ in range(3)]
+    # viewers are not notified, their shifts are empty
+    users.append(make_user_for_organization(organization, role=LegacyAccessControlRole.VIEWER))
+    schedule = make_schedule(organization, schedule_class=OnCallScheduleWeb, time_zone=rnd.choice(TIME_ZONES[1:]))
+    _make_random_shifts(rnd, organization, schedule, users, make_on_call_shift, 8)
+
+    for datetime_start, datetime_end in WINDOWS:
+        datetime_end = datetime_end.replace(tzinfo=datetime.timezone.utc)
+        for with_empty_shifts in (False, True):
+            settings.FEATURE_WEB_SCHEDULE_NATIVE_SHIFT_EXPANSION_ENABLED = False
+            assert schedule.get_rotation_events() is None
+            expected = _get_shifts(schedule, datetime_start, datetime_end, with_empty_shifts)
+
+            settings.FEATURE_WEB_SCHEDULE_NATIVE_SHIFT_EXPANSION_ENABLED = True
+            assert schedule.get_rotation_events() is not None
+            assert _get_shifts(schedule, datetime_start, datetime_end, with_empty_shifts) == expected
+
+
+@pytest.mark.parametrize("seed", range(4))
+@pytest.mark.django_db
+def test_preview_shift_rotation_events_same_as_ical_events(
+    settings, make_organization, make_user_for_organization, make_schedule, make_on_call_shift, seed
+):
+    rnd = random.Random(seed)
+    organization = make_organization()
+    users = [make_user_for_organization(organization) for _ in range(3)]
+    schedule = make_schedule(organization, schedule_class=OnCallScheduleWeb)
+    _make_random_shifts(rnd, organization, schedule, users, make_on_call_shift, 4)
+    new_shift = CustomOnCallShift(organization=organization, **_get_random_shift_data(rnd, schedule, users))
+
+    datetime_start = datetime.datetime(2024, 2, 1, tzinfo=datetime.timezone.utc)
+    datetime_end = datetime.datetime(2024, 2, 15, tzinfo=datetime.timezone.utc)
+    settings.FEATURE_WEB_SCHEDULE_NATIVE_SHIFT_EXPANSION_ENABLED = False
+    expected = schedule.preview_shift(new_shift, datetime_start, datetime_end)
+    settings.FEATURE_WEB_SCHEDULE_NATIVE_SHIFT_EXPANSION_ENABLED = True
+    assert schedule.preview_shift(new_shift, datetime_start, datetime_end) == expected
+    assert schedule._preview_shifts is None
+
+
+@pytest.mark.django_db
+def test_rotation_events_cached(make_organization, make_user_for_organization, make_schedule, make_on_call_shift):
+    clear_rotation_events_cache()
+    organization = make_organization()
+    user = make_user_for_organization(organization)
+    schedule = make_schedule(organization, schedule_class=OnCallScheduleWeb)
+    start = datetime.datetime(2024, 1, 1, 9, tzinfo=datetime.timezone.utc)
+    on_call_shift = make_on_call_shift(
+        organization=organization,
+        shift_type=CustomOnCallShift.TYPE_ROLLING_USERS_EVENT,
+        schedule=schedule,
+        start=start,
+        rotation_start=start,
+        duration=datetime.timedelta(hours=8),
+        frequency=CustomOnCallShift.FREQUENCY_DAILY,
+    )
+    on_call_shift.add_rolling_users([[user]])
+
+    with patch.object(
+        OnCallScheduleWeb,
+        "_generate_rotation_events_from_shifts",
+        autospec=True,
+        side_effect=OnCallScheduleWeb._generate_rotation_events_from_shifts,
+    ) as mock_generate:
+        rotation_events_primary, rotation_events_overrides = schedule.get_rotation_events()
+        assert len(rotation_events_primary) == 1
+        assert rotation_events_overrides is None
+        # rotation events are reused until the schedule iCal file changes
+        schedule = OnCallScheduleWeb.objects.get(pk=schedule.pk)
+        assert schedule.get_rotation_events() == (rotation_events_primary, None)
+        assert mock_generate.call_count == 1
+
+        on_call_shift.add_rolling_users([[user], [user]])
+        schedule.refresh_ical_file()
+        schedule = OnCallScheduleWeb.objects.get(pk=schedule.pk)
+        rotation_events_primary, _ = schedule.get_rotation_events()
+        assert len(rotation_events_primary) == 2
+        assert mock_generate.call_count == 2
+
+    events = schedule.filter_events(start, start + datetime.timedelta(days=2), filter_by=OnCallSchedule.PRIMARY)
+    assert [(e["start"], e["end"]) for e in events] == [
+        (start + datetime.timedelta(days=i), start + datetime.timedelta(days=i, hours=8)) for i in range(2)
+    ]
@@ -3,7 +3,7 @@ import logging
 from django.urls import reverse
 
 from apps.alerts.models import BundledNotification
-from apps.alerts.tasks import send_update_log_report_signal
+from apps.alerts.tasks import schedule_update_log_report_signal
 from apps.twilioapp.models import TwilioCallStatuses, TwilioPhoneCall, TwilioSMS, TwilioSMSstatuses
 from common.api_helpers.utils import create_engine_url
 
@@ -154,9 +154,7 @@ def update_twilio_sms_status(message_sid, message_status):
                     )
                     log_records_to_create.append(log_record)
                     # send send_update_log_report_signal with 10 seconds delay
-                    send_update_log_report_signal.apply_async(
-                        kwargs={"alert_group_pk": notification.alert_group_id}, countdown=10
-                    )
+                    schedule_update_log_report_signal(notification.alert_group_id, countdown=10)
                 UserNotificationPolicyLogRecord.objects.bulk_create(log_records_to_create, batch_size=5000)
                 logger.info(
                     f"twilioapp.update_twilio_sms_status: created log_records for sms bundle "
@@ -7,10 +7,13 @@ from django.conf import settings
 from django.core.validators import MinLengthValidator
 from django.db import models
 from django.db.models import Count, JSONField, Q
+from django.db.models.signals import post_save
+from django.dispatch import receiver
 from django.utils import timezone
 from mirage import fields as mirage_fields
 
 from apps.alerts.models import MaintainableObject
+from apps.auth_token.auth_cache import invalidate_organization_auth_cache
 from apps.chatops_proxy.utils import (
     register_oncall_tenant_with_async_fallback,
     unlink_slack_team,
@@ -70,7 +73,10 @@ class OrganizationQuerySet(models.QuerySet):
 
     def delete(self):
         # Be careful with deleting via queryset - it doesn't delete chatops-proxy connectors.
+        organization_ids = list(self.values_list("id", flat=True))
         self.update(deleted_at=timezone.now())
+        for organization_id in organization_ids:
+            invalidate_organization_auth_cache(organization_id)
 
     def hard_delete(self):
         super().delete()
@@ -380,3 +386,9 @@ class Organization(MaintainableObject):
     @property
     def is_moved(self):
         return self.migration_destination_id is not None
+
+
+@receiver(post_save, sender=Organization)
+def listen_for_organization_model_save(sender: Organization, instance: Organization, *args, **kwargs) -> None:
+    # cached authentication results depend on organization settings (e.g. RBAC status, deleted or moved state)
+    invalidate_organization_auth_cache(instance.pk)
@@ -20,8 +20,10 @@ from apps.api.permissions import (
     RBACPermission,
     user_is_authorized,
 )
+from apps.auth_token.auth_cache import invalidate_organization_auth_cache
 from apps.google import utils as google_utils
 from apps.google.models import GoogleOAuth2User
+from apps.schedules.final_schedule_export import invalidate_users_fingerprint
 from apps.schedules.tasks import drop_cached_ical_for_custom_events_for_organization
 from apps.user_management.types import AlertGroupTableColumn, GoogleCalendarSettings
 from common.public_primary_keys import generate_public_primary_key, increase_public_primary_key_length
@@ -88,7 +90,12 @@ class UserQuerySet(models.QuerySet):
 
     def delete(self):
         # is_active = None is used to be able to have multiple deleted users with the same user_id
-        return super().update(is_active=None)
+        organization_ids = set(self.values_list("organization_id", flat=True))
+        result = super().update(is_active=None)
+        for organization_id in organization_ids:
+            invalidate_organization_auth_cache(organization_id)
+            invalidate_users_fingerprint(organization_id)
+        return result
 
     def hard_delete(self):
         return super().delete()
@@ -426,6 +433,10 @@ class User(models.Model):
 # TODO: check whether this signal can be moved to save method of the model
 @receiver(post_save, sender=User)
 def listen_for_user_model_save(sender: User, instance: User, created: bool, *args, **kwargs) -> None:
+    # cached authentication results include the user's role and permissions
+    invalidate_organization_auth_cache(instance.organization_id)
+    # exported final schedules depend on the organization users
+    invalidate_users_fingerprint(instance.organization_id)
     drop_cached_ical_for_custom_events_for_organization.apply_async(
         (instance.organization_id,),
     )
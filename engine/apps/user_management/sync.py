@@ -8,11 +8,13 @@ from django.utils import timezone
 
 from apps.alerts.models import AlertReceiveChannel
 from apps.api.permissions import LegacyAccessControlRole
+from apps.auth_token.auth_cache import invalidate_organization_auth_cache
 from apps.auth_token.exceptions import InvalidToken
 from apps.grafana_plugin.helpers.client import GcomAPIClient, GCOMInstanceInfo, GrafanaAPIClient
 from apps.grafana_plugin.sync_data import SyncData, SyncPermission, SyncSettings, SyncTeam, SyncUser
 from apps.metrics_exporter.helpers import metrics_bulk_update_team_label_cache
 from apps.metrics_exporter.metrics_cache_manager import MetricsCacheManager
+from apps.schedules.final_schedule_export import invalidate_users_fingerprint
 from apps.user_management.models import Organization, Team, User
 from common.utils import task_lock
 from settings.base import CLOUD_LICENSE_NAME, OPEN_SOURCE_LICENSE_NAME
@@ -368,6 +370,10 @@ def _sync_users_data(organization: Organization, sync_users: list[SyncUser], del
         user_ids_to_delete = existing_user_ids - {user.id for user in sync_users}
         organization.users.filter(user_id__in=user_ids_to_delete).delete()
 
+    # users are updated in bulk, without sending post_save
+    invalidate_organization_auth_cache(organization.pk)
+    invalidate_users_fingerprint(organization.pk)
+
 
 def _sync_teams_data(organization: Organization, sync_teams: list[SyncTeam] | None):
     if sync_teams is None:
@@ -13,8 +13,11 @@ from django.db.models.signals import post_save
 from django.dispatch import receiver
 from django.utils import timezone
 from mirage import fields as mirage_fields
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
+from urllib3 import HTTPConnectionPool, HTTPSConnectionPool
 
+from apps.metrics_exporter.counters import Counters
 from apps.webhooks.utils import (
     InvalidWebhookData,
     InvalidWebhookHeaders,
@@ -22,6 +25,7 @@ from apps.webhooks.utils import (
     InvalidWebhookUrl,
     apply_jinja_template_for_json,
     parse_url,
+    validate_url,
 )
 from common.jinja_templater import apply_jinja_template
 from common.jinja_templater.apply_jinja_template import JinjaTemplateError, JinjaTemplateWarning
@@ -53,11 +57,82 @@ def generate_public_primary_key_for_webhook():
     return new_public_primary_key
 
 
+webhook_connection_counters = Counters(
+    "outgoing_webhook_connections",
+    {
+        "requests": "Number of outgoing webhook requests sent",
+        "opened": "Number of outgoing webhook connections opened, requests not opening one reused a pooled connection",
+    },
+)
+
+
+class _CountingHTTPConnectionPool(HTTPConnectionPool):
+    def _new_conn(self):
+        webhook_connection_counters.add(opened=1)
+        return super()._new_conn()
+
+
+class _CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    def _new_conn(self):
+        webhook_connection_counters.add(opened=1)
+        return super()._new_conn()
+
+
+class WebhookHTTPAdapter(HTTPAdapter):
+    """
+    Sends requests to the IP address validated by `WebhookSession.send` instead of resolving the hostname again.
+    Connection pools are keyed by the IP address and the hostname, which is still used for TLS SNI and certificate
+    verification. Sent requests and opened connections are counted, to monitor connection reuse.
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _CountingHTTPConnectionPool,
+            "https": _CountingHTTPSConnectionPool,
+        }
+
+    def send(self, request, *args, **kwargs):
+        webhook_connection_counters.add(requests=1)
+        return super().send(request, *args, **kwargs)
+
+    def build_connection_pool_key_attributes(self, request, verify, cert=None):
+        host_params, pool_kwargs = super().build_connection_pool_key_attributes(request, verify, cert)
+        ip_address = getattr(request, "validated_ip_address", None)
+        if ip_address is not None:
+            if host_params["scheme"] == "https":
+                pool_kwargs["server_hostname"] = host_params["host"]
+                pool_kwargs["assert_hostname"] = host_params["host"]
+            host_params["host"] = ip_address
+        return host_params, pool_kwargs
+
+
+# keep-alive connections are shared by all outgoing webhook requests of the process
+_http_adapter = WebhookHTTPAdapter(
+    pool_connections=settings.OUTGOING_WEBHOOK_POOL_CONNECTIONS,
+    pool_maxsize=settings.OUTGOING_WEBHOOK_POOL_MAXSIZE,
+)
+
+
 class WebhookSession(requests.Session):
+    def __init__(self, dangerous_webhooks_enabled: typing.Optional[bool] = None):
+        super().__init__()
+        self.mount("http://", _http_adapter)
+        self.mount("https://", _http_adapter)
+        self.dangerous_webhooks_enabled = dangerous_webhooks_enabled
+
     def send(self, request, **kwargs):
-        parse_url(request.url)  # validate URL on every redirect
+        # validate URL on every redirect
+        parsed_url, request.validated_ip_address = validate_url(request.url, self.dangerous_webhooks_enabled)
+        if request.validated_ip_address is not None:
+            # the connection is made to the IP address, the Host header must still match the url
+            request.headers["Host"] = parsed_url.netloc.rpartition("@")[2]
         return super().send(request, **kwargs)
 
+    def close(self):
+        # connection pools are shared by all sessions and are kept open
+        pass
+
 
 class WebhookQueryset(models.QuerySet):
     def delete(self):
@@ -281,11 +356,15 @@ class Webhook(models.Model):
         except (JinjaTemplateError, JinjaTemplateWarning) as e:
             raise InvalidWebhookTrigger(e.fallback_message)
 
-    def make_request(self, url, request_kwargs):
+    def make_request(self, url, request_kwargs, dangerous_webhooks_enabled: typing.Optional[bool] = None):
+        """
+        Send the webhook request. Unless `dangerous_webhooks_enabled` is passed, the DANGEROUS_WEBHOOKS_ENABLED live
+        setting is read from the database to validate the url.
+        """
         if self.http_method not in ("GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"):
             raise ValueError(f"Unsupported http method: {self.http_method}")
 
-        with WebhookSession() as session:
+        with WebhookSession(dangerous_webhooks_enabled) as session:
             response = session.request(
                 self.http_method, url, timeout=settings.OUTGOING_WEBHOOK_TIMEOUT, **request_kwargs
             )
@@ -1,17 +1,21 @@
 import json
 import logging
 import typing
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from json import JSONDecodeError
 
 import requests
 from celery.utils.log import get_task_logger
 from django.conf import settings
+from django.db import connection
 from django.db.models import Prefetch
+from django.db.models.signals import post_save
 from django.utils import timezone
 
 from apps.alerts.models import AlertGroup, AlertGroupLogRecord, EscalationPolicy
 from apps.base.models import UserNotificationPolicyLogRecord
+from apps.base.utils import live_settings
 from apps.user_management.models import User
 from apps.webhooks.models import Webhook, WebhookResponse
 from apps.webhooks.models.webhook import WEBHOOK_FIELD_PLACEHOLDER
@@ -21,6 +25,7 @@ from apps.webhooks.utils import (
     InvalidWebhookHeaders,
     InvalidWebhookTrigger,
     InvalidWebhookUrl,
+    serialize_alert_group_event_data,
     serialize_event,
 )
 from common.custom_celery_tasks import shared_dedicated_queue_retry_task
@@ -60,6 +65,10 @@ class WebhookRequestStatus(typing.TypedDict):
     event_data: str
 
 
+# (triggered, status, error, exception)
+WebhookRequestResult = typing.Tuple[bool, WebhookRequestStatus, typing.Optional[str], typing.Optional[Exception]]
+
+
 @shared_dedicated_queue_retry_task(
     autoretry_for=(Exception,), retry_backoff=True, max_retries=1 if settings.DEBUG else None
 )
@@ -80,6 +89,10 @@ def send_webhook_event(trigger_type, alert_group_id, organization_id=None, user_
     if is_backsync:
         webhooks_qs = webhooks_qs.filter(is_from_connected_integration=False)
 
+    if settings.OUTGOING_WEBHOOK_FAN_OUT_ENABLED:
+        execute_webhooks(list(webhooks_qs), alert_group_id, user_id, trigger_type)
+        return
+
     for webhook in webhooks_qs:
         execute_webhook.apply_async((webhook.pk, alert_group_id, user_id, None), kwargs={"trigger_type": trigger_type})
 
@@ -88,9 +101,50 @@ def _isoformat_date(date_value: datetime) -> typing.Optional[str]:
     return date_value.isoformat() if date_value else None
 
 
+def _get_alert_group(alert_group_id: int) -> typing.Optional[AlertGroup]:
+    personal_log_records = UserNotificationPolicyLogRecord.objects.filter(
+        alert_group_id=alert_group_id,
+        author__isnull=False,
+        type=UserNotificationPolicyLogRecord.TYPE_PERSONAL_NOTIFICATION_SUCCESS,
+    ).select_related("author")
+    return (
+        AlertGroup.objects.prefetch_related(
+            Prefetch("personal_log_records", queryset=personal_log_records, to_attr="sent_notifications")
+        )
+        .select_related("channel")
+        .filter(pk=alert_group_id)
+        .first()
+    )
+
+
+def _get_responses_data(alert_group: AlertGroup) -> typing.Dict[str, typing.Any]:
+    """
+    Return the latest response data per webhook public primary key.
+    """
+    responses_data = {}
+    responses = alert_group.webhook_responses.select_related("webhook").order_by("-timestamp")
+    for r in responses:
+        if r.webhook.public_primary_key not in responses_data:
+            try:
+                response_data = r.json()
+            except JSONDecodeError:
+                response_data = r.content
+            responses_data[r.webhook.public_primary_key] = response_data
+    return responses_data
+
+
 def _build_payload(
-    webhook: Webhook, alert_group: AlertGroup, user: User, trigger_type: int | None
+    webhook: Webhook,
+    alert_group: AlertGroup,
+    user: User,
+    trigger_type: int | None,
+    alert_group_data: typing.Optional[typing.Dict[str, typing.Any]] = None,
+    responses_data: typing.Optional[typing.Dict[str, typing.Any]] = None,
 ) -> typing.Dict[str, typing.Any]:
+    """
+    Build the webhook event data. `alert_group_data` and `responses_data` can be passed in when building the payloads
+    of multiple webhooks triggered by the same event.
+    """
     payload_trigger_type = webhook.trigger_type
     if payload_trigger_type == Webhook.TRIGGER_STATUS_CHANGE and trigger_type is not None:
         # use original trigger type when generating the payload if status change is set
@@ -112,21 +166,15 @@ def _build_payload(
 
     # include latest response data per webhook in the event input data
     # exclude past responses from webhook being executed
-    responses_data = {}
-    responses = (
-        alert_group.webhook_responses.all()
-        .exclude(webhook__public_primary_key=webhook.public_primary_key)
-        .order_by("-timestamp")
-    )
-    for r in responses:
-        if r.webhook.public_primary_key not in responses_data:
-            try:
-                response_data = r.json()
-            except JSONDecodeError:
-                response_data = r.content
-            responses_data[r.webhook.public_primary_key] = response_data
+    if responses_data is None:
+        responses_data = _get_responses_data(alert_group)
+    responses_data = {
+        webhook_pk: response_data
+        for webhook_pk, response_data in responses_data.items()
+        if webhook_pk != webhook.public_primary_key
+    }
 
-    return serialize_event(event, alert_group, user, webhook, responses_data)
+    return serialize_event(event, alert_group, user, webhook, responses_data, alert_group_data=alert_group_data)
 
 
 def mask_authorization_header(
@@ -140,81 +188,274 @@ def mask_authorization_header(
     return masked_headers
 
 
-def make_request(
-    webhook: Webhook, alert_group: AlertGroup, data: typing.Dict[str, typing.Any]
-) -> typing.Tuple[bool, WebhookRequestStatus, typing.Optional[str], typing.Optional[Exception]]:
-    status: WebhookRequestStatus = {
-        "url": None,
-        "request_trigger": None,
-        "request_headers": None,
-        "request_data": None,
-        "status_code": None,
-        "content": None,
-        "webhook": webhook,
-        "event_data": json.dumps(data),
-    }
+def _prepare_request(
+    webhook: Webhook, alert_group: AlertGroup, data: typing.Dict[str, typing.Any], status: WebhookRequestStatus
+) -> typing.Optional[typing.Dict[str, typing.Any]]:
+    """
+    Check whether the webhook is triggered and return its request kwargs, None if it's not triggered.
+    Request details are recorded in `status`.
+    """
     masked_header_keys = ["Authorization"]
+    if webhook.preset:
+        if webhook.preset not in WebhookPresetOptions.WEBHOOK_PRESETS:
+            raise Exception(f"Invalid preset {webhook.preset}")
+        else:
+            preset = WebhookPresetOptions.WEBHOOK_PRESETS[webhook.preset]
+            preset.override_parameters_at_runtime(webhook)
+            masked_header_keys.extend(preset.get_masked_headers())
+
+    if not webhook.check_integration_filter(alert_group):
+        status["request_trigger"] = NOT_FROM_SELECTED_INTEGRATION
+        return None
+
+    triggered, status["request_trigger"] = webhook.check_trigger(data)
+    if not triggered:
+        return None
+
+    status["url"] = webhook.build_url(data)
+    request_kwargs = webhook.build_request_kwargs(data, raise_data_errors=True)
+    display_headers = mask_authorization_header(request_kwargs.get("headers", {}), masked_header_keys)
+    status["request_headers"] = json.dumps(display_headers)
+    if "json" in request_kwargs:
+        status["request_data"] = json.dumps(request_kwargs["json"])
+    else:
+        status["request_data"] = request_kwargs.get("data")
+    return request_kwargs
 
-    exception = error = None
-    try:
-        if webhook.preset:
-            if webhook.preset not in WebhookPresetOptions.WEBHOOK_PRESETS:
-                raise Exception(f"Invalid preset {webhook.preset}")
-            else:
-                preset = WebhookPresetOptions.WEBHOOK_PRESETS[webhook.preset]
-                preset.override_parameters_at_runtime(webhook)
-                masked_header_keys.extend(preset.get_masked_headers())
-
-        if not webhook.check_integration_filter(alert_group):
-            status["request_trigger"] = NOT_FROM_SELECTED_INTEGRATION
-            return False, status, None, None
-
-        triggered, status["request_trigger"] = webhook.check_trigger(data)
-        if triggered:
-            status["url"] = webhook.build_url(data)
-            request_kwargs = webhook.build_request_kwargs(data, raise_data_errors=True)
-            display_headers = mask_authorization_header(request_kwargs.get("headers", {}), masked_header_keys)
-            status["request_headers"] = json.dumps(display_headers)
-            if "json" in request_kwargs:
-                status["request_data"] = json.dumps(request_kwargs["json"])
-            else:
-                status["request_data"] = request_kwargs.get("data")
-            response = webhook.make_request(status["url"], request_kwargs)
-            status["status_code"] = response.status_code
-            content_length = len(response.content)
-            if content_length <= WEBHOOK_RESPONSE_LIMIT:
-                try:
-                    status["content"] = json.dumps(response.json())
-                except JSONDecodeError:
-                    status["content"] = response.content.decode("utf-8")
-            else:
-                status[
-                    "content"
-                ] = f"Response content {content_length} exceeds {WEBHOOK_RESPONSE_LIMIT} character limit"
-
-        return triggered, status, None, None
-    except InvalidWebhookUrl as e:
+
+def _handle_request_exception(status: WebhookRequestStatus, e: Exception) -> WebhookRequestResult:
+    exception = None
+    if isinstance(e, InvalidWebhookUrl):
         status["url"] = error = e.message
-    except InvalidWebhookTrigger as e:
+    elif isinstance(e, InvalidWebhookTrigger):
         status["request_trigger"] = error = e.message
-    except InvalidWebhookHeaders as e:
+    elif isinstance(e, InvalidWebhookHeaders):
         status["request_headers"] = error = e.message
-    except InvalidWebhookData as e:
+    elif isinstance(e, InvalidWebhookData):
         status["request_data"] = error = e.message
-    except requests.exceptions.SSLError as e:
+    elif isinstance(e, requests.exceptions.SSLError):
         # Don't raise an exception for SSL errors, as they are out of our control and retrying
         # isn't going to help. Just show the error to the user and give up
         #
         # from the docs (https://requests.readthedocs.io/en/latest/user/advanced/#ssl-cert-verification)
         # "Requests will throw a SSLError if it’s unable to verify the certificate"
         status["content"] = error = str(e)
-    except Exception as e:
+    else:
         status["content"] = error = str(e)
         exception = e
 
     return True, status, error, exception
 
 
+def _send_request(
+    webhook: Webhook,
+    status: WebhookRequestStatus,
+    request_kwargs: typing.Dict[str, typing.Any],
+    dangerous_webhooks_enabled: typing.Optional[bool] = None,
+) -> WebhookRequestResult:
+    """
+    Send the request prepared by `_prepare_request`. Doesn't access the database if `dangerous_webhooks_enabled` is
+    passed, so it's safe to call from other threads then.
+    """
+    try:
+        response = webhook.make_request(status["url"], request_kwargs, dangerous_webhooks_enabled)
+        status["status_code"] = response.status_code
+        content_length = len(response.content)
+        if content_length <= WEBHOOK_RESPONSE_LIMIT:
+            try:
+                status["content"] = json.dumps(response.json())
+            except JSONDecodeError:
+                status["content"] = response.content.decode("utf-8")
+        else:
+            status["content"] = f"Response content {content_length} exceeds {WEBHOOK_RESPONSE_LIMIT} character limit"
+    except Exception as e:
+        return _handle_request_exception(status, e)
+
+    return True, status, None, None
+
+
+def _new_request_status(webhook: Webhook, data: typing.Dict[str, typing.Any]) -> WebhookRequestStatus:
+    return {
+        "url": None,
+        "request_trigger": None,
+        "request_headers": None,
+        "request_data": None,
+        "status_code": None,
+        "content": None,
+        "webhook": webhook,
+        "event_data": json.dumps(data),
+    }
+
+
+def make_request(webhook: Webhook, alert_group: AlertGroup, data: typing.Dict[str, typing.Any]) -> WebhookRequestResult:
+    status = _new_request_status(webhook, data)
+    try:
+        request_kwargs = _prepare_request(webhook, alert_group, data, status)
+    except Exception as e:
+        return _handle_request_exception(status, e)
+
+    if request_kwargs is None:
+        return False, status, None, None
+    return _send_request(webhook, status, request_kwargs)
+
+
+def _build_log_record(
+    webhook: Webhook,
+    alert_group: AlertGroup,
+    user: typing.Optional[User],
+    status: WebhookRequestStatus,
+    error: typing.Optional[str],
+    response: typing.Optional[WebhookResponse],
+    escalation_policy: typing.Optional[EscalationPolicy] = None,
+    escalation_policy_step: typing.Optional[int] = None,
+) -> AlertGroupLogRecord:
+    error_code = None
+    log_type = AlertGroupLogRecord.TYPE_CUSTOM_WEBHOOK_TRIGGERED
+    trigger_log = TRIGGER_TYPE_TO_LABEL[webhook.trigger_type]
+    if webhook.trigger_type == Webhook.TRIGGER_MANUAL and escalation_policy is None:
+        trigger_log = None  # triggered manually
+    reason = str(status["status_code"])
+    if error is not None:
+        log_type = AlertGroupLogRecord.TYPE_ESCALATION_FAILED
+        error_code = AlertGroupLogRecord.ERROR_ESCALATION_TRIGGER_CUSTOM_WEBHOOK_ERROR
+        reason = error
+
+    return AlertGroupLogRecord(
+        type=log_type,
+        alert_group=alert_group,
+        author=user,
+        reason=reason,
+        step_specific_info={
+            "webhook_name": webhook.name,
+            "webhook_id": webhook.public_primary_key,
+            "trigger": trigger_log,
+            "response_id": response.pk if response else None,
+        },
+        escalation_policy=escalation_policy,
+        escalation_policy_step=escalation_policy_step,
+        escalation_error_code=error_code,
+    )
+
+
+def _create_webhook_responses(responses: typing.List[WebhookResponse]) -> None:
+    if connection.features.can_return_rows_from_bulk_insert:
+        WebhookResponse.objects.bulk_create(responses)
+        # bulk_create doesn't send post_save, connected integrations rely on it to handle webhook responses
+        for response in responses:
+            post_save.send(sender=WebhookResponse, instance=response, created=True)
+    else:
+        # primary keys are needed for log records, bulk_create doesn't set them on all databases
+        for response in responses:
+            response.save()
+
+
+def _save_webhook_results(
+    webhooks: typing.List[Webhook],
+    results: typing.Dict[int, WebhookRequestResult],
+    alert_group: AlertGroup,
+    user: typing.Optional[User],
+    trigger_type: int,
+) -> None:
+    # create response entries and log records only for triggered webhooks
+    responses = {}
+    for webhook in webhooks:
+        if webhook.pk not in results:
+            continue
+        triggered, status, _, _ = results[webhook.pk]
+        if triggered:
+            responses[webhook.pk] = WebhookResponse(
+                alert_group=alert_group, trigger_type=trigger_type or webhook.trigger_type, **status
+            )
+        else:
+            reason = status.get("request_trigger", "Unknown")
+            logger.info(f"Webhook {webhook.pk} was not triggered: {reason}")
+    _create_webhook_responses(list(responses.values()))
+    AlertGroupLogRecord.objects.bulk_create_with_log_report_update(
+        [
+            _build_log_record(webhook, alert_group, user, results[webhook.pk][1], results[webhook.pk][2], response)
+            for webhook in webhooks
+            if (response := responses.get(webhook.pk))
+        ]
+    )
+
+
+def execute_webhooks(
+    webhooks: typing.List[Webhook], alert_group_id: int, user_id: typing.Optional[int], trigger_type: int
+) -> None:
+    """
+    Execute the webhooks triggered by an alert group event concurrently, up to OUTGOING_WEBHOOK_FAN_OUT_MAX_WORKERS
+    requests at a time. Unlike with one `execute_webhook` task per webhook, the alert group is loaded and serialized
+    once, and webhook responses and log records are inserted in bulk.
+    Each request is limited by OUTGOING_WEBHOOK_TIMEOUT. Webhooks failing with an exception are retried one by one
+    by `execute_webhook`, so other webhooks aren't triggered again. Errors raised after the requests are sent are
+    logged and not raised, retrying the task would send all the requests again.
+    """
+    if not webhooks:
+        return
+
+    alert_group = _get_alert_group(alert_group_id)
+    if alert_group is None:
+        return
+
+    user = None
+    if user_id is not None:
+        user = User.objects.filter(pk=user_id).first()
+
+    # requests are prepared in this thread, as it's the one with the database connection
+    alert_group_data = serialize_alert_group_event_data(alert_group)
+    responses_data = _get_responses_data(alert_group)
+    dangerous_webhooks_enabled = live_settings.DANGEROUS_WEBHOOKS_ENABLED
+    results: typing.Dict[int, WebhookRequestResult] = {}
+    requests_to_send = []
+    webhooks_to_retry = []
+    for webhook in webhooks:
+        try:
+            data = _build_payload(webhook, alert_group, user, trigger_type, alert_group_data, responses_data)
+        except Exception as e:
+            # don't let a single webhook fail the task, it's retried by execute_webhook
+            logger.warning(f"Failed to build payload for webhook={webhook.pk} alert_group={alert_group_id}: {e}")
+            webhooks_to_retry.append((webhook.pk, e))
+            continue
+        status = _new_request_status(webhook, data)
+        try:
+            request_kwargs = _prepare_request(webhook, alert_group, data, status)
+        except Exception as e:
+            results[webhook.pk] = _handle_request_exception(status, e)
+            continue
+        if request_kwargs is None:
+            results[webhook.pk] = False, status, None, None
+        else:
+            requests_to_send.append((webhook, status, request_kwargs))
+
+    if requests_to_send:
+        max_workers = min(settings.OUTGOING_WEBHOOK_FAN_OUT_MAX_WORKERS, len(requests_to_send))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                webhook.pk: executor.submit(_send_request, webhook, status, request_kwargs, dangerous_webhooks_enabled)
+                for webhook, status, request_kwargs in requests_to_send
+            }
+        for webhook_pk, future in futures.items():
+            results[webhook_pk] = future.result()
+
+    try:
+        _save_webhook_results(webhooks, results, alert_group, user, trigger_type)
+    except Exception:
+        logger.exception(f"Failed to save webhook responses for alert_group={alert_group_id}")
+
+    webhooks_to_retry += [(webhook_pk, result[3]) for webhook_pk, result in results.items() if result[3] is not None]
+    for webhook_pk, exception in webhooks_to_retry:
+        msg_details = f"webhook={webhook_pk} alert_group={alert_group_id} user={user_id}"
+        kwargs = {"trigger_type": trigger_type}
+        if isinstance(exception, EXECUTE_WEBHOOK_EXCEPTIONS_TO_MANUALLY_RETRY):
+            # this was the first attempt, same as for execute_webhook
+            kwargs["manual_retry_num"] = 1
+        logger.warning(f"Retrying execute_webhook for {msg_details}: {exception}")
+        try:
+            execute_webhook.apply_async((webhook_pk, alert_group_id, user_id, None), kwargs=kwargs, countdown=10)
+        except Exception:
+            logger.exception(f"Failed to retry execute_webhook for {msg_details}")
+
+
 @shared_dedicated_queue_retry_task(
     autoretry_for=(Exception,), retry_backoff=True, max_retries=1 if settings.DEBUG else EXECUTE_WEBHOOK_RETRIES
 )
@@ -227,20 +468,8 @@ def execute_webhook(webhook_pk, alert_group_id, user_id, escalation_policy_id, t
         logger.warning(f"Webhook {webhook_pk} does not exist")
         return
 
-    try:
-        personal_log_records = UserNotificationPolicyLogRecord.objects.filter(
-            alert_group_id=alert_group_id,
-            author__isnull=False,
-            type=UserNotificationPolicyLogRecord.TYPE_PERSONAL_NOTIFICATION_SUCCESS,
-        ).select_related("author")
-        alert_group = (
-            AlertGroup.objects.prefetch_related(
-                Prefetch("personal_log_records", queryset=personal_log_records, to_attr="sent_notifications")
-            )
-            .select_related("channel")
-            .get(pk=alert_group_id)
-        )
-    except AlertGroup.DoesNotExist:
+    alert_group = _get_alert_group(alert_group_id)
+    if alert_group is None:
         return
 
     user = None
@@ -268,33 +497,8 @@ def execute_webhook(webhook_pk, alert_group_id, user_id, escalation_policy_id, t
         step = EscalationPolicy.STEP_TRIGGER_CUSTOM_WEBHOOK
 
     # create log record
-    error_code = None
-    log_type = AlertGroupLogRecord.TYPE_CUSTOM_WEBHOOK_TRIGGERED
-    trigger_log = TRIGGER_TYPE_TO_LABEL[webhook.trigger_type]
-    if webhook.trigger_type == Webhook.TRIGGER_MANUAL and escalation_policy is None:
-        trigger_log = None  # triggered manually
-    reason = str(status["status_code"])
-    if error is not None:
-        log_type = AlertGroupLogRecord.TYPE_ESCALATION_FAILED
-        error_code = AlertGroupLogRecord.ERROR_ESCALATION_TRIGGER_CUSTOM_WEBHOOK_ERROR
-        reason = error
-
     if triggered:
-        AlertGroupLogRecord.objects.create(
-            type=log_type,
-            alert_group=alert_group,
-            author=user,
-            reason=reason,
-            step_specific_info={
-                "webhook_name": webhook.name,
-                "webhook_id": webhook.public_primary_key,
-                "trigger": trigger_log,
-                "response_id": response.pk if response else None,
-            },
-            escalation_policy=escalation_policy,
-            escalation_policy_step=step,
-            escalation_error_code=error_code,
-        )
+        _build_log_record(webhook, alert_group, user, status, error, response, escalation_policy, step).save()
 
     if isinstance(exception, EXECUTE_WEBHOOK_EXCEPTIONS_TO_MANUALLY_RETRY):
         msg_details = (
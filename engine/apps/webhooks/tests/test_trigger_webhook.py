@@ -1,4 +1,5 @@
 import json
+import threading
 from datetime import timedelta
 from unittest.mock import call, patch
 
@@ -6,14 +7,16 @@ import httpretty
 import pytest
 import requests
 from django.utils import timezone
+from requests.adapters import HTTPAdapter
 
 from apps.alerts.models import AlertGroupExternalID, AlertGroupLogRecord, EscalationPolicy
-from apps.base.models import UserNotificationPolicyLogRecord
+from apps.base.models import LiveSetting, UserNotificationPolicyLogRecord
 from apps.public_api.serializers import AlertGroupSerializer
 from apps.webhooks.models import Webhook
-from apps.webhooks.models.webhook import WebhookSession
+from apps.webhooks.models.webhook import WebhookHTTPAdapter, WebhookSession
 from apps.webhooks.tasks import execute_webhook, send_webhook_event
-from apps.webhooks.tasks.trigger_webhook import NOT_FROM_SELECTED_INTEGRATION
+from apps.webhooks.tasks.trigger_webhook import NOT_FROM_SELECTED_INTEGRATION, _build_payload
+from apps.webhooks.utils import serialize_alert_group_event_data
 from settings.base import WEBHOOK_RESPONSE_LIMIT
 
 TIMEOUT = 4
@@ -235,7 +238,11 @@ def test_execute_webhook_ok(
     mock_response = httpretty.Response(json.dumps({"response": 200}))
     httpretty.register_uri(httpretty.POST, templated_url, responses=[mock_response])
 
-    with patch("apps.webhooks.utils.socket.gethostbyname", return_value="8.8.8.8"):
+    # httpretty serves certificates for the address connected to, so connect to the hostname instead of the resolved
+    # (and validated) address
+    with patch("apps.webhooks.utils.socket.gethostbyname", return_value="8.8.8.8"), patch.object(
+        WebhookHTTPAdapter, "build_connection_pool_key_attributes", HTTPAdapter.build_connection_pool_key_attributes
+    ):
         with patch(
             "apps.webhooks.models.webhook.WebhookSession.request", wraps=WebhookSession().request
         ) as mock_request:
@@ -949,3 +956,225 @@ def test_execute_webhook_integration_config(
 
     # check on_webhook_response_created is called
     mock_on_webhook_response_created.assert_called_once_with(webhook.responses.all()[0], source_alert_receive_channel)
+
+
+@patch("apps.webhooks.tasks.trigger_webhook.execute_webhook.apply_async")
+@patch("apps.webhooks.utils.socket.gethostbyname", return_value="8.8.8.8")
+@pytest.mark.django_db
+def test_send_webhook_event_fan_out(
+    _,
+    mock_execute,
+    settings,
+    make_organization,
+    make_user_for_organization,
+    make_alert_receive_channel,
+    make_alert_group,
+    make_custom_webhook,
+):
+    settings.OUTGOING_WEBHOOK_FAN_OUT_ENABLED = True
+    organization = make_organization()
+    user = make_user_for_organization(organization)
+    alert_receive_channel = make_alert_receive_channel(organization)
+    alert_group = make_alert_group(
+        alert_receive_channel, acknowledged_at=timezone.now(), acknowledged=True, acknowledged_by=user.pk
+    )
+    webhook = make_custom_webhook(
+        organization=organization, url="https://ok/", http_method="POST", trigger_type=Webhook.TRIGGER_ACKNOWLEDGE
+    )
+    status_change_webhook = make_custom_webhook(
+        organization=organization,
+        url="https://status-change/",
+        http_method="POST",
+        trigger_type=Webhook.TRIGGER_STATUS_CHANGE,
+    )
+    timeout_webhook = make_custom_webhook(
+        organization=organization, url="https://timeout/", http_method="POST", trigger_type=Webhook.TRIGGER_ACKNOWLEDGE
+    )
+    not_triggered_webhook = make_custom_webhook(
+        organization=organization,
+        url="https://not-triggered/",
+        http_method="POST",
+        trigger_type=Webhook.TRIGGER_ACKNOWLEDGE,
+        trigger_template="{{ false }}",
+    )
+
+    def request(method, url, **kwargs):
+        if url == "https://timeout/":
+            raise requests.exceptions.ReadTimeout("foo bar")
+        return MockResponse()
+
+    with patch(
+        "apps.webhooks.tasks.trigger_webhook.serialize_alert_group_event_data",
+        wraps=serialize_alert_group_event_data,
+    ) as spy_serialize_alert_group_event_data:
+        with patch("apps.webhooks.models.webhook.WebhookSession.request", side_effect=request) as mock_request:
+            send_webhook_event(Webhook.TRIGGER_ACKNOWLEDGE, alert_group.pk, organization_id=organization.pk)
+
+    # alert group is serialized once for all the webhooks
+    spy_serialize_alert_group_event_data.assert_called_once()
+    assert sorted(c.args[1] for c in mock_request.call_args_list) == [
+        "https://ok/",
+        "https://status-change/",
+        "https://timeout/",
+    ]
+    for c in mock_request.call_args_list:
+        assert c.kwargs["json"]["event"]["type"] == "acknowledge"
+        assert c.kwargs["json"]["user"] is None
+
+    assert not_triggered_webhook.responses.count() == 0
+    for w in (webhook, status_change_webhook):
+        response = w.responses.get()
+        assert response.status_code == 200
+        assert response.trigger_type == Webhook.TRIGGER_ACKNOWLEDGE
+        log_record = alert_group.log_records.get(step_specific_info__webhook_id=w.public_primary_key)
+        assert log_record.type == AlertGroupLogRecord.TYPE_CUSTOM_WEBHOOK_TRIGGERED
+        assert log_record.step_specific_info["response_id"] == response.pk
+
+    response = timeout_webhook.responses.get()
+    assert response.content == "foo bar"
+    log_record = alert_group.log_records.get(step_specific_info__webhook_id=timeout_webhook.public_primary_key)
+    assert log_record.type == AlertGroupLogRecord.TYPE_ESCALATION_FAILED
+    assert log_record.reason == "foo bar"
+
+    # only the failed webhook is retried
+    mock_execute.assert_called_once_with(
+        (timeout_webhook.pk, alert_group.pk, None, None),
+        kwargs={"trigger_type": Webhook.TRIGGER_ACKNOWLEDGE, "manual_retry_num": 1},
+        countdown=10,
+    )
+
+
+@patch("apps.webhooks.utils.socket.gethostbyname", return_value="8.8.8.8")
+@pytest.mark.django_db
+def test_send_webhook_event_fan_out_using_responses_data(
+    _,
+    settings,
+    make_organization,
+    make_alert_receive_channel,
+    make_alert_group,
+    make_custom_webhook,
+    make_webhook_response,
+):
+    settings.OUTGOING_WEBHOOK_FAN_OUT_ENABLED = True
+    organization = make_organization()
+    alert_receive_channel = make_alert_receive_channel(organization)
+    alert_group = make_alert_group(alert_receive_channel, resolved_at=timezone.now(), resolved=True)
+    webhooks = [
+        make_custom_webhook(
+            organization=organization,
+            public_primary_key=f"webhook-{i}",
+            url="https://something/",
+            http_method="POST",
+            trigger_type=Webhook.TRIGGER_RESOLVE,
+            data="{{ responses|tojson }}",
+            forward_all=False,
+        )
+        for i in range(2)
+    ]
+    for webhook in webhooks:
+        make_webhook_response(
+            alert_group=alert_group,
+            webhook=webhook,
+            trigger_type=Webhook.TRIGGER_ALERT_GROUP_CREATED,
+            status_code=200,
+            content=json.dumps({"id": webhook.public_primary_key}),
+        )
+
+    with patch("apps.webhooks.models.webhook.WebhookSession.request", return_value=MockResponse()) as mock_request:
+        send_webhook_event(Webhook.TRIGGER_RESOLVE, alert_group.pk, organization_id=organization.pk)
+
+    # past responses of the webhook being executed are excluded
+    assert sorted([c.kwargs["json"] for c in mock_request.call_args_list], key=json.dumps) == [
+        {"webhook-0": {"id": "webhook-0"}},
+        {"webhook-1": {"id": "webhook-1"}},
+    ]
+
+
+@httpretty.activate(verbose=True, allow_net_connect=False)
+@patch("apps.webhooks.utils.socket.gethostbyname", return_value="8.8.8.8")
+@pytest.mark.django_db
+def test_send_webhook_event_fan_out_live_settings_read_in_task_thread(
+    _,
+    settings,
+    make_organization,
+    make_alert_receive_channel,
+    make_alert_group,
+    make_custom_webhook,
+):
+    settings.OUTGOING_WEBHOOK_FAN_OUT_ENABLED = True
+    organization = make_organization()
+    alert_receive_channel = make_alert_receive_channel(organization)
+    alert_group = make_alert_group(alert_receive_channel, resolved_at=timezone.now(), resolved=True)
+    webhooks = []
+    for i in range(2):
+        url = f"https://example.com/{i}/"
+        webhooks.append(
+            make_custom_webhook(
+                organization=organization, url=url, http_method="POST", trigger_type=Webhook.TRIGGER_RESOLVE
+            )
+        )
+        httpretty.register_uri(httpretty.POST, url, body=json.dumps({"response": 200}))
+
+    get_setting = LiveSetting.get_setting
+    setting_threads = set()
+
+    def get_setting_spy(setting_name):
+        setting_threads.add(threading.current_thread())
+        return get_setting(setting_name)
+
+    # httpretty serves certificates for the address connected to, so connect to the hostname instead of the resolved
+    # (and validated) address
+    with patch.object(LiveSetting, "get_setting", side_effect=get_setting_spy), patch.object(
+        WebhookHTTPAdapter, "build_connection_pool_key_attributes", HTTPAdapter.build_connection_pool_key_attributes
+    ):
+        send_webhook_event(Webhook.TRIGGER_RESOLVE, alert_group.pk, organization_id=organization.pk)
+
+    # the database is only accessed by the task thread, request threads don't open connections
+    assert setting_threads == {threading.current_thread()}
+    for webhook in webhooks:
+        assert webhook.responses.get().status_code == 200
+
+
+@patch("apps.webhooks.tasks.trigger_webhook.execute_webhook.apply_async")
+@patch("apps.webhooks.tasks.trigger_webhook._create_webhook_responses", side_effect=Exception("db error"))
+@patch("apps.webhooks.utils.socket.gethostbyname", return_value="8.8.8.8")
+@pytest.mark.django_db
+def test_send_webhook_event_fan_out_errors_not_raised(
+    _,
+    mock_create_webhook_responses,
+    mock_execute,
+    settings,
+    make_organization,
+    make_alert_receive_channel,
+    make_alert_group,
+    make_custom_webhook,
+):
+    settings.OUTGOING_WEBHOOK_FAN_OUT_ENABLED = True
+    organization = make_organization()
+    alert_receive_channel = make_alert_receive_channel(organization)
+    alert_group = make_alert_group(alert_receive_channel, resolved_at=timezone.now(), resolved=True)
+    webhook = make_custom_webhook(
+        organization=organization, url="https://ok/", http_method="POST", trigger_type=Webhook.TRIGGER_RESOLVE
+    )
+    broken_webhook = make_custom_webhook(
+        organization=organization, url="https://broken/", http_method="POST", trigger_type=Webhook.TRIGGER_RESOLVE
+    )
+
+    def build_payload_spy(w, *args, **kwargs):
+        if w.pk == broken_webhook.pk:
+            raise Exception("payload error")
+        return _build_payload(w, *args, **kwargs)
+
+    with patch("apps.webhooks.tasks.trigger_webhook._build_payload", side_effect=build_payload_spy):
+        with patch("apps.webhooks.models.webhook.WebhookSession.request", return_value=MockResponse()) as mock_request:
+            # requests are sent already, raising would retry the task and send them again
+            send_webhook_event(Webhook.TRIGGER_RESOLVE, alert_group.pk, organization_id=organization.pk)
+
+    assert [c.args[1] for c in mock_request.call_args_list] == [webhook.url]
+    mock_create_webhook_responses.assert_called_once()
+    # the webhook failing before its request is sent is retried on its own
+    mock_execute.assert_called_once_with(
+        (broken_webhook.pk, alert_group.pk, None, None),
+        kwargs={"trigger_type": Webhook.TRIGGER_RESOLVE},
+        countdown=10,
+    )
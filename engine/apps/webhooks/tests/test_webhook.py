@@ -1,12 +1,23 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest.mock import call, patch
+from urllib.parse import urlparse
 
 import httpretty
 import pytest
+import requests
 from django.conf import settings
 from requests.auth import HTTPBasicAuth
 
 from apps.webhooks.models import Webhook
-from apps.webhooks.utils import InvalidWebhookData, InvalidWebhookHeaders, InvalidWebhookTrigger, InvalidWebhookUrl
+from apps.webhooks.models.webhook import WebhookHTTPAdapter, webhook_connection_counters
+from apps.webhooks.utils import (
+    InvalidWebhookData,
+    InvalidWebhookHeaders,
+    InvalidWebhookTrigger,
+    InvalidWebhookUrl,
+    resolved_hostname_cache_counters,
+)
 
 
 @pytest.mark.django_db
@@ -258,6 +269,74 @@ def test_make_request_bad_redirect(make_organization, make_custom_webhook):
         webhook.make_request(url, {})
 
 
+@pytest.mark.django_db
+def test_build_url_resolved_hostname_cached(make_organization, make_custom_webhook):
+    organization = make_organization()
+    webhook = make_custom_webhook(organization=organization, url="{{foo}}")
+
+    with patch("apps.webhooks.utils.socket.gethostbyname", return_value="8.8.8.8") as mock_gethostbyname:
+        for _ in range(3):
+            webhook.build_url({"foo": "http://oncall.url"})
+
+    mock_gethostbyname.assert_called_once_with("oncall.url")
+    resolved_hostname_cache_counters.flush()
+    assert resolved_hostname_cache_counters.get_totals() == {"hits": 2, "misses": 1}
+
+
+def test_webhook_http_adapter_connects_to_validated_ip_address():
+    request = requests.Request("POST", "https://example.com:8443/path").prepare()
+    request.validated_ip_address = "8.8.8.8"
+
+    host_params, pool_kwargs = WebhookHTTPAdapter().build_connection_pool_key_attributes(request, verify=True)
+
+    assert host_params == {"scheme": "https", "host": "8.8.8.8", "port": 8443}
+    assert pool_kwargs["server_hostname"] == "example.com"
+    assert pool_kwargs["assert_hostname"] == "example.com"
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    hosts = []
+    client_ports = []
+
+    def do_POST(self):
+        self.hosts.append(self.headers["Host"])
+        self.client_ports.append(self.client_address[1])
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.mark.django_db
+def test_make_request_reuses_connections(make_organization, make_custom_webhook):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    server.daemon_threads = True
+    server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+    server_thread.start()
+
+    organization = make_organization()
+    webhook = make_custom_webhook(organization=organization, http_method="POST")
+    url = f"http://example.com:{server.server_port}/"
+
+    # example.com is validated as resolving to the local server
+    with patch("apps.webhooks.models.webhook.validate_url", side_effect=lambda u, *_: (urlparse(u), "127.0.0.1")):
+        for _ in range(3):
+            response = webhook.make_request(url, {})
+            assert response.status_code == 200
+    server.shutdown()
+    server.server_close()
+
+    # requests are sent to the validated IP address with the original Host header, over a single connection
+    assert KeepAliveHandler.hosts == [f"example.com:{server.server_port}"] * 3
+    assert len(set(KeepAliveHandler.client_ports)) == 1
+    webhook_connection_counters.flush()
+    assert webhook_connection_counters.get_totals() == {"requests": 3, "opened": 1}
+
+
 @pytest.mark.django_db
 def test_escaping_payload_with_double_quotes(make_organization, make_custom_webhook):
     organization = make_organization()
@@ -1,15 +1,23 @@
+import copy
 import ipaddress
 import json
 import re
 import socket
-from urllib.parse import urlparse
+import time
+import typing
+from dataclasses import dataclass, field
+from urllib.parse import ParseResult, urlparse
 
 from django.conf import settings
 
 from apps.base.utils import live_settings
 from apps.labels.utils import get_alert_group_labels_dict, get_labels_dict, is_labels_feature_enabled
+from apps.metrics_exporter.counters import Counters
 from apps.schedules.ical_utils import list_users_to_notify_from_ical
 from common.jinja_templater import apply_jinja_template
+from common.lru_cache import LRUCache
+
+RESOLVED_HOSTNAME_CACHE_SIZE = 1000
 
 
 class InvalidWebhookUrl(Exception):
@@ -32,7 +40,56 @@ class InvalidWebhookData(Exception):
         self.message = f"Data - {message}"
 
 
-def parse_url(url):
+@dataclass(frozen=True)
+class ResolvedHostname:
+    ip_address: str
+    resolved_at: float = field(default_factory=time.monotonic)
+
+
+# hostnames resolved for outgoing webhooks, entries are used for OUTGOING_WEBHOOK_DNS_CACHE_TTL seconds
+_resolved_hostnames: LRUCache[str, ResolvedHostname] = LRUCache(maxsize=RESOLVED_HOSTNAME_CACHE_SIZE)
+resolved_hostname_cache_counters = Counters(
+    "outgoing_webhook_resolved_hostname_cache",
+    {
+        "hits": "Number of outgoing webhook hostnames found in the resolved hostname cache",
+        "misses": "Number of outgoing webhook hostnames resolved with a DNS lookup",
+    },
+)
+
+
+def resolve_hostname(hostname: str) -> str:
+    """
+    Return the IPv4 address of the hostname, raise socket.gaierror if it can't be resolved.
+    Resolved addresses are cached in the process for OUTGOING_WEBHOOK_DNS_CACHE_TTL seconds, failures are not cached.
+    """
+    resolved_hostname = _resolved_hostnames.get(hostname)
+    if (
+        resolved_hostname is not None
+        and time.monotonic() - resolved_hostname.resolved_at <= settings.OUTGOING_WEBHOOK_DNS_CACHE_TTL
+    ):
+        resolved_hostname_cache_counters.add(hits=1)
+        return resolved_hostname.ip_address
+
+    resolved_hostname_cache_counters.add(misses=1)
+    ip_address = socket.gethostbyname(hostname)
+    _resolved_hostnames.set(hostname, ResolvedHostname(ip_address))
+    return ip_address
+
+
+def clear_resolved_hostname_cache() -> None:
+    _resolved_hostnames.clear()
+
+
+def validate_url(
+    url: str, dangerous_webhooks_enabled: typing.Optional[bool] = None
+) -> typing.Tuple[ParseResult, typing.Optional[str]]:
+    """
+    Raise InvalidWebhookUrl if the url can't be used for outgoing webhooks.
+    Return the parsed url and the validated IP address of its host. Requests must be sent to this IP address, so the
+    host can't resolve to another (private) address between the check and the request. The address is None if
+    dangerous webhooks are enabled, in which case it is not validated.
+    `dangerous_webhooks_enabled` defaults to the DANGEROUS_WEBHOOKS_ENABLED live setting, which is read from the database.
+    """
     parsed_url = urlparse(url)
     # ensure the url looks like url
     if parsed_url.scheme not in ["http", "https"] or not parsed_url.netloc:
@@ -41,15 +98,24 @@ def parse_url(url):
     if settings.BASE_URL in url:
         raise InvalidWebhookUrl("Potential self-reference")
 
-    if not live_settings.DANGEROUS_WEBHOOKS_ENABLED:
+    if dangerous_webhooks_enabled is None:
+        dangerous_webhooks_enabled = live_settings.DANGEROUS_WEBHOOKS_ENABLED
+
+    webhook_url_ip_address = None
+    if not dangerous_webhooks_enabled:
         # Get the ip address of the webhook url and check if it belongs to the private network
         try:
-            webhook_url_ip_address = socket.gethostbyname(parsed_url.hostname)
+            webhook_url_ip_address = resolve_hostname(parsed_url.hostname)
         except socket.gaierror:
             raise InvalidWebhookUrl("Cannot resolve name in url")
-        if ipaddress.ip_address(socket.gethostbyname(webhook_url_ip_address)).is_private:
+        if ipaddress.ip_address(webhook_url_ip_address).is_private:
             raise InvalidWebhookUrl("This url is not supported for outgoing webhooks")
 
+    return parsed_url, webhook_url_ip_address
+
+
+def parse_url(url):
+    parsed_url, _ = validate_url(url)
     return parsed_url
 
 
@@ -149,8 +215,10 @@ def _extract_users_from_escalation_snapshot(escalation_snapshot):
     return list({u["id"]: u for u in users if u}.values())
 
 
-def serialize_event(event, alert_group, user, webhook, responses=None):
-    from apps.alerts.models import AlertGroupExternalID
+def serialize_alert_group_event_data(alert_group):
+    """
+    Return the alert group part of the event data, which is the same for all the webhooks triggered by an event.
+    """
     from apps.public_api.serializers import AlertGroupSerializer
 
     alert_payload = alert_group.alerts.first()
@@ -158,9 +226,7 @@ def serialize_event(event, alert_group, user, webhook, responses=None):
     if alert_payload:
         alert_payload_raw = alert_payload.raw_request_data
 
-    data = {
-        "event": event,
-        "user": _serialize_event_user(user),
+    return {
         "alert_group": AlertGroupSerializer(alert_group).data,
         "alert_group_id": alert_group.public_primary_key,
         "alert_payload": alert_payload_raw,
@@ -178,6 +244,22 @@ def serialize_event(event, alert_group, user, webhook, responses=None):
         "alert_group_acknowledged_by": _serialize_event_user(alert_group.acknowledged_by_user),
         "alert_group_resolved_by": _serialize_event_user(alert_group.resolved_by_user),
     }
+
+
+def serialize_event(event, alert_group, user, webhook, responses=None, alert_group_data=None):
+    from apps.alerts.models import AlertGroupExternalID
+
+    if alert_group_data is None:
+        alert_group_data = serialize_alert_group_event_data(alert_group)
+    else:
+        # shared by other webhooks, the data is modified below
+        alert_group_data = copy.deepcopy(alert_group_data)
+
+    data = {
+        "event": event,
+        "user": _serialize_event_user(user),
+        **alert_group_data,
+    }
     if responses:
         data["responses"] = responses
 
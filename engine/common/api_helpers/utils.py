@@ -6,11 +6,10 @@ from urllib.parse import urljoin
 import requests
 from django.conf import settings
 from django.utils import dateparse, timezone
-from icalendar import Calendar
 from rest_framework import serializers
 from rest_framework.request import Request
 
-from apps.schedules.ical_utils import fetch_ical_file
+from apps.schedules.ical_feeds import fetch_ical_feed
 from common.api_helpers.exceptions import BadRequest
 from common.jinja_templater import apply_jinja_template
 from common.jinja_templater.apply_jinja_template import JinjaTemplateWarning
@@ -70,8 +69,7 @@ def validate_ical_url(url):
         if settings.BASE_URL in url:
             raise serializers.ValidationError("Potential self-reference")
         try:
-            ical_file = fetch_ical_file(url)
-            Calendar.from_ical(ical_file)
+            fetch_ical_feed(url)
         except requests.exceptions.RequestException:
             raise serializers.ValidationError("Ical download failed")
         except ValueError:
@@ -1,2 +1,7 @@
 from .apply_jinja_template import apply_jinja_template, apply_jinja_template_to_alert_payload_and_labels  # noqa: F401
+from .compiled_template_cache import (  # noqa: F401
+    clear_compiled_template_cache,
+    compiled_template_cache_info,
+    get_compiled_template,
+)
 from .jinja_template_env import jinja_template_env  # noqa: F401
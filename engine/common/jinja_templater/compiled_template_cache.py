@@ -0,0 +1,35 @@
+import hashlib
+import typing
+
+from django.conf import settings
+
+from common.lru_cache import LRUCache, LRUCacheInfo
+
+from .jinja_template_env import jinja_template_env
+
+if typing.TYPE_CHECKING:
+    from jinja2.environment import Template
+
+# compiled templates are keyed by a digest of their source, so the (potentially large) template strings themselves
+# are not retained by the cache
+_compiled_templates: LRUCache[str, "Template"] = LRUCache(maxsize=settings.JINJA_COMPILED_TEMPLATE_CACHE_SIZE)
+
+
+def _get_template_key(template: str) -> str:
+    return hashlib.md5(template.encode("utf-8"), usedforsecurity=False).hexdigest()
+
+
+def get_compiled_template(template: str) -> "Template":
+    """
+    Return the compiled `jinja_template_env` template for the given source, compiling it only on cache miss.
+    Templates that fail to compile are not cached and raise the same exceptions as `jinja_template_env.from_string`.
+    """
+    return _compiled_templates.get_or_set(_get_template_key(template), lambda: jinja_template_env.from_string(template))
+
+
+def compiled_template_cache_info() -> LRUCacheInfo:
+    return _compiled_templates.cache_info()
+
+
+def clear_compiled_template_cache() -> None:
+    _compiled_templates.clear()
@@ -0,0 +1,121 @@
+import threading
+import typing
+from collections import OrderedDict
+from dataclasses import dataclass
+
+_KT = typing.TypeVar("_KT", bound=typing.Hashable)
+_VT = typing.TypeVar("_VT")
+
+
+@dataclass(frozen=True)
+class LRUCacheInfo:
+    hits: int
+    misses: int
+    evictions: int
+    maxsize: int
+    currsize: int
+    maxweight: typing.Optional[int] = None
+    currweight: int = 0
+
+
+class LRUCache(typing.Generic[_KT, _VT]):
+    """
+    Process-wide, size-bounded, thread-safe LRU mapping.
+
+    Unlike `functools.lru_cache` (and `common.utils.timed_lru_cache`) the keys are explicit, so callers can choose a
+    cheap/stable key (ex. a content hash) instead of relying on the hashability of the arguments, and entries can be
+    invalidated individually. Hit/miss/eviction counters are kept so the cache effectiveness can be inspected via
+    `cache_info`.
+
+    Optionally entries can be weighted (ex. by the size of the data they were built from) with `weigher`, in which case
+    least recently used entries are also evicted to keep the total weight under `maxweight`. An entry heavier than
+    `maxweight` is not cached at all.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        maxweight: typing.Optional[int] = None,
+        weigher: typing.Optional[typing.Callable[[_KT, _VT], int]] = None,
+    ) -> None:
+        self.maxsize = maxsize
+        self.maxweight = maxweight
+        self._weigher = weigher
+        self._weights: typing.Dict[_KT, int] = {}
+        self._weight = 0
+        self._data: OrderedDict[_KT, _VT] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key: _KT) -> typing.Optional[_VT]:
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self._misses += 1
+                return None
+            self._data.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def set(self, key: _KT, value: _VT) -> None:
+        if self.maxsize <= 0:
+            return
+        weight = self._weigher(key, value) if self._weigher is not None else 0
+        with self._lock:
+            self._pop(key)
+            if self.maxweight is not None and weight > self.maxweight:
+                return
+            self._data[key] = value
+            self._weights[key] = weight
+            self._weight += weight
+            while len(self._data) > self.maxsize or (self.maxweight is not None and self._weight > self.maxweight):
+                self._pop(next(iter(self._data)))
+                self._evictions += 1
+
+    def _pop(self, key: _KT) -> None:
+        if key in self._data:
+            del self._data[key]
+            self._weight -= self._weights.pop(key)
+
+    def get_or_set(self, key: _KT, factory: typing.Callable[[], _VT]) -> _VT:
+        """
+        Return the cached value for `key`, computing and storing it with `factory` on a miss. Exceptions raised by
+        `factory` propagate and nothing is cached.
+        """
+        value = self.get(key)
+        if value is None:
+            value = factory()
+            self.set(key, value)
+        return value
+
+    def delete(self, key: _KT) -> None:
+        with self._lock:
+            self._pop(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._weights.clear()
+            self._weight = 0
+            self._hits = self._misses = self._evictions = 0
+
+    def cache_info(self) -> LRUCacheInfo:
+        with self._lock:
+            return LRUCacheInfo(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                maxsize=self.maxsize,
+                currsize=len(self._data),
+                maxweight=self.maxweight,
+                currweight=self._weight,
+            )
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: _KT) -> bool:
+        return key in self._data
@@ -8,7 +8,12 @@ from django.conf import settings
 from django.utils.dateparse import parse_datetime
 from pytz import timezone
 
-from common.jinja_templater import apply_jinja_template, apply_jinja_template_to_alert_payload_and_labels
+from common.jinja_templater import (
+    apply_jinja_template,
+    apply_jinja_template_to_alert_payload_and_labels,
+    clear_compiled_template_cache,
+    compiled_template_cache_info,
+)
 from common.jinja_templater.apply_jinja_template import (
     JinjaTemplateError,
     JinjaTemplateWarning,
@@ -299,3 +304,26 @@ def test_apply_jinja_template_parse_json():
         )
         == expected_name
     )
+
+
+def test_apply_jinja_template_reuses_compiled_template():
+    clear_compiled_template_cache()
+    template = "{{ payload.name }}"
+
+    assert apply_jinja_template(template, payload={"name": "foo"}) == "foo"
+    assert apply_jinja_template(template, payload={"name": "bar"}) == "bar"
+
+    info = compiled_template_cache_info()
+    assert info.misses == 1
+    assert info.hits == 1
+    assert info.currsize == 1
+
+
+def test_apply_jinja_template_does_not_cache_invalid_template():
+    clear_compiled_template_cache()
+
+    for _ in range(2):
+        with pytest.raises(JinjaTemplateError):
+            apply_jinja_template("{{ payload.name ")
+
+    assert compiled_template_cache_info().currsize == 0
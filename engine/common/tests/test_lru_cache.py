@@ -0,0 +1,93 @@
+import pytest
+
+from common.lru_cache import LRUCache
+
+
+def test_lru_cache_get_set():
+    cache = LRUCache(maxsize=2)
+    assert cache.get("a") is None
+
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+
+    info = cache.cache_info()
+    assert (info.hits, info.misses, info.evictions, info.currsize) == (1, 1, 0, 1)
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    # touch "a" so "b" becomes the least recently used entry
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+    assert cache.cache_info().evictions == 1
+
+
+def test_lru_cache_get_or_set():
+    cache = LRUCache(maxsize=2)
+    calls = []
+
+    def factory():
+        calls.append(1)
+        return "value"
+
+    assert cache.get_or_set("a", factory) == "value"
+    assert cache.get_or_set("a", factory) == "value"
+    assert len(calls) == 1
+
+
+def test_lru_cache_get_or_set_does_not_cache_exceptions():
+    cache = LRUCache(maxsize=2)
+
+    def factory():
+        raise ValueError
+
+    with pytest.raises(ValueError):
+        cache.get_or_set("a", factory)
+    assert "a" not in cache
+
+
+def test_lru_cache_delete_and_clear():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    cache.delete("a")
+    assert "a" not in cache
+    assert len(cache) == 1
+
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.cache_info().hits == 0
+
+
+def test_lru_cache_disabled():
+    cache = LRUCache(maxsize=0)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+
+
+def test_lru_cache_maxweight():
+    cache = LRUCache(maxsize=10, maxweight=5, weigher=lambda key, value: len(value))
+    cache.set("a", "xx")
+    cache.set("b", "xx")
+    assert cache.cache_info().currweight == 4
+
+    # "a" is evicted to keep the total weight under maxweight
+    cache.set("c", "xx")
+    assert "a" not in cache
+    assert cache.cache_info().currweight == 4
+
+    # replacing an entry accounts for the weight of the new value only
+    cache.set("b", "x")
+    assert cache.cache_info().currweight == 3
+
+    # entries heavier than maxweight are not cached
+    cache.set("d", "xxxxxx")
+    assert "d" not in cache
+    assert cache.cache_info().currweight == 3
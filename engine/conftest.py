@@ -73,6 +73,7 @@ from apps.labels.tests.factories import (
     LabelValueFactory,
     WebhookAssociatedLabelFactory,
 )
+from apps.metrics_exporter.counters import reset_counters
 from apps.mobile_app.models import MobileAppAuthToken, MobileAppVerificationToken
 from apps.phone_notifications.phone_backend import PhoneBackend
 from apps.phone_notifications.tests.factories import PhoneCallRecordFactory, SMSRecordFactory
@@ -111,6 +112,7 @@ from apps.webhooks.tests.test_webhook_presets import (
     TestAdvancedWebhookPreset,
     TestWebhookPreset,
 )
+from apps.webhooks.utils import clear_resolved_hostname_cache
 
 register(OrganizationFactory)
 register(UserFactory)
@@ -216,6 +218,18 @@ def clear_ical_users_cache():
     memoized_users_in_ical.cache_clear()
 
 
+@pytest.fixture(autouse=True)
+def clear_webhook_resolved_hostname_cache():
+    # hostnames are resolved with mocked DNS in tests, don't reuse addresses resolved in other tests
+    clear_resolved_hostname_cache()
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics_exporter_counters():
+    # counter totals are isolated by isolated_cache, drop increments of other tests not flushed to the cache yet
+    reset_counters()
+
+
 @pytest.fixture(autouse=True)
 def mock_is_labels_feature_enabled(settings):
     settings.FEATURE_LABELS_ENABLED_FOR_ALL = True
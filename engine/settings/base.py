@@ -75,6 +75,14 @@ FEATURE_LABELS_ENABLED_PER_ORG = getenv_list("FEATURE_LABELS_ENABLED_PER_ORG", d
 FEATURE_ALERT_GROUP_SEARCH_ENABLED = getenv_boolean("FEATURE_ALERT_GROUP_SEARCH_ENABLED", default=True)
 FEATURE_ALERT_GROUP_SEARCH_CUTOFF_DAYS = getenv_integer("FEATURE_ALERT_GROUP_SEARCH_CUTOFF_DAYS", default=None)
 FEATURE_NOTIFICATION_BUNDLE_ENABLED = getenv_boolean("FEATURE_NOTIFICATION_BUNDLE_ENABLED", default=True)
+# Create all alerts of an AlertManager/Grafana Alerting notification in a single task instead of one task per alert
+FEATURE_ALERTMANAGER_BATCH_INGESTION_ENABLED = getenv_boolean(
+    "FEATURE_ALERTMANAGER_BATCH_INGESTION_ENABLED", default=True
+)
+# Expand web schedule shifts from their rotation events instead of generating, parsing and unfolding iCal files
+FEATURE_WEB_SCHEDULE_NATIVE_SHIFT_EXPANSION_ENABLED = getenv_boolean(
+    "FEATURE_WEB_SCHEDULE_NATIVE_SHIFT_EXPANSION_ENABLED", default=True
+)
 
 TWILIO_API_KEY_SID = os.environ.get("TWILIO_API_KEY_SID")
 TWILIO_API_KEY_SECRET = os.environ.get("TWILIO_API_KEY_SECRET")
@@ -96,6 +104,14 @@ GRAFANA_CLOUD_ONCALL_TOKEN = os.environ.get("GRAFANA_CLOUD_ONCALL_TOKEN", None)
 # Outgoing webhook settings
 DANGEROUS_WEBHOOKS_ENABLED = getenv_boolean("DANGEROUS_WEBHOOKS_ENABLED", default=False)
 OUTGOING_WEBHOOK_TIMEOUT = getenv_integer("OUTGOING_WEBHOOK_TIMEOUT", default=4)
+# Number of hosts and max number of keep-alive connections per host kept in the per-process outgoing webhook pool
+OUTGOING_WEBHOOK_POOL_CONNECTIONS = getenv_integer("OUTGOING_WEBHOOK_POOL_CONNECTIONS", default=100)
+OUTGOING_WEBHOOK_POOL_MAXSIZE = getenv_integer("OUTGOING_WEBHOOK_POOL_MAXSIZE", default=10)
+# Seconds resolved (and validated) outgoing webhook hostnames are cached for
+OUTGOING_WEBHOOK_DNS_CACHE_TTL = getenv_integer("OUTGOING_WEBHOOK_DNS_CACHE_TTL", default=30)
+# Execute the webhooks of an alert group event concurrently within a single task instead of one task per webhook
+OUTGOING_WEBHOOK_FAN_OUT_ENABLED = getenv_boolean("OUTGOING_WEBHOOK_FAN_OUT_ENABLED", default=False)
+OUTGOING_WEBHOOK_FAN_OUT_MAX_WORKERS = getenv_integer("OUTGOING_WEBHOOK_FAN_OUT_MAX_WORKERS", default=8)
 WEBHOOK_RESPONSE_LIMIT = 50000
 
 # Multiregion settings
@@ -119,6 +135,8 @@ METRICS_ALL = [
 ]
 # List of metrics to collect. Collect all available application metrics by default
 METRICS_TO_COLLECT = getenv_list("METRICS_TO_COLLECT", METRICS_ALL)
+# Number of organizations to fetch metrics cache for at a time when rendering /metrics
+METRICS_EXPORTER_CACHE_BATCH_SIZE = getenv_integer("METRICS_EXPORTER_CACHE_BATCH_SIZE", 500)
 
 
 # Database
@@ -833,6 +851,36 @@ GRAFANA_INCIDENT_STATIC_API_KEY = os.environ.get("GRAFANA_INCIDENT_STATIC_API_KE
 JINJA_TEMPLATE_MAX_LENGTH = os.getenv("JINJA_TEMPLATE_MAX_LENGTH", 50000)
 JINJA_RESULT_TITLE_MAX_LENGTH = os.getenv("JINJA_RESULT_TITLE_MAX_LENGTH", 500)
 JINJA_RESULT_MAX_LENGTH = os.getenv("JINJA_RESULT_MAX_LENGTH", 50000)
+# Max number of compiled templates kept in the per-process cache used by apply_jinja_template
+JINJA_COMPILED_TEMPLATE_CACHE_SIZE = getenv_integer("JINJA_COMPILED_TEMPLATE_CACHE_SIZE", 1000)
+# Number of alert group inside_organization_number values reserved per process at once. Values > 1 reduce contention
+# on the per-organization counter row under bursts, at the cost of gaps and non-monotonic numbers across processes.
+ALERT_GROUP_COUNTER_BLOCK_SIZE = getenv_integer("ALERT_GROUP_COUNTER_BLOCK_SIZE", 1)
+# Max number of integrations whose precompiled routes are kept in the per-process route table cache
+ROUTE_TABLE_CACHE_SIZE = getenv_integer("ROUTE_TABLE_CACHE_SIZE", 1000)
+# Max number of routes whose serialized escalation chain is kept in the per-process escalation snapshot cache
+ESCALATION_SNAPSHOT_CACHE_SIZE = getenv_integer("ESCALATION_SNAPSHOT_CACHE_SIZE", 1000)
+# Max number of integrations kept in the per-process cache used to look up integrations by token on alert ingestion
+ALERT_RECEIVE_CHANNEL_CACHE_SIZE = getenv_integer("ALERT_RECEIVE_CHANNEL_CACHE_SIZE", 5000)
+# Max number of parsed schedule calendars kept in the per-process cache used by OnCallSchedule.get_icalendars, and max
+# total size (in characters) of their iCal sources. Parsed calendars take several times more memory than their source.
+ICAL_PARSED_CALENDAR_CACHE_SIZE = getenv_integer("ICAL_PARSED_CALENDAR_CACHE_SIZE", 1000)
+ICAL_PARSED_CALENDAR_CACHE_MAX_SOURCE_SIZE = getenv_integer("ICAL_PARSED_CALENDAR_CACHE_MAX_SOURCE_SIZE", 20_000_000)
+# Max number of web schedule calendars whose shift rotation events are kept in the per-process cache used to expand
+# web schedule shifts without generating and parsing iCal
+SCHEDULE_ROTATION_EVENTS_CACHE_SIZE = getenv_integer("SCHEDULE_ROTATION_EVENTS_CACHE_SIZE", 1000)
+# Number of hosts and max number of keep-alive connections per host kept in the per-process iCal feed download pool
+ICAL_FEED_POOL_CONNECTIONS = getenv_integer("ICAL_FEED_POOL_CONNECTIONS", 100)
+ICAL_FEED_POOL_MAXSIZE = getenv_integer("ICAL_FEED_POOL_MAXSIZE", 10)
+# Seconds iCal feed validators (ETag/Last-Modified) used for conditional downloads are cached for
+ICAL_FEED_VALIDATORS_CACHE_TIMEOUT = getenv_integer("ICAL_FEED_VALIDATORS_CACHE_TIMEOUT", 60 * 60 * 24)
+# Max random delay (in seconds) iCal feed refresh batches are spread over, so feeds are not all polled at the same time
+ICAL_FEED_REFRESH_JITTER = getenv_integer("ICAL_FEED_REFRESH_JITTER", 60)
+# Number of imported iCal schedules refreshed together, and max number of their feeds downloaded concurrently
+ICAL_FEED_REFRESH_BATCH_SIZE = getenv_integer("ICAL_FEED_REFRESH_BATCH_SIZE", 50)
+ICAL_FEED_DOWNLOAD_MAX_WORKERS = getenv_integer("ICAL_FEED_DOWNLOAD_MAX_WORKERS", 10)
+# Seconds API, plugin and Grafana service account authentication results are cached for, 0 disables the cache
+AUTH_TOKEN_CACHE_TIMEOUT = getenv_integer("AUTH_TOKEN_CACHE_TIMEOUT", 30)
 
 # Log inbound/outbound calls as slow=1 if they exceed threshold
 SLOW_THRESHOLD_SECONDS = 2.0